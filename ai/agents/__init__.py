@@ -6,9 +6,18 @@ This package contains all ADK agents organized by domain:
 - chat/: Conversational QA assistant agent
 
 The root_agent is the main orchestrator that coordinates all sub-agents.
+It is built on first access so importing a subpackage does not construct it.
 """
 from __future__ import annotations
 
-from ai.agents.agent import root_agent
+from typing import Any
 
 __all__ = ["root_agent"]
+
+
+def __getattr__(name: str) -> Any:
+    if name == "root_agent":
+        from ai.agents.agent import root_agent
+
+        return root_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -5,5 +5,16 @@ from ai.agents.analysis.log_analyst import log_analyst
 from ai.agents.analysis.video_analyst import video_analyst
 from ai.agents.analysis.repro_planner import repro_planner
 from ai.agents.analysis.synthesizer import synthesizer
+from ai.agents.analysis.fused import chunk_analyst
+from ai.agents.analysis.output_repair import output_repairer
+from ai.agents.analysis.batch import create_batch_agent
 
-__all__ = ["log_analyst", "video_analyst", "repro_planner", "synthesizer"]
+__all__ = [
+    "log_analyst",
+    "video_analyst",
+    "repro_planner",
+    "synthesizer",
+    "chunk_analyst",
+    "output_repairer",
+    "create_batch_agent",
+]
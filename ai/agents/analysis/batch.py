@@ -0,0 +1,36 @@
+"""Batch variants of the small text agents, used by ai.services.batching."""
+from __future__ import annotations
+
+from google.adk.agents import LlmAgent
+
+BATCH_INSTRUCTION = """
+Batched input:
+Instead of a single input you may receive several independent inputs at once:
+{
+    "batch": true,
+    "items": {"<key>": {"task": "...", "input": { ... }}}
+}
+
+Handle every item on its own, exactly as you would a single input, and return ONLY:
+{
+    "results": {"<key>": { ...the JSON object you would return for that item... }}
+}
+
+- Return exactly one entry per key, using the keys you were given
+- Never carry findings from one item into another; items come from unrelated sessions
+"""
+
+
+def create_batch_agent(agent: LlmAgent) -> LlmAgent:
+    """Same model and instruction as ``agent``, answering keyed multi-item requests.
+
+    No ``output_schema``: the keyed result map cannot be expressed without
+    ``additionalProperties``. Each item is validated against ``agent``'s schema
+    after the reply is split.
+    """
+    return LlmAgent(
+        name=f"{agent.name}_batch",
+        model=agent.model,
+        description=f"{agent.description} (several independent inputs per call)",
+        instruction=f"{agent.instruction}\n{BATCH_INSTRUCTION}",
+    )
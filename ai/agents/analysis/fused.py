@@ -0,0 +1,88 @@
+"""Chunk Analyst Agent - Log analysis, repro planning and synthesis in one call."""
+from __future__ import annotations
+
+import os
+
+from google.adk.agents import LlmAgent
+from pydantic import BaseModel
+
+from ai.agents.analysis.log_analyst import LogAnalystOutput
+from ai.agents.analysis.repro_planner import ReproPlannerOutput
+from ai.agents.analysis.synthesizer import SynthesizerOutput
+
+CHUNK_ANALYST_INSTRUCTION = """You analyze one chunk of a QA testing session without video.
+
+The input holds the session, chunk and checkpoint once, then:
+- "logs": console/network events, plus known_issues (rule summaries), network_summary and
+  error_clusters when present
+- "interactions": user interaction events and tester annotations
+
+Produce three sections in a single JSON object:
+{
+    "log": {
+        "summary": "Brief summary of log findings",
+        "issues": [
+            {
+                "title": "Issue title",
+                "severity": "low|medium|high",
+                "detail": "Detailed description",
+                "ts": "timestamp",
+                "source": "console|network",
+                "category": "error|warning|performance|security"
+            }
+        ],
+        "evidence": [
+            {
+                "type": "console|network",
+                "message": "Error message or URL",
+                "ts": "timestamp",
+                "status": "HTTP status if network"
+            }
+        ]
+    },
+    "repro": {
+        "summary": "Brief summary of the reproduction flow",
+        "repro_steps": ["Step 1: Navigate to [URL]", "Expected: ...", "Actual: ..."]
+    },
+    "synthesis": {
+        "summary": "Executive summary of the chunk (2-3 sentences)",
+        "suspected_root_cause": "Most likely root cause based on evidence",
+        "severity_breakdown": {"high": 0, "medium": 0, "low": 0},
+        "top_issues": [
+            {
+                "title": "Issue title",
+                "severity": "high|medium|low",
+                "detail": "Brief description",
+                "source": "log_analyst"
+            }
+        ]
+    }
+}
+
+Guidelines:
+- log: prioritize errors over warnings, group related errors, use network_summary to explain
+  failures, and treat each known_issues entry as already classified (report it at most once)
+- repro: start from the entry URL, name specific elements and entered data, include expected vs
+  actual behavior, and reference tester markers
+- synthesis: build on your own log issues and repro steps, tie errors to the interactions just
+  before them, and limit top_issues to the 5 most important findings
+- Include all three sections even when one of them is empty
+"""
+
+
+class ChunkAnalystOutput(BaseModel):
+    log: LogAnalystOutput = LogAnalystOutput()
+    repro: ReproPlannerOutput = ReproPlannerOutput()
+    synthesis: SynthesizerOutput = SynthesizerOutput()
+
+
+OUTPUT_SCHEMA = ChunkAnalystOutput
+
+
+chunk_analyst = LlmAgent(
+    name="chunk_analyst",
+    model=os.getenv("ADK_TEXT_MODEL", "gemini-3-flash"),
+    description="Analyzes logs, plans repro steps and summarizes a chunk without video",
+    instruction=CHUNK_ANALYST_INSTRUCTION,
+    output_schema=OUTPUT_SCHEMA,
+)
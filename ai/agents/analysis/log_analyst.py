@@ -2,9 +2,12 @@
 from __future__ import annotations
 
 import os
+from typing import List
 
 from google.adk.agents import LlmAgent
 
+from ai.agents.analysis.schemas import AgentReport, Evidence, Issue
+
 LOG_ANALYST_INSTRUCTION = """You analyze console and network events from a QA testing session.
 
 Your task is to identify errors, warnings, and anomalies in the logs.
@@ -37,12 +40,28 @@ Guidelines:
 - Group related errors together
 - Note recurring patterns
 - Use checkpoint context to avoid reporting duplicates
+- network_summary holds a per-endpoint latency/error table (plus retry storms and slow
+  requests) in place of successful requests. Latency issues derived from it are added for you;
+  use it for context and to explain failures, not to restate them
+- known_issues lists events already classified by rules (title, severity, count, a sample);
+  report each as an issue, refining the detail if the sample warrants it, and do not re-derive
+  them from events
 - Include relevant timestamps for correlation
 """
 
+
+class LogAnalystOutput(AgentReport):
+    issues: List[Issue] = []
+    evidence: List[Evidence] = []
+
+
+OUTPUT_SCHEMA = LogAnalystOutput
+
+
 log_analyst = LlmAgent(
     name="log_analyst",
     model=os.getenv("ADK_TEXT_MODEL", "gemini-3-flash"),
     description="Analyzes console logs and network requests for errors and anomalies",
     instruction=LOG_ANALYST_INSTRUCTION,
+    output_schema=OUTPUT_SCHEMA,
 )
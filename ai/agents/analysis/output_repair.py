@@ -0,0 +1,36 @@
+"""Output Repairer Agent - Fixes the parts of an agent reply that failed validation."""
+from __future__ import annotations
+
+import os
+
+from google.adk.agents import LlmAgent
+
+OUTPUT_REPAIRER_INSTRUCTION = """You fix JSON from an analysis agent that failed schema validation.
+
+The input JSON has:
+- "agent": which agent produced the output
+- "schema": the JSON schema the output must follow
+- either "broken": a map of path -> {"value": ..., "error": ...} for the parts that failed,
+  or "raw_text": the full reply when it could not be parsed as JSON at all
+
+Return JSON with the following structure:
+{
+    "fixes": {"<path>": <corrected value>}
+}
+or, for "raw_text", the complete corrected object:
+{
+    "output": { ... }
+}
+
+Guidelines:
+- Only return the paths you were given; do not re-analyze the session
+- Keep the original meaning; change only what is needed to satisfy the schema
+- If a value cannot be repaired, omit its path
+"""
+
+output_repairer = LlmAgent(
+    name="output_repairer",
+    model=os.getenv("ADK_TEXT_MODEL", "gemini-3-flash"),
+    description="Repairs invalid fields in analysis agent outputs without re-running the analysis",
+    instruction=OUTPUT_REPAIRER_INSTRUCTION,
+)
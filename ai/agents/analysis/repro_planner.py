@@ -2,9 +2,12 @@
 from __future__ import annotations
 
 import os
+from typing import List
 
 from google.adk.agents import LlmAgent
 
+from ai.agents.analysis.schemas import AgentReport
+
 REPRO_PLANNER_INSTRUCTION = """You derive reproduction steps from user interaction events and annotations.
 
 Your task is to create clear, actionable steps to reproduce issues found during testing.
@@ -31,9 +34,18 @@ Guidelines:
 - Group related actions logically
 """
 
+
+class ReproPlannerOutput(AgentReport):
+    repro_steps: List[str] = []
+
+
+OUTPUT_SCHEMA = ReproPlannerOutput
+
+
 repro_planner = LlmAgent(
     name="repro_planner",
     model=os.getenv("ADK_TEXT_MODEL", "gemini-3-flash"),
     description="Generates clear reproduction steps from interaction events and tester annotations",
     instruction=REPRO_PLANNER_INSTRUCTION,
+    output_schema=OUTPUT_SCHEMA,
 )
@@ -0,0 +1,45 @@
+"""Typed output schemas shared by the analysis agents.
+
+Each agent passes its output model to ADK as ``output_schema`` so the model is
+asked for JSON in that shape, and the orchestrator validates the reply
+against the same model (see ``ai.services.agent_outputs``).
+"""
+from __future__ import annotations
+
+from typing import Optional, Union
+
+from pydantic import BaseModel, Field, field_validator
+
+SEVERITIES = ("low", "medium", "high")
+
+Timestamp = Optional[Union[str, int, float]]
+
+
+class Issue(BaseModel):
+    title: str = Field(min_length=1)
+    severity: str = "medium"
+    detail: str = ""
+    ts: Timestamp = None
+    source: Optional[str] = None
+    category: Optional[str] = None
+
+    @field_validator("severity", mode="before")
+    @classmethod
+    def _normalize_severity(cls, value: object) -> object:
+        if isinstance(value, str):
+            value = value.strip().lower()
+            if value not in SEVERITIES:
+                raise ValueError(f"severity must be one of {', '.join(SEVERITIES)}")
+        return value
+
+
+class Evidence(BaseModel):
+    type: Optional[str] = None
+    message: Optional[str] = None
+    url: Optional[str] = None
+    ts: Timestamp = None
+    status: Optional[Union[int, str]] = None
+
+
+class AgentReport(BaseModel):
+    summary: str = ""
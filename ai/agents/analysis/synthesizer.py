@@ -2,8 +2,12 @@
 from __future__ import annotations
 
 import os
+from typing import List, Optional
 
 from google.adk.agents import LlmAgent
+from pydantic import BaseModel
+
+from ai.agents.analysis.schemas import AgentReport, Issue
 
 SYNTHESIZER_INSTRUCTION = """You consolidate findings from multiple analysis agents into a coherent summary.
 
@@ -30,16 +34,35 @@ Return JSON with the following structure:
 
 Guidelines:
 - Prioritize issues by severity and impact
-- Correlate findings across different sources (logs + video)
+- Correlate findings across different sources (logs + video); chunk input arrives as
+  issue_groups, where issues that overlap in time are already grouped with the console/network
+  errors in that window and the interactions just before it
 - Identify patterns that suggest root causes
 - Keep the summary actionable and concise
 - Limit top_issues to the 5 most important findings
 - Consider the testing context and environment
 """
 
+
+class SeverityBreakdown(BaseModel):
+    high: int = 0
+    medium: int = 0
+    low: int = 0
+
+
+class SynthesizerOutput(AgentReport):
+    suspected_root_cause: Optional[str] = None
+    severity_breakdown: SeverityBreakdown = SeverityBreakdown()
+    top_issues: List[Issue] = []
+
+
+OUTPUT_SCHEMA = SynthesizerOutput
+
+
 synthesizer = LlmAgent(
     name="synthesizer",
     model=os.getenv("ADK_TEXT_MODEL", "gemini-3-flash"),
     description="Consolidates findings from all analysis agents into actionable insights",
     instruction=SYNTHESIZER_INSTRUCTION,
+    output_schema=OUTPUT_SCHEMA,
 )
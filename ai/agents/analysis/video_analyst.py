@@ -2,8 +2,12 @@
 from __future__ import annotations
 
 import os
+from typing import List, Optional
 
 from google.adk.agents import LlmAgent
+from pydantic import BaseModel
+
+from ai.agents.analysis.schemas import AgentReport, Issue
 
 VIDEO_ANALYST_INSTRUCTION = """You analyze recorded UI video from a QA testing session for visual and UX issues.
 
@@ -40,9 +44,32 @@ Guidelines:
 - If video_url is missing, explain that video could not be analyzed and return empty arrays
 """
 
+
+class VideoIssue(Issue):
+    timestamp_start: Optional[str] = None
+    timestamp_end: Optional[str] = None
+    ui_area: Optional[str] = None
+    confidence: Optional[str] = None
+
+
+class VideoEvidence(BaseModel):
+    type: Optional[str] = None
+    timestamp: Optional[str] = None
+    description: Optional[str] = None
+
+
+class VideoAnalystOutput(AgentReport):
+    issues: List[VideoIssue] = []
+    evidence: List[VideoEvidence] = []
+
+
+OUTPUT_SCHEMA = VideoAnalystOutput
+
+
 video_analyst = LlmAgent(
     name="video_analyst",
     model=os.getenv("ADK_VIDEO_MODEL", "gemini-3-pro-preview"),
     description="Analyzes recorded video for visual glitches, UI/UX issues, and accessibility problems",
     instruction=VIDEO_ANALYST_INSTRUCTION,
+    output_schema=OUTPUT_SCHEMA,
 )
@@ -1,8 +1,13 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
+from typing import Optional
 
-from ai.models.requests import AggregateRequest, AnalyzeRequest
+from fastapi import APIRouter, Depends, Response
+
+from ai.app.api.bodies import aggregate_body, analyze_body, prioritize_body
+from ai.app.responses import report_response
+from ai.core.profiling import stage
+from ai.models.requests import AggregateRequest, AnalyzeRequest, PrioritizeRequest
 from ai.services.orchestrator import Orchestrator
 from ai.services.orchestrator_provider import get_orchestrator
 
@@ -10,10 +15,42 @@ router = APIRouter()
 
 
 @router.post("/analyze")
-def analyze(payload: AnalyzeRequest, orchestrator: Orchestrator = Depends(get_orchestrator)) -> dict:
-    return orchestrator.analyze_chunk(payload.session, payload.chunk, payload.events)
+def analyze(
+    payload: AnalyzeRequest = Depends(analyze_body),
+    fields: Optional[str] = None,
+    compact: bool = False,
+    orchestrator: Orchestrator = Depends(get_orchestrator),
+) -> Response:
+    with stage("orchestrator.analyze"):
+        report = orchestrator.analyze_chunk(payload.session, payload.chunk, payload.events)
+    with stage("response"):
+        return report_response(report, fields, compact)
+
+
+@router.post("/prioritize")
+def prioritize(
+    payload: PrioritizeRequest = Depends(prioritize_body),
+    orchestrator: Orchestrator = Depends(get_orchestrator),
+) -> dict:
+    with stage("orchestrator.prioritize"):
+        return orchestrator.prioritize(
+            payload.session, [(entry.chunk, entry.events) for entry in payload.chunks]
+        )
 
 
 @router.post("/aggregate")
-def aggregate(payload: AggregateRequest, orchestrator: Orchestrator = Depends(get_orchestrator)) -> dict:
-    return orchestrator.aggregate_session(payload.session, payload.chunk_reports)
+def aggregate(
+    payload: AggregateRequest = Depends(aggregate_body),
+    fields: Optional[str] = None,
+    compact: bool = False,
+    orchestrator: Orchestrator = Depends(get_orchestrator),
+) -> Response:
+    chunk_ids = (
+        [str(chunk_id) for chunk_id in payload.chunk_ids] if payload.chunk_ids is not None else None
+    )
+    with stage("orchestrator.aggregate"):
+        report = orchestrator.aggregate_session(
+            payload.session, payload.chunk_reports, chunk_ids, payload.version
+        )
+    with stage("response"):
+        return report_response(report, fields, compact)
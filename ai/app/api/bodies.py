@@ -0,0 +1,91 @@
+"""Request body dependencies that understand compressed and columnar payloads."""
+from __future__ import annotations
+
+from typing import Type, TypeVar
+
+from fastapi import HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
+
+from ai.app.wire import WireFormatError, decode_body, is_plain_json
+from ai.core.config import settings
+from ai.core.offload import offload
+from ai.core.profiling import stage
+from ai.models.events import parse_events
+from ai.models.requests import (
+    AggregateRequest,
+    AnalyzeRequest,
+    ChatRequest,
+    LiveEventsRequest,
+    PrioritizeRequest,
+)
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+async def parse_body(request: Request, model: Type[ModelT]) -> ModelT:
+    with stage("body.read"):
+        body = await request.body()
+    with stage("body.parse"):
+        return await _parse(body, request, model)
+
+
+async def _parse(body: bytes, request: Request, model: Type[ModelT]) -> ModelT:
+    content_type = request.headers.get("content-type")
+    content_encoding = request.headers.get("content-encoding")
+    try:
+        if offload.should_offload(len(body)):
+            # the worker parses; unpickling its result here is several times cheaper than
+            # parsing JSON
+            data = await offload.run(
+                decode_body,
+                body,
+                content_type,
+                content_encoding,
+                settings.max_body_bytes,
+                size=len(body),
+                task="decode_body",
+            )
+            return model.model_validate(data)
+        if is_plain_json(content_type, content_encoding):
+            return model.model_validate_json(body)
+        data = decode_body(body, content_type, content_encoding, settings.max_body_bytes)
+        return model.model_validate(data)
+    except WireFormatError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=str(exc)) from exc
+    except ValidationError as exc:
+        raise RequestValidationError(exc.errors(include_url=False)) from exc
+
+
+async def analyze_body(request: Request) -> AnalyzeRequest:
+    return await parse_body(request, AnalyzeRequest)
+
+
+async def aggregate_body(request: Request) -> AggregateRequest:
+    return await parse_body(request, AggregateRequest)
+
+
+async def prioritize_body(request: Request) -> PrioritizeRequest:
+    return await parse_body(request, PrioritizeRequest)
+
+
+async def chat_body(request: Request) -> ChatRequest:
+    return await parse_body(request, ChatRequest)
+
+
+async def live_events_body(request: Request) -> LiveEventsRequest:
+    with stage("body.read"):
+        body = await request.body()
+    with stage("body.parse"):
+        if (
+            is_plain_json(
+                request.headers.get("content-type"), request.headers.get("content-encoding")
+            )
+            and body.lstrip()[:1] == b"["
+        ):
+            # a bare event array goes straight through the bulk adapter
+            try:
+                return LiveEventsRequest.model_construct(events=parse_events(body))
+            except ValidationError as exc:
+                raise RequestValidationError(exc.errors(include_url=False)) from exc
+        return await _parse(body, request, LiveEventsRequest)
@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from fastapi import APIRouter, Depends
 
+from ai.app.api.bodies import chat_body
+from ai.core.profiling import stage
 from ai.models.requests import ChatRequest
 from ai.services.orchestrator import Orchestrator
 from ai.services.orchestrator_provider import get_orchestrator
@@ -10,14 +12,18 @@ router = APIRouter()
 
 
 @router.post("/chat")
-def chat(payload: ChatRequest, orchestrator: Orchestrator = Depends(get_orchestrator)) -> dict:
-    return orchestrator.chat(
-        payload.session,
-        payload.analysis,
-        payload.events,
-        payload.message,
-        payload.mode,
-        payload.model,
-        payload.resources,
-        payload.images,
-    )
+def chat(
+    payload: ChatRequest = Depends(chat_body),
+    orchestrator: Orchestrator = Depends(get_orchestrator),
+) -> dict:
+    with stage("orchestrator.chat"):
+        return orchestrator.chat(
+            payload.session,
+            payload.analysis,
+            payload.events,
+            payload.message,
+            payload.mode,
+            payload.model,
+            payload.resources,
+            payload.images,
+        )
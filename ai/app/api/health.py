@@ -1,20 +1,43 @@
 from __future__ import annotations
 
+import json
 import os
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
+from fastapi.responses import PlainTextResponse
 
+from ai.core.metrics import metrics
 from ai.services.orchestrator import _should_use_adk
+from ai.services.orchestrator_provider import circuit_states, is_ready
 
 router = APIRouter()
 
 
 @router.get("/health")
 def health() -> dict:
+    circuits = circuit_states()
     return {
         "status": "ok",
         "adk_enabled": _should_use_adk(),
+        # any open or half-open breaker means some ADK calls are being served by the stub
+        "degraded": any(circuit["state"] != "closed" for circuit in circuits.values()),
+        "circuits": circuits,
         "adk_text_model": os.getenv("ADK_TEXT_MODEL", "gemini-3-flash"),
         "adk_video_model": os.getenv("ADK_VIDEO_MODEL", "gemini-3-pro-preview"),
         "gemini_model": os.getenv("GEMINI_MODEL", "gemini-1.5-pro"),
     }
+
+
+@router.get("/ready")
+def ready(response: Response) -> dict:
+    if not is_ready():
+        response.status_code = 503
+        return {"status": "warming"}
+    return {"status": "ready", "adk_enabled": _should_use_adk()}
+
+
+@router.get("/metrics")
+def metrics_endpoint(format: str = "prometheus") -> Response:
+    if format == "json":
+        return Response(json.dumps(metrics.snapshot()), media_type="application/json")
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from ai.app.api.bodies import live_events_body
+from ai.models.requests import LiveEventsRequest
+from ai.services.orchestrator import Orchestrator
+from ai.services.orchestrator_provider import get_orchestrator
+
+router = APIRouter()
+
+
+@router.post("/sessions/{session_id}/events")
+def ingest_events(
+    session_id: str,
+    payload: LiveEventsRequest = Depends(live_events_body),
+    orchestrator: Orchestrator = Depends(get_orchestrator),
+) -> dict:
+    return orchestrator.ingest_events(session_id, payload.events)
+
+
+@router.get("/sessions/{session_id}/live")
+def live_state(session_id: str, orchestrator: Orchestrator = Depends(get_orchestrator)) -> dict:
+    snapshot = orchestrator.live.snapshot(session_id)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="no live state for session")
+    return snapshot
+
+
+@router.delete("/sessions/{session_id}/live")
+def discard_live_state(
+    session_id: str, orchestrator: Orchestrator = Depends(get_orchestrator)
+) -> dict:
+    return {"discarded": orchestrator.live.discard(session_id)}
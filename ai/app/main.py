@@ -1,19 +1,52 @@
 ﻿from __future__ import annotations
 
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
 from ai.app.api.analysis import router as analysis_router
 from ai.app.api.chat import router as chat_router
 from ai.app.api.health import router as health_router
+from ai.app.api.live import router as live_router
 from ai.core.config import settings
 from ai.core.logging import configure_logging
+from ai.core.loop_lag import LoopLagMonitor
+from ai.core.offload import offload
+from ai.core.profiling import ProfilingMiddleware
+from ai.services.orchestrator_provider import warm_orchestrator
 
 configure_logging()
 
-app = FastAPI(title=settings.app_name)
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # Warm in the background so /health answers immediately; /ready flips when done.
+    warmup = asyncio.create_task(asyncio.to_thread(warm_orchestrator))
+    pool_warmup = asyncio.create_task(asyncio.to_thread(offload.warm))
+    loop_lag = LoopLagMonitor(settings.loop_lag_interval_seconds)
+    loop_lag.start()
+    yield
+    loop_lag.stop()
+    for task in (warmup, pool_warmup):
+        if not task.done():
+            task.cancel()
+    offload.shutdown()
+
+
+app = FastAPI(title=settings.app_name, lifespan=lifespan)
+if settings.profile_dir:
+    app.add_middleware(
+        ProfilingMiddleware,
+        directory=settings.profile_dir,
+        sample_rate=settings.profile_sample_rate,
+        interval=settings.profile_interval_ms / 1000.0,
+    )
 app.include_router(health_router)
 app.include_router(analysis_router)
 app.include_router(chat_router)
+app.include_router(live_router)
 app.include_router(health_router, prefix="/v1")
 app.include_router(analysis_router, prefix="/v1")
 app.include_router(chat_router, prefix="/v1")
+app.include_router(live_router, prefix="/v1")
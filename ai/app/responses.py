@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, Iterator, List, Optional
+
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+
+from ai.core.config import settings
+from ai.services.reports import compact_report, project_report
+
+_STREAM_BATCH = 200
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def parse_fields(raw: Optional[str]) -> List[str]:
+    return [field.strip() for field in (raw or "").split(",") if field.strip()]
+
+
+def _item_count(report: Dict[str, Any]) -> int:
+    return sum(len(value) for value in report.values() if isinstance(value, list))
+
+
+def iter_json(report: Dict[str, Any]) -> Iterator[str]:
+    """Serialize ``report`` as JSON text in pieces, batching large lists."""
+    yield "{"
+    for position, (key, value) in enumerate(report.items()):
+        prefix = "," if position else ""
+        if not isinstance(value, list) or len(value) <= _STREAM_BATCH:
+            yield f"{prefix}{_dumps(key)}:{_dumps(value)}"
+            continue
+        yield f"{prefix}{_dumps(key)}:["
+        for start in range(0, len(value), _STREAM_BATCH):
+            batch = ",".join(_dumps(item) for item in value[start : start + _STREAM_BATCH])
+            yield ("," if start else "") + batch
+        yield "]"
+    yield "}"
+
+
+def report_response(
+    report: Dict[str, Any], fields: Optional[str] = None, compact: bool = False
+) -> Response:
+    """Render an analysis report, skipping FastAPI's generic encoder.
+
+    ``fields`` is a comma-separated projection, ``compact`` replaces embedded
+    copies with index references, and reports with many list items are streamed.
+    """
+    selected = parse_fields(fields)
+    if selected:
+        report = project_report(report, selected)
+    if compact:
+        report = compact_report(report)
+    if _item_count(report) >= settings.response_stream_min_items:
+        return StreamingResponse(
+            (chunk.encode("utf-8") for chunk in iter_json(report)), media_type="application/json"
+        )
+    return Response(content=_dumps(report).encode("utf-8"), media_type="application/json")
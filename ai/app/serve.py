@@ -0,0 +1,75 @@
+"""
+Multi-worker entrypoint for the AI service.
+
+Usage:
+    python -m ai.app.serve [--workers N] [--host HOST] [--port PORT]
+
+Each worker is a separate process with its own orchestrator and offload pool.
+They share CHECKPOINT_DIR safely because checkpoint updates take a per-session
+file lock. Live session state (``ai.services.live``) is per worker, and workers
+share one port, so live sessions are best served by single-worker instances
+routed by session id.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+from typing import List
+
+import uvicorn
+
+from ai.core.config import settings
+
+
+def usable_cpus() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # pragma: no cover - not available on macOS/Windows
+        return os.cpu_count() or 1
+
+
+def default_workers() -> int:
+    """Worker count from WEB_CONCURRENCY, else one per usable CPU (max 8).
+
+    Request handling is mostly JSON work plus waiting on the model, so more
+    processes than cores only adds memory (each holds its own ADK runners).
+    """
+    if settings.web_concurrency > 0:
+        return settings.web_concurrency
+    return max(1, min(usable_cpus(), 8))
+
+
+def offload_workers(workers: int) -> int:
+    """Offload pool size per worker from OFFLOAD_WORKERS, else the usable CPUs split evenly.
+
+    Every worker starts its own pool, so a fixed per-worker size multiplies
+    with the worker count (8 workers with 2 each is 16 pool processes).
+    """
+    raw = os.getenv("OFFLOAD_WORKERS")
+    if raw and raw.strip():
+        return settings.offload_workers
+    return max(1, usable_cpus() // max(workers, 1))
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Run the AI service with multiple workers.")
+    parser.add_argument("--workers", type=int, default=default_workers())
+    parser.add_argument("--host", default=settings.host)
+    parser.add_argument("--port", type=int, default=settings.port)
+    args = parser.parse_args(argv)
+    workers = max(args.workers, 1)
+    if workers > 1:
+        # worker processes read the pool size from the environment when they import the settings
+        os.environ["OFFLOAD_WORKERS"] = str(offload_workers(workers))
+
+    uvicorn.run(
+        "ai.app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        log_level=settings.log_level.lower(),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Request body decoding for compressed and columnar payloads.
+
+Negotiated per request:
+
+- ``Content-Encoding``: ``identity`` (default), ``gzip`` or ``zstd``
+- ``Content-Type``:
+  - ``application/json`` (default)
+  - ``application/msgpack`` (same shape as JSON)
+  - ``application/vnd.qa-assist.columnar+json`` / ``+msgpack``
+
+In the columnar shape ``events`` is a struct of arrays and per-event fields
+that repeat the session are hoisted::
+
+    {"session": {...}, "chunk": {...},
+     "events": {"session_id": "...", "id": [...], "ts": [...],
+                "type": [0, 1, ...], "types": ["console", "network"],
+                "payload": [...]}}
+
+``type`` may hold the strings directly or indices into ``types``.
+msgpack and zstd need the optional ``msgpack`` and ``zstandard`` packages.
+"""
+from __future__ import annotations
+
+import json
+import zlib
+from typing import Any, Dict, List, Optional
+
+try:
+    import msgpack
+except ImportError:  # optional dependency
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+JSON_TYPES = {"application/json", ""}
+MSGPACK_TYPES = {"application/msgpack", "application/x-msgpack"}
+COLUMNAR_JSON = "application/vnd.qa-assist.columnar+json"
+COLUMNAR_MSGPACK = "application/vnd.qa-assist.columnar+msgpack"
+
+
+class WireFormatError(ValueError):
+    """Malformed body (400), unsupported format (415) or oversized body (413)."""
+
+    def __init__(self, message: str, status_code: int = 400) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+
+    def __reduce__(self):
+        # keep the status code when raised inside an offload worker
+        return type(self), (str(self), self.status_code)
+
+
+def media_type(content_type: Optional[str]) -> str:
+    return (content_type or "").split(";", 1)[0].strip().lower()
+
+
+def is_plain_json(content_type: Optional[str], content_encoding: Optional[str]) -> bool:
+    encoding = (content_encoding or "identity").strip().lower()
+    return media_type(content_type) in JSON_TYPES and encoding == "identity"
+
+
+def decompress(body: bytes, content_encoding: Optional[str], max_bytes: int = 0) -> bytes:
+    """Undo ``Content-Encoding``; ``max_bytes`` (if set) caps the inflated size."""
+    encoding = (content_encoding or "identity").strip().lower()
+    limit = max_bytes if max_bytes > 0 else -1
+    if encoding == "identity":
+        return body
+    if encoding == "gzip":
+        try:
+            inflater = zlib.decompressobj(wbits=31)
+            raw = inflater.decompress(body, limit + 1 if limit > 0 else 0)
+        except zlib.error as exc:
+            raise WireFormatError(f"invalid gzip body: {exc}") from exc
+    elif encoding == "zstd":
+        if zstandard is None:
+            raise WireFormatError("zstd request bodies need the zstandard package", 415)
+        try:
+            with zstandard.ZstdDecompressor().stream_reader(body) as reader:
+                raw = reader.read(limit + 1 if limit > 0 else -1)
+        except zstandard.ZstdError as exc:
+            raise WireFormatError(f"invalid zstd body: {exc}") from exc
+    else:
+        raise WireFormatError(f"unsupported Content-Encoding {encoding!r}", 415)
+    if limit > 0 and len(raw) > limit:
+        raise WireFormatError(f"decompressed body exceeds {limit} bytes", 413)
+    return raw
+
+
+def _unpack_msgpack(body: bytes) -> Any:
+    if msgpack is None:
+        raise WireFormatError("msgpack request bodies need the msgpack package", 415)
+    try:
+        return msgpack.unpackb(body, raw=False, strict_map_key=False)
+    except (msgpack.UnpackException, ValueError) as exc:
+        raise WireFormatError(f"invalid msgpack body: {exc}") from exc
+
+
+def expand_events(columns: Dict[str, Any], session_id: Any = None) -> List[Dict[str, Any]]:
+    """Turn a columnar events block back into row dictionaries."""
+    ids = columns.get("id") or []
+    ts = columns.get("ts") or []
+    types = columns.get("type") or []
+    payloads = columns.get("payload") or []
+    count = columns.get("count", len(types))
+    if any(len(column) not in (0, count) for column in (ids, ts, types, payloads)):
+        raise WireFormatError("columnar events have mismatched column lengths")
+    table = columns.get("types")
+    if table:
+        types = [table[code] if isinstance(code, int) else code for code in types]
+    shared_session = columns.get("session_id", session_id)
+    return [
+        {
+            "id": ids[idx] if ids else None,
+            "session_id": shared_session,
+            "ts": ts[idx] if ts else None,
+            "type": types[idx] if types else None,
+            "payload": payloads[idx] if payloads else {},
+        }
+        for idx in range(count)
+    ]
+
+
+def collapse_events(events: List[Dict[str, Any]], session_id: Any = None) -> Dict[str, Any]:
+    """Row events to the columnar block accepted by :func:`expand_events`."""
+    types: List[str] = []
+    codes: Dict[str, int] = {}
+    type_column: List[int] = []
+    for event in events:
+        code = codes.setdefault(event.get("type"), len(codes))
+        if code == len(types):
+            types.append(event.get("type"))
+        type_column.append(code)
+    return {
+        "count": len(events),
+        "session_id": session_id
+        if session_id is not None
+        else (events[0].get("session_id") if events else None),
+        "id": [event.get("id") for event in events],
+        "ts": [event.get("ts") for event in events],
+        "types": types,
+        "type": type_column,
+        "payload": [event.get("payload", {}) for event in events],
+    }
+
+
+def decode_body(
+    body: bytes,
+    content_type: Optional[str],
+    content_encoding: Optional[str] = None,
+    max_bytes: int = 0,
+) -> Dict[str, Any]:
+    """Decompress and decode a request body into the plain JSON-shaped dict."""
+    kind = media_type(content_type)
+    raw = decompress(body, content_encoding, max_bytes)
+    if kind in JSON_TYPES or kind == COLUMNAR_JSON:
+        try:
+            data = json.loads(raw)
+        except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+            raise WireFormatError(f"invalid JSON body: {exc}") from exc
+    elif kind in MSGPACK_TYPES or kind == COLUMNAR_MSGPACK:
+        data = _unpack_msgpack(raw)
+    else:
+        raise WireFormatError(f"unsupported Content-Type {kind!r}", 415)
+
+    if not isinstance(data, dict):
+        raise WireFormatError("request body must be an object")
+    if kind in (COLUMNAR_JSON, COLUMNAR_MSGPACK) and isinstance(data.get("events"), dict):
+        session = data.get("session") if isinstance(data.get("session"), dict) else {}
+        try:
+            data["events"] = expand_events(data["events"], session.get("id"))
+        except (IndexError, TypeError) as exc:
+            raise WireFormatError(f"invalid columnar events: {exc}") from exc
+    return data
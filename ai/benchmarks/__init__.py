@@ -0,0 +1,9 @@
+"""
+Micro-benchmarks for the AI service.
+
+Run the suite and compare against a stored baseline:
+
+    python -m ai.benchmarks.run --output bench.json
+    python -m ai.benchmarks.run --baseline bench.json --max-regression 0.25
+"""
+from __future__ import annotations
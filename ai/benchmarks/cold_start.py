@@ -0,0 +1,134 @@
+"""
+Cold-start benchmark, modelling a freshly autoscaled instance.
+
+Each iteration starts a new uvicorn process and measures the time until
+``/health`` answers (live), until ``/ready`` returns 200 (warm), and the
+latency of the first and second ``/analyze`` requests.
+
+Usage:
+    python -m ai.benchmarks.cold_start [--iterations 5] [--mode stub --mode adk]
+                                       [--output cold.json] [--baseline old.json]
+
+ADK mode uses the synthetic model backend, so no API key or quota is needed.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+from ai.benchmarks.harness import (
+    BenchResult,
+    compare,
+    format_seconds,
+    load_results,
+    results_document,
+)
+from ai.benchmarks.synthetic import SessionSpec, generate_session
+
+MODES: Dict[str, Dict[str, str]] = {
+    "stub": {"ADK_ENABLED": "false"},
+    "adk": {"ADK_ENABLED": "true", "ADK_MODEL_BACKEND": "synthetic"},
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for(client: httpx.Client, path: str, started: float, timeout: float) -> Optional[float]:
+    while time.perf_counter() - started < timeout:
+        try:
+            if client.get(path).status_code == 200:
+                return time.perf_counter() - started
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.01)
+    return None
+
+
+def cold_start_once(mode: str, payload: Dict, timeout: float = 60.0) -> Dict[str, float]:
+    port = _free_port()
+    with tempfile.TemporaryDirectory() as checkpoint_dir:
+        env = dict(os.environ, CHECKPOINT_DIR=checkpoint_dir, **MODES[mode])
+        command = [
+            sys.executable, "-m", "uvicorn", "ai.app.main:app",
+            "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning",
+        ]
+        started = time.perf_counter()
+        process = subprocess.Popen(command, env=env, cwd=str(Path(__file__).resolve().parents[2]))
+        try:
+            with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=timeout) as client:
+                live = _wait_for(client, "/health", started, timeout)
+                ready = _wait_for(client, "/ready", started, timeout)
+                if live is None or ready is None:
+                    raise RuntimeError(f"{mode} instance did not become ready within {timeout}s")
+                timings = {"live_s": live, "ready_s": ready}
+                for label in ("first_analyze_s", "second_analyze_s"):
+                    request_started = time.perf_counter()
+                    client.post("/analyze", json=payload).raise_for_status()
+                    timings[label] = time.perf_counter() - request_started
+                return timings
+        finally:
+            process.terminate()
+            process.wait(timeout=10)
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure AI service cold start.")
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--mode", action="append", choices=sorted(MODES))
+    parser.add_argument("--events", type=int, default=500)
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    payload = generate_session(SessionSpec(event_count=args.events), "cold-start")
+    results: List[BenchResult] = []
+    for mode in args.mode or list(MODES):
+        runs = [cold_start_once(mode, payload) for _ in range(args.iterations)]
+        for metric in runs[0]:
+            samples = [run[metric] for run in runs]
+            results.append(
+                BenchResult(
+                    name=f"cold_start.{mode}.{metric}",
+                    median_s=statistics.median(samples),
+                    min_s=min(samples),
+                    mean_s=statistics.fmean(samples),
+                    stdev_s=statistics.stdev(samples) if len(samples) > 1 else 0.0,
+                    repeat=len(samples),
+                    number=1,
+                )
+            )
+
+    for result in results:
+        median, fastest = format_seconds(result.median_s), format_seconds(result.min_s)
+        print(f"{result.name:<40} median {median:>10}  min {fastest:>10}")
+
+    document = results_document(results)
+    if args.output:
+        args.output.write_text(json.dumps(document, indent=2), encoding="utf-8")
+    if args.baseline:
+        rows = compare(document, load_results(args.baseline), args.max_regression)
+        regressions = [row["name"] for row in rows if row["regression"]]
+        if regressions:
+            print(f"regressed: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,117 @@
+"""Timing and baseline-comparison helpers for the benchmark suite."""
+from __future__ import annotations
+
+import json
+import platform
+import statistics
+import sys
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+
+@dataclass
+class BenchResult:
+    name: str
+    median_s: float
+    min_s: float
+    mean_s: float
+    stdev_s: float
+    repeat: int
+    number: int
+
+
+def measure(
+    name: str,
+    fn: Callable[[], Any],
+    repeat: int = 5,
+    number: Optional[int] = None,
+    min_time: float = 0.05,
+    setup: Optional[Callable[[], Any]] = None,
+) -> BenchResult:
+    """Time ``fn`` and report per-call statistics.
+
+    When ``number`` is not given it is calibrated so that each repeat takes at
+    least ``min_time`` seconds. ``setup`` runs before every repeat and is not timed.
+    """
+    if number is None:
+        number = 1
+        while True:
+            if setup:
+                setup()
+            start = time.perf_counter()
+            for _ in range(number):
+                fn()
+            if time.perf_counter() - start >= min_time or number >= 1_000_000:
+                break
+            number *= 2
+
+    samples: List[float] = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+
+    return BenchResult(
+        name=name,
+        median_s=statistics.median(samples),
+        min_s=min(samples),
+        mean_s=statistics.fmean(samples),
+        stdev_s=statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        repeat=repeat,
+        number=number,
+    )
+
+
+def results_document(results: List[BenchResult]) -> Dict[str, Any]:
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "results": {result.name: asdict(result) for result in results},
+    }
+
+
+def load_results(path: Path) -> Dict[str, Any]:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def compare(
+    current: Dict[str, Any], baseline: Dict[str, Any], max_regression: float = 0.2
+) -> List[Dict[str, Any]]:
+    """Compare two result documents by median time.
+
+    Returns one row per benchmark present in both documents. A row is flagged
+    as ``regression`` when the current median is more than ``max_regression``
+    (as a fraction) slower than the baseline.
+    """
+    rows: List[Dict[str, Any]] = []
+    base_results = baseline.get("results", {})
+    for name, result in current.get("results", {}).items():
+        base = base_results.get(name)
+        if not base or not base.get("median_s"):
+            continue
+        ratio = result["median_s"] / base["median_s"]
+        rows.append(
+            {
+                "name": name,
+                "baseline_s": base["median_s"],
+                "current_s": result["median_s"],
+                "ratio": ratio,
+                "regression": ratio > 1 + max_regression,
+            }
+        )
+    return rows
+
+
+def format_seconds(value: float) -> str:
+    if value >= 1:
+        return f"{value:.3f}s"
+    if value >= 1e-3:
+        return f"{value * 1e3:.3f}ms"
+    return f"{value * 1e6:.1f}us"
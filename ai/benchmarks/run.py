@@ -0,0 +1,848 @@
+"""
+Benchmark runner.
+
+Usage:
+    python -m ai.benchmarks.run [--suite NAME ...] [--events 1000,10000]
+                                [--output bench.json]
+                                [--baseline old.json --max-regression 0.2]
+
+Exits with status 1 when a baseline is given and any benchmark regressed.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from ai.benchmarks.harness import (
+    BenchResult,
+    compare,
+    format_seconds,
+    load_results,
+    measure,
+    results_document,
+)
+from ai.benchmarks.synthetic import SessionSpec, generate_chunk_reports, generate_session
+from ai.services import checkpoint_codec
+from ai.services.checkpoints import CheckpointStore
+from ai.services.orchestrator import StubOrchestrator
+from ai.tools.event_tools import (
+    extract_error_events,
+    filter_console_events,
+    filter_interaction_events,
+    filter_network_events,
+)
+
+DEFAULT_EVENT_COUNTS = [1_000, 10_000]
+DEFAULT_CHUNK_COUNTS = [10, 50, 200]
+
+
+def bench_event_tools(event_counts: List[int], repeat: int) -> List[BenchResult]:
+    results: List[BenchResult] = []
+    for count in event_counts:
+        events = generate_session(SessionSpec(event_count=count))["events"]
+        for fn in (
+            filter_console_events,
+            filter_network_events,
+            filter_interaction_events,
+            extract_error_events,
+        ):
+            results.append(
+                measure(
+                    f"event_tools.{fn.__name__}[events={count}]", lambda fn=fn: fn(events), repeat
+                )
+            )
+    return results
+
+
+def bench_stub_orchestrator(event_counts: List[int], repeat: int) -> List[BenchResult]:
+    results: List[BenchResult] = []
+    orchestrator = StubOrchestrator()
+    orchestrator.use_llm = False
+    for count in event_counts:
+        data = generate_session(SessionSpec(event_count=count))
+        results.append(
+            measure(
+                f"stub.analyze_chunk[events={count}]",
+                lambda data=data: orchestrator.analyze_chunk(
+                    data["session"], data["chunk"], data["events"]
+                ),
+                repeat,
+            )
+        )
+    for chunks in DEFAULT_CHUNK_COUNTS:
+        reports = generate_chunk_reports(chunks)
+        results.append(
+            measure(
+                f"stub.aggregate_session[chunks={chunks}]",
+                lambda reports=reports: orchestrator.aggregate_session({"id": "bench"}, reports),
+                repeat,
+            )
+        )
+    return results
+
+
+def bench_checkpoints(_event_counts: List[int], repeat: int) -> List[BenchResult]:
+    results: List[BenchResult] = []
+    extra = generate_chunk_reports(1, seed=7)[0]
+    with tempfile.TemporaryDirectory() as tmp:
+        for chunks in DEFAULT_CHUNK_COUNTS:
+            store = CheckpointStore(base_dir=Path(tmp) / f"chunks-{chunks}", ttl_hours=0)
+            seed_state = {"chunk_reports": generate_chunk_reports(chunks)}
+
+            def reset(
+                store: CheckpointStore = store, seed_state: Dict[str, Any] = seed_state
+            ) -> None:
+                store.save("bench", seed_state)
+
+            results.append(
+                measure(
+                    f"checkpoints.append_chunk[chunks={chunks}]",
+                    lambda store=store: store.append_chunk("bench", extra),
+                    repeat,
+                    number=1,
+                    setup=reset,
+                )
+            )
+            results.append(
+                measure(
+                    f"checkpoints.load[chunks={chunks}]",
+                    lambda store=store: store.load("bench"),
+                    repeat,
+                )
+            )
+    return results
+
+
+def bench_checkpoint_codec(_event_counts: List[int], repeat: int) -> List[BenchResult]:
+    results: List[BenchResult] = []
+    for chunks in DEFAULT_CHUNK_COUNTS:
+        store = CheckpointStore(base_dir=Path(tempfile.gettempdir()), ttl_hours=0)
+        state: Dict[str, Any] = {}
+        for report in generate_chunk_reports(chunks, issues_per_chunk=8):
+            state = store._with_chunk(state, report)
+        legacy = json.dumps(state, ensure_ascii=False, indent=2).encode("utf-8")
+        binary = checkpoint_codec.encode(state)
+        results.extend(
+            [
+                measure(
+                    f"codec.encode_json[chunks={chunks}]",
+                    lambda state=state: json.dumps(state, ensure_ascii=False, indent=2).encode(
+                        "utf-8"
+                    ),
+                    repeat,
+                ),
+                measure(
+                    f"codec.encode_v2[chunks={chunks}]",
+                    lambda state=state: checkpoint_codec.encode(state),
+                    repeat,
+                ),
+                measure(
+                    f"codec.decode_json[chunks={chunks}]",
+                    lambda legacy=legacy: json.loads(legacy),
+                    repeat,
+                ),
+                measure(
+                    f"codec.decode_v2[chunks={chunks}]",
+                    lambda binary=binary: checkpoint_codec.decode(binary),
+                    repeat,
+                ),
+            ]
+        )
+        print(
+            f"codec bytes[chunks={chunks}]: json {len(legacy)}  v2 {len(binary)}", file=sys.stderr
+        )
+    return results
+
+
+def bench_responses(_event_counts: List[int], repeat: int) -> List[BenchResult]:
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+
+    from ai.app.responses import iter_json
+    from ai.services.reports import compact_report, project_report
+
+    results: List[BenchResult] = []
+    orchestrator = StubOrchestrator()
+    orchestrator.use_llm = False
+    data = generate_session(SessionSpec(event_count=10_000, error_rate=0.3))
+    chunk_report = orchestrator.analyze_chunk(data["session"], data["chunk"], data["events"])
+    session_report = orchestrator.aggregate_session(
+        {"id": "bench"}, generate_chunk_reports(200, issues_per_chunk=8)
+    )
+    for label, report in (("analyze", chunk_report), ("aggregate", session_report)):
+        variants = {
+            "full": report,
+            "compact": compact_report(report),
+            "summary_counts": project_report(report, ["summary", "counts"]),
+        }
+        results.append(
+            measure(
+                f"responses.{label}.jsonable_encoder",
+                lambda report=report: JSONResponse(jsonable_encoder(report)).body,
+                repeat,
+            )
+        )
+        for name, variant in variants.items():
+            size = len("".join(iter_json(variant)).encode("utf-8"))
+            print(f"response bytes[{label}.{name}]: {size}", file=sys.stderr)
+            results.append(
+                measure(
+                    f"responses.{label}.{name}",
+                    lambda variant=variant: "".join(iter_json(variant)),
+                    repeat,
+                )
+            )
+    return results
+
+
+def bench_wire(event_counts: List[int], repeat: int) -> List[BenchResult]:
+    import gzip
+
+    from ai.app import wire
+    from ai.models.requests import AnalyzeRequest
+
+    results: List[BenchResult] = []
+    for count in event_counts:
+        data = generate_session(SessionSpec(event_count=count))
+        columnar = dict(data, events=wire.collapse_events(data["events"], data["session"]["id"]))
+        plain = json.dumps(data, separators=(",", ":")).encode("utf-8")
+        bodies = {
+            "json": (plain, "application/json", None),
+            "json_gzip": (gzip.compress(plain, compresslevel=5), "application/json", "gzip"),
+            "columnar_json_gzip": (
+                gzip.compress(
+                    json.dumps(columnar, separators=(",", ":")).encode("utf-8"), compresslevel=5
+                ),
+                wire.COLUMNAR_JSON,
+                "gzip",
+            ),
+        }
+        if wire.msgpack is not None:
+            bodies["msgpack"] = (wire.msgpack.packb(data), "application/msgpack", None)
+            bodies["columnar_msgpack"] = (wire.msgpack.packb(columnar), wire.COLUMNAR_MSGPACK, None)
+            if wire.zstandard is not None:
+                bodies["columnar_msgpack_zstd"] = (
+                    wire.zstandard.ZstdCompressor(level=3).compress(bodies["columnar_msgpack"][0]),
+                    wire.COLUMNAR_MSGPACK,
+                    "zstd",
+                )
+        for name, (body, content_type, encoding) in bodies.items():
+            print(f"wire bytes[{name},events={count}]: {len(body)}", file=sys.stderr)
+
+            def decode(body=body, content_type=content_type, encoding=encoding, name=name):
+                if name == "json":
+                    return AnalyzeRequest.model_validate_json(body)
+                return AnalyzeRequest.model_validate(wire.decode_body(body, content_type, encoding))
+
+            results.append(measure(f"wire.decode.{name}[events={count}]", decode, repeat))
+    return results
+
+
+async def _loop_lag_while_decoding(
+    pool: Any, args: tuple, offloaded: bool, rounds: int = 3
+) -> float:
+    from ai.app import wire
+    from ai.core.loop_lag import LoopLagMonitor
+    from ai.models.requests import AnalyzeRequest
+
+    monitor = LoopLagMonitor(interval=0.005)
+    monitor.start()
+    await asyncio.sleep(0.02)
+    for _ in range(rounds):
+        if offloaded:
+            AnalyzeRequest.model_validate(
+                await pool.run(wire.decode_body, *args, size=len(args[0]), task="bench")
+            )
+        else:
+            AnalyzeRequest.model_validate(wire.decode_body(*args))
+        await asyncio.sleep(0.01)
+    monitor.stop()
+    return monitor.max_lag
+
+
+def bench_parse(event_counts: List[int], repeat: int) -> List[BenchResult]:
+    from pydantic import BaseModel, Field
+
+    from ai.models.events import parse_events
+    from ai.models.requests import AnalyzeRequest
+
+    class UntypedAnalyzeRequest(BaseModel):
+        """The request model before typed envelopes, for comparison."""
+
+        session: Dict[str, Any]
+        chunk: Dict[str, Any]
+        events: List[Dict[str, Any]] = Field(default_factory=list)
+
+    results: List[BenchResult] = []
+    for count in event_counts:
+        data = generate_session(SessionSpec(event_count=count))
+        body = json.dumps(data, separators=(",", ":")).encode("utf-8")
+        events_body = json.dumps(data["events"], separators=(",", ":")).encode("utf-8")
+        decoded = json.loads(body)
+        cases = {
+            "json_loads_floor": lambda body=body: json.loads(body),
+            "untyped_json": lambda body=body: UntypedAnalyzeRequest.model_validate_json(body),
+            "typed_json": lambda body=body: AnalyzeRequest.model_validate_json(body),
+            "event_list_adapter_json": lambda events_body=events_body: parse_events(events_body),
+            "untyped_decoded": lambda decoded=decoded: UntypedAnalyzeRequest.model_validate(
+                decoded
+            ),
+            "typed_decoded": lambda decoded=decoded: AnalyzeRequest.model_validate(decoded),
+        }
+        for name, fn in cases.items():
+            results.append(measure(f"parse.{name}[events={count}]", fn, repeat))
+    return results
+
+
+def bench_offload(event_counts: List[int], repeat: int) -> List[BenchResult]:
+    import gzip
+
+    from ai.app import wire
+    from ai.core.offload import OffloadPool
+    from ai.models.requests import AnalyzeRequest
+
+    pool = OffloadPool(workers=2, min_bytes=0)
+    pool.warm()
+    results: List[BenchResult] = []
+    try:
+        for count in event_counts:
+            data = generate_session(SessionSpec(event_count=count))
+            columnar = dict(
+                data, events=wire.collapse_events(data["events"], data["session"]["id"])
+            )
+            body = gzip.compress(
+                json.dumps(columnar, separators=(",", ":")).encode("utf-8"), compresslevel=5
+            )
+            args = (body, wire.COLUMNAR_JSON, "gzip", 0)
+            results.append(
+                measure(
+                    f"offload.decode_inline[events={count}]",
+                    lambda args=args: AnalyzeRequest.model_validate(wire.decode_body(*args)),
+                    repeat,
+                )
+            )
+            results.append(
+                measure(
+                    f"offload.decode_pool[events={count}]",
+                    lambda args=args, body=body: AnalyzeRequest.model_validate(
+                        pool.call(wire.decode_body, *args, size=len(body), task="bench")
+                    ),
+                    repeat,
+                )
+            )
+            for mode, offloaded in (("inline", False), ("pool", True)):
+                lag = asyncio.run(_loop_lag_while_decoding(pool, args, offloaded))
+                print(
+                    f"offload loop lag max[{mode},events={count}]: {lag * 1000:.1f}ms",
+                    file=sys.stderr,
+                )
+    finally:
+        pool.shutdown()
+    return results
+
+
+def bench_profiling(event_counts: List[int], repeat: int) -> List[BenchResult]:
+    from ai.core.profiling import profiled, stage
+
+    def idle_stage() -> None:
+        with stage("noop"):
+            pass
+
+    results = [measure("profiling.stage_disabled", idle_stage, repeat)]
+    orchestrator = StubOrchestrator()
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in event_counts:
+            data = generate_session(SessionSpec(event_count=count))
+
+            def analyze(data=data):
+                return orchestrator.analyze_chunk(data["session"], data["chunk"], data["events"])
+
+            def analyze_profiled(analyze=analyze) -> None:
+                with profiled("bench", tmp):
+                    analyze()
+
+            results.append(measure(f"profiling.analyze_plain[events={count}]", analyze, repeat))
+            results.append(
+                measure(f"profiling.analyze_profiled[events={count}]", analyze_profiled, repeat)
+            )
+    return results
+
+
+def bench_live(event_counts: List[int], repeat: int) -> List[BenchResult]:
+    from ai.services.live import LiveSessionRegistry
+
+    results: List[BenchResult] = []
+    orchestrator = StubOrchestrator()
+    orchestrator.use_llm = False
+    for count in event_counts:
+        data = generate_session(SessionSpec(event_count=count, error_rate=0.3))
+        events = data["events"]
+
+        def stream(events: List[Dict[str, Any]] = events) -> LiveSessionRegistry:
+            registry = LiveSessionRegistry(window_events=200, error_burst=50)
+            for start in range(0, len(events), 100):
+                registry.ingest("bench", events[start : start + 100])
+            return registry
+
+        findings = stream().take_findings("bench", events)
+        results.append(measure(f"live.ingest_100_event_deltas[events={count}]", stream, repeat))
+        results.append(
+            measure(
+                f"live.chunk_close_cold[events={count}]",
+                lambda data=data: orchestrator.analyze_chunk(
+                    data["session"], data["chunk"], data["events"]
+                ),
+                repeat,
+            )
+        )
+        results.append(
+            measure(
+                f"live.chunk_close_precomputed[events={count}]",
+                lambda data=data, findings=findings: orchestrator.analyze_chunk(
+                    data["session"], data["chunk"], data["events"], findings
+                ),
+                repeat,
+            )
+        )
+    return results
+
+
+def bench_retrieval(event_counts: List[int], repeat: int) -> List[BenchResult]:
+    from ai.services.retrieval import BM25Index, RetrievalCache, build_documents
+
+    results: List[BenchResult] = []
+    for count in event_counts:
+        data = generate_session(SessionSpec(event_count=count, error_rate=0.2))
+        events = data["events"]
+        analysis = StubOrchestrator().analyze_chunk(data["session"], data["chunk"], events)
+        index = BM25Index(build_documents(events, analysis, {}, []))
+        cache = RetrievalCache()
+        context = cache.context(
+            "bench", "why does checkout fail with 500?", events, analysis, {}, [], 60, 6000
+        )
+        before = len(json.dumps({"events": events[-300:], "analysis": analysis}, default=str))
+        after = len(json.dumps(context))
+        print(
+            f"chat context bytes[events={count}]: last-300 {before}  retrieved {after}",
+            file=sys.stderr,
+        )
+        results.append(
+            measure(
+                f"retrieval.build_index[events={count}]",
+                lambda events=events, analysis=analysis: BM25Index(
+                    build_documents(events, analysis, {}, [])
+                ),
+                repeat,
+            )
+        )
+        results.append(
+            measure(
+                f"retrieval.search[events={count}]",
+                lambda index=index: index.search("checkout 500 cart", 60),
+                repeat,
+            )
+        )
+    return results
+
+
+def bench_correlation(event_counts: List[int], repeat: int) -> List[BenchResult]:
+    from ai.services.correlation import Correlator, correlation_groups
+
+    results: List[BenchResult] = []
+    for count in event_counts:
+        data = generate_session(SessionSpec(event_count=count, error_rate=0.2))
+        events = data["events"]
+        issues = [{"title": "err", "ts": event["ts"]} for event in events[:: max(1, count // 200)]]
+
+        def correlate(
+            events: List[Dict[str, Any]] = events, issues: List[Dict[str, Any]] = issues
+        ) -> None:
+            correlation_groups(Correlator(events, data["chunk"]).attach(issues))
+
+        results.append(
+            measure(
+                f"correlation.attach_and_group[events={count},issues={len(issues)}]",
+                correlate,
+                repeat,
+            )
+        )
+    return results
+
+
+def bench_aggregate(_event_counts: List[int], repeat: int) -> List[BenchResult]:
+    try:
+        from ai.services.adk_orchestrator import AdkOrchestrator
+        from ai.services.model_backends import SyntheticBackend
+    except ImportError as exc:
+        print(f"skipping aggregate suite: {exc}", file=sys.stderr)
+        return []
+
+    results: List[BenchResult] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["CHECKPOINT_DIR"] = tmp
+        orchestrator = AdkOrchestrator(backend=SyntheticBackend(seed=0))
+        for chunks in DEFAULT_CHUNK_COUNTS:
+            session = {"id": f"bench-{chunks}"}
+            reports = generate_chunk_reports(chunks, issues_per_chunk=8)
+            for idx, report in enumerate(reports):
+                report["chunk_id"] = f"chunk-{idx}"
+            chunk_ids = [report["chunk_id"] for report in reports]
+            orchestrator.checkpoints.extend_chunks(session["id"], reports)
+            full = len(json.dumps({"session": session, "chunk_reports": reports}))
+            delta = len(json.dumps({"session": session, "chunk_ids": chunk_ids}))
+            print(
+                f"aggregate request bytes[chunks={chunks}]: full {full}  delta {delta}",
+                file=sys.stderr,
+            )
+            results.append(
+                measure(
+                    f"aggregate.full_resend[chunks={chunks}]",
+                    lambda session=session, reports=reports: orchestrator.aggregate_session(
+                        session, reports
+                    ),
+                    repeat,
+                )
+            )
+            orchestrator.aggregate_session(session, [], chunk_ids=chunk_ids)
+            results.append(
+                measure(
+                    f"aggregate.delta_cached[chunks={chunks}]",
+                    lambda session=session, chunk_ids=chunk_ids: orchestrator.aggregate_session(
+                        session, [], chunk_ids=chunk_ids
+                    ),
+                    repeat,
+                )
+            )
+    return results
+
+
+def bench_batching(_event_counts: List[int], repeat: int) -> List[BenchResult]:
+    try:
+        import threading
+
+        from ai.agents.analysis import create_batch_agent
+        from ai.services.adk_orchestrator import AdkOrchestrator
+        from ai.services.batching import MicroBatcher
+        from ai.services.model_backends import LatencyModel, SyntheticBackend
+    except ImportError as exc:
+        print(f"skipping batching suite: {exc}", file=sys.stderr)
+        return []
+
+    class SlotLimitedBackend(SyntheticBackend):
+        """At most ``slots`` calls in flight, like a per-project rate limit."""
+
+        def __init__(self, slots: int, **kwargs: Any) -> None:
+            super().__init__(**kwargs)
+            self.slots = threading.BoundedSemaphore(slots)
+            self.calls = 0
+
+        async def generate(self, agent: Any, parts: Any) -> str:
+            await asyncio.to_thread(self.slots.acquire)
+            try:
+                self.calls += 1
+                return await super().generate(agent, parts)
+            finally:
+                self.slots.release()
+
+    results: List[BenchResult] = []
+    sessions = 32
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["CHECKPOINT_DIR"] = tmp
+        for mode in ("individual", "batched"):
+            backend = SlotLimitedBackend(4, latency=LatencyModel(mean_ms=50), seed=0)
+            orchestrator = AdkOrchestrator(backend=backend)
+            if mode == "batched":
+                orchestrator.batcher = MicroBatcher(
+                    {orchestrator.synth_agent.name: create_batch_agent(orchestrator.synth_agent)},
+                    orchestrator._run_agent,
+                    window_seconds=0.02,
+                    max_items=8,
+                )
+            payloads = [
+                {
+                    "session": {"id": f"s{idx}"},
+                    "issue_count": 2,
+                    "issue_groups": [{"issues": [{"idx": 0, "title": "500"}]}],
+                }
+                for idx in range(sessions)
+            ]
+
+            def burst(
+                orchestrator: Any = orchestrator, payloads: List[Dict[str, Any]] = payloads
+            ) -> None:
+                threads = [
+                    threading.Thread(
+                        target=lambda payload=payload: asyncio.run(
+                            orchestrator._call_agent(
+                                orchestrator.synth_agent, payload, "Summarize findings."
+                            )
+                        )
+                    )
+                    for payload in payloads
+                ]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+
+            results.append(
+                measure(
+                    f"batching.synthesizer_{mode}[sessions={sessions},slots=4]",
+                    burst,
+                    repeat,
+                    number=1,
+                )
+            )
+            print(
+                f"batching model calls[{mode}]: {backend.calls / (repeat + 0.0):.1f} per burst",
+                file=sys.stderr,
+            )
+    return results
+
+
+def bench_rules(_event_counts: List[int], repeat: int) -> List[BenchResult]:
+    import random
+    import re
+
+    from ai.services.rules import RuleEngine
+
+    rng = random.Random(7)
+    letters = "bcdfghjklmnprstvwz"
+    words = sorted(
+        {"".join(rng.choice(letters) + rng.choice("aeiou") for _ in range(3)) for _ in range(1500)}
+    )
+    pack: List[Dict[str, Any]] = []
+    hits: List[str] = []  # text each rule matches
+    for idx in range(500):
+        first, second, third = rng.sample(words, 3)
+        if idx % 10 < 7:
+            pack.append({"id": f"kw-{idx}", "keywords": [f"{first} {second}"], "title": first})
+            hits.append(f"{first} {second}")
+        elif idx % 10 < 9:
+            pack.append(
+                {"id": f"re-{idx}", "pattern": rf"\b{first}\b.*\b{second}s?\b", "title": first}
+            )
+            hits.append(f"{first} then {second}s")
+        else:
+            # alternation at the top: no anchor, goes to the combined regex
+            pack.append(
+                {"id": f"alt-{idx}", "pattern": rf"(?:{first}|{second})_{third}", "title": first}
+            )
+            hits.append(f"{second}_{third}")
+    # 200 distinct messages, three in four matching a rule, repeated over 2000 events
+    templates = []
+    for idx in range(200):
+        filler = " ".join(rng.choice(words) for _ in range(12))
+        templates.append(f"Error: {rng.choice(hits)} {filler}" if idx % 4 else f"Error: {filler}")
+    events = [
+        {"type": "console", "payload": {"level": "error", "message": rng.choice(templates)}}
+        for _ in range(2000)
+    ]
+    sample = events[:200]
+
+    compiled = [
+        re.compile(
+            r"\b" + re.escape(rule["keywords"][0]) + r"\b"
+            if "keywords" in rule
+            else rule["pattern"],
+            re.IGNORECASE,
+        )
+        for rule in pack
+    ]
+    alternation = re.compile(
+        "|".join(f"(?P<r{idx}>{regex.pattern})" for idx, regex in enumerate(compiled)),
+        re.IGNORECASE,
+    )
+
+    def naive_loop() -> None:
+        for event in sample:
+            message = event["payload"]["message"]
+            next((idx for idx, regex in enumerate(compiled) if regex.search(message)), None)
+
+    def naive_alternation() -> None:
+        for event in sample:
+            min(
+                (
+                    int(found.lastgroup[1:])
+                    for found in alternation.finditer(event["payload"]["message"])
+                ),
+                default=None,
+            )
+
+    engine = RuleEngine(pack, cache_size=4096)
+
+    def engine_uncached() -> None:
+        for event in events:
+            engine._classify(event)
+
+    def engine_cached() -> None:
+        for event in events:
+            engine.match(event)
+
+    results = [
+        measure(f"rules.naive_loop[rules=500,events={len(sample)}]", naive_loop, repeat),
+        measure(
+            f"rules.naive_alternation[rules=500,events={len(sample)}]",
+            naive_alternation,
+            repeat,
+            number=1,
+        ),
+        measure(f"rules.engine_uncached[rules=500,events={len(events)}]", engine_uncached, repeat),
+        measure(f"rules.engine_cached[rules=500,events={len(events)}]", engine_cached, repeat),
+    ]
+    for result in results:
+        count = int(result.name.rsplit("events=", 1)[1].rstrip("]"))
+        print(f"{result.name}: {count / result.median_s:,.0f} events/s", file=sys.stderr)
+    return results
+
+
+def bench_network(event_counts: List[int], repeat: int) -> List[BenchResult]:
+    from ai.services.network_perf import NetworkAnalyzer
+
+    analyzer = NetworkAnalyzer()
+    results: List[BenchResult] = []
+    for count in event_counts:
+        events = generate_session(SessionSpec(event_count=count, type_mix={"network": 1}))["events"]
+        # pair each response with a request sent 50-1500 ms earlier, like the recorder does
+        paired: List[Dict[str, Any]] = []
+        for idx, event in enumerate(events):
+            sent = dict(event, ts=event["ts"])
+            sent["payload"] = {
+                "requestId": event["payload"]["requestId"] + f".{idx}",
+                "url": event["payload"]["url"],
+                "method": "GET",
+                "type": "request",
+            }
+            event["payload"]["requestId"] = sent["payload"]["requestId"]
+            event["payload"]["duration"] = 50 + (idx * 37) % 1450
+            paired.extend((sent, event))
+        results.append(
+            measure(
+                f"network.analyze[events={len(paired)}]",
+                lambda paired=paired: analyzer.analyze(paired),
+                repeat,
+            )
+        )
+    return results
+
+
+def bench_adk_payloads(event_counts: List[int], repeat: int) -> List[BenchResult]:
+    try:
+        from ai.services.adk_orchestrator import AdkOrchestrator
+        from ai.services.model_backends import SyntheticBackend
+    except ImportError as exc:
+        print(f"skipping adk suite: {exc}", file=sys.stderr)
+        return []
+
+    results: List[BenchResult] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["CHECKPOINT_DIR"] = tmp
+        orchestrator = AdkOrchestrator(backend=SyntheticBackend(seed=0))
+
+        for count in event_counts:
+            data = generate_session(SessionSpec(event_count=count))
+
+            def build(data: Dict[str, Any] = data) -> None:
+                payload = orchestrator._build_payload(
+                    data["session"], data["chunk"], data["events"], {}
+                )
+                for sub in (
+                    orchestrator._build_log_payload(payload),
+                    orchestrator._build_repro_payload(payload),
+                    orchestrator._build_video_payload(payload),
+                ):
+                    json.dumps(sub, ensure_ascii=False)
+
+            def analyze(data: Dict[str, Any] = data) -> None:
+                session = dict(data["session"], id=None)
+                asyncio.run(
+                    orchestrator.analyze_chunk_async(session, data["chunk"], data["events"])
+                )
+
+            results.append(measure(f"adk.build_payloads[events={count}]", build, repeat))
+            results.append(
+                measure(f"adk.analyze_chunk_fake_runner[events={count}]", analyze, repeat)
+            )
+    return results
+
+
+SUITES: Dict[str, Callable[[List[int], int], List[BenchResult]]] = {
+    "event_tools": bench_event_tools,
+    "stub": bench_stub_orchestrator,
+    "checkpoints": bench_checkpoints,
+    "codec": bench_checkpoint_codec,
+    "responses": bench_responses,
+    "wire": bench_wire,
+    "parse": bench_parse,
+    "live": bench_live,
+    "retrieval": bench_retrieval,
+    "correlation": bench_correlation,
+    "aggregate": bench_aggregate,
+    "offload": bench_offload,
+    "profiling": bench_profiling,
+    "batching": bench_batching,
+    "rules": bench_rules,
+    "network": bench_network,
+    "adk": bench_adk_payloads,
+}
+
+
+def _parse_counts(raw: str) -> List[int]:
+    return [int(item) for item in raw.split(",") if item.strip()]
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Run AI service micro-benchmarks.")
+    parser.add_argument(
+        "--suite", action="append", choices=sorted(SUITES), help="Suite to run (repeatable)."
+    )
+    parser.add_argument(
+        "--events",
+        type=_parse_counts,
+        default=DEFAULT_EVENT_COUNTS,
+        help="Comma-separated event counts.",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", type=Path, help="Write results JSON to this path.")
+    parser.add_argument("--baseline", type=Path, help="Compare against a previous results JSON.")
+    parser.add_argument(
+        "--max-regression", type=float, default=0.2, help="Allowed slowdown fraction."
+    )
+    args = parser.parse_args(argv)
+
+    results: List[BenchResult] = []
+    for name in args.suite or list(SUITES):
+        results.extend(SUITES[name](args.events, args.repeat))
+
+    for result in results:
+        print(f"{result.name:<55} {format_seconds(result.median_s):>12}  (x{result.number})")
+
+    document = results_document(results)
+    if args.output:
+        args.output.write_text(json.dumps(document, indent=2), encoding="utf-8")
+
+    if not args.baseline:
+        return 0
+
+    rows = compare(document, load_results(args.baseline), args.max_regression)
+    regressions = [row for row in rows if row["regression"]]
+    print()
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else ""
+        print(f"{row['name']:<55} {row['ratio']:>7.2f}x  {flag}")
+    if regressions:
+        print(
+            f"\n{len(regressions)} benchmark(s) regressed by more than {args.max_regression:.0%}."
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
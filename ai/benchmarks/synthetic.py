@@ -0,0 +1,198 @@
+"""Synthetic QA session generator used by benchmarks and load tests."""
+from __future__ import annotations
+
+import random
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+DEFAULT_TYPE_MIX: Dict[str, float] = {
+    "console": 0.35,
+    "network": 0.4,
+    "interaction": 0.2,
+    "marker": 0.03,
+    "annotation": 0.02,
+}
+
+_WORDS = (
+    "request failed undefined render component state token cart checkout user "
+    "profile widget timeout payload handler promise listener layout style fetch"
+).split()
+_ENDPOINTS = [
+    "/api/cart",
+    "/api/users",
+    "/api/orders",
+    "/api/search",
+    "/static/app.js",
+    "/api/auth",
+]
+_SELECTORS = [
+    "#checkout",
+    "button.submit",
+    "input[name=email]",
+    ".nav > a",
+    "#search",
+    "form.login",
+]
+_ACTIONS = ["click", "input", "change", "submit", "scroll"]
+
+
+@dataclass
+class SessionSpec:
+    """Shape of a generated session.
+
+    Args:
+        event_count: Number of events to generate
+        type_mix: Relative weight of each event type
+        message_size: Approximate length of console messages, in characters
+        error_rate: Probability that a console/network event is an error
+        seed: Random seed, so runs are reproducible
+    """
+
+    event_count: int = 1000
+    type_mix: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_TYPE_MIX))
+    message_size: int = 120
+    error_rate: float = 0.1
+    seed: int = 1337
+
+
+def _message(rng: random.Random, size: int) -> str:
+    words: List[str] = []
+    length = 0
+    while length < size:
+        word = rng.choice(_WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)[:size]
+
+
+def _event(
+    rng: random.Random, spec: SessionSpec, event_type: str, session_id: str, ts: datetime
+) -> Dict[str, Any]:
+    tab = {"id": 1, "url": "https://shop.example.com/checkout", "title": "Checkout"}
+    is_error = rng.random() < spec.error_rate
+    if event_type == "console":
+        level = "error" if is_error else rng.choice(["log", "info", "warning"])
+        payload: Dict[str, Any] = {
+            "message": _message(rng, spec.message_size),
+            "level": level,
+            "tab": tab,
+        }
+    elif event_type == "network":
+        status = (
+            rng.choice([400, 404, 500, 502]) if is_error else rng.choice([200, 200, 201, 204, 304])
+        )
+        payload = {
+            "url": f"https://shop.example.com{rng.choice(_ENDPOINTS)}?id={rng.randint(1, 500)}",
+            "requestId": f"{rng.randint(1000, 9999)}.{rng.randint(1, 99)}",
+            "status": status,
+            "statusText": "OK" if status < 400 else "Error",
+            "mimeType": "application/json",
+            "tab": tab,
+        }
+    elif event_type == "interaction":
+        payload = {
+            "action": rng.choice(_ACTIONS),
+            "selector": rng.choice(_SELECTORS),
+            "text": _message(rng, 24),
+            "tab": tab,
+        }
+    elif event_type == "marker":
+        payload = {"label": f"Marker {rng.randint(1, 50)}", "url": tab["url"]}
+    else:
+        payload = {"text": _message(rng, 60)}
+    return {
+        "id": str(uuid.UUID(int=rng.getrandbits(128))),
+        "session_id": session_id,
+        "ts": ts.isoformat(),
+        "type": event_type,
+        "payload": payload,
+    }
+
+
+def generate_events(spec: SessionSpec, session_id: str = "bench-session") -> List[Dict[str, Any]]:
+    """Generate a time-ordered list of events following ``spec``."""
+    rng = random.Random(spec.seed)
+    types = list(spec.type_mix)
+    weights = [spec.type_mix[name] for name in types]
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    ts = start
+    events: List[Dict[str, Any]] = []
+    for event_type in rng.choices(types, weights=weights, k=spec.event_count):
+        ts += timedelta(milliseconds=rng.randint(5, 400))
+        events.append(_event(rng, spec, event_type, session_id, ts))
+    return events
+
+
+def generate_session(spec: SessionSpec, session_id: str = "bench-session") -> Dict[str, Any]:
+    """Generate an ``/analyze`` style payload with session, chunk and events."""
+    events = generate_events(spec, session_id)
+    return {
+        "session": {
+            "id": session_id,
+            "status": "recording",
+            "metadata": {"browser": "Chrome 131", "os": "macOS", "viewport": "1440x900"},
+        },
+        "chunk": {
+            "id": f"{session_id}-chunk-1",
+            "session_id": session_id,
+            "idx": 1,
+            "start_ts": events[0]["ts"] if events else None,
+            "end_ts": events[-1]["ts"] if events else None,
+            "content_type": "video/webm",
+        },
+        "events": events,
+    }
+
+
+def generate_chunk_reports(
+    count: int, issues_per_chunk: int = 5, seed: int = 1337
+) -> List[Dict[str, Any]]:
+    """Generate chunk reports shaped like ``/analyze`` responses."""
+    rng = random.Random(seed)
+    reports: List[Dict[str, Any]] = []
+    for idx in range(count):
+        issues = [
+            {
+                "title": f"Network error on {rng.choice(_ENDPOINTS)}",
+                "severity": rng.choice(["low", "medium", "high"]),
+                "detail": _message(rng, 80),
+                "ts": f"2026-01-01T00:{idx % 60:02d}:{n % 60:02d}+00:00",
+                "source": "network",
+            }
+            for n in range(issues_per_chunk)
+        ]
+        evidence = [
+            {"type": "network", "status": 500, "url": issue["title"], "ts": issue["ts"]}
+            for issue in issues
+        ]
+        steps = [f"{rng.choice(_ACTIONS)} {rng.choice(_SELECTORS)}" for _ in range(3)]
+        reports.append(
+            {
+                "summary": f"Chunk {idx} analysis.",
+                "suspected_root_cause": issues[0]["detail"] if issues else None,
+                "issues": issues,
+                "evidence": evidence,
+                "repro_steps": steps,
+                "agents": [
+                    {
+                        "name": "log_analyst",
+                        "summary": "",
+                        "issues": issues,
+                        "evidence": evidence,
+                        "steps": [],
+                    },
+                    {
+                        "name": "repro_planner",
+                        "summary": "",
+                        "issues": [],
+                        "evidence": [],
+                        "steps": steps,
+                    },
+                ],
+                "chunk_id": f"chunk-{idx}",
+                "chunk_idx": idx,
+            }
+        )
+    return reports
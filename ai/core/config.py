@@ -14,11 +14,64 @@ class Settings:
     app_name: str = "QA Assist AI"
     host: str = os.getenv("HOST", "127.0.0.1")
     port: int = int(os.getenv("PORT", "8000"))
+    web_concurrency: int = int(os.getenv("WEB_CONCURRENCY", "0"))
     log_level: str = os.getenv("LOG_LEVEL", "INFO").upper()
     checkpoint_dir: str = os.getenv(
         "CHECKPOINT_DIR", str(Path(__file__).resolve().parents[1] / ".checkpoints")
     )
     checkpoint_ttl_hours: int = int(os.getenv("CHECKPOINT_TTL_HOURS", "48"))
+    offload_workers: int = int(os.getenv("OFFLOAD_WORKERS", "2"))
+    offload_min_bytes: int = int(os.getenv("OFFLOAD_MIN_BYTES", str(256 * 1024)))
+    loop_lag_interval_seconds: float = float(os.getenv("LOOP_LAG_INTERVAL_SECONDS", "0.1"))
+    profile_dir: str = os.getenv("PROFILE_DIR", "")
+    profile_sample_rate: float = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    profile_interval_ms: float = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+    max_body_bytes: int = int(os.getenv("MAX_BODY_BYTES", str(256 * 1024 * 1024)))
+    response_stream_min_items: int = int(os.getenv("RESPONSE_STREAM_MIN_ITEMS", "2000"))
+    checkpoint_format: str = os.getenv("CHECKPOINT_FORMAT", "binary")
+    agent_output_repair: bool = os.getenv("AGENT_OUTPUT_REPAIR", "true").lower() in {
+        "1",
+        "true",
+        "yes",
+    }
+    chat_context_tokens: int = int(os.getenv("CHAT_CONTEXT_TOKENS", "6000"))
+    chat_retrieval_top_k: int = int(os.getenv("CHAT_RETRIEVAL_TOP_K", "60"))
+    chat_recent_events: int = int(os.getenv("CHAT_RECENT_EVENTS", "20"))
+    chat_image_max_px: int = int(os.getenv("CHAT_IMAGE_MAX_PX", "1536"))
+    chat_image_quality: int = int(os.getenv("CHAT_IMAGE_QUALITY", "85"))
+    chat_image_cache_mb: float = float(os.getenv("CHAT_IMAGE_CACHE_MB", "64"))
+    retrieval_cache_sessions: int = int(os.getenv("RETRIEVAL_CACHE_SESSIONS", "64"))
+    retrieval_cache_ttl_seconds: float = float(os.getenv("RETRIEVAL_CACHE_TTL_SECONDS", "900"))
+    fused_max_chars: int = int(os.getenv("FUSED_MAX_CHARS", "0"))
+    batch_window_ms: float = float(os.getenv("BATCH_WINDOW_MS", "0"))
+    batch_max_items: int = int(os.getenv("BATCH_MAX_ITEMS", "8"))
+    batch_max_item_chars: int = int(os.getenv("BATCH_MAX_ITEM_CHARS", "8000"))
+    batch_agents: str = os.getenv("BATCH_AGENTS", "synthesizer,log_analyst")
+    rules_path: str = os.getenv("RULES_PATH", "")
+    rules_cache_size: int = int(os.getenv("RULES_CACHE_SIZE", "4096"))
+    network_slow_ms: float = float(os.getenv("NETWORK_SLOW_MS", "1000"))
+    network_retry_storm_count: int = int(os.getenv("NETWORK_RETRY_STORM_COUNT", "5"))
+    network_retry_storm_seconds: float = float(os.getenv("NETWORK_RETRY_STORM_SECONDS", "10"))
+    network_max_concurrency: int = int(os.getenv("NETWORK_MAX_CONCURRENCY", "16"))
+    network_table_rows: int = int(os.getenv("NETWORK_TABLE_ROWS", "20"))
+    known_issues_max: int = int(os.getenv("KNOWN_ISSUES_MAX", "10000"))
+    known_issues_flush_seconds: float = float(os.getenv("KNOWN_ISSUES_FLUSH_SECONDS", "5"))
+    circuit_failure_rate: float = float(os.getenv("CIRCUIT_FAILURE_RATE", "0.5"))
+    circuit_window: int = int(os.getenv("CIRCUIT_WINDOW", "20"))
+    circuit_min_calls: int = int(os.getenv("CIRCUIT_MIN_CALLS", "5"))
+    circuit_open_seconds: float = float(os.getenv("CIRCUIT_OPEN_SECONDS", "30"))
+    circuit_slo_ms: str = os.getenv("CIRCUIT_SLO_MS", "analyze=120000,aggregate=60000,chat=30000")
+    circuit_timeout_seconds: float = float(os.getenv("CIRCUIT_TIMEOUT_SECONDS", "0"))
+    anomaly_threshold: float = float(os.getenv("ANOMALY_THRESHOLD", "3.5"))
+    anomaly_min_count: int = int(os.getenv("ANOMALY_MIN_COUNT", "3"))
+    correlation_window_seconds: float = float(os.getenv("CORRELATION_WINDOW_SECONDS", "3"))
+    correlation_lookback_seconds: float = float(os.getenv("CORRELATION_LOOKBACK_SECONDS", "15"))
+    live_window_events: int = int(os.getenv("LIVE_WINDOW_EVENTS", "500"))
+    live_window_seconds: float = float(os.getenv("LIVE_WINDOW_SECONDS", "10"))
+    live_error_burst: int = int(os.getenv("LIVE_ERROR_BURST", "5"))
+    live_session_ttl_seconds: float = float(os.getenv("LIVE_SESSION_TTL_SECONDS", "1800"))
+    live_max_sessions: int = int(os.getenv("LIVE_MAX_SESSIONS", "256"))
+    live_seen_limit: int = int(os.getenv("LIVE_SEEN_LIMIT", "10000"))
 
 
 settings = Settings()
@@ -0,0 +1,53 @@
+"""Event loop lag sampling, exported as gauges on ``/metrics``.
+
+A task sleeps for ``interval`` seconds and records how late it woke up. Any
+synchronous work on the loop (parsing a large body inline, for example) shows
+up directly as lag.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from typing import Deque, Optional
+
+from ai.core.metrics import metrics
+
+metrics.describe("event_loop_lag_seconds", "Lag of the most recent event loop sample")
+metrics.describe("event_loop_lag_max_seconds", "Largest event loop lag over the recent window")
+metrics.describe("event_loop_lag_seconds_total", "Sum of sampled event loop lag")
+metrics.describe("event_loop_lag_samples_total", "Number of event loop lag samples")
+
+
+class LoopLagMonitor:
+    def __init__(self, interval: float = 0.1, window: int = 50) -> None:
+        self.interval = interval
+        self.samples: Deque[float] = deque(maxlen=window)
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def max_lag(self) -> float:
+        return max(self.samples, default=0.0)
+
+    def record(self, lag: float) -> None:
+        self.samples.append(lag)
+        metrics.set("event_loop_lag_seconds", lag)
+        metrics.set("event_loop_lag_max_seconds", self.max_lag)
+        metrics.inc("event_loop_lag_seconds_total", lag)
+        metrics.inc("event_loop_lag_samples_total")
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.record(max(0.0, loop.time() - expected))
+
+    def start(self) -> asyncio.Task:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run())
+        return self._task
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
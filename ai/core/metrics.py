@@ -0,0 +1,78 @@
+"""In-process counters and gauges, exposed on ``/metrics`` in Prometheus text format.
+
+Values are per worker process; scrape each worker (or aggregate upstream).
+"""
+from __future__ import annotations
+
+import threading
+from typing import Dict, List, Tuple
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, object]) -> LabelSet:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+class Metrics:
+    def __init__(self) -> None:
+        self._counters: Dict[str, Dict[LabelSet, float]] = {}
+        self._gauges: Dict[str, Dict[LabelSet, float]] = {}
+        self._help: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def describe(self, name: str, text: str) -> None:
+        self._help[name] = text
+
+    def inc(self, name: str, value: float = 1.0, **labels: object) -> None:
+        key = _labels(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def set(self, name: str, value: float, **labels: object) -> None:
+        with self._lock:
+            self._gauges.setdefault(name, {})[_labels(labels)] = value
+
+    def value(self, name: str, **labels: object) -> float:
+        key = _labels(labels)
+        with self._lock:
+            series = self._counters.get(name) or self._gauges.get(name) or {}
+            return series.get(key, 0.0)
+
+    def snapshot(self) -> Dict[str, List[Dict[str, object]]]:
+        with self._lock:
+            merged = {**self._counters, **self._gauges}
+            return {
+                name: [
+                    {"labels": dict(key), "value": value} for key, value in sorted(series.items())
+                ]
+                for name, series in sorted(merged.items())
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+
+    def render_prometheus(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            for kind, store in (("counter", self._counters), ("gauge", self._gauges)):
+                for name, series in sorted(store.items()):
+                    if name in self._help:
+                        lines.append(f"# HELP {name} {self._help[name]}")
+                    lines.append(f"# TYPE {name} {kind}")
+                    for key, value in sorted(series.items()):
+                        rendered = ",".join(f'{label}="{_escape(text)}"' for label, text in key)
+                        lines.append(
+                            f"{name}{{{rendered}}} {value:g}" if rendered else f"{name} {value:g}"
+                        )
+        return "\n".join(lines) + "\n"
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+metrics = Metrics()
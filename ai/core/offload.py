@@ -0,0 +1,130 @@
+"""
+Process pool for CPU-bound preprocessing (body decoding, checkpoint encoding).
+
+Request bodies are sent to the workers as raw bytes and come back decoded
+and pickled; unpickling is several times cheaper than parsing JSON on the
+event loop. Checkpoint state is sized by the previous write of the same
+checkpoint, so it is only serialized once, by the pool. Payloads under
+``OFFLOAD_MIN_BYTES`` run inline, since for them the round trip costs more
+than the work.
+
+The pool belongs to one service process. ``python -m ai.app.serve`` splits
+the host's CPUs between its workers' pools unless ``OFFLOAD_WORKERS`` is set;
+with an explicit value the host runs ``workers * OFFLOAD_WORKERS`` pool
+processes (16 for 8 workers and the default of 2). Set ``OFFLOAD_WORKERS=0``
+to keep everything inline.
+"""
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional, TypeVar
+
+from ai.core.config import settings
+from ai.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+metrics.describe("offload_tasks_total", "Preprocessing tasks by where they ran (inline|pool)")
+metrics.describe(
+    "offload_seconds_total", "Wall time of preprocessing tasks, including the pool round trip"
+)
+
+
+def _noop() -> None:
+    return None
+
+
+class OffloadPool:
+    def __init__(self, workers: int = 2, min_bytes: int = 256 * 1024) -> None:
+        self.workers = max(0, workers)
+        self.min_bytes = min_bytes
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> "OffloadPool":
+        return cls(workers=settings.offload_workers, min_bytes=settings.offload_min_bytes)
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0
+
+    def should_offload(self, size: int) -> bool:
+        return self.enabled and size >= self.min_bytes
+
+    def executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a process that already runs threads can copy held locks
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def warm(self) -> None:
+        """Start the worker processes now instead of on the first large payload."""
+        if not self.enabled:
+            return
+        executor = self.executor()
+        for future in [executor.submit(_noop) for _ in range(self.workers)]:
+            future.result()
+
+    def call(self, fn: Callable[..., T], *args: Any, size: int, task: str) -> T:
+        """Run ``fn(*args)`` in the pool when ``size`` reaches the threshold; blocks the caller."""
+        if not self.should_offload(size):
+            return self._inline(fn, args, task)
+        start = time.perf_counter()
+        try:
+            result = self.executor().submit(fn, *args).result()
+        except BrokenProcessPool:
+            self._reset()
+            return self._inline(fn, args, task)
+        self._record(task, "pool", start)
+        return result
+
+    async def run(self, fn: Callable[..., T], *args: Any, size: int, task: str) -> T:
+        """Like :meth:`call`, but awaits the pool so the event loop keeps serving other requests."""
+        if not self.should_offload(size):
+            return self._inline(fn, args, task)
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(self.executor(), functools.partial(fn, *args))
+        except BrokenProcessPool:
+            self._reset()
+            return self._inline(fn, args, task)
+        self._record(task, "pool", start)
+        return result
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _inline(self, fn: Callable[..., T], args: tuple, task: str) -> T:
+        start = time.perf_counter()
+        result = fn(*args)
+        self._record(task, "inline", start)
+        return result
+
+    def _reset(self) -> None:
+        logger.warning("offload pool broke; running inline and restarting it on the next task")
+        self.shutdown()
+
+    @staticmethod
+    def _record(task: str, mode: str, start: float) -> None:
+        metrics.inc("offload_tasks_total", task=task, mode=mode)
+        metrics.inc("offload_seconds_total", time.perf_counter() - start, task=task, mode=mode)
+
+
+offload = OffloadPool.from_settings()
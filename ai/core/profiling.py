@@ -0,0 +1,248 @@
+"""
+Opt-in per-request profiling.
+
+A request is profiled when it carries ``X-QA-Profile: 1`` or is picked at
+``PROFILE_SAMPLE_RATE``. Nothing is installed unless ``PROFILE_DIR`` is set.
+Each profiled request writes two files to that directory:
+
+- ``<id>.collapsed``: stacks sampled every ``PROFILE_INTERVAL_MS`` in the
+  ``frame;frame;frame count`` format read by flamegraph.pl and speedscope
+- ``<id>.stages.json``: wall-clock time per orchestrator stage
+
+Stages are marked with ``with stage("checkpoint.load"):``. Outside a profiled
+request that is a single context variable lookup. The sampler only records
+threads that are inside a stage, so the sampled stacks belong to this request
+even when the server is busy with others.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+PROFILE_HEADER = b"x-qa-profile"
+PROFILE_ID_HEADER = b"x-qa-profile-id"
+
+_current: ContextVar[Optional["Profile"]] = ContextVar("qa_profile", default=None)
+_depth: ContextVar[int] = ContextVar("qa_profile_depth", default=0)
+
+
+def _frame_label(frame: Any) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class Profile:
+    def __init__(self, name: str, interval: float = 0.005) -> None:
+        self.id = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.name = name
+        self.interval = interval
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        self.stages: List[Dict[str, Any]] = []
+        self.stacks: Dict[str, int] = {}
+        self.samples = 0
+        self.status: Optional[int] = None
+        self._active: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._sampler = threading.Thread(
+            target=self._sample_loop, name=f"profiler-{self.id}", daemon=True
+        )
+        self._sampler.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        self.finished = time.perf_counter()
+
+    def enter(self) -> None:
+        ident = threading.get_ident()
+        with self._lock:
+            self._active[ident] = self._active.get(ident, 0) + 1
+
+    def leave(self, name: str, start: float, depth: int) -> None:
+        ident = threading.get_ident()
+        end = time.perf_counter()
+        with self._lock:
+            remaining = self._active.get(ident, 1) - 1
+            if remaining:
+                self._active[ident] = remaining
+            else:
+                self._active.pop(ident, None)
+            self.stages.append(
+                {
+                    "name": name,
+                    "start": round(start - self.started, 6),
+                    "seconds": round(end - start, 6),
+                    "depth": depth,
+                    "thread": threading.current_thread().name,
+                }
+            )
+
+    def _sample_loop(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                threads = [ident for ident in self._active if ident != own]
+            if not threads:
+                continue
+            frames = sys._current_frames()
+            for ident in threads:
+                frame = frames.get(ident)
+                labels: List[str] = []
+                while frame is not None:
+                    labels.append(_frame_label(frame))
+                    frame = frame.f_back
+                if labels:
+                    stack = ";".join(reversed(labels))
+                    self.stacks[stack] = self.stacks.get(stack, 0) + 1
+                    self.samples += 1
+
+    def breakdown(self) -> Dict[str, Any]:
+        totals: Dict[str, Dict[str, Any]] = {}
+        for entry in self.stages:
+            total = totals.setdefault(
+                entry["name"],
+                {"name": entry["name"], "count": 0, "seconds": 0.0, "max_seconds": 0.0},
+            )
+            total["count"] += 1
+            total["seconds"] = round(total["seconds"] + entry["seconds"], 6)
+            total["max_seconds"] = max(total["max_seconds"], entry["seconds"])
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return {
+            "id": self.id,
+            "request": self.name,
+            "status": self.status,
+            "total_seconds": round(end - self.started, 6),
+            "interval_seconds": self.interval,
+            "samples": self.samples,
+            "stages": sorted(totals.values(), key=lambda total: total["seconds"], reverse=True),
+            "timeline": sorted(self.stages, key=lambda entry: entry["start"]),
+        }
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+    def write(self, directory: str) -> Path:
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        (path / f"{self.id}.collapsed").write_text(self.collapsed(), encoding="utf-8")
+        stages = path / f"{self.id}.stages.json"
+        stages.write_text(json.dumps(self.breakdown(), indent=2), encoding="utf-8")
+        return stages
+
+
+def current_profile() -> Optional[Profile]:
+    return _current.get()
+
+
+class _Stage:
+    __slots__ = ("profile", "name", "depth", "start", "token")
+
+    def __init__(self, profile: Profile, name: str) -> None:
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.depth = _depth.get()
+        self.token = _depth.set(self.depth + 1)
+        self.profile.enter()
+        self.start = time.perf_counter()
+
+    def __exit__(self, *_exc: Any) -> None:
+        self.profile.leave(self.name, self.start, self.depth)
+        _depth.reset(self.token)
+
+
+class _NoStage:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *_exc: Any) -> None:
+        return None
+
+
+_NO_STAGE = _NoStage()
+
+
+def stage(name: str) -> Any:
+    """Time a block as ``name`` (and sample its thread) when the request is profiled."""
+    profile = _current.get()
+    return _NO_STAGE if profile is None else _Stage(profile, name)
+
+
+@contextmanager
+def profiled(name: str, directory: str, interval: float = 0.005) -> Iterator[Profile]:
+    """Profile a block outside HTTP (scripts, benchmarks); files are written on exit."""
+    profile = Profile(name, interval)
+    token = _current.set(profile)
+    profile.start()
+    try:
+        with stage("total"):
+            yield profile
+    finally:
+        profile.stop()
+        _current.reset(token)
+        profile.write(directory)
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles requests on demand."""
+
+    def __init__(
+        self, app: Any, directory: str, sample_rate: float = 0.0, interval: float = 0.005
+    ) -> None:
+        self.app = app
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.interval = interval
+
+    def wanted(self, scope: Dict[str, Any]) -> bool:
+        for key, value in scope.get("headers") or []:
+            if key == PROFILE_HEADER:
+                return value.strip().lower() not in {b"", b"0", b"false", b"no"}
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or not self.wanted(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = Profile(f"{scope.get('method')} {scope.get('path')}", self.interval)
+
+        async def send_with_id(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                profile.status = message.get("status")
+                message = {
+                    **message,
+                    "headers": [
+                        *message.get("headers", []),
+                        (PROFILE_ID_HEADER, profile.id.encode()),
+                    ],
+                }
+            await send(message)
+
+        token = _current.set(profile)
+        profile.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            profile.stop()
+            _current.reset(token)
+            await asyncio.to_thread(profile.write, self.directory)
@@ -0,0 +1,56 @@
+"""
+Typed envelopes for recorded events and chunks.
+
+Only the envelope is validated: an event needs a string ``type``, and ``id``
+and ``ts`` must be scalars when present. ``payload`` is typed ``Any``, so it is
+never walked: a decoded body hands it through as is, and a JSON body builds it
+once while parsing with no validation pass on top. Both are ``TypedDict``s,
+so validated events are still the plain dicts every consumer reads with
+``.get``. Unknown keys on events and chunks pass through unvalidated.
+
+``EVENT_LIST`` is a prebuilt ``TypeAdapter`` for bulk event arrays (NDJSON
+lines, a bare JSON array) that do not come wrapped in a request model.
+"""
+from __future__ import annotations
+
+from typing import Any, List, Optional, Union
+
+from pydantic import ConfigDict, StrictFloat, StrictInt, StrictStr, TypeAdapter
+from typing_extensions import NotRequired, TypedDict
+
+# strict members: a value matches its own type in one pass, where lax unions try each member
+Id = Union[StrictStr, StrictInt, None]
+Scalar = Union[StrictStr, StrictInt, StrictFloat, None]
+
+
+class Event(TypedDict):
+    # recorders add their own fields (frame ids, tab ids, ...); kept unchecked, like payload
+    __pydantic_config__ = ConfigDict(extra="allow")  # type: ignore[misc]
+
+    type: StrictStr
+    id: NotRequired[Id]
+    session_id: NotRequired[Id]
+    ts: NotRequired[Scalar]
+    payload: NotRequired[Any]
+
+
+class Chunk(TypedDict, total=False):
+    # chunks are one per request and carry backend-specific fields, so unknown keys are kept
+    __pydantic_config__ = ConfigDict(extra="allow")  # type: ignore[misc]
+
+    id: Id
+    session_id: Id
+    idx: Optional[int]
+    start_ts: Scalar
+    end_ts: Scalar
+    video_url: Optional[str]
+
+
+EVENT_LIST: TypeAdapter[List[Event]] = TypeAdapter(List[Event])
+
+
+def parse_events(data: Union[bytes, str, List[Any]]) -> List[Event]:
+    """Validate a bulk list of events from JSON text or already decoded objects."""
+    if isinstance(data, (bytes, str)):
+        return EVENT_LIST.validate_json(data)
+    return EVENT_LIST.validate_python(data)
@@ -1,27 +1,45 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Union
 
 from pydantic import BaseModel, Field
 
+from ai.models.events import Chunk, Event
+
 
 class AnalyzeRequest(BaseModel):
     session: Dict[str, Any]
-    chunk: Dict[str, Any]
-    events: List[Dict[str, Any]] = Field(default_factory=list)
+    chunk: Chunk
+    events: List[Event] = Field(default_factory=list)
+
+
+class ChunkEvents(BaseModel):
+    chunk: Chunk
+    events: List[Event] = Field(default_factory=list)
+
+
+class PrioritizeRequest(BaseModel):
+    session: Dict[str, Any]
+    chunks: List[ChunkEvents] = Field(default_factory=list)
 
 
 class AggregateRequest(BaseModel):
     session: Dict[str, Any]
     chunk_reports: List[Dict[str, Any]] = Field(default_factory=list)
+    chunk_ids: Optional[List[Union[str, int]]] = None
+    version: Optional[str] = None
 
 
 class ChatRequest(BaseModel):
     session: Dict[str, Any]
     analysis: Dict[str, Any] = Field(default_factory=dict)
-    events: List[Dict[str, Any]] = Field(default_factory=list)
+    events: List[Event] = Field(default_factory=list)
     message: str
     mode: str = "investigate"
     model: str = "default"
     resources: List[Dict[str, Any]] = Field(default_factory=list)
     images: List[Dict[str, Any]] = Field(default_factory=list)
+
+
+class LiveEventsRequest(BaseModel):
+    events: List[Event] = Field(default_factory=list)
@@ -0,0 +1,80 @@
+"""
+Compare checkpoint encodings on real session checkpoints.
+
+Reads every checkpoint in CHECKPOINT_DIR (or --dir), re-encodes it as legacy
+pretty JSON and as the v2 binary format, and reports size and encode/decode time.
+
+Usage:
+    python -m ai.scripts.checkpoint_stats [--dir ai/.checkpoints]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Any, Callable, List, Tuple
+
+from ai.services import checkpoint_codec
+from ai.services.checkpoints import CheckpointStore
+
+
+def _timed(fn: Callable[[], Any], repeat: int = 3) -> Tuple[Any, float]:
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def _print_row(
+    name: str,
+    json_bytes: int,
+    v2_bytes: int,
+    enc_json: float,
+    enc_v2: float,
+    dec_json: float,
+    dec_v2: float,
+) -> None:
+    ratio = json_bytes / max(v2_bytes, 1)
+    print(
+        f"{name:<40} {json_bytes:>10} {v2_bytes:>10} {ratio:>6.1f}x "
+        f"{enc_json * 1e3:>7.1f}/{enc_v2 * 1e3:<8.1f} {dec_json * 1e3:>7.1f}/{dec_v2 * 1e3:<8.1f}"
+    )
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Report checkpoint size and codec timings.")
+    parser.add_argument("--dir", type=Path, default=None)
+    args = parser.parse_args(argv)
+
+    base_dir = args.dir or CheckpointStore.from_env().base_dir
+    paths = sorted(list(base_dir.glob("*.json")) + list(base_dir.glob("*.ckpt")))
+    if not paths:
+        print(f"no checkpoints found in {base_dir}")
+        return 1
+
+    totals = [0, 0, 0.0, 0.0, 0.0, 0.0]
+    print(
+        f"{'checkpoint':<40} {'json':>10} {'v2':>10} {'ratio':>7} "
+        f"{'enc json/v2 ms':>16} {'dec json/v2 ms':>16}"
+    )
+    for path in paths:
+        state = checkpoint_codec.decode(path.read_bytes())
+        legacy, enc_json = _timed(
+            lambda: json.dumps(state, ensure_ascii=False, indent=2).encode("utf-8")
+        )
+        binary, enc_v2 = _timed(lambda: checkpoint_codec.encode(state))
+        _, dec_json = _timed(lambda: json.loads(legacy.decode("utf-8")))
+        _, dec_v2 = _timed(lambda: checkpoint_codec.decode(binary))
+        for idx, value in enumerate([len(legacy), len(binary), enc_json, enc_v2, dec_json, dec_v2]):
+            totals[idx] += value
+        _print_row(path.name[:40], len(legacy), len(binary), enc_json, enc_v2, dec_json, dec_v2)
+    _print_row("TOTAL", *totals)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,263 @@
+"""
+End-to-end load generator for the AI service.
+
+Drives ``/analyze``, ``/aggregate`` and ``/chat`` on a running uvicorn instance
+with synthetic payloads and reports throughput, latency percentiles and server
+memory over time.
+
+Usage:
+    # start a server with the synthetic model backend and load it for 60s
+    python -m ai.scripts.loadtest --spawn --duration 60 --concurrency 32
+
+    # load an already running server (memory sampling needs its pid)
+    python -m ai.scripts.loadtest --url http://127.0.0.1:8000 --pid 1234
+
+``--spawn`` sets ``ADK_MODEL_BACKEND=synthetic`` unless it is already set, so
+the ADK path is exercised without calling the model API. Latency and failure
+injection use the ``FAKE_LLM_*`` variables (see ai/README.md).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from ai.benchmarks.synthetic import SessionSpec, generate_chunk_reports, generate_session
+
+CHAT_MESSAGES = [
+    "Why did checkout fail?",
+    "Summarize the session",
+    "Which request returned 500?",
+    "What should I test next?",
+]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of ``values`` (0 when empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def read_rss_kb(pid: int) -> Optional[int]:
+    try:
+        with open(f"/proc/{pid}/status", encoding="utf-8") as handle:
+            for line in handle:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        return None
+    return None
+
+
+def _parse_mix(raw: str) -> Dict[str, int]:
+    mix: Dict[str, int] = {}
+    for item in raw.split(","):
+        name, _, weight = item.partition("=")
+        mix[name.strip()] = int(weight or 1)
+    return mix
+
+
+class PayloadFactory:
+    """Pre-builds a pool of realistic request bodies per endpoint."""
+
+    def __init__(self, events_per_chunk: int, chunks_per_session: int, pool_size: int = 8) -> None:
+        self.analyze: List[Dict[str, Any]] = []
+        self.aggregate: List[Dict[str, Any]] = []
+        self.chat: List[Dict[str, Any]] = []
+        for idx in range(pool_size):
+            session_id = f"load-session-{idx}"
+            data = generate_session(SessionSpec(event_count=events_per_chunk, seed=idx), session_id)
+            self.analyze.append(data)
+            self.aggregate.append(
+                {
+                    "session": data["session"],
+                    "chunk_reports": generate_chunk_reports(chunks_per_session, seed=idx),
+                }
+            )
+            self.chat.append(
+                {
+                    "session": data["session"],
+                    "analysis": {"summary": "Checkout fails after cart update."},
+                    "events": data["events"][-300:],
+                    "message": CHAT_MESSAGES[idx % len(CHAT_MESSAGES)],
+                    "mode": "investigate",
+                    "model": "default",
+                }
+            )
+
+    def body(self, endpoint: str, rng: random.Random) -> Dict[str, Any]:
+        return rng.choice(getattr(self, endpoint))
+
+
+async def _worker(
+    client: httpx.AsyncClient,
+    factory: PayloadFactory,
+    endpoints: List[str],
+    weights: List[int],
+    deadline: float,
+    samples: Dict[str, List[float]],
+    statuses: Dict[str, Dict[str, int]],
+    seed: int,
+) -> None:
+    rng = random.Random(seed)
+    while time.perf_counter() < deadline:
+        endpoint = rng.choices(endpoints, weights=weights)[0]
+        body = factory.body(endpoint, rng)
+        start = time.perf_counter()
+        try:
+            response = await client.post(f"/{endpoint}", json=body)
+            status = str(response.status_code)
+        except httpx.HTTPError as exc:
+            status = type(exc).__name__
+        samples[endpoint].append(time.perf_counter() - start)
+        statuses[endpoint][status] = statuses[endpoint].get(status, 0) + 1
+
+
+async def _sample_memory(
+    pid: Optional[int], deadline: float, interval: float, out: List[Dict[str, Any]]
+) -> None:
+    if pid is None:
+        return
+    started = time.perf_counter()
+    while time.perf_counter() < deadline:
+        rss = read_rss_kb(pid)
+        if rss is not None:
+            out.append(
+                {"t": round(time.perf_counter() - started, 2), "rss_mb": round(rss / 1024, 1)}
+            )
+        await asyncio.sleep(interval)
+
+
+async def run_load(args: argparse.Namespace, pid: Optional[int]) -> Dict[str, Any]:
+    factory = PayloadFactory(args.events, args.chunks)
+    mix = _parse_mix(args.mix)
+    endpoints = [name for name in mix if name in {"analyze", "aggregate", "chat"}]
+    weights = [mix[name] for name in endpoints]
+    samples: Dict[str, List[float]] = defaultdict(list)
+    statuses: Dict[str, Dict[str, int]] = defaultdict(dict)
+    memory: List[Dict[str, Any]] = []
+
+    limits = httpx.Limits(
+        max_connections=args.concurrency, max_keepalive_connections=args.concurrency
+    )
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(
+            _sample_memory(pid, deadline, args.memory_interval, memory),
+            *[
+                _worker(client, factory, endpoints, weights, deadline, samples, statuses, seed)
+                for seed in range(args.concurrency)
+            ],
+        )
+        elapsed = time.perf_counter() - started
+
+    per_endpoint = {}
+    for endpoint in endpoints:
+        latencies = samples.get(endpoint, [])
+        per_endpoint[endpoint] = {
+            "requests": len(latencies),
+            "throughput_rps": round(len(latencies) / elapsed, 2),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+            "statuses": statuses.get(endpoint, {}),
+        }
+    total = sum(len(values) for values in samples.values())
+    return {
+        "duration_s": round(elapsed, 2),
+        "concurrency": args.concurrency,
+        "requests": total,
+        "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "endpoints": per_endpoint,
+        "memory": memory,
+    }
+
+
+def _spawn_server(args: argparse.Namespace) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.setdefault("ADK_MODEL_BACKEND", "synthetic")
+    env.setdefault("ADK_ENABLED", "true")
+    host, _, port = args.url.split("://", 1)[-1].partition(":")
+    command = [
+        sys.executable, "-m", "uvicorn", "ai.app.main:app",
+        "--host", host, "--port", port or "8000", "--log-level", "warning",
+    ]
+    process = subprocess.Popen(command, env=env, cwd=str(Path(__file__).resolve().parents[2]))
+    deadline = time.time() + args.startup_timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"{args.url}/health", timeout=1).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        if process.poll() is not None:
+            raise RuntimeError("uvicorn exited during startup")
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("uvicorn did not become healthy in time")
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    rate = report["throughput_rps"]
+    print(f"{report['requests']} requests in {report['duration_s']}s ({rate} req/s)")
+    for name, stats in report["endpoints"].items():
+        print(
+            f"  /{name:<10} {stats['requests']:>7} req  {stats['throughput_rps']:>8} req/s  "
+            f"p50 {stats['p50_ms']:>8}ms  p95 {stats['p95_ms']:>8}ms  p99 {stats['p99_ms']:>8}ms  "
+            f"{stats['statuses']}"
+        )
+    if report["memory"]:
+        rss = [point["rss_mb"] for point in report["memory"]]
+        print(f"  server RSS: start {rss[0]}MB  peak {max(rss)}MB  end {rss[-1]}MB")
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Load-test the AI service over HTTP.")
+    parser.add_argument("--url", default="http://127.0.0.1:8765")
+    parser.add_argument(
+        "--spawn", action="store_true", help="Start a uvicorn instance for the run."
+    )
+    parser.add_argument("--pid", type=int, help="Server pid to sample memory from.")
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--mix", default="analyze=6,aggregate=1,chat=3", help="Endpoint weights.")
+    parser.add_argument("--events", type=int, default=500, help="Events per /analyze chunk.")
+    parser.add_argument("--chunks", type=int, default=12, help="Chunk reports per /aggregate call.")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--memory-interval", type=float, default=1.0)
+    parser.add_argument("--startup-timeout", type=float, default=60.0)
+    parser.add_argument("--output", type=Path, help="Write the JSON report here.")
+    args = parser.parse_args(argv)
+
+    process = _spawn_server(args) if args.spawn else None
+    pid = process.pid if process else args.pid
+    try:
+        report = asyncio.run(run_load(args, pid))
+    finally:
+        if process:
+            process.terminate()
+            process.wait(timeout=10)
+
+    _print_report(report)
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,68 @@
+"""
+Import-time profile of the AI service.
+
+Runs ``python -X importtime -c "import ai.app.main"`` in a fresh interpreter for
+stub and ADK mode and prints the slowest modules by cumulative import time.
+
+Usage:
+    python -m ai.scripts.profile_imports [--top 20] [--module ai.app.main]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+MODES: Dict[str, Dict[str, str]] = {
+    "stub": {"ADK_ENABLED": "false"},
+    "adk": {"ADK_ENABLED": "true", "ADK_MODEL_BACKEND": "synthetic"},
+}
+
+
+def profile(module: str, env_overrides: Dict[str, str]) -> List[Tuple[str, int, int]]:
+    """Return ``(module, self_us, cumulative_us)`` rows from ``-X importtime``."""
+    env = dict(os.environ, **env_overrides)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env,
+        cwd=str(Path(__file__).resolve().parents[2]),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows: List[Tuple[str, int, int]] = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, self_us, cumulative_us, name = (
+            part.strip() for part in line.replace("import time:", "|").split("|")
+        )
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Profile AI service import time.")
+    parser.add_argument("--module", default="ai.app.main")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--mode", action="append", choices=sorted(MODES))
+    args = parser.parse_args(argv)
+
+    for mode in args.mode or list(MODES):
+        rows = profile(args.module, MODES[mode])
+        total = sum(self_us for _, self_us, _ in rows)
+        print(f"[{mode}] import {args.module}: {total / 1000:.1f}ms across {len(rows)} modules")
+        for name, self_us, cumulative_us in sorted(rows, key=lambda row: row[2], reverse=True)[
+            : args.top
+        ]:
+            cumulative_ms, self_ms = cumulative_us / 1000, self_us / 1000
+            print(f"  {cumulative_ms:>9.1f}ms cumulative  {self_ms:>8.1f}ms self  {name}")
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,377 @@
+"""
+Offline re-analysis of exported sessions.
+
+Reads an NDJSON export (optionally gzipped), runs every session through
+``Orchestrator`` and appends one report line per session to ``--output`` as soon
+as it finishes. Each input line is either a whole session::
+
+    {"session": {...}, "chunks": [{"chunk": {...}, "events": [...]}, ...]}
+
+or a stream of records, where a chunk or event belongs to the session or chunk
+before it::
+
+    {"session": {...}}
+    {"chunk": {...}, "events": [...]}
+    {"event": {...}}
+
+The output file is the checkpoint: sessions that already have a report line are
+skipped on the next run, so a crashed run resumes where it stopped (a torn last
+line is dropped first). Sessions that failed are written with an ``error`` field
+and retried on the next run; readers should keep the last line per session.
+
+Chunks run concurrently up to ``--concurrency`` (natively async when ADK is
+enabled, on threads otherwise). Within a session they start in the order of
+the anomaly detector's priority queue and carry its analysis depth (see
+``ai.services.anomaly``). ``--processes N`` fans whole sessions out to N
+worker processes, each with its own orchestrator, for CPU-bound stub runs or a
+GIL-heavy event pipeline. Throughput and an ETA based on input bytes go to stderr.
+
+Usage:
+    ADK_MODEL_BACKEND=synthetic python -m ai.scripts.reanalyze sessions.ndjson.gz \\
+        --output reports.ndjson [--concurrency 8] [--processes 4] [--limit 100]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import sys
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Any, Dict, Iterator, List, Optional, Set
+
+from ai.models.events import parse_events
+
+
+@dataclass
+class SessionRecord:
+    session: Dict[str, Any]
+    chunks: List[Dict[str, Any]] = field(default_factory=list)
+    line: int = 0
+    # share of the input file, in raw (possibly compressed) bytes, for progress and ETA
+    size: int = 0
+
+    @property
+    def session_id(self) -> str:
+        session_id = self.session.get("id")
+        return str(session_id) if session_id is not None else f"line:{self.line}"
+
+
+def read_sessions(path: Path) -> Iterator[SessionRecord]:
+    """Yield sessions from an NDJSON export, holding at most one in memory."""
+    with path.open("rb") as raw:
+        stream: IO[bytes] = gzip.GzipFile(fileobj=raw) if path.suffix == ".gz" else raw
+        current: Optional[SessionRecord] = None
+        line_no = 0
+        position = 0
+        while True:
+            line = stream.readline()
+            if not line:
+                break
+            line_no += 1
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as exc:
+                raise ValueError(f"{path}:{line_no}: invalid JSON ({exc})") from None
+            if not isinstance(record, dict):
+                raise ValueError(f"{path}:{line_no}: expected an object")
+            if "session" in record:
+                if current is not None:
+                    yield current
+                    position += current.size
+                current = SessionRecord(
+                    record["session"] or {}, list(record.get("chunks") or []), line_no
+                )
+            elif current is None:
+                raise ValueError(f"{path}:{line_no}: chunk or event before any session")
+            elif "chunk" in record:
+                current.chunks.append(
+                    {"chunk": record["chunk"], "events": list(record.get("events") or [])}
+                )
+            elif "event" in record:
+                if not current.chunks:
+                    raise ValueError(f"{path}:{line_no}: event before any chunk")
+                current.chunks[-1]["events"].append(record["event"])
+            else:
+                raise ValueError(f"{path}:{line_no}: expected a session, chunk or event record")
+            current.size = raw.tell() - position
+        if current is not None:
+            yield current
+
+
+def load_done(output: Path) -> Set[str]:
+    """Return session ids already reported in ``output``, dropping a torn last line."""
+    if not output.exists():
+        return set()
+    done: Set[str] = set()
+    good = 0
+    with output.open("rb") as handle:
+        for line in handle:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            good += len(line)
+            if "error" not in record:
+                done.add(str(record.get("session_id")))
+    if good != output.stat().st_size:
+        with output.open("rb+") as handle:
+            handle.truncate(good)
+    return done
+
+
+async def analyze_session(
+    orchestrator: Any, record: SessionRecord, limit: asyncio.Semaphore
+) -> Dict[str, Any]:
+    """Analyze every chunk of ``record`` and aggregate them into one report line."""
+    session = record.session
+    adk = getattr(orchestrator, "adk", None)
+
+    async def run_chunk(chunk: Dict[str, Any], events: List[Dict[str, Any]]) -> Dict[str, Any]:
+        async with limit:
+            if adk:
+                return await adk.analyze_chunk_async(session, chunk, events)
+            return await asyncio.to_thread(orchestrator.analyze_chunk, session, chunk, events)
+
+    start = time.perf_counter()
+    try:
+        entries = [
+            (entry.get("chunk") or {}, parse_events(entry.get("events") or []))
+            for entry in record.chunks
+        ]
+        # bursty chunks take the semaphore first (it wakes waiters in order) and set their own depth
+        queue = orchestrator.anomalies.detect(entries).queue()
+        tasks = {
+            item.position: asyncio.ensure_future(
+                run_chunk(
+                    {**entries[item.position][0], "priority": item.tag()}, entries[item.position][1]
+                )
+            )
+            for item in queue
+        }
+        reports = list(await asyncio.gather(*(tasks[position] for position in range(len(entries)))))
+        if adk:
+            aggregate = await adk.aggregate_session_async(session, reports)
+        else:
+            aggregate = await asyncio.to_thread(orchestrator.aggregate_session, session, reports)
+    except Exception as exc:
+        return {
+            "session_id": record.session_id,
+            "chunks": len(record.chunks),
+            "error": f"{type(exc).__name__}: {exc}",
+        }
+    return {
+        "session_id": record.session_id,
+        "chunks": len(record.chunks),
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+        "aggregate": aggregate,
+        "chunk_reports": reports,
+    }
+
+
+_worker_orchestrator: Any = None
+
+
+def _init_worker() -> None:
+    global _worker_orchestrator
+    from ai.services.orchestrator import Orchestrator
+
+    _worker_orchestrator = Orchestrator()
+
+
+def _worker_session(record: SessionRecord, concurrency: int) -> Dict[str, Any]:
+    async def run() -> Dict[str, Any]:
+        return await analyze_session(_worker_orchestrator, record, asyncio.Semaphore(concurrency))
+
+    return asyncio.run(run())
+
+
+class Progress:
+    """Throughput and ETA over input bytes, printed at most every ``interval`` seconds."""
+
+    def __init__(self, total_bytes: int, interval: float, out: IO[str]) -> None:
+        self.total_bytes = total_bytes
+        self.interval = interval
+        self.out = out
+        self.start = time.perf_counter()
+        self.last_print = 0.0
+        self.sessions = 0
+        self.chunks = 0
+        self.errors = 0
+        self.skipped = 0
+        self.bytes_done = 0
+        self.bytes_skipped = 0
+
+    def update(self, result: Dict[str, Any], size: int) -> None:
+        self.sessions += 1
+        self.chunks += int(result.get("chunks") or 0)
+        self.errors += "error" in result
+        self.bytes_done += size
+        self.report()
+
+    def skip(self, size: int) -> None:
+        self.skipped += 1
+        self.bytes_skipped += size
+
+    def summary(self) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - self.start
+        rate = self.bytes_done / elapsed if elapsed else 0.0
+        remaining = max(self.total_bytes - self.bytes_skipped - self.bytes_done, 0)
+        return {
+            "sessions": self.sessions,
+            "chunks": self.chunks,
+            "errors": self.errors,
+            "skipped": self.skipped,
+            "elapsed_s": round(elapsed, 1),
+            "sessions_per_s": round(self.sessions / elapsed, 2) if elapsed else 0.0,
+            "chunks_per_s": round(self.chunks / elapsed, 2) if elapsed else 0.0,
+            "eta_s": round(remaining / rate, 1) if rate else None,
+        }
+
+    def report(self, force: bool = False) -> None:
+        now = time.perf_counter()
+        if not force and now - self.last_print < self.interval:
+            return
+        self.last_print = now
+        stats = self.summary()
+        done = self.bytes_skipped + self.bytes_done
+        percent = 100.0 * done / self.total_bytes if self.total_bytes else 100.0
+        eta = "?" if stats["eta_s"] is None else _duration(stats["eta_s"])
+        print(
+            f"[{percent:5.1f}%] {stats['sessions']} sessions "
+            f"({stats['skipped']} skipped, {stats['errors']} errors) "
+            f"{stats['sessions_per_s']} sessions/s {stats['chunks_per_s']} chunks/s ETA {eta}",
+            file=self.out,
+            flush=True,
+        )
+
+
+def _duration(seconds: float) -> str:
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m{secs:02d}s" if hours else f"{minutes}m{secs:02d}s"
+
+
+async def reanalyze(
+    input_path: Path,
+    output: Path,
+    concurrency: int = 4,
+    processes: int = 0,
+    limit: Optional[int] = None,
+    orchestrator: Any = None,
+    interval: float = 5.0,
+    out: IO[str] = sys.stderr,
+) -> Dict[str, Any]:
+    """Run every not-yet-reported session in ``input_path`` and append reports to ``output``."""
+    concurrency = max(1, concurrency)
+    done = load_done(output)
+    progress = Progress(input_path.stat().st_size, interval, out)
+    executor: Optional[Executor] = None
+    if processes > 0:
+        import multiprocessing
+
+        # spawn: workers build their own orchestrator instead of inheriting a forked event loop
+        executor = ProcessPoolExecutor(
+            processes, multiprocessing.get_context("spawn"), _init_worker
+        )
+    elif orchestrator is None:
+        from ai.services.orchestrator import Orchestrator
+
+        orchestrator = Orchestrator()
+
+    loop = asyncio.get_running_loop()
+    chunk_limit = asyncio.Semaphore(concurrency)
+    # whole sessions in flight; with a pool, enough to keep every worker fed
+    max_sessions = max(concurrency, processes * 2)
+    pending: Set[asyncio.Future] = set()
+    started = 0
+
+    async def run(record: SessionRecord) -> Dict[str, Any]:
+        if executor is not None:
+            result = await loop.run_in_executor(executor, _worker_session, record, concurrency)
+        else:
+            result = await analyze_session(orchestrator, record, chunk_limit)
+        return {**result, "_size": record.size}
+
+    def flush(finished: Set[asyncio.Future]) -> None:
+        for future in finished:
+            result = future.result()
+            size = result.pop("_size")
+            handle.write(json.dumps(result, default=str) + "\n")
+            handle.flush()
+            progress.update(result, size)
+
+    try:
+        with output.open("a", encoding="utf-8") as handle:
+            for record in read_sessions(input_path):
+                if record.session_id in done:
+                    progress.skip(record.size)
+                    continue
+                if limit is not None and started >= limit:
+                    break
+                if len(pending) >= max_sessions:
+                    finished, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    flush(finished)
+                pending.add(asyncio.ensure_future(run(record)))
+                started += 1
+            if pending:
+                finished, _ = await asyncio.wait(pending)
+                flush(finished)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+    progress.report(force=True)
+    return progress.summary()
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Re-run archived sessions through the orchestrator."
+    )
+    parser.add_argument(
+        "input", type=Path, help="NDJSON export of sessions, chunks and events (.gz ok)"
+    )
+    parser.add_argument(
+        "--output", type=Path, required=True, help="report NDJSON; doubles as the resume checkpoint"
+    )
+    parser.add_argument("--concurrency", type=int, default=4, help="chunk analyses in flight")
+    parser.add_argument(
+        "--processes", type=int, default=0, help="worker processes (0 = run in this process)"
+    )
+    parser.add_argument("--limit", type=int, default=None, help="stop after this many new sessions")
+    parser.add_argument(
+        "--interval", type=float, default=5.0, help="seconds between progress lines"
+    )
+    parser.add_argument(
+        "--fresh", action="store_true", help="discard existing reports instead of resuming"
+    )
+    args = parser.parse_args(argv)
+
+    if args.fresh and args.output.exists():
+        os.remove(args.output)
+    summary = asyncio.run(
+        reanalyze(
+            args.input,
+            args.output,
+            args.concurrency,
+            args.processes,
+            args.limit,
+            interval=args.interval,
+        )
+    )
+    print(json.dumps(summary, indent=2))
+    return 1 if summary["errors"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
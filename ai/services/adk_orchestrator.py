@@ -8,24 +8,56 @@ from __future__ import annotations
 import asyncio
 import json
 import os
-import uuid
 from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional
 
 from google.adk.agents import LlmAgent
 from google.adk.sessions import InMemorySessionService
 from google.genai import types
-
-from ai.services.checkpoints import CheckpointStore
-from ai.agents.analysis import log_analyst, video_analyst, repro_planner, synthesizer
+from pydantic import BaseModel
+
+from ai.agents.analysis import (
+    chunk_analyst,
+    log_analyst,
+    output_repairer,
+    repro_planner,
+    synthesizer,
+    video_analyst,
+)
 from ai.agents.chat import create_qa_chat_agent
-from ai.tools.event_tools import filter_console_events, filter_network_events, filter_interaction_events
+from ai.core.config import settings
+from ai.core.metrics import metrics
+from ai.core.profiling import stage
+from ai.services.agent_outputs import parse_json_object, structured_output
+from ai.services.aggregation import (
+    latest_reports,
+    missing_response,
+    reconcile,
+    unchanged_response,
+    version_token,
+)
+from ai.services.anomaly import analysis_depth
+from ai.services.batching import MicroBatcher
+from ai.services.checkpoints import CheckpointStore
+from ai.services.correlation import Correlator, correlation_groups
+from ai.services.images import ImageCache
+from ai.services.known_issues import KnownIssueIndex
+from ai.services.model_backends import ModelBackend, backend_from_env
+from ai.services.network_perf import NetworkAnalyzer
+from ai.services.retrieval import RetrievalCache
+from ai.services.rules import Finding, default_engine
+from ai.services.views import canned_view, fresh_view, render_reply, update_views
 from ai.tools.checkpoint_tools import load_checkpoint_context
+from ai.tools.event_tools import (
+    filter_console_events,
+    filter_interaction_events,
+    filter_network_events,
+    is_error_event,
+)
 
-try:
-    from google.adk.runners import Runner
-except ImportError:  # pragma: no cover - fallback for older module layout
-    from google.adk.runners.runner import Runner
+metrics.describe("chunk_analysis_mode_total", "Chunk text analyses by mode (fused|split|fallback)")
+# light (error-free) chunks from /prioritize fuse up to this multiple of FUSED_MAX_CHARS
+LIGHT_FUSED_FACTOR = 4
 
 
 @dataclass
@@ -43,11 +75,19 @@ class AgentOutput:
 class AdkOrchestrator:
     """Orchestrates ADK agents for QA session analysis."""
     
-    def __init__(self) -> None:
+    def __init__(self, backend: Optional[ModelBackend] = None) -> None:
         self.app_name = "qa-assist-ai"
         self.user_id = "qa-assist"
         self.session_service = InMemorySessionService()
         self.checkpoints = CheckpointStore.from_env()
+        self.backend = backend or backend_from_env(
+            self.session_service, self.app_name, self.user_id
+        )
+        self.retrieval = RetrievalCache.from_settings()
+        self.rules = default_engine()
+        self.network = NetworkAnalyzer.from_settings()
+        self.issue_index = KnownIssueIndex.from_settings(self.checkpoints)
+        self.images = ImageCache.from_settings()
 
         self.text_model = os.getenv("ADK_TEXT_MODEL", "gemini-3-flash")
         self.video_model = os.getenv("ADK_VIDEO_MODEL", "gemini-3-pro-preview")
@@ -57,12 +97,55 @@ class AdkOrchestrator:
         self.video_agent = video_analyst
         self.repro_agent = repro_planner
         self.synth_agent = synthesizer
+        self.repair_agent = output_repairer
+        # FUSED_MAX_CHARS > 0 runs log/repro/synthesis as one call for small chunks without video
+        self.fused_agent = chunk_analyst
+        self.fused_max_chars = settings.fused_max_chars
+        self._chat_agents: Dict[str, LlmAgent] = {}
+        # BATCH_WINDOW_MS > 0 coalesces small log_analyst/synthesizer calls across requests
+        self.batcher = MicroBatcher.from_settings(
+            [self.log_agent, self.synth_agent], self._run_agent
+        )
 
-    def analyze_chunk(self, session: Dict[str, Any], chunk: Dict[str, Any], events: List[Dict[str, Any]]) -> Dict[str, Any]:
-        return self._run_sync(self._analyze_chunk_async(session, chunk, events))
+    def warm(self) -> None:
+        """Prebuild runners, the default chat agent and model clients."""
+        agents = [
+            self.log_agent,
+            self.video_agent,
+            self.repro_agent,
+            self.synth_agent,
+            self.repair_agent,
+        ]
+        if self.fused_max_chars > 0:
+            agents.append(self.fused_agent)
+        agents.append(self._chat_agent(self.text_model))
+        agents.extend(self.batcher.batch_agents.values())
+        warm = getattr(self.backend, "warm", None)
+        if warm:
+            warm(agents)
+
+    def analyze_chunk(
+        self,
+        session: Dict[str, Any],
+        chunk: Dict[str, Any],
+        events: List[Dict[str, Any]],
+        error_clusters: Optional[List[Dict[str, Any]]] = None,
+        findings: Optional[Dict[str, Finding]] = None,
+    ) -> Dict[str, Any]:
+        return self._run_sync(
+            self._analyze_chunk_async(session, chunk, events, error_clusters, findings)
+        )
 
-    def aggregate_session(self, session: Dict[str, Any], chunk_reports: List[Dict[str, Any]]) -> Dict[str, Any]:
-        return self._run_sync(self._aggregate_session_async(session, chunk_reports))
+    def aggregate_session(
+        self,
+        session: Dict[str, Any],
+        chunk_reports: List[Dict[str, Any]],
+        chunk_ids: Optional[List[str]] = None,
+        version: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        return self._run_sync(
+            self._aggregate_session_async(session, chunk_reports, chunk_ids, version)
+        )
 
     def chat(
         self,
@@ -78,14 +161,23 @@ class AdkOrchestrator:
         return self._run_sync(self._chat_async(session, analysis, events, message, mode, model, resources, images))
 
     async def analyze_chunk_async(
-        self, session: Dict[str, Any], chunk: Dict[str, Any], events: List[Dict[str, Any]]
+        self,
+        session: Dict[str, Any],
+        chunk: Dict[str, Any],
+        events: List[Dict[str, Any]],
+        error_clusters: Optional[List[Dict[str, Any]]] = None,
+        findings: Optional[Dict[str, Finding]] = None,
     ) -> Dict[str, Any]:
-        return await self._analyze_chunk_async(session, chunk, events)
+        return await self._analyze_chunk_async(session, chunk, events, error_clusters, findings)
 
     async def aggregate_session_async(
-        self, session: Dict[str, Any], chunk_reports: List[Dict[str, Any]]
+        self,
+        session: Dict[str, Any],
+        chunk_reports: List[Dict[str, Any]],
+        chunk_ids: Optional[List[str]] = None,
+        version: Optional[str] = None,
     ) -> Dict[str, Any]:
-        return await self._aggregate_session_async(session, chunk_reports)
+        return await self._aggregate_session_async(session, chunk_reports, chunk_ids, version)
 
     async def chat_async(
         self,
@@ -101,21 +193,86 @@ class AdkOrchestrator:
         return await self._chat_async(session, analysis, events, message, mode, model, resources, images)
 
     async def _analyze_chunk_async(
-        self, session: Dict[str, Any], chunk: Dict[str, Any], events: List[Dict[str, Any]]
+        self,
+        session: Dict[str, Any],
+        chunk: Dict[str, Any],
+        events: List[Dict[str, Any]],
+        error_clusters: Optional[List[Dict[str, Any]]] = None,
+        findings: Optional[Dict[str, Finding]] = None,
     ) -> Dict[str, Any]:
         session_id = session.get("id") if isinstance(session, dict) else None
         checkpoint = self.checkpoints.load(session_id) if session_id else {}
-        payload = self._build_payload(session, chunk, events, checkpoint)
-        log_payload = self._build_log_payload(payload)
-        repro_payload = self._build_repro_payload(payload)
-        video_payload = self._build_video_payload(payload)
-
-        log_result = await self._call_agent(self.log_agent, log_payload, "Analyze console/network logs.")
+        with stage("build_payload"):
+            # errors explained in earlier sessions are attached as is and kept from the model
+            indexed = self.issue_index.match(events)
+            payload = self._build_payload(session, chunk, indexed.remaining, checkpoint)
+            if error_clusters:
+                # clustered while the session was live; shows the log agent repeats across the
+                # whole session
+                payload["error_clusters"] = error_clusters
+            network = self.network.analyze(events)
+            if network.requests:
+                payload["network_summary"] = network.prompt_summary(settings.network_table_rows)
+            log_payload = self._build_log_payload(payload, findings)
+            repro_payload = self._build_repro_payload(payload)
+            video_payload = self._build_video_payload(payload)
+
+        # chunk["priority"] from /prioritize: bursts get every agent, quiet chunks fuse at a
+        # larger size
+        depth = analysis_depth(chunk)
+        fused_limit = 0 if depth == "deep" else self.fused_max_chars
+        if depth == "light":
+            fused_limit *= LIGHT_FUSED_FACTOR
+        fused: Optional[List[AgentOutput]] = None
+        # every error matched the cross-session index and no rule summaries are left for the
+        # log agent
+        if (
+            indexed.issues
+            and indexed.known == set(indexed.counts)
+            and not log_payload.get("known_issues")
+        ):
+            log_result = AgentOutput(
+                self.log_agent.name,
+                f"All errors match {len(indexed.issues)} known issues.",
+                [],
+                [],
+                [],
+            )
+        else:
+            fused_prompt = self._fused_prompt(payload, log_payload, repro_payload, fused_limit)
+            if fused_prompt is not None:
+                fused = await self._call_fused(fused_prompt)
+            if fused is not None:
+                log_result = fused[0]
+            else:
+                log_result = await self._call_agent(
+                    self.log_agent, log_payload, "Analyze console/network logs."
+                )
         video_result = await self._call_agent(self.video_agent, video_payload, "Analyze video for UI/UX issues.")
-        repro_result = await self._call_agent(self.repro_agent, repro_payload, "Generate repro steps.")
+        if fused is not None:
+            repro_result = fused[1]
+        else:
+            repro_result = await self._call_agent(
+                self.repro_agent, repro_payload, "Generate repro steps."
+            )
 
-        issues = log_result.issues + video_result.issues
-        evidence = log_result.evidence + video_result.evidence
+        for issue in video_result.issues:
+            if isinstance(issue, dict):
+                issue.setdefault("source", "video")
+        with stage("correlate"):
+            correlator = Correlator(
+                events,
+                chunk,
+                window_seconds=settings.correlation_window_seconds,
+                lookback_seconds=settings.correlation_lookback_seconds,
+            )
+            issues = correlator.attach(
+                log_result.issues + indexed.issues + network.issues + video_result.issues
+            )
+            issue_groups = correlation_groups(issues)
+        # only the model's own log issues explain fingerprints for later sessions
+        self.issue_index.observe(session_id, indexed, issues[: len(log_result.issues)])
+        evidence = log_result.evidence + network.evidence + video_result.evidence
         repro_steps = repro_result.repro_steps
 
         synth_payload = {
@@ -123,12 +280,18 @@ class AdkOrchestrator:
             "chunk": {"id": chunk.get("id"), "idx": chunk.get("idx")},
             "log_summary": log_result.summary,
             "video_summary": video_result.summary,
-            "issues": issues,
+            "issue_count": len(issues),
+            # issues whose time windows overlap, with the errors and preceding interactions they
+            # link to
+            "issue_groups": issue_groups,
             "repro_steps": repro_steps,
             "environment": session.get("metadata", {}),
             "checkpoint": payload.get("checkpoint", {}),
         }
-        synth = await self._call_agent(self.synth_agent, synth_payload, "Summarize findings.")
+        if fused is not None:
+            synth = fused[2]
+        else:
+            synth = await self._call_agent(self.synth_agent, synth_payload, "Summarize findings.")
 
         severity_breakdown = synth.severity_breakdown or self._severity_breakdown(issues)
         top_issues = synth.top_issues or issues[:5]
@@ -151,19 +314,50 @@ class AdkOrchestrator:
             "chunk_idx": chunk.get("idx"),
             "session_id": session.get("id"),
         }
+        if chunk.get("priority"):
+            report["analysis_depth"] = depth
         if session_id:
             self.checkpoints.append_chunk(session_id, report)
         return report
 
     async def _aggregate_session_async(
-        self, session: Dict[str, Any], chunk_reports: List[Dict[str, Any]]
+        self,
+        session: Dict[str, Any],
+        chunk_reports: List[Dict[str, Any]],
+        chunk_ids: Optional[List[str]] = None,
+        version: Optional[str] = None,
     ) -> Dict[str, Any]:
         session_id = session.get("id") if isinstance(session, dict) else None
-        if not chunk_reports and session_id:
-            checkpoint = self.checkpoints.load(session_id)
-            if checkpoint.get("chunk_reports"):
-                chunk_reports = checkpoint["chunk_reports"]
+        if chunk_ids is None and version is None:
+            if not chunk_reports and session_id:
+                checkpoint = self.checkpoints.load(session_id)
+                if checkpoint.get("chunk_reports"):
+                    chunk_reports = checkpoint["chunk_reports"]
+            chunk_reports = latest_reports(chunk_reports)
+            return await self._synthesize_session(
+                session, chunk_reports, version_token(chunk_reports)
+            )
 
+        if not session_id:
+            return missing_response(None, [str(chunk_id) for chunk_id in chunk_ids or []])
+        checkpoint = self.checkpoints.load(session_id)
+        reconciled = reconcile(checkpoint, chunk_ids, chunk_reports)
+        if reconciled.added:
+            checkpoint = self.checkpoints.extend_chunks(session_id, reconciled.added)
+        if reconciled.missing:
+            return missing_response(session_id, reconciled.missing)
+
+        cached = checkpoint.get("session_synthesis") or {}
+        if cached.get("version") == reconciled.version:
+            if version == reconciled.version:
+                return unchanged_response(session_id, version)
+            return self._session_report(session_id, reconciled.reports, cached)
+        return await self._synthesize_session(session, reconciled.reports, reconciled.version)
+
+    async def _synthesize_session(
+        self, session: Dict[str, Any], chunk_reports: List[Dict[str, Any]], version: str
+    ) -> Dict[str, Any]:
+        session_id = session.get("id") if isinstance(session, dict) else None
         issues = [issue for report in chunk_reports for issue in report.get("issues", [])]
         evidence = [item for report in chunk_reports for item in report.get("evidence", [])]
         steps = [step for report in chunk_reports for step in report.get("repro_steps", [])]
@@ -182,32 +376,74 @@ class AdkOrchestrator:
             if chunk_reports
             else "No chunk analysis available."
         )
-
-        severity_breakdown = synth.severity_breakdown or self._severity_breakdown(issues)
-        top_issues = synth.top_issues or issues[:8]
-
-        report = {
+        synthesis = {
+            "version": version,
             "summary": summary,
-            "severity_breakdown": severity_breakdown,
-            "top_issues": top_issues,
-            "issues": issues,
-            "evidence": evidence,
-            "repro_steps": steps,
-            "session_id": session.get("id"),
+            "severity_breakdown": synth.severity_breakdown or self._severity_breakdown(issues),
+            "top_issues": synth.top_issues or issues[:8],
         }
+        report = self._session_report(session_id, chunk_reports, synthesis)
         if session_id:
-            checkpoint = self.checkpoints.load(session_id)
-            checkpoint.update(
-                {
-                    "summary": summary,
-                    "issues": issues,
-                    "evidence": evidence,
-                    "repro_steps": steps,
-                }
+            self.checkpoints.update(
+                session_id,
+                lambda checkpoint: update_views(
+                    {
+                        **checkpoint,
+                        "summary": summary,
+                        "issues": report["issues"],
+                        "evidence": report["evidence"],
+                        "repro_steps": report["repro_steps"],
+                        "session_synthesis": synthesis,
+                    }
+                ),
             )
-            self.checkpoints.save(session_id, checkpoint)
         return report
 
+    def _session_report(
+        self, session_id: Any, chunk_reports: List[Dict[str, Any]], synthesis: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        return {
+            "summary": synthesis.get("summary"),
+            "severity_breakdown": synthesis.get("severity_breakdown") or {},
+            "top_issues": synthesis.get("top_issues") or [],
+            "issues": [issue for report in chunk_reports for issue in report.get("issues", [])],
+            "evidence": [item for report in chunk_reports for item in report.get("evidence", [])],
+            "repro_steps": [
+                step for report in chunk_reports for step in report.get("repro_steps", [])
+            ],
+            "session_id": session_id,
+            "version": synthesis.get("version"),
+        }
+
+    def view_reply(
+        self,
+        session: Dict[str, Any],
+        message: str,
+        mode: str,
+        model: str,
+        resources: Optional[List[Dict[str, Any]]] = None,
+        images: Optional[List[Dict[str, Any]]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Answer a canned summarize/triage request from the checkpoint's view, or None."""
+        session_id = session.get("id") if isinstance(session, dict) else None
+        view = canned_view(mode, message)
+        if view is None or not session_id or resources or images:
+            return None
+        checkpoint = self.checkpoints.load(session_id)
+        data = fresh_view(checkpoint, view)
+        if data is None:
+            metrics.inc("chat_view_total", mode=view, result="stale")
+            return None
+        metrics.inc("chat_view_total", mode=view, result="hit")
+        return {
+            **render_reply(view, data),
+            "mode": mode,
+            "model": self._pick_model(model),
+            "session_id": session_id,
+            "view": view,
+            "view_version": checkpoint.get("updated_at"),
+        }
+
     async def _chat_async(
         self,
         session: Dict[str, Any],
@@ -221,20 +457,44 @@ class AdkOrchestrator:
     ) -> Dict[str, Any]:
         session_id = session.get("id") if isinstance(session, dict) else None
         checkpoint = self.checkpoints.load(session_id) if session_id else {}
+        with stage("retrieval"):
+            context = self.retrieval.context(
+                session_id,
+                message,
+                events,
+                analysis if isinstance(analysis, dict) else {},
+                checkpoint,
+                resources,
+                settings.chat_retrieval_top_k,
+                settings.chat_context_tokens,
+            )
+        overview = self._checkpoint_context(checkpoint)
+        overview.pop("issues", None)
+        overview.pop("repro_steps", None)
+        with stage("images"):
+            # pixels go in binary parts after the text; the prompt only lists them
+            prepared, image_refs = self.images.prepare(images)
         prompt = {
             "instruction": self._mode_instruction(mode),
             "mode": mode,
             "user_message": message,
             "session": session,
-            "analysis": analysis,
-            "events": self._trim_events(events),
-            "checkpoint": self._checkpoint_context(checkpoint),
-            "resources": resources or [],
-            "images": images or [],
+            "analysis": self._analysis_overview(analysis),
+            "context": context,
+            "checkpoint": overview,
+            "resources": [
+                {key: value for key, value in resource.items() if key not in {"text", "content"}}
+                for resource in resources or []
+                if isinstance(resource, dict)
+            ],
+            "images": image_refs,
         }
-        # Use chat agent factory from ai/agents/chat/
-        agent = create_qa_chat_agent(self._pick_model(model))
-        response_text = await self._run_agent(agent, json.dumps(prompt, ensure_ascii=False))
+        agent = self._chat_agent(self._pick_model(model))
+        parts = [types.Part(text=json.dumps(prompt, ensure_ascii=False))]
+        parts.extend(
+            types.Part.from_bytes(data=image.data, mime_type=image.mime_type) for image in prepared
+        )
+        response_text = await self._run_agent_parts(agent, parts)
         parsed = self._parse_json(response_text)
         reply = parsed.get("reply") or "No response generated."
         return {
@@ -243,6 +503,8 @@ class AdkOrchestrator:
             "mode": mode,
             "model": self._pick_model(model),
             "session_id": session.get("id"),
+            # later turns can send {"sha256": ...} instead of the bytes again
+            **({"images": image_refs} if image_refs else {}),
         }
 
     def _build_payload(
@@ -266,13 +528,36 @@ class AdkOrchestrator:
             "checkpoint": self._checkpoint_context(checkpoint or {}),
         }
 
-    def _build_log_payload(self, payload: Dict[str, Any]) -> Dict[str, Any]:
-        events = payload.get("events", [])
+    def _build_log_payload(
+        self, payload: Dict[str, Any], findings: Optional[Dict[str, Finding]] = None
+    ) -> Dict[str, Any]:
+        """``findings`` are rule findings precomputed while the session was live."""
+        # events a rule classifies are sent as one summary per rule; ignored noise is dropped
+        events, rule_matches = self.rules.known_issues(payload.get("events", []), findings)
+        network_events = filter_network_events(events)
+        if payload.get("network_summary"):
+            # the per-endpoint table stands in for successful requests
+            network_events = [
+                event
+                for event in network_events
+                if is_error_event(event) or (event.get("payload") or {}).get("type") == "failed"
+            ]
         return {
             "session": payload.get("session"),
             "chunk": payload.get("chunk"),
-            "events": filter_console_events(events) + filter_network_events(events),
+            "events": filter_console_events(events) + network_events,
             "checkpoint": payload.get("checkpoint", {}),
+            **({"known_issues": rule_matches} if rule_matches else {}),
+            **(
+                {"network_summary": payload["network_summary"]}
+                if payload.get("network_summary")
+                else {}
+            ),
+            **(
+                {"error_clusters": payload["error_clusters"]}
+                if payload.get("error_clusters")
+                else {}
+            ),
         }
 
     def _build_repro_payload(self, payload: Dict[str, Any]) -> Dict[str, Any]:
@@ -292,6 +577,13 @@ class AdkOrchestrator:
             "checkpoint": payload.get("checkpoint", {}),
         }
 
+    def _chat_agent(self, model: str) -> LlmAgent:
+        # Use chat agent factory from ai/agents/chat/, one agent per model
+        agent = self._chat_agents.get(model)
+        if agent is None:
+            agent = self._chat_agents.setdefault(model, create_qa_chat_agent(model))
+        return agent
+
     def _pick_model(self, model: str) -> str:
         if model and model not in {"default", "auto"}:
             return model
@@ -311,6 +603,20 @@ class AdkOrchestrator:
             breakdown[severity] += 1
         return breakdown
 
+    def _analysis_overview(self, analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """Headline fields of the analysis; individual items arrive via retrieval."""
+        if not isinstance(analysis, dict) or not analysis:
+            return {}
+        issues = analysis.get("issues")
+        top_issues = analysis.get("top_issues")
+        return {
+            "summary": analysis.get("summary"),
+            "suspected_root_cause": analysis.get("suspected_root_cause"),
+            "severity_breakdown": analysis.get("severity_breakdown"),
+            "issue_count": len(issues) if isinstance(issues, list) else 0,
+            "top_issues": top_issues[:5] if isinstance(top_issues, list) else [],
+        }
+
     def _checkpoint_context(self, checkpoint: Dict[str, Any]) -> Dict[str, Any]:
         if not checkpoint:
             return {}
@@ -335,20 +641,88 @@ class AdkOrchestrator:
         return "You are a QA exploratory testing assistant. Respond succinctly."
 
     async def _call_agent(self, agent: LlmAgent, payload: Dict[str, Any], task: str) -> AgentOutput:
-        prompt = (
-            f"{task}\n\nReturn ONLY valid JSON. Input JSON:\n"
-            f"{json.dumps(payload, ensure_ascii=False)}"
-        )
-        response_text = await self._run_agent_with_payload(agent, prompt, payload)
-        parsed = self._parse_json(response_text)
-
+        with stage(f"agent.{agent.name}"):
+            with stage("prompt.encode"):
+                prompt = (
+                    f"{task}\n\nReturn ONLY valid JSON. Input JSON:\n"
+                    f"{json.dumps(payload, ensure_ascii=False)}"
+                )
+            response_text = None
+            if self.batcher.accepts(agent.name, len(prompt)):
+                with stage("model.batch_wait"):
+                    response_text = await self.batcher.submit(agent, payload, task)
+            if response_text is None:
+                response_text = await self._run_agent_with_payload(agent, prompt, payload)
+            with stage("output.validate"):
+                parsed = await self._structured_output(agent, response_text)
+
+        return self._agent_output(agent.name, parsed)
+
+    def _fused_prompt(
+        self,
+        payload: Dict[str, Any],
+        log_payload: Dict[str, Any],
+        repro_payload: Dict[str, Any],
+        limit: int,
+    ) -> Optional[str]:
+        """One prompt for the chunk_analyst, or None when the chunk should take the split path.
+
+        ``limit`` caps the prompt length; 0 disables fusing.
+        """
+        if limit <= 0 or payload.get("video_url"):
+            return None
+        shared = {"session", "chunk", "checkpoint"}
+        fused_payload = {
+            "session": payload.get("session"),
+            "chunk": payload.get("chunk"),
+            "checkpoint": payload.get("checkpoint", {}),
+            "logs": {key: value for key, value in log_payload.items() if key not in shared},
+            "interactions": repro_payload.get("events", []),
+        }
+        with stage("prompt.encode"):
+            prompt = (
+                "Analyze logs, plan repro steps and summarize this chunk.\n\n"
+                "Return ONLY valid JSON. Input JSON:\n"
+                f"{json.dumps(fused_payload, ensure_ascii=False)}"
+            )
+        if len(prompt) > limit:
+            # large chunks keep one focused call per agent
+            metrics.inc("chunk_analysis_mode_total", mode="split")
+            return None
+        return prompt
+
+    async def _call_fused(self, prompt: str) -> Optional[List[AgentOutput]]:
+        """Log, repro and synthesis outputs from one chunk_analyst call, or None if unusable."""
+        with stage(f"agent.{self.fused_agent.name}"):
+            response_text = await self._run_agent(self.fused_agent, prompt)
+            data, _ = parse_json_object(response_text)
+            if data is None:
+                metrics.inc("chunk_analysis_mode_total", mode="fallback")
+                return None
+            outputs = []
+            # each section is validated (and repaired) against its split agent's schema
+            for key, agent in (
+                ("log", self.log_agent),
+                ("repro", self.repro_agent),
+                ("synthesis", self.synth_agent),
+            ):
+                section = data.get(key)
+                with stage("output.validate"):
+                    parsed = await self._structured_output(
+                        agent, json.dumps(section if isinstance(section, dict) else {})
+                    )
+                outputs.append(self._agent_output(agent.name, parsed))
+        metrics.inc("chunk_analysis_mode_total", mode="fused")
+        return outputs
+
+    def _agent_output(self, name: str, parsed: Dict[str, Any]) -> AgentOutput:
         issues = parsed.get("issues")
         evidence = parsed.get("evidence")
         repro_steps = parsed.get("repro_steps")
         severity_breakdown = parsed.get("severity_breakdown")
         top_issues = parsed.get("top_issues")
         return AgentOutput(
-            name=agent.name,
+            name=name,
             summary=str(parsed.get("summary", "")),
             issues=issues if isinstance(issues, list) else [],
             evidence=evidence if isinstance(evidence, list) else [],
@@ -358,6 +732,20 @@ class AdkOrchestrator:
             top_issues=top_issues if isinstance(top_issues, list) else [],
         )
 
+    async def _structured_output(self, agent: LlmAgent, text: str) -> Dict[str, Any]:
+        schema = getattr(agent, "output_schema", None)
+        if not (isinstance(schema, type) and issubclass(schema, BaseModel)):
+            return self._parse_json(text)
+        repair = self._repair_output if settings.agent_output_repair else None
+        return await structured_output(agent.name, schema, text, repair)
+
+    async def _repair_output(self, request: Dict[str, Any]) -> str:
+        prompt = (
+            "Repair agent output.\n\nReturn ONLY valid JSON. Input JSON:\n"
+            f"{json.dumps(request, ensure_ascii=False, default=str)}"
+        )
+        return await self._run_agent(self.repair_agent, prompt)
+
     async def _run_agent_with_payload(self, agent: LlmAgent, prompt: str, payload: Dict[str, Any]) -> str:
         if agent.name == "video_analyst":
             video_url = payload.get("video_url")
@@ -377,23 +765,8 @@ class AdkOrchestrator:
         return await self._run_agent_parts(agent, [types.Part(text=prompt)])
 
     async def _run_agent_parts(self, agent: LlmAgent, parts: List[types.Part]) -> str:
-        session_id = f"{agent.name}-{uuid.uuid4().hex}"
-        await self.session_service.create_session(
-            app_name=self.app_name, user_id=self.user_id, session_id=session_id
-        )
-        runner = Runner(agent=agent, app_name=self.app_name, session_service=self.session_service)
-        content = types.Content(role="user", parts=parts)
-
-        final_text: Optional[str] = None
-        async for event in runner.run_async(
-            user_id=self.user_id, session_id=session_id, new_message=content
-        ):
-            if event.is_final_response():
-                if event.content and event.content.parts:
-                    final_text = event.content.parts[0].text
-                break
-
-        return final_text or "{}"
+        with stage("model.wait"):
+            return await self.backend.generate(agent, parts)
 
     def _parse_json(self, text: str) -> Dict[str, Any]:
         if not text:
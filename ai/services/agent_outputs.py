@@ -0,0 +1,230 @@
+"""
+Parse, validate and repair structured agent replies.
+
+A reply is validated against the agent's ``output_schema``. Parts that fail
+(a top-level field such as ``summary``, or one item such as ``issues[2]``) are
+set aside, the rest is kept, and one targeted repair call is made for just the
+broken parts. A reply that is not JSON at all is sent to the repair call as
+raw text, which is still far cheaper than re-running the agent on the chunk.
+
+Outcomes are counted in ``ai.core.metrics`` under ``agent_output_total``
+(result: ok|extracted|repaired|partial|failed), ``agent_output_invalid_parts_total``
+and ``agent_repair_calls_total``.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import re
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+
+from ai.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+RepairCall = Callable[[Dict[str, Any]], Awaitable[str]]
+
+_INDEXED_PATH = re.compile(r"^(\w+)\[(\d+)\]$")
+_RAW_TEXT_LIMIT = 8000
+
+metrics.describe("agent_output_total", "Agent replies by validation outcome")
+metrics.describe("agent_output_invalid_parts_total", "Fields or list items that failed validation")
+metrics.describe("agent_repair_calls_total", "Targeted repair calls by outcome")
+
+
+def parse_json_object(text: str) -> Tuple[Optional[Dict[str, Any]], str]:
+    """Parse ``text`` as a JSON object; returns (data, "ok"|"extracted"|"failed")."""
+    if not text:
+        return None, "failed"
+    try:
+        data = json.loads(text)
+        return (data, "ok") if isinstance(data, dict) else (None, "failed")
+    except json.JSONDecodeError:
+        pass
+    start = text.find("{")
+    end = text.rfind("}")
+    if start != -1 and end > start:
+        try:
+            data = json.loads(text[start : end + 1])
+        except json.JSONDecodeError:
+            return None, "failed"
+        if isinstance(data, dict):
+            return data, "extracted"
+    return None, "failed"
+
+
+@dataclass
+class CheckedOutput:
+    data: Dict[str, Any]
+    broken: Dict[str, Dict[str, Any]]
+
+
+def _error_path(data: Dict[str, Any], loc: Tuple[Any, ...]) -> Tuple[str, Any]:
+    field = str(loc[0])
+    value = data.get(field)
+    if len(loc) > 1 and isinstance(loc[1], int) and isinstance(value, list) and loc[1] < len(value):
+        return f"{field}[{loc[1]}]", value[loc[1]]
+    return field, value
+
+
+def _without(data: Dict[str, Any], paths: Dict[str, Any]) -> Dict[str, Any]:
+    cleaned = dict(data)
+    dropped: Dict[str, set] = {}
+    for path in paths:
+        match = _INDEXED_PATH.match(path)
+        if match:
+            dropped.setdefault(match.group(1), set()).add(int(match.group(2)))
+        else:
+            cleaned.pop(path, None)
+    for field, indices in dropped.items():
+        if isinstance(cleaned.get(field), list):
+            cleaned[field] = [item for idx, item in enumerate(cleaned[field]) if idx not in indices]
+    return cleaned
+
+
+def _dump(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(exclude_none=True)
+    if isinstance(value, list):
+        return [_dump(item) for item in value]
+    return value
+
+
+def _merge(raw: Dict[str, Any], validated: BaseModel) -> Dict[str, Any]:
+    """Validated values over the raw reply, keeping keys the schema does not know."""
+    merged = dict(raw)
+    for name in type(validated).model_fields:
+        value = getattr(validated, name)
+        raw_value = raw.get(name)
+        if isinstance(raw_value, list) and isinstance(value, list):
+            merged[name] = [
+                {**raw_item, **_dump(item)}
+                if isinstance(raw_item, dict) and isinstance(item, BaseModel)
+                else _dump(item)
+                for raw_item, item in zip(raw_value, value)
+            ]
+        elif isinstance(raw_value, dict) and isinstance(value, BaseModel):
+            merged[name] = {**raw_value, **_dump(value)}
+        else:
+            merged[name] = _dump(value)
+    return merged
+
+
+def check_output(schema: Type[BaseModel], data: Dict[str, Any]) -> CheckedOutput:
+    """Validate ``data``; broken fields and list items are dropped and reported by path."""
+    broken: Dict[str, Dict[str, Any]] = {}
+    try:
+        return CheckedOutput(_merge(data, schema.model_validate(data)), broken)
+    except ValidationError as exc:
+        for error in exc.errors(include_url=False):
+            if not error["loc"]:
+                continue
+            path, value = _error_path(data, error["loc"])
+            broken.setdefault(path, {"value": value, "error": error["msg"]})
+    cleaned = _without(data, broken)
+    try:
+        return CheckedOutput(_merge(cleaned, schema.model_validate(cleaned)), broken)
+    except ValidationError:
+        return CheckedOutput(_merge({}, schema()), broken)
+
+
+def apply_fixes(
+    data: Dict[str, Any], broken: Dict[str, Any], fixes: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Put repaired values back at their paths; paths not in ``broken`` are ignored."""
+    patched = dict(data)
+    for path, value in fixes.items():
+        if path not in broken:
+            continue
+        match = _INDEXED_PATH.match(path)
+        if match:
+            field, idx = match.group(1), int(match.group(2))
+            items = list(patched.get(field) or [])
+            if idx < len(items):
+                items[idx] = value
+                patched[field] = items
+        else:
+            patched[path] = value
+    return patched
+
+
+async def structured_output(
+    agent_name: str,
+    schema: Type[BaseModel],
+    text: str,
+    repair: Optional[RepairCall] = None,
+) -> Dict[str, Any]:
+    """Validated reply for ``agent_name``, repairing broken parts when ``repair`` is given."""
+    data, parse = parse_json_object(text)
+    if data is None:
+        data = (
+            await _repair_raw(agent_name, schema, text, repair)
+            if repair and text and text.strip()
+            else None
+        )
+        if data is None:
+            metrics.inc("agent_output_total", agent=agent_name, result="failed")
+            return {}
+        parse = "repaired"
+
+    checked = check_output(schema, data)
+    if not checked.broken:
+        metrics.inc("agent_output_total", agent=agent_name, result=parse)
+        return checked.data
+
+    metrics.inc("agent_output_invalid_parts_total", len(checked.broken), agent=agent_name)
+    if repair is None:
+        metrics.inc("agent_output_total", agent=agent_name, result="partial")
+        return checked.data
+
+    request = {"agent": agent_name, "schema": schema.model_json_schema(), "broken": checked.broken}
+    try:
+        reply, _ = parse_json_object(await repair(request))
+    except Exception:
+        logger.warning("repair call for %s failed", agent_name, exc_info=True)
+        metrics.inc("agent_repair_calls_total", agent=agent_name, result="error")
+        metrics.inc("agent_output_total", agent=agent_name, result="partial")
+        return checked.data
+
+    fixes = reply.get("fixes") if reply else None
+    if not isinstance(fixes, dict):
+        fixes = {}
+    repaired = check_output(schema, apply_fixes(data, checked.broken, fixes))
+    outcome = (
+        "success"
+        if not repaired.broken
+        else ("partial" if len(repaired.broken) < len(checked.broken) else "failed")
+    )
+    metrics.inc("agent_repair_calls_total", agent=agent_name, result=outcome)
+    metrics.inc(
+        "agent_output_total",
+        agent=agent_name,
+        result="repaired" if not repaired.broken else "partial",
+    )
+    return repaired.data
+
+
+async def _repair_raw(
+    agent_name: str, schema: Type[BaseModel], text: str, repair: RepairCall
+) -> Optional[Dict[str, Any]]:
+    request = {
+        "agent": agent_name,
+        "schema": schema.model_json_schema(),
+        "raw_text": text[:_RAW_TEXT_LIMIT],
+    }
+    try:
+        reply, _ = parse_json_object(await repair(request))
+    except Exception:
+        logger.warning("raw repair call for %s failed", agent_name, exc_info=True)
+        metrics.inc("agent_repair_calls_total", agent=agent_name, result="error")
+        return None
+    output = reply.get("output") if reply else None
+    metrics.inc(
+        "agent_repair_calls_total",
+        agent=agent_name,
+        result="success" if isinstance(output, dict) else "failed",
+    )
+    return output if isinstance(output, dict) else None
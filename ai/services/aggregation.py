@@ -0,0 +1,115 @@
+"""
+Delta protocol for ``/aggregate``.
+
+Callers may send ``chunk_ids`` (and optionally a previous ``version``) instead
+of every chunk report. The ids are reconciled against the session checkpoint;
+reports the service does not hold are returned as ``missing_chunk_ids`` so the
+caller can resend just those. The version token identifies the ordered set of
+chunk ids and the content of each report, so re-analysing a chunk changes it,
+and the session synthesis is cached per version. A chunk id that appears more
+than once resolves to its latest report.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+
+def chunk_key(report: Any) -> Optional[str]:
+    if not isinstance(report, dict) or report.get("chunk_id") is None:
+        return None
+    return str(report["chunk_id"])
+
+
+# set on reports as they are checkpointed, so versions do not re-serialize every report
+DIGEST_KEY = "content_hash"
+
+
+def report_digest(report: Dict[str, Any]) -> str:
+    stamped = report.get(DIGEST_KEY)
+    if isinstance(stamped, str):
+        return stamped
+    body = {key: value for key, value in report.items() if key != DIGEST_KEY}
+    encoded = json.dumps(body, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+def with_digest(report: Dict[str, Any]) -> Dict[str, Any]:
+    return {**report, DIGEST_KEY: report_digest(report)}
+
+
+def latest_reports(reports: Sequence[Any]) -> List[Dict[str, Any]]:
+    """The last report per chunk id, where the id first appeared; reports without an id are kept."""
+    latest: Dict[Any, Dict[str, Any]] = {}
+    for idx, report in enumerate(reports):
+        if isinstance(report, dict):
+            key = chunk_key(report)
+            latest[key if key is not None else idx] = report
+    return list(latest.values())
+
+
+def version_token(reports: Sequence[Dict[str, Any]]) -> str:
+    entries = [f"{chunk_key(report)}:{report_digest(report)}" for report in reports]
+    digest = hashlib.sha256("\n".join(entries).encode("utf-8")).hexdigest()
+    return f"v{len(entries)}-{digest[:16]}"
+
+
+@dataclass
+class Reconciled:
+    reports: List[Dict[str, Any]]
+    missing: List[str]
+    added: List[Dict[str, Any]]
+    version: str
+
+
+def reconcile(
+    checkpoint: Dict[str, Any],
+    chunk_ids: Optional[Sequence[Any]],
+    supplied: Sequence[Dict[str, Any]],
+) -> Reconciled:
+    """Match requested chunk ids against checkpointed and supplied reports.
+
+    Without ``chunk_ids`` every report the service knows about is used, in
+    checkpoint order followed by newly supplied ones.
+    """
+    known = {
+        key: report
+        for key, report in (
+            (chunk_key(report), report)
+            for report in latest_reports(checkpoint.get("chunk_reports") or [])
+        )
+        if key is not None
+    }
+    order = list(known)
+
+    added: List[Dict[str, Any]] = []
+    for report in supplied:
+        key = chunk_key(report)
+        if key is None:
+            continue
+        if key not in known:
+            order.append(key)
+        elif report_digest(report) == report_digest(known[key]):
+            continue
+        # new chunks and re-analysed ones are checkpointed
+        added.append(report)
+        known[key] = report
+
+    wanted = [str(chunk_id) for chunk_id in chunk_ids] if chunk_ids is not None else order
+    reports = [known[key] for key in wanted if key in known]
+    return Reconciled(
+        reports=reports,
+        missing=[key for key in wanted if key not in known],
+        added=added,
+        version=version_token(reports),
+    )
+
+
+def missing_response(session_id: Any, missing: List[str]) -> Dict[str, Any]:
+    return {"session_id": session_id, "missing_chunk_ids": missing, "version": None}
+
+
+def unchanged_response(session_id: Any, version: str) -> Dict[str, Any]:
+    return {"session_id": session_id, "version": version, "unchanged": True}
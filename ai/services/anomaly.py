@@ -0,0 +1,272 @@
+"""
+Session-level error bursts and anomalies, used to prioritize chunks.
+
+Every timestamped event in a session is binned per second into a few count
+series: errors, HTTP 4xx, HTTP 5xx and failed requests, console, and network.
+Each series has a session baseline, the median count per second, with the
+MAD as a robust spread (floored at one event, so a quiet series still has a
+scale). A second is anomalous when its count is at least ``min_count`` and
+its robust z-score reaches ``threshold``. Runs of anomalous seconds in a
+series are reported as bursts, for example a spike of 4xx or a console storm.
+
+Each chunk's priority is its strongest weighted z-score, plus ``log1p`` of its
+error count. The chunk's ``depth`` is ``deep`` if it overlaps a burst,
+``light`` if it has no errors at all, and ``standard`` otherwise. The offline
+re-analysis CLI queues a session's chunks by descending priority; the backend
+scores each chunk on its own right before ``/analyze`` and only uses the
+depth. The ADK orchestrator reads ``depth``
+from ``chunk["priority"]``: deep chunks always get the separate agents, and
+light chunks without video may use the fused call at a larger prompt size.
+
+Bins are counted with NumPy when it is installed and in pure Python otherwise.
+"""
+from __future__ import annotations
+
+import math
+import statistics
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ai.core.config import settings
+from ai.core.metrics import metrics
+from ai.services.correlation import parse_ts
+from ai.tools.event_tools import is_error_event
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy is optional; bins are then counted in pure Python
+    np = None
+
+metrics.describe(
+    "anomaly_bursts_total", "Event bursts found by the session anomaly detector, per series"
+)
+
+SERIES = ("errors", "http_4xx", "http_5xx", "console", "network")
+# how much a spike in each series says about a chunk being worth a look
+_WEIGHTS = {"errors": 1.0, "http_5xx": 1.0, "http_4xx": 0.8, "console": 0.5, "network": 0.3}
+_MAD_SCALE = 1.4826
+DEPTHS = ("light", "standard", "deep")
+
+
+def event_series(event: Dict[str, Any]) -> List[str]:
+    """Series an event is counted in."""
+    event_type = event.get("type")
+    series = ["errors"] if is_error_event(event) else []
+    if event_type == "console":
+        series.append("console")
+    elif event_type == "network":
+        series.append("network")
+        payload = event.get("payload") or {}
+        status = payload.get("status") if isinstance(payload, dict) else None
+        if isinstance(status, (int, float)) and 400 <= status < 500:
+            series.append("http_4xx")
+        elif (isinstance(status, (int, float)) and status >= 500) or (
+            isinstance(payload, dict) and payload.get("type") == "failed"
+        ):
+            series.append("http_5xx")
+    return series
+
+
+def analysis_depth(chunk: Dict[str, Any]) -> str:
+    """Depth requested by a chunk's ``priority`` (from the detector), else ``standard``."""
+    priority = chunk.get("priority") if isinstance(chunk, dict) else None
+    depth = priority.get("depth") if isinstance(priority, dict) else None
+    return depth if depth in DEPTHS else "standard"
+
+
+@dataclass
+class Burst:
+    series: str
+    # seconds since the session's first timestamped event, inclusive
+    first_second: int
+    last_second: int
+    peak: int
+    total: int
+    peak_z: float
+    chunk_positions: List[int] = field(default_factory=list)
+
+    def as_dict(self, origin: float) -> Dict[str, Any]:
+        return {
+            **asdict(self),
+            "start": origin + self.first_second,
+            "end": origin + self.last_second + 1,
+        }
+
+
+@dataclass
+class ChunkPriority:
+    position: int
+    chunk_id: Any
+    score: float
+    depth: str
+    errors: int
+    peak: Optional[Dict[str, Any]] = None
+    bursts: List[int] = field(default_factory=list)
+
+    def tag(self) -> Dict[str, Any]:
+        """What goes into ``chunk["priority"]`` for ``/analyze``."""
+        return {"score": self.score, "depth": self.depth}
+
+
+@dataclass
+class SessionAnomalies:
+    origin: Optional[float]
+    seconds: int
+    baseline: Dict[str, Dict[str, float]]
+    bursts: List[Burst]
+    chunks: List[ChunkPriority]
+
+    def queue(self) -> List[ChunkPriority]:
+        """Chunks by descending priority, ties in recording order."""
+        return sorted(self.chunks, key=lambda chunk: (-chunk.score, chunk.position))
+
+    def as_dict(self) -> Dict[str, Any]:
+        origin = self.origin or 0.0
+        return {
+            "seconds": self.seconds,
+            "baseline": self.baseline,
+            "bursts": [burst.as_dict(origin) for burst in self.bursts],
+            "chunks": [asdict(chunk) for chunk in self.queue()],
+        }
+
+
+def _bincount(offsets: List[int], size: int) -> Sequence[int]:
+    if np is not None:
+        return np.bincount(np.asarray(offsets, dtype=np.int64), minlength=size)
+    counts = [0] * size
+    for offset in offsets:
+        counts[offset] += 1
+    return counts
+
+
+def _baseline(counts: Sequence[int]) -> Tuple[float, float]:
+    if np is not None:
+        median = float(np.median(counts))
+        return median, float(np.median(np.abs(counts - median)))
+    median = float(statistics.median(counts))
+    return median, float(statistics.median(abs(count - median) for count in counts))
+
+
+def _anomalous(
+    counts: Sequence[int], median: float, scale: float, threshold: float, min_count: int
+) -> List[int]:
+    floor = max(min_count, median + threshold * scale)
+    if np is not None:
+        return [int(second) for second in np.flatnonzero(counts >= floor)]
+    return [second for second, count in enumerate(counts) if count >= floor]
+
+
+class AnomalyDetector:
+    def __init__(
+        self, threshold: float = 3.5, min_count: int = 3, max_seconds: int = 24 * 3600
+    ) -> None:
+        self.threshold = threshold
+        self.min_count = max(1, min_count)
+        # bad clocks can put events days apart; bins past this are clamped to the last second
+        self.max_seconds = max(1, max_seconds)
+
+    @classmethod
+    def from_settings(cls) -> "AnomalyDetector":
+        return cls(threshold=settings.anomaly_threshold, min_count=settings.anomaly_min_count)
+
+    def detect(self, chunks: List[Tuple[Dict[str, Any], List[Dict[str, Any]]]]) -> SessionAnomalies:
+        """Bursts and per-chunk priorities for a session given as ``(chunk, events)`` pairs."""
+        stamped: List[Tuple[int, float, List[str]]] = []
+        errors = [0] * len(chunks)
+        for position, (_, events) in enumerate(chunks):
+            for event in events:
+                series = event_series(event)
+                errors[position] += "errors" in series
+                at = parse_ts(event.get("ts"))
+                if at is not None and series:
+                    stamped.append((position, at, series))
+
+        if not stamped:
+            priorities = [
+                self._priority(position, chunk, errors[position], None, [])
+                for position, (chunk, _) in enumerate(chunks)
+            ]
+            return SessionAnomalies(None, 0, {}, [], priorities)
+
+        origin = min(at for _, at, _ in stamped)
+        size = min(int(max(at for _, at, _ in stamped) - origin) + 1, self.max_seconds)
+        offsets: Dict[str, List[int]] = {name: [] for name in SERIES}
+        chunk_seconds: List[set] = [set() for _ in chunks]
+        for position, at, series in stamped:
+            second = min(int(at - origin), size - 1)
+            chunk_seconds[position].add(second)
+            for name in series:
+                offsets[name].append(second)
+
+        baseline: Dict[str, Dict[str, float]] = {}
+        zscores: Dict[str, Dict[int, float]] = {}
+        bursts: List[Burst] = []
+        for name in SERIES:
+            if not offsets[name]:
+                continue
+            counts = _bincount(offsets[name], size)
+            median, mad = _baseline(counts)
+            scale = max(mad * _MAD_SCALE, 1.0)
+            baseline[name] = {"median": median, "mad": mad}
+            hot = _anomalous(counts, median, scale, self.threshold, self.min_count)
+            zscores[name] = {second: (int(counts[second]) - median) / scale for second in hot}
+            bursts.extend(self._bursts(name, hot, counts, zscores[name]))
+
+        for burst in bursts:
+            burst.chunk_positions = [
+                position
+                for position, seconds in enumerate(chunk_seconds)
+                if any(burst.first_second <= second <= burst.last_second for second in seconds)
+            ]
+            metrics.inc("anomaly_bursts_total", series=burst.series)
+
+        priorities = []
+        for position, (chunk, _) in enumerate(chunks):
+            peak = None
+            for name, hot in zscores.items():
+                for second in chunk_seconds[position] & hot.keys():
+                    weighted = _WEIGHTS[name] * hot[second]
+                    if peak is None or weighted > peak["weighted_z"]:
+                        peak = {
+                            "series": name,
+                            "offset_s": second,
+                            "z": round(hot[second], 2),
+                            "weighted_z": weighted,
+                        }
+            overlapping = [
+                idx for idx, burst in enumerate(bursts) if position in burst.chunk_positions
+            ]
+            priorities.append(self._priority(position, chunk, errors[position], peak, overlapping))
+        return SessionAnomalies(origin, size, baseline, bursts, priorities)
+
+    def _bursts(
+        self, name: str, hot: List[int], counts: Sequence[int], zscores: Dict[int, float]
+    ) -> List[Burst]:
+        bursts: List[Burst] = []
+        for second in hot:
+            count = int(counts[second])
+            last = bursts[-1] if bursts else None
+            # a one-second lull does not split a burst
+            if last is not None and second - last.last_second <= 2:
+                last.last_second = second
+                last.total += count
+                last.peak = max(last.peak, count)
+                last.peak_z = max(last.peak_z, round(zscores[second], 2))
+            else:
+                bursts.append(Burst(name, second, second, count, count, round(zscores[second], 2)))
+        return bursts
+
+    def _priority(
+        self,
+        position: int,
+        chunk: Dict[str, Any],
+        errors: int,
+        peak: Optional[Dict[str, Any]],
+        bursts: List[int],
+    ) -> ChunkPriority:
+        score = (peak["weighted_z"] if peak else 0.0) + math.log1p(errors)
+        if peak:
+            peak = {**peak, "weighted_z": round(peak["weighted_z"], 2)}
+        depth = "deep" if bursts else ("light" if not errors else "standard")
+        chunk_id = chunk.get("id") if isinstance(chunk, dict) else None
+        return ChunkPriority(position, chunk_id, round(score, 3), depth, errors, peak, bursts)
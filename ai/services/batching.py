@@ -0,0 +1,201 @@
+"""
+Micro-batching of small agent calls across concurrent requests.
+
+Every request runs its orchestrator coroutine on its own event loop (sync
+routes call ``asyncio.run`` in the threadpool). So batches are coordinated
+with a lock and ``concurrent.futures.Future`` objects, not an asyncio queue:
+
+- The first caller for an agent opens a batch and leads it. It waits
+  ``BATCH_WINDOW_MS``, then sends the batch from its own loop.
+- Later callers join the open batch and wait on their future. A caller
+  that fills the batch to ``BATCH_MAX_ITEMS`` sends it straight away.
+- The reply ``{"results": {key: output}}`` is split per caller. Each caller
+  still validates its own item against the agent's schema.
+
+Some items resolve to ``None``: those missing from the reply or not an
+object, every item of a failed call, a batch of one, and every item of a
+batch whose leader was cancelled before sending it (for example by the
+circuit breaker timeout). Those callers make their usual individual call.
+"""
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import json
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from ai.core.config import settings
+from ai.core.metrics import metrics
+from ai.services.agent_outputs import parse_json_object
+
+logger = logging.getLogger(__name__)
+
+RunAgent = Callable[[Any, str], Awaitable[str]]
+
+metrics.describe("agent_batch_calls_total", "Batched model calls sent")
+metrics.describe(
+    "agent_batch_items_total", "Agent calls offered to the batcher, by outcome (batched|fallback)"
+)
+
+
+@dataclass
+class _Item:
+    key: str
+    task: str
+    payload: Dict[str, Any]
+    future: "concurrent.futures.Future[Optional[str]]" = field(
+        default_factory=concurrent.futures.Future
+    )
+
+
+@dataclass
+class _Batch:
+    agent: Any
+    items: List[_Item] = field(default_factory=list)
+    open: bool = True
+
+
+class MicroBatcher:
+    def __init__(
+        self,
+        batch_agents: Dict[str, Any],
+        run_agent: RunAgent,
+        window_seconds: float = 0.02,
+        max_items: int = 8,
+        max_item_chars: int = 8000,
+        wait_timeout: float = 300.0,
+    ) -> None:
+        self.batch_agents = batch_agents
+        self.run_agent = run_agent
+        self.window_seconds = window_seconds
+        self.max_items = max_items
+        self.max_item_chars = max_item_chars
+        self.wait_timeout = wait_timeout
+        self._open: Dict[str, _Batch] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, agents: Iterable[Any], run_agent: RunAgent) -> "MicroBatcher":
+        from ai.agents.analysis import create_batch_agent
+
+        names = {name.strip() for name in settings.batch_agents.split(",") if name.strip()}
+        batch_agents = (
+            {agent.name: create_batch_agent(agent) for agent in agents if agent.name in names}
+            if settings.batch_window_ms > 0
+            else {}
+        )
+        return cls(
+            batch_agents,
+            run_agent,
+            window_seconds=settings.batch_window_ms / 1000.0,
+            max_items=settings.batch_max_items,
+            max_item_chars=settings.batch_max_item_chars,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.batch_agents)
+
+    def accepts(self, agent_name: str, size: int) -> bool:
+        return agent_name in self.batch_agents and size <= self.max_item_chars
+
+    async def submit(self, agent: Any, payload: Dict[str, Any], task: str) -> Optional[str]:
+        """Response text for this item, or ``None`` when the caller should call the agent itself."""
+        with self._lock:
+            batch = self._open.get(agent.name)
+            leader = batch is None
+            if batch is None:
+                batch = self._open[agent.name] = _Batch(self.batch_agents[agent.name])
+            item = _Item(f"item{len(batch.items)}", task, payload)
+            batch.items.append(item)
+            full = len(batch.items) >= self.max_items
+            if full:
+                self._close(agent.name, batch)
+
+        result = asyncio.wrap_future(item.future)
+        if full:
+            await self._flush(agent.name, batch)
+        elif leader:
+            try:
+                # returns early when a follower filled and sent the batch
+                await asyncio.wait_for(asyncio.shield(result), self.window_seconds)
+            except asyncio.TimeoutError:
+                with self._lock:
+                    send = batch.open
+                    if send:
+                        self._close(agent.name, batch)
+                if send:
+                    await self._flush(agent.name, batch)
+            except asyncio.CancelledError:
+                # nobody else would send this batch; release the followers instead of stalling them
+                self._abandon(agent.name, batch)
+                raise
+
+        try:
+            return await asyncio.wait_for(result, self.wait_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                "batched %s call did not answer within %ss", agent.name, self.wait_timeout
+            )
+            return None
+
+    def _close(self, agent_name: str, batch: _Batch) -> None:
+        batch.open = False
+        if self._open.get(agent_name) is batch:
+            del self._open[agent_name]
+
+    def _abandon(self, agent_name: str, batch: _Batch) -> None:
+        with self._lock:
+            if not batch.open:
+                # a follower filled it and is sending it
+                return
+            self._close(agent_name, batch)
+        for item in batch.items:
+            metrics.inc("agent_batch_items_total", agent=agent_name, result="fallback")
+            if not item.future.done():
+                item.future.set_result(None)
+
+    async def _flush(self, agent_name: str, batch: _Batch) -> None:
+        results: Dict[str, Any] = {}
+        try:
+            if len(batch.items) > 1:
+                results = await self._call(agent_name, batch)
+        finally:
+            # followers on other loops are waiting; resolve every future whatever happened
+            for item in batch.items:
+                output = results.get(item.key)
+                batched = isinstance(output, dict)
+                metrics.inc(
+                    "agent_batch_items_total",
+                    agent=agent_name,
+                    result="batched" if batched else "fallback",
+                )
+                if not item.future.done():
+                    item.future.set_result(
+                        json.dumps(output, ensure_ascii=False) if batched else None
+                    )
+
+    async def _call(self, agent_name: str, batch: _Batch) -> Dict[str, Any]:
+        request = {
+            "batch": True,
+            "items": {item.key: {"task": item.task, "input": item.payload} for item in batch.items},
+        }
+        prompt = (
+            "Process each item independently.\n\nReturn ONLY valid JSON. Input JSON:\n"
+            f"{json.dumps(request, ensure_ascii=False)}"
+        )
+        metrics.inc("agent_batch_calls_total", agent=agent_name)
+        try:
+            data, _ = parse_json_object(await self.run_agent(batch.agent, prompt))
+        except Exception:
+            logger.warning(
+                "batched %s call failed; falling back to individual calls",
+                agent_name,
+                exc_info=True,
+            )
+            return {}
+        results = data.get("results") if data else None
+        return results if isinstance(results, dict) else {}
@@ -0,0 +1,185 @@
+"""
+Versioned on-disk encoding for session checkpoints.
+
+Layout of a v2 file::
+
+    b"QACK" | version (1 byte) | codec (1 byte) | compressed body
+
+The body is compact JSON of ``{"strings": [...], "data": ...}`` where:
+
+- agent-level copies of issues/evidence/steps inside each chunk report are
+  replaced by index references (see ``ai.services.reports.compact_agents``)
+- top-level ``issues``/``evidence``/``repro_steps`` are dropped when they are
+  exactly the flattening of ``chunk_reports`` and rebuilt on decode
+- repeated string values are stored once in ``strings`` and referenced as
+  ``"\\x00<index>"``; genuine strings starting with NUL are escaped as ``"\\x00\\x00..."``
+
+The codec is zstd when ``zstandard`` is installed, otherwise gzip.
+Files without the magic prefix are treated as legacy UTF-8 JSON.
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import zlib
+from collections import Counter
+from typing import Any, Dict, List
+
+from ai.services.reports import compact_agents, expand_agents
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+MAGIC = b"QACK"
+VERSION = 2
+CODEC_NONE = 0
+CODEC_GZIP = 1
+CODEC_ZSTD = 2
+
+_DERIVED_KEYS = {"issues": "issues", "evidence": "evidence", "repro_steps": "repro_steps"}
+_MIN_INTERN_LENGTH = 6
+_REF = "\x00"
+
+
+class CheckpointDecodeError(ValueError):
+    pass
+
+
+def is_encoded(raw: bytes) -> bool:
+    return raw[: len(MAGIC)] == MAGIC
+
+
+def default_codec() -> int:
+    return CODEC_ZSTD if zstandard is not None else CODEC_GZIP
+
+
+def encode(state: Dict[str, Any], codec: int | None = None) -> bytes:
+    codec = default_codec() if codec is None else codec
+    packed = _pack_state(state)
+    strings = _repeated_strings(packed)
+    document = {
+        "strings": strings,
+        "data": _intern(packed, {value: idx for idx, value in enumerate(strings)}),
+    }
+    body = json.dumps(document, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return MAGIC + bytes([VERSION, codec]) + _compress(body, codec)
+
+
+def decode(raw: bytes) -> Dict[str, Any]:
+    if not is_encoded(raw):
+        return json.loads(raw.decode("utf-8"))
+    if len(raw) < len(MAGIC) + 2:
+        raise CheckpointDecodeError("truncated checkpoint header")
+    version, codec = raw[len(MAGIC)], raw[len(MAGIC) + 1]
+    if version != VERSION:
+        raise CheckpointDecodeError(f"unsupported checkpoint version {version}")
+    try:
+        document = json.loads(_decompress(raw[len(MAGIC) + 2 :], codec).decode("utf-8"))
+        data = _resolve(document.get("data"), document.get("strings") or [])
+        return _unpack_state(data)
+    except (EOFError, zlib.error, IndexError, KeyError, TypeError, AttributeError) as exc:
+        raise CheckpointDecodeError(f"corrupt checkpoint: {exc}") from exc
+
+
+def _compress(body: bytes, codec: int) -> bytes:
+    if codec == CODEC_NONE:
+        return body
+    if codec == CODEC_GZIP:
+        return gzip.compress(body, compresslevel=5, mtime=0)
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise CheckpointDecodeError("zstandard is not installed")
+        return zstandard.ZstdCompressor(level=3).compress(body)
+    raise CheckpointDecodeError(f"unknown checkpoint codec {codec}")
+
+
+def _decompress(body: bytes, codec: int) -> bytes:
+    if codec == CODEC_NONE:
+        return body
+    if codec == CODEC_GZIP:
+        return gzip.decompress(body)
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise CheckpointDecodeError(
+                "checkpoint is zstd-compressed but zstandard is not installed"
+            )
+        return zstandard.ZstdDecompressor().decompress(body)
+    raise CheckpointDecodeError(f"unknown checkpoint codec {codec}")
+
+
+def _flatten(reports: List[Dict[str, Any]], key: str) -> List[Any]:
+    return [item for report in reports if isinstance(report, dict) for item in report.get(key, [])]
+
+
+def _pack_state(state: Dict[str, Any]) -> Dict[str, Any]:
+    packed = dict(state)
+    reports = state.get("chunk_reports")
+    if not isinstance(reports, list):
+        return packed
+    packed["chunk_reports"] = [compact_agents(r) if isinstance(r, dict) else r for r in reports]
+    derived = [
+        key
+        for key, report_key in _DERIVED_KEYS.items()
+        if key in state and state[key] == _flatten(reports, report_key)
+    ]
+    for key in derived:
+        del packed[key]
+    if derived:
+        packed["$derived"] = derived
+    return packed
+
+
+def _unpack_state(data: Dict[str, Any]) -> Dict[str, Any]:
+    derived = data.pop("$derived", [])
+    reports = data.get("chunk_reports")
+    if isinstance(reports, list):
+        data["chunk_reports"] = reports = [
+            expand_agents(r) if isinstance(r, dict) else r for r in reports
+        ]
+        for key in derived:
+            data[key] = _flatten(reports, _DERIVED_KEYS[key])
+    return data
+
+
+def _repeated_strings(value: Any) -> List[str]:
+    counts: Counter = Counter()
+    stack = [value]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, str):
+            if len(node) >= _MIN_INTERN_LENGTH:
+                counts[node] += 1
+        elif isinstance(node, dict):
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    return [text for text, count in counts.most_common() if count > 1]
+
+
+def _intern(value: Any, table: Dict[str, int]) -> Any:
+    if isinstance(value, str):
+        idx = table.get(value)
+        if idx is not None:
+            return f"{_REF}{idx}"
+        return _REF + value if value.startswith(_REF) else value
+    if isinstance(value, dict):
+        return {key: _intern(item, table) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_intern(item, table) for item in value]
+    return value
+
+
+def _resolve(value: Any, strings: List[str]) -> Any:
+    if isinstance(value, str):
+        if not value.startswith(_REF):
+            return value
+        if value.startswith(_REF * 2):
+            return value[1:]
+        return strings[int(value[1:])]
+    if isinstance(value, dict):
+        return {key: _resolve(item, strings) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_resolve(item, strings) for item in value]
+    return value
@@ -2,13 +2,31 @@ from __future__ import annotations
 
 import json
 import os
+import threading
 import uuid
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Iterator, List, Optional
 
 from ai.core.config import settings
+from ai.core.offload import offload
+from ai.core.profiling import stage
+from ai.services import checkpoint_codec
+from ai.services.aggregation import chunk_key, with_digest
+from ai.services.views import update_views
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows has no fcntl; fall back to in-process locks
+    fcntl = None
+
+_thread_locks: Dict[str, threading.Lock] = {}
+_thread_locks_guard = threading.Lock()
+
+# CHECKPOINT_FORMAT -> file suffix; files in the other format are still read
+FORMAT_SUFFIXES = {"binary": ".ckpt", "json": ".json"}
 
 
 def _now() -> datetime:
@@ -27,6 +45,25 @@ def _parse_ts(value: str | None) -> datetime | None:
     return parsed
 
 
+@contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+    """Advisory ``flock`` on ``path``, or a per-path thread lock where fcntl is unavailable."""
+    if fcntl is None:
+        with _thread_locks_guard:
+            thread_lock = _thread_locks.setdefault(str(path), threading.Lock())
+        with thread_lock:
+            yield
+        return
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a+b") as handle:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
 def _sanitize_session_id(session_id: str) -> str:
     return "".join(ch if ch.isalnum() or ch in "-_." else "_" for ch in session_id)
 
@@ -35,6 +72,7 @@ def _sanitize_session_id(session_id: str) -> str:
 class CheckpointStore:
     base_dir: Path
     ttl_hours: int = 48
+    format: str = "binary"
 
     @classmethod
     def from_env(cls) -> "CheckpointStore":
@@ -42,25 +80,24 @@ class CheckpointStore:
         base_dir = Path(raw_dir) if raw_dir and raw_dir.strip() else Path(settings.checkpoint_dir)
         raw_ttl = os.getenv("CHECKPOINT_TTL_HOURS")
         ttl_hours = int(raw_ttl) if raw_ttl and raw_ttl.strip() else settings.checkpoint_ttl_hours
-        return cls(base_dir=base_dir, ttl_hours=ttl_hours)
+        raw_format = (os.getenv("CHECKPOINT_FORMAT") or settings.checkpoint_format).strip().lower()
+        checkpoint_format = raw_format if raw_format in FORMAT_SUFFIXES else "binary"
+        return cls(base_dir=base_dir, ttl_hours=ttl_hours, format=checkpoint_format)
 
     def load(self, session_id: str) -> Dict[str, Any]:
         if not session_id:
             return {}
-        path = self._path(session_id)
-        if not path.exists():
-            return {}
-
-        data = self._read(path)
-        if not data:
-            path.unlink(missing_ok=True)
-            return {}
+        for path in self._paths(session_id):
+            if not path.exists():
+                continue
 
-        if self._is_expired(path, data):
-            path.unlink(missing_ok=True)
-            return {}
+            data = self._read(path)
+            if not data or self._is_expired(path, data):
+                path.unlink(missing_ok=True)
+                continue
 
-        return data
+            return data
+        return {}
 
     def save(self, session_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
         if not session_id:
@@ -69,15 +106,72 @@ class CheckpointStore:
         payload = dict(data)
         payload["session_id"] = session_id
         payload["updated_at"] = _now().isoformat()
-        self._write(self._path(session_id), payload)
+        views = payload.get("views")
+        if isinstance(views, dict) and views.get("version") is None:
+            # views rebuilt for this write; ones carried over from an earlier state keep their
+            # old version
+            payload["views"] = {**views, "version": payload["updated_at"]}
+        primary, *legacy = self._paths(session_id)
+        self._write(primary, payload)
+        for path in legacy:
+            path.unlink(missing_ok=True)
         return payload
 
+    def update(
+        self, session_id: str, mutate: Callable[[Dict[str, Any]], Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Read-modify-write a checkpoint while holding the session lock.
+
+        ``mutate`` receives the current state and returns the state to save.
+        """
+        if not session_id:
+            return {}
+        with self.lock(session_id):
+            return self.save(session_id, mutate(self.load(session_id)))
+
     def append_chunk(self, session_id: str, chunk_report: Dict[str, Any]) -> Dict[str, Any]:
         if not session_id:
             return {}
-        state = self.load(session_id)
+        return self.update(session_id, lambda state: self._with_chunk(state, chunk_report))
+
+    @contextmanager
+    def lock(self, session_id: str) -> Iterator[None]:
+        """Exclusive per-session lock, shared across threads and worker processes.
+
+        Uses an advisory ``flock`` on ``<session>.lock`` next to the checkpoint.
+        Lock files are left in place; removing them would race with waiters.
+        """
+        with file_lock(self.base_dir / f"{_sanitize_session_id(session_id)}.lock"):
+            yield
+
+    def extend_chunks(self, session_id: str, chunk_reports: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Append several chunk reports under one lock, flattening once."""
+        if not session_id or not chunk_reports:
+            return {}
+        return self.update(session_id, lambda state: self._with_chunks(state, chunk_reports))
+
+    def _with_chunk(self, state: Dict[str, Any], chunk_report: Dict[str, Any]) -> Dict[str, Any]:
+        return self._with_chunks(state, [chunk_report])
+
+    def _with_chunks(
+        self, state: Dict[str, Any], new_reports: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
         chunk_reports = list(state.get("chunk_reports", []))
-        chunk_reports.append(chunk_report)
+        positions = {chunk_key(report): idx for idx, report in enumerate(chunk_reports)}
+        appended: Optional[int] = 0
+        for report in new_reports:
+            report = with_digest(report)
+            key = chunk_key(report)
+            if key is not None and key in positions:
+                # a re-analysed chunk replaces its earlier report
+                chunk_reports[positions[key]] = report
+                appended = None
+            else:
+                positions[key] = len(chunk_reports)
+                chunk_reports.append(report)
+                if appended is not None:
+                    appended += 1
+        chunk_report = new_reports[-1]
 
         issues = [issue for report in chunk_reports for issue in report.get("issues", [])]
         evidence = [item for report in chunk_reports for item in report.get("evidence", [])]
@@ -96,22 +190,50 @@ class CheckpointStore:
                 "last_chunk_idx": chunk_report.get("chunk_idx") or state.get("last_chunk_idx"),
             }
         )
-        return self.save(session_id, state)
+        return update_views(state, appended)
 
     def _path(self, session_id: str) -> Path:
+        return self._paths(session_id)[0]
+
+    def _paths(self, session_id: str) -> List[Path]:
+        """Checkpoint path for the configured format first, then legacy formats."""
         safe = _sanitize_session_id(session_id)
-        return self.base_dir / f"{safe}.json"
+        suffixes = [FORMAT_SUFFIXES[self.format]]
+        suffixes += [suffix for suffix in FORMAT_SUFFIXES.values() if suffix not in suffixes]
+        return [self.base_dir / f"{safe}{suffix}" for suffix in suffixes]
 
     def _read(self, path: Path) -> Dict[str, Any]:
         try:
-            return json.loads(path.read_text(encoding="utf-8"))
-        except (OSError, json.JSONDecodeError):
+            with stage("checkpoint.read"):
+                raw = path.read_bytes()
+                data = offload.call(
+                    checkpoint_codec.decode, raw, size=len(raw), task="checkpoint_decode"
+                )
+        except (OSError, ValueError):
             return {}
+        return data if isinstance(data, dict) else {}
 
     def _write(self, path: Path, data: Dict[str, Any]) -> None:
         tmp_path = path.with_suffix(f".{uuid.uuid4().hex}.tmp")
-        tmp_path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
-        os.replace(tmp_path, path)
+        with stage("checkpoint.write"):
+            if self.format == "json":
+                tmp_path.write_text(
+                    json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8"
+                )
+            else:
+                tmp_path.write_bytes(self._encode(path, data))
+            os.replace(tmp_path, path)
+
+    def _encode(self, path: Path, data: Dict[str, Any]) -> bytes:
+        if not offload.enabled:
+            return checkpoint_codec.encode(data)
+        # the previous write of this checkpoint sizes the next one without serializing it first;
+        # a state grows by about one chunk report per write
+        try:
+            size = path.stat().st_size
+        except OSError:
+            size = 0
+        return offload.call(checkpoint_codec.encode, data, size=size, task="checkpoint_encode")
 
     def _is_expired(self, path: Path, data: Dict[str, Any]) -> bool:
         if self.ttl_hours <= 0:
@@ -0,0 +1,180 @@
+"""
+Circuit breakers for the ADK path, one per operation (analyze, aggregate, chat).
+
+A breaker tracks the outcomes of the last ``window`` calls. A call fails if it
+raises, times out, or takes longer than the operation's latency SLO. Once at
+least ``min_calls`` outcomes are in the window and the failure rate reaches
+``failure_rate``, the breaker opens. While it is open, the orchestrator serves
+stub results tagged ``degraded: true`` without touching the model. After
+``open_seconds`` it goes half-open: ``half_open_probes`` calls are let through,
+and the rest are still degraded. A successful probe closes the breaker and a
+failed one opens it again.
+
+State is exposed on ``/health`` and as ``circuit_state{operation}`` (0 closed,
+1 half-open, 2 open) on ``/metrics``.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional
+
+from ai.core.config import settings
+from ai.core.metrics import metrics
+
+metrics.describe(
+    "circuit_state", "ADK circuit breaker state per operation (0 closed, 1 half-open, 2 open)"
+)
+metrics.describe(
+    "circuit_calls_total", "ADK calls per operation, by outcome (ok|error|timeout|slow|rejected)"
+)
+metrics.describe("circuit_transitions_total", "ADK circuit breaker state changes per operation")
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+OPERATIONS = ("analyze", "aggregate", "chat")
+
+
+def parse_slo(raw: str) -> Dict[str, float]:
+    """``"analyze=120000,chat=30000"`` to milliseconds per operation."""
+    slo: Dict[str, float] = {}
+    for item in raw.split(","):
+        name, _, value = item.partition("=")
+        if name.strip() and value.strip():
+            slo[name.strip()] = float(value)
+    return slo
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        operation: str,
+        failure_rate: float = 0.5,
+        window: int = 20,
+        min_calls: int = 5,
+        open_seconds: float = 30.0,
+        slo_ms: float = 0.0,
+        half_open_probes: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.operation = operation
+        self.failure_rate = failure_rate
+        self.min_calls = max(1, min_calls)
+        self.open_seconds = open_seconds
+        self.slo_ms = slo_ms
+        self.half_open_probes = max(1, half_open_probes)
+        self.clock = clock
+        self.state = CLOSED
+        self.opened_at: Optional[float] = None
+        self._outcomes: Deque[bool] = deque(maxlen=max(1, window))
+        self._probes = 0
+        self._lock = threading.Lock()
+        metrics.set("circuit_state", 0, operation=operation)
+
+    @property
+    def enabled(self) -> bool:
+        return self.failure_rate > 0
+
+    def allow(self) -> bool:
+        """Whether the next call may go to the model; a ``True`` in half-open is a probe."""
+        if not self.enabled:
+            return True
+        with self._lock:
+            if self.state == OPEN and self.clock() - (self.opened_at or 0.0) >= self.open_seconds:
+                self._transition(HALF_OPEN)
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and self._probes < self.half_open_probes:
+                self._probes += 1
+                return True
+        metrics.inc("circuit_calls_total", operation=self.operation, result="rejected")
+        return False
+
+    def record(self, ok: bool, seconds: float, outcome: Optional[str] = None) -> None:
+        """Record a finished call; ``ok`` calls over the SLO count as failures."""
+        if ok and self.slo_ms and seconds * 1000.0 > self.slo_ms:
+            ok, outcome = False, "slow"
+        metrics.inc(
+            "circuit_calls_total",
+            operation=self.operation,
+            result=outcome or ("ok" if ok else "error"),
+        )
+        if not self.enabled:
+            return
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probes = max(0, self._probes - 1)
+                self._transition(CLOSED if ok else OPEN)
+                return
+            self._outcomes.append(ok)
+            failures = self._outcomes.count(False)
+            if (
+                self.state == CLOSED
+                and len(self._outcomes) >= self.min_calls
+                and failures / len(self._outcomes) >= self.failure_rate
+            ):
+                self._transition(OPEN)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            calls = len(self._outcomes)
+            failures = self._outcomes.count(False)
+            retry_in = None
+            if self.state == OPEN and self.opened_at is not None:
+                retry_in = round(max(0.0, self.open_seconds - (self.clock() - self.opened_at)), 1)
+            return {
+                "state": self.state,
+                "calls": calls,
+                "failure_rate": round(failures / calls, 3) if calls else 0.0,
+                "slo_ms": self.slo_ms or None,
+                "retry_in_seconds": retry_in,
+            }
+
+    def _transition(self, state: str) -> None:
+        # callers hold self._lock
+        if state == self.state:
+            return
+        self.state = state
+        if state == OPEN:
+            self.opened_at = self.clock()
+        if state != HALF_OPEN:
+            self._probes = 0
+        if state == CLOSED:
+            self._outcomes.clear()
+        metrics.set("circuit_state", _STATE_VALUES[state], operation=self.operation)
+        metrics.inc("circuit_transitions_total", operation=self.operation, state=state)
+
+
+class CircuitBreakers:
+    """One breaker per ADK operation, configured from settings."""
+
+    def __init__(self, breakers: Dict[str, CircuitBreaker], timeout_seconds: float = 0.0) -> None:
+        self.breakers = breakers
+        self.timeout_seconds = timeout_seconds
+
+    @classmethod
+    def from_settings(cls) -> "CircuitBreakers":
+        slo = parse_slo(settings.circuit_slo_ms)
+        return cls(
+            {
+                operation: CircuitBreaker(
+                    operation,
+                    failure_rate=settings.circuit_failure_rate,
+                    window=settings.circuit_window,
+                    min_calls=settings.circuit_min_calls,
+                    open_seconds=settings.circuit_open_seconds,
+                    slo_ms=slo.get(operation, 0.0),
+                )
+                for operation in OPERATIONS
+            },
+            timeout_seconds=settings.circuit_timeout_seconds,
+        )
+
+    def __getitem__(self, operation: str) -> CircuitBreaker:
+        return self.breakers[operation]
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {operation: breaker.snapshot() for operation, breaker in self.breakers.items()}
@@ -0,0 +1,221 @@
+"""
+Timestamp correlation between agent findings, error events and interactions.
+
+Timestamps are parsed once into sorted arrays (seconds since the epoch). Each
+issue's time window is then joined against the error and interaction arrays
+with ``bisect``, so a chunk with n issues and m events costs O((n + m) log m).
+
+Video findings carry offsets into the chunk recording (``"00:00:12"``); they
+are anchored at the chunk's ``start_ts``.
+"""
+from __future__ import annotations
+
+import re
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ai.services.orchestrator import _event_text
+from ai.tools.event_tools import extract_error_events
+
+_OFFSET = re.compile(r"^\s*(?:(\d+):)?(?:(\d+):)?(\d+(?:\.\d+)?)\s*s?\s*$")
+_TEXT_LIMIT = 200
+
+
+def parse_ts(value: Any) -> Optional[float]:
+    """Absolute timestamp (ISO-8601 string or epoch seconds/milliseconds) to epoch seconds."""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) / 1000.0 if value > 1e11 else float(value)
+    text = str(value).strip()
+    if not text:
+        return None
+    try:
+        parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            return parse_ts(float(text))
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def parse_offset(value: Any) -> Optional[float]:
+    """Recording offset (``"12"``, ``"12.5s"``, ``"01:02"``, ``"00:01:02"``) to seconds."""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _OFFSET.match(str(value))
+    if not match:
+        return None
+    first, second, seconds = match.groups()
+    hours, minutes = (first, second) if second is not None else (None, first)
+    return int(hours or 0) * 3600 + int(minutes or 0) * 60 + float(seconds)
+
+
+@dataclass
+class SortedEvents:
+    """Events sorted by parsed time, with a parallel array of times for ``bisect``."""
+
+    times: List[float]
+    events: List[Dict[str, Any]]
+
+    @classmethod
+    def build(cls, events: Sequence[Dict[str, Any]]) -> "SortedEvents":
+        timed = [
+            (t, idx, event)
+            for idx, event in enumerate(events)
+            if (t := parse_ts(event.get("ts"))) is not None
+        ]
+        timed.sort(key=lambda entry: (entry[0], entry[1]))
+        return cls([entry[0] for entry in timed], [entry[2] for entry in timed])
+
+    def between(self, start: float, end: float) -> List[Dict[str, Any]]:
+        return self.events[bisect_left(self.times, start) : bisect_right(self.times, end)]
+
+    def before(self, at: float, limit: int, lookback: float) -> List[Dict[str, Any]]:
+        hi = bisect_right(self.times, at)
+        lo = max(bisect_left(self.times, at - lookback), hi - limit)
+        return self.events[lo:hi]
+
+
+def issue_window(
+    issue: Dict[str, Any], origin: Optional[float], slack: float
+) -> Optional[Tuple[float, float]]:
+    """Time window an issue covers, widened by ``slack`` seconds on both sides."""
+    start = end = parse_ts(issue.get("ts"))
+    if start is None and origin is not None:
+        offset_start = parse_offset(issue.get("timestamp_start") or issue.get("timestamp"))
+        if offset_start is not None:
+            start = origin + offset_start
+            offset_end = parse_offset(issue.get("timestamp_end"))
+            end = (
+                origin + offset_end
+                if offset_end is not None and offset_end >= offset_start
+                else start
+            )
+    if start is None or end is None:
+        return None
+    return start - slack, end + slack
+
+
+def _brief(event: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "ts": event.get("ts"),
+        "type": event.get("type"),
+        "text": str(_event_text(event))[:_TEXT_LIMIT],
+    }
+
+
+class Correlator:
+    def __init__(
+        self,
+        events: Sequence[Dict[str, Any]],
+        chunk: Optional[Dict[str, Any]] = None,
+        window_seconds: float = 3.0,
+        lookback_seconds: float = 15.0,
+        max_errors: int = 5,
+        max_interactions: int = 3,
+    ) -> None:
+        chunk = chunk or {}
+        self.origin = parse_ts(chunk.get("start_ts") or chunk.get("started_at"))
+        self.window_seconds = window_seconds
+        self.lookback_seconds = lookback_seconds
+        self.max_errors = max_errors
+        self.max_interactions = max_interactions
+        self.errors = SortedEvents.build(extract_error_events(list(events)))
+        self.interactions = SortedEvents.build(
+            [
+                event
+                for event in events
+                if event.get("type") in {"interaction", "marker", "annotation"}
+            ]
+        )
+
+    def link(self, issue: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        window = issue_window(issue, self.origin, self.window_seconds)
+        if window is None:
+            return None
+        errors = self.errors.between(*window)
+        interactions = self.interactions.before(
+            window[0] + self.window_seconds, self.max_interactions, self.lookback_seconds
+        )
+        return {
+            "window": [window[0], window[1]],
+            "errors": [_brief(event) for event in errors[: self.max_errors]],
+            "error_count": len(errors),
+            "interactions": [_brief(event) for event in interactions],
+        }
+
+    def attach(self, issues: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Set ``linked_evidence`` on ``issues`` where a time window could be derived.
+
+        Issues are updated in place, so agent outputs keep pointing at the report's issues.
+        """
+        for issue in issues:
+            evidence = self.link(issue) if isinstance(issue, dict) else None
+            if evidence:
+                issue["linked_evidence"] = evidence
+        return issues
+
+
+def correlation_groups(
+    issues: List[Dict[str, Any]], brief_limit: int = _TEXT_LIMIT
+) -> List[Dict[str, Any]]:
+    """Merge issues whose linked windows overlap into groups for the synthesizer.
+
+    Issues without a window each form their own group.
+    """
+    windowed = sorted(
+        (
+            (issue["linked_evidence"]["window"], idx)
+            for idx, issue in enumerate(issues)
+            if isinstance(issue, dict) and isinstance(issue.get("linked_evidence"), dict)
+        ),
+        key=lambda entry: entry[0][0],
+    )
+    spans: List[List[Any]] = []
+    for (start, end), idx in windowed:
+        if spans and start <= spans[-1][1]:
+            spans[-1][1] = max(spans[-1][1], end)
+            spans[-1][2].append(idx)
+        else:
+            spans.append([start, end, [idx]])
+    grouped = {idx for span in spans for idx in span[2]}
+    spans.extend([None, None, [idx]] for idx in range(len(issues)) if idx not in grouped)
+
+    groups: List[Dict[str, Any]] = []
+    for start, end, members in spans:
+        errors: Dict[str, Dict[str, Any]] = {}
+        interactions: Dict[str, Dict[str, Any]] = {}
+        briefs = []
+        for idx in members:
+            issue = issues[idx] if isinstance(issues[idx], dict) else {"detail": str(issues[idx])}
+            linked = issue.get("linked_evidence") or {}
+            for item in linked.get("errors", []):
+                errors.setdefault(f"{item['ts']}|{item['text']}", item)
+            for item in linked.get("interactions", []):
+                interactions.setdefault(f"{item['ts']}|{item['text']}", item)
+            briefs.append(
+                {
+                    "idx": idx,
+                    "title": issue.get("title"),
+                    "severity": issue.get("severity"),
+                    "source": issue.get("source"),
+                    "detail": str(issue.get("detail") or "")[:brief_limit],
+                }
+            )
+        groups.append(
+            {
+                "window": [start, end] if start is not None else None,
+                "issues": briefs,
+                "errors": list(errors.values()),
+                "interactions": list(interactions.values()),
+            }
+        )
+    return groups
@@ -0,0 +1,211 @@
+"""
+Chat image attachments as binary model parts.
+
+An image arrives as ``{"name", "type", "data"}``. ``data`` holds the bytes:
+base64 text, a ``data:`` URL, or raw bytes from a msgpack body. A later turn
+can send ``{"sha256": ...}`` instead of the bytes to reuse an image the
+service has already seen. Images are deduplicated by the SHA-256 of their
+original bytes. Each one is preprocessed once: if Pillow is installed it is
+downscaled to ``max_side`` pixels on its longest side and re-encoded when that
+makes it smaller. The result goes into a byte-bounded LRU cache keyed by that
+hash. Without Pillow, only data with PNG, JPEG, GIF or WebP magic bytes is
+accepted. The prompt lists image metadata, and the pixels travel as
+``types.Part.from_bytes`` parts instead of base64 text.
+"""
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from ai.core.config import settings
+from ai.core.metrics import metrics
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - Pillow is optional; images are then sent as uploaded
+    Image = None
+
+metrics.describe(
+    "chat_image_total", "Chat images by outcome (processed|cached|duplicate|missing|invalid)"
+)
+
+# magic bytes -> mime type, for uploads without (or with a wrong) declared type
+_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+
+
+def sniff_mime(data: bytes) -> Optional[str]:
+    for signature, mime_type in _SIGNATURES:
+        if data.startswith(signature):
+            return mime_type
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+def decode_data(value: Any) -> Optional[bytes]:
+    """Image bytes from raw bytes, strict base64 text or a ``data:`` URL; None if unreadable."""
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value)
+    if not isinstance(value, str) or not value:
+        return None
+    if value.startswith("data:"):
+        value = value.partition(",")[2]
+    try:
+        return base64.b64decode(value, validate=True)
+    except (binascii.Error, ValueError):
+        return None
+
+
+@dataclass
+class PreparedImage:
+    sha256: str
+    mime_type: str
+    data: bytes
+    original_bytes: int
+    width: Optional[int] = None
+    height: Optional[int] = None
+
+    def describe(self, name: Any = None) -> Dict[str, Any]:
+        return {
+            "name": name,
+            "sha256": self.sha256,
+            "mime_type": self.mime_type,
+            "width": self.width,
+            "height": self.height,
+            "bytes": len(self.data),
+        }
+
+
+class ImageCache:
+    """Preprocessed images by original SHA-256, evicted least recently used past ``max_bytes``."""
+
+    def __init__(
+        self, max_bytes: int = 64 * 1024 * 1024, max_side: int = 1536, quality: int = 85
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.max_side = max_side
+        self.quality = quality
+        self._entries: "OrderedDict[str, PreparedImage]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> "ImageCache":
+        return cls(
+            max_bytes=int(settings.chat_image_cache_mb * 1024 * 1024),
+            max_side=settings.chat_image_max_px,
+            quality=settings.chat_image_quality,
+        )
+
+    def get(self, sha256: str) -> Optional[PreparedImage]:
+        with self._lock:
+            entry = self._entries.get(sha256)
+            if entry is not None:
+                self._entries.move_to_end(sha256)
+            return entry
+
+    def put(self, image: PreparedImage) -> None:
+        if len(image.data) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(image.sha256, None)
+            if previous is not None:
+                self._size -= len(previous.data)
+            self._entries[image.sha256] = image
+            self._size += len(image.data)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted.data)
+
+    def prepare(
+        self, images: Optional[List[Dict[str, Any]]]
+    ) -> Tuple[List[PreparedImage], List[Dict[str, Any]]]:
+        """Unique prepared images in request order, plus prompt metadata for every attachment."""
+        prepared: List[PreparedImage] = []
+        described: List[Dict[str, Any]] = []
+        seen: Dict[str, int] = {}
+        for item in images or []:
+            if not isinstance(item, dict):
+                continue
+            name = item.get("name")
+            raw = decode_data(item.get("data"))
+            if raw is None and item.get("data"):
+                metrics.inc("chat_image_total", result="invalid")
+                described.append({"name": name, "error": "image data is not valid base64"})
+                continue
+            digest = hashlib.sha256(raw).hexdigest() if raw else str(item.get("sha256") or "")
+            if digest in seen:
+                metrics.inc("chat_image_total", result="duplicate")
+                described.append({**prepared[seen[digest]].describe(name), "part": seen[digest]})
+                continue
+            image = self.get(digest) if digest else None
+            if image is not None:
+                metrics.inc("chat_image_total", result="cached")
+            elif raw:
+                image = self._process(
+                    digest, raw, str(item.get("type") or item.get("mime_type") or "")
+                )
+                if image is None:
+                    metrics.inc("chat_image_total", result="invalid")
+                    described.append(
+                        {"name": name, "sha256": digest, "error": "not a supported image"}
+                    )
+                    continue
+                metrics.inc("chat_image_total", result="processed")
+                self.put(image)
+            else:
+                # metadata only, or a hash this worker has not seen (or has evicted)
+                metrics.inc("chat_image_total", result="missing")
+                meta = {key: value for key, value in item.items() if key != "data"}
+                described.append({**meta, "available": False})
+                continue
+            seen[digest] = len(prepared)
+            prepared.append(image)
+            described.append({**image.describe(name), "part": seen[digest]})
+        return prepared, described
+
+    def _process(self, digest: str, raw: bytes, declared: str) -> Optional[PreparedImage]:
+        sniffed = sniff_mime(raw)
+        mime_type = sniffed or (declared if declared.startswith("image/") else None)
+        if Image is None:
+            # nothing decodes the data, so only its magic bytes can vouch for it being an image
+            return PreparedImage(digest, sniffed, raw, len(raw)) if sniffed else None
+        try:
+            with Image.open(io.BytesIO(raw)) as opened:
+                opened.load()
+                width, height = opened.size
+                if max(width, height) <= self.max_side and mime_type in {
+                    "image/png",
+                    "image/jpeg",
+                    "image/webp",
+                }:
+                    return PreparedImage(digest, mime_type, raw, len(raw), width, height)
+                picture = opened.copy()
+        except Exception:
+            return PreparedImage(digest, sniffed, raw, len(raw)) if sniffed else None
+        picture.thumbnail((self.max_side, self.max_side), Image.LANCZOS)
+        buffer = io.BytesIO()
+        # screenshots with transparency stay PNG; everything else becomes a much smaller JPEG
+        if picture.mode in {"RGBA", "LA"} or (
+            picture.mode == "P" and "transparency" in picture.info
+        ):
+            picture.save(buffer, format="PNG", optimize=True)
+            encoded_type = "image/png"
+        else:
+            picture.convert("RGB").save(buffer, format="JPEG", quality=self.quality, optimize=True)
+            encoded_type = "image/jpeg"
+        encoded = buffer.getvalue()
+        if len(encoded) >= len(raw) and mime_type and max(width, height) <= self.max_side:
+            return PreparedImage(digest, mime_type, raw, len(raw), width, height)
+        return PreparedImage(digest, encoded_type, encoded, len(raw), picture.width, picture.height)
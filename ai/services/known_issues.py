@@ -0,0 +1,307 @@
+"""
+Cross-session index of triaged error fingerprints.
+
+Each unclassified error event is keyed by ``event_fingerprint``. When a chunk
+report lands, every fingerprint in the chunk is counted and the fingerprints
+the model explained (a log issue whose linked evidence includes the first
+event) keep that issue as their explanation. On later chunks, from any
+session, errors with an explained fingerprint are attached to the report as
+``known_issue`` entries without a model call, and only new fingerprints are
+sent to the log analyst.
+
+Lookups are a dict hit. The index keeps at most ``max_entries`` fingerprints
+(least recently seen are evicted) with a few example sessions each, and is
+persisted in the ``_index`` subdirectory of the checkpoint directory, where
+session enumeration (``*.ckpt`` at the top level) does not see it and no
+session id can collide with it. Workers buffer their updates and merge them
+into the shared file under the checkpoint lock every ``flush_seconds``.
+"""
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import nullcontext
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, ContextManager, Dict, List, Optional, Set
+
+from ai.core.config import settings
+from ai.core.metrics import metrics
+from ai.services import checkpoint_codec
+from ai.services.checkpoints import file_lock
+from ai.services.correlation import _brief
+from ai.tools.event_tools import event_fingerprint, extract_error_events
+
+metrics.describe(
+    "known_issue_lookups_total",
+    "Error fingerprints looked up in the known-issue index, by result (hit|miss)",
+)
+
+INDEX_DIR = "_index"
+INDEX_NAME = "known_issues"
+# written straight into CHECKPOINT_DIR by earlier versions
+_LEGACY_NAME = "_known_issues.ckpt"
+_SEVERITY_RANK = {"high": 0, "medium": 1, "low": 2}
+_DETAIL_LIMIT = 500
+
+
+@dataclass
+class KnownIssue:
+    fingerprint: str
+    first_seen: float
+    last_seen: float
+    count: int = 0
+    sessions: List[str] = field(default_factory=list)
+    # the issue the model last reported for this fingerprint; None until one was correlated
+    explanation: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "KnownIssue":
+        return cls(
+            fingerprint=data["fingerprint"],
+            first_seen=float(data.get("first_seen") or 0.0),
+            last_seen=float(data.get("last_seen") or 0.0),
+            count=int(data.get("count") or 0),
+            sessions=list(data.get("sessions") or []),
+            explanation=data.get("explanation"),
+        )
+
+    def merge(self, other: "KnownIssue", max_examples: int) -> None:
+        self.first_seen = min(self.first_seen, other.first_seen)
+        self.count += other.count
+        for session_id in other.sessions:
+            if session_id not in self.sessions and len(self.sessions) < max_examples:
+                self.sessions.append(session_id)
+        if other.explanation is not None and other.last_seen >= self.last_seen:
+            self.explanation = other.explanation
+        self.last_seen = max(self.last_seen, other.last_seen)
+
+
+@dataclass
+class ChunkMatches:
+    """Error fingerprints of one chunk, split into known and new."""
+
+    remaining: List[Dict[str, Any]]
+    issues: List[Dict[str, Any]]
+    counts: Dict[str, int]
+    first: Dict[str, Dict[str, Any]]
+    known: Set[str]
+
+
+class KnownIssueIndex:
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        max_entries: int = 10000,
+        max_examples: int = 5,
+        flush_seconds: float = 5.0,
+        lock: Optional[Callable[[], ContextManager[Any]]] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self.max_examples = max_examples
+        self.flush_seconds = flush_seconds
+        self.clock = clock
+        self._file_lock = lock
+        self._entries: "OrderedDict[str, KnownIssue]" = OrderedDict()
+        self._pending: Dict[str, KnownIssue] = {}
+        self._lock = threading.Lock()
+        self._last_flush = clock()
+        if path is not None:
+            self._entries = self._bounded(self._read())
+
+    @classmethod
+    def from_settings(cls, store: Any = None) -> "KnownIssueIndex":
+        """Index persisted under ``store``'s directory (``CheckpointStore``), or in memory only."""
+        if store is None:
+            return cls(
+                max_entries=settings.known_issues_max,
+                flush_seconds=settings.known_issues_flush_seconds,
+            )
+        path = store.base_dir / INDEX_DIR / f"{INDEX_NAME}.ckpt"
+        legacy = store.base_dir / _LEGACY_NAME
+        if legacy.exists() and not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            legacy.replace(path)
+        return cls(
+            path=path,
+            max_entries=settings.known_issues_max,
+            flush_seconds=settings.known_issues_flush_seconds,
+            lock=lambda: file_lock(path.with_suffix(".lock")),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, fingerprint: str) -> Optional[KnownIssue]:
+        return self._entries.get(fingerprint)
+
+    def match(self, events: List[Dict[str, Any]]) -> ChunkMatches:
+        """Attach explained fingerprints as issues and drop their events from ``remaining``."""
+        counts: Dict[str, int] = {}
+        first: Dict[str, Dict[str, Any]] = {}
+        fingerprints: Dict[int, str] = {}
+        for event in extract_error_events(events) if self.enabled else []:
+            fingerprint = event_fingerprint(event)
+            if fingerprint is None:
+                continue
+            fingerprints[id(event)] = fingerprint
+            counts[fingerprint] = counts.get(fingerprint, 0) + 1
+            first.setdefault(fingerprint, event)
+
+        issues: List[Dict[str, Any]] = []
+        known: Set[str] = set()
+        with self._lock:
+            for fingerprint, event in first.items():
+                entry = self._entries.get(fingerprint)
+                if entry is None or entry.explanation is None:
+                    metrics.inc("known_issue_lookups_total", result="miss")
+                    continue
+                metrics.inc("known_issue_lookups_total", result="hit")
+                known.add(fingerprint)
+                issues.append(
+                    {
+                        **entry.explanation,
+                        "ts": event.get("ts"),
+                        "fingerprints": [fingerprint],
+                        "known_issue": {
+                            "first_seen": entry.first_seen,
+                            "last_seen": entry.last_seen,
+                            "count": entry.count,
+                            "sessions": list(entry.sessions),
+                            "occurrences": counts[fingerprint],
+                        },
+                    }
+                )
+        remaining = (
+            events
+            if not known
+            else [event for event in events if fingerprints.get(id(event)) not in known]
+        )
+        return ChunkMatches(remaining, issues, counts, first, known)
+
+    def observe(
+        self, session_id: Optional[str], matches: ChunkMatches, issues: List[Dict[str, Any]]
+    ) -> None:
+        """Record a finished chunk; new fingerprints learn the issue that links their first event.
+
+        ``issues`` are the log issues the model reported, after correlation. Rule, network
+        and known issues are not passed: their windows cover errors they do not explain.
+        Issues chosen as explanations are tagged with ``fingerprints`` in place.
+        """
+        if not self.enabled or not matches.counts:
+            return
+        now = self.clock()
+        updates: Dict[str, KnownIssue] = {}
+        for fingerprint, occurrences in matches.counts.items():
+            update = KnownIssue(
+                fingerprint, now, now, occurrences, [str(session_id)] if session_id else []
+            )
+            if fingerprint not in matches.known:
+                issue = self._explaining_issue(matches.first[fingerprint], issues)
+                if issue is not None:
+                    issue.setdefault("fingerprints", []).append(fingerprint)
+                    update.explanation = _explanation(issue)
+            updates[fingerprint] = update
+
+        with self._lock:
+            for fingerprint, update in updates.items():
+                for target in (self._entries, self._pending):
+                    entry = target.get(fingerprint)
+                    if entry is None:
+                        target[fingerprint] = KnownIssue.from_dict(asdict(update))
+                    else:
+                        entry.merge(update, self.max_examples)
+                self._entries.move_to_end(fingerprint)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            due = now - self._last_flush >= self.flush_seconds
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        """Merge buffered updates into the shared file and reload it."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = self.clock()
+        if self.path is None or not pending:
+            return
+        with self._file_lock() if self._file_lock else nullcontext():
+            entries = self._read()
+            for fingerprint, update in pending.items():
+                entry = entries.get(fingerprint)
+                if entry is None:
+                    entries[fingerprint] = update
+                else:
+                    entry.merge(update, self.max_examples)
+            merged = self._bounded(entries)
+            self._write(merged)
+        with self._lock:
+            # updates that arrived while the file was being written stay on top of the merged view
+            for fingerprint, update in self._pending.items():
+                entry = merged.get(fingerprint)
+                if entry is None:
+                    merged[fingerprint] = KnownIssue.from_dict(asdict(update))
+                else:
+                    entry.merge(update, self.max_examples)
+            self._entries = self._bounded(merged)
+
+    def _explaining_issue(
+        self, event: Dict[str, Any], issues: List[Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        brief = _brief(event)
+        candidates = []
+        for idx, issue in enumerate(issues):
+            if not isinstance(issue, dict) or issue.get("known_issue"):
+                continue
+            # being inside the window is not enough; the error has to be one the issue links
+            if brief in (issue.get("linked_evidence") or {}).get("errors", []):
+                candidates.append(
+                    (_SEVERITY_RANK.get(str(issue.get("severity")).lower(), 3), idx, issue)
+                )
+        return min(candidates, key=lambda entry: entry[:2])[2] if candidates else None
+
+    def _bounded(self, entries: Dict[str, KnownIssue]) -> "OrderedDict[str, KnownIssue]":
+        ordered = (
+            sorted(entries.values(), key=lambda entry: entry.last_seen)[-self.max_entries :]
+            if self.max_entries > 0
+            else []
+        )
+        return OrderedDict((entry.fingerprint, entry) for entry in ordered)
+
+    def _read(self) -> Dict[str, KnownIssue]:
+        if self.path is None or not self.path.exists():
+            return {}
+        try:
+            data = checkpoint_codec.decode(self.path.read_bytes())
+            return {
+                entry["fingerprint"]: KnownIssue.from_dict(entry)
+                for entry in data.get("entries", [])
+            }
+        except (OSError, ValueError, KeyError, TypeError):
+            return {}
+
+    def _write(self, entries: Dict[str, KnownIssue]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+        tmp_path.write_bytes(
+            checkpoint_codec.encode({"entries": [asdict(entry) for entry in entries.values()]})
+        )
+        tmp_path.replace(self.path)
+
+
+def _explanation(issue: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "title": issue.get("title"),
+        "severity": issue.get("severity"),
+        "detail": str(issue.get("detail") or "")[:_DETAIL_LIMIT],
+        "source": issue.get("source"),
+        "category": issue.get("category"),
+    }
@@ -0,0 +1,269 @@
+"""
+Rolling per-session state for sessions that are still recording.
+
+Event deltas are indexed as they arrive and error events are clustered by
+fingerprint. On watermark windows (every N events, every N seconds, or on an
+error burst) the rule engine's findings for the window's events are computed
+and kept by ``event_key``, so when the chunk closes ``analyze_chunk`` takes
+them instead of classifying the chunk again: the stub log analyst reports
+them, and the ADK log payload builds its rule summaries from them.
+
+Deduplication remembers the last ``seen_limit`` event keys, so a delta resent
+after that many newer events is counted again. At most as many findings are
+kept; the oldest ones not taken by a chunk are dropped.
+
+State lives in process memory, so the deltas and the chunk close of a session
+have to reach the same worker (route by session id). Anything not precomputed
+is simply analyzed at chunk close.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from ai.core.config import settings
+from ai.services.rules import Finding, default_engine
+from ai.tools.event_tools import event_fingerprint, event_key, extract_error_events
+
+
+@dataclass
+class ErrorCluster:
+    fingerprint: str
+    count: int = 0
+    first_ts: Any = None
+    last_ts: Any = None
+    sample: Dict[str, Any] = field(default_factory=dict)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "fingerprint": self.fingerprint,
+            "count": self.count,
+            "first_ts": self.first_ts,
+            "last_ts": self.last_ts,
+            "sample": self.sample,
+        }
+
+
+@dataclass
+class EventIndex:
+    """Counts, recent events per type and the most recently seen keys for one session."""
+
+    recent_limit: int = 200
+    seen_limit: int = 10000
+    counts: Dict[str, int] = field(default_factory=dict)
+    recent: Dict[str, Deque[Dict[str, Any]]] = field(default_factory=dict)
+    # insertion-ordered, oldest first
+    seen: "OrderedDict[str, None]" = field(default_factory=OrderedDict)
+    total: int = 0
+    last_ts: Any = None
+
+    def add(self, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Index ``events`` and return the ones not seen before."""
+        fresh: List[Dict[str, Any]] = []
+        for event in events:
+            key = event_key(event)
+            if key in self.seen:
+                continue
+            self.seen[key] = None
+            if len(self.seen) > self.seen_limit:
+                self.seen.popitem(last=False)
+            self.total += 1
+            event_type = str(event.get("type"))
+            self.counts[event_type] = self.counts.get(event_type, 0) + 1
+            recent = self.recent.get(event_type)
+            if recent is None:
+                recent = self.recent[event_type] = deque(maxlen=self.recent_limit)
+            recent.append(event)
+            self.last_ts = event.get("ts", self.last_ts)
+            fresh.append(event)
+        return fresh
+
+
+@dataclass
+class LiveSession:
+    session_id: str
+    window_events: int
+    window_seconds: float
+    error_burst: int
+    clock: Callable[[], float] = time.monotonic
+    index: EventIndex = field(default_factory=EventIndex)
+    clusters: Dict[str, ErrorCluster] = field(default_factory=dict)
+    windows: List[Dict[str, Any]] = field(default_factory=list)
+    # rule engine findings of closed windows, oldest first, until a chunk takes them
+    findings: "OrderedDict[str, Finding]" = field(default_factory=OrderedDict)
+    pending: List[Dict[str, Any]] = field(default_factory=list)
+    pending_events: int = 0
+    pending_errors: int = 0
+    window_started: float = 0.0
+    touched: float = 0.0
+
+    def __post_init__(self) -> None:
+        self.window_started = self.touched = self.clock()
+
+    def ingest(self, events: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Add a delta; returns the window record if a watermark was crossed."""
+        now = self.clock()
+        self.touched = now
+        fresh = self.index.add(events)
+        errors = extract_error_events(fresh)
+        for event in errors:
+            fingerprint = event_fingerprint(event) or "unknown"
+            cluster = self.clusters.get(fingerprint)
+            if cluster is None:
+                cluster = self.clusters[fingerprint] = ErrorCluster(
+                    fingerprint, first_ts=event.get("ts"), sample=event
+                )
+            cluster.count += 1
+            cluster.last_ts = event.get("ts")
+        self.pending.extend(fresh)
+        self.pending_events += len(fresh)
+        self.pending_errors += len(errors)
+
+        if self.pending_errors >= self.error_burst:
+            return self._close_window("error_burst", now)
+        if self.pending_events >= self.window_events:
+            return self._close_window("events", now)
+        if self.pending_events and now - self.window_started >= self.window_seconds:
+            return self._close_window("time", now)
+        return None
+
+    def _close_window(self, reason: str, now: float) -> Dict[str, Any]:
+        engine = default_engine()
+        # only rules with "match": "all" look beyond error events
+        candidates = self.pending if engine.match_all else extract_error_events(self.pending)
+        found = 0
+        for event in candidates:
+            finding = engine.finding(event)
+            if finding is not None:
+                self.findings[event_key(event)] = finding
+                found += 1
+        while len(self.findings) > self.index.seen_limit:
+            self.findings.popitem(last=False)
+        window = {
+            "idx": len(self.windows),
+            "reason": reason,
+            "event_count": self.pending_events,
+            "error_count": self.pending_errors,
+            "finding_count": found,
+            "total_events": self.index.total,
+            "last_ts": self.index.last_ts,
+        }
+        self.windows.append(window)
+        self.pending = []
+        self.pending_events = 0
+        self.pending_errors = 0
+        self.window_started = now
+        return window
+
+    def top_clusters(self, limit: int = 10) -> List[Dict[str, Any]]:
+        ranked = sorted(self.clusters.values(), key=lambda cluster: cluster.count, reverse=True)
+        return [cluster.as_dict() for cluster in ranked[:limit]]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.session_id,
+            "event_count": self.index.total,
+            "counts": dict(self.index.counts),
+            "error_count": sum(cluster.count for cluster in self.clusters.values()),
+            "clusters": self.top_clusters(),
+            "windows": len(self.windows),
+            "precomputed_findings": len(self.findings),
+            "last_window": self.windows[-1] if self.windows else None,
+            "last_ts": self.index.last_ts,
+        }
+
+
+class LiveSessionRegistry:
+    """Bounded, thread-safe map of session id to :class:`LiveSession`."""
+
+    def __init__(
+        self,
+        window_events: int = 500,
+        window_seconds: float = 10.0,
+        error_burst: int = 5,
+        ttl_seconds: float = 1800.0,
+        max_sessions: int = 256,
+        seen_limit: int = 10000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.window_events = window_events
+        self.window_seconds = window_seconds
+        self.error_burst = error_burst
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self.seen_limit = seen_limit
+        self.clock = clock
+        self._sessions: "OrderedDict[str, LiveSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> "LiveSessionRegistry":
+        return cls(
+            window_events=settings.live_window_events,
+            window_seconds=settings.live_window_seconds,
+            error_burst=settings.live_error_burst,
+            ttl_seconds=settings.live_session_ttl_seconds,
+            max_sessions=settings.live_max_sessions,
+            seen_limit=settings.live_seen_limit,
+        )
+
+    def ingest(self, session_id: str, events: List[Dict[str, Any]]) -> Dict[str, Any]:
+        with self._lock:
+            live = self._sessions.get(session_id)
+            if live is None:
+                live = LiveSession(
+                    session_id,
+                    self.window_events,
+                    self.window_seconds,
+                    self.error_burst,
+                    self.clock,
+                    EventIndex(seen_limit=self.seen_limit),
+                )
+                self._sessions[session_id] = live
+            self._sessions.move_to_end(session_id)
+            self._evict()
+            window = live.ingest(events)
+            return {**live.snapshot(), "window": window}
+
+    def get(self, session_id: Optional[str]) -> Optional[LiveSession]:
+        if not session_id:
+            return None
+        with self._lock:
+            return self._sessions.get(session_id)
+
+    def snapshot(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            live = self._sessions.get(session_id)
+            return live.snapshot() if live else None
+
+    def take_findings(
+        self, session_id: Optional[str], events: List[Dict[str, Any]]
+    ) -> Dict[str, Finding]:
+        """Pop the precomputed findings for the events of a closing chunk, by ``event_key``."""
+        live = self.get(session_id)
+        if live is None:
+            return {}
+        taken: Dict[str, Finding] = {}
+        with self._lock:
+            for event in events:
+                key = event_key(event)
+                finding = live.findings.pop(key, None)
+                if finding is not None:
+                    taken[key] = finding
+        return taken
+
+    def discard(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def _evict(self) -> None:
+        # least recently used first; the session just touched is always last
+        cutoff = self.clock() - self.ttl_seconds
+        while len(self._sessions) > 1:
+            oldest = next(iter(self._sessions.values()))
+            if oldest.touched >= cutoff and len(self._sessions) <= self.max_sessions:
+                break
+            self._sessions.popitem(last=False)
@@ -0,0 +1,508 @@
+"""
+Model backends for the ADK orchestrator.
+
+The orchestrator hands each agent call (agent + content parts) to a backend and
+gets the final response text back. ``AdkRunnerBackend`` talks to the real model
+through ADK; the fake backends let us load-test the ADK path without using quota:
+
+- ``RecordingBackend`` wraps another backend and stores every response
+- ``ReplayBackend`` serves recorded responses keyed by agent + normalized prompt hash
+- ``SyntheticBackend`` fabricates valid JSON for each agent
+
+Fake backends share a ``LatencyModel`` and ``FaultInjector`` so response times,
+failures (including 429s) and malformed replies can be shaped from the environment.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import os
+import random
+import threading
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Protocol
+
+from google.genai import types
+
+try:
+    from google.adk.runners import Runner
+except ImportError:  # pragma: no cover - fallback for older module layout
+    from google.adk.runners.runner import Runner
+
+FAKE_BACKENDS = {"replay", "synthetic"}
+BATCH_SUFFIX = "_batch"
+# checkpoint bookkeeping that changes on every save; left out of the replay key
+VOLATILE_KEYS = frozenset({"updated_at", "created_at", "view_version"})
+
+logger = logging.getLogger(__name__)
+
+
+class BackendError(RuntimeError):
+    """Raised by fake backends to simulate a failed model call."""
+
+    status_code = 500
+
+
+class RateLimitError(BackendError):
+    """Raised by fake backends to simulate a 429 from the model API."""
+
+    status_code = 429
+
+
+class ModelBackend(Protocol):
+    async def generate(self, agent: Any, parts: List[types.Part]) -> str:
+        ...
+
+
+def _without_volatile(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {
+            key: _without_volatile(item) for key, item in value.items() if key not in VOLATILE_KEYS
+        }
+    if isinstance(value, list):
+        return [_without_volatile(item) for item in value]
+    return value
+
+
+def normalize_prompt(text: str) -> str:
+    """Prompt text with volatile keys dropped from its JSON input, if it has one.
+
+    Prompts are either a JSON object or an instruction followed by one; the JSON
+    is re-encoded with sorted keys so key order does not matter either.
+    """
+    start = text.find("{")
+    if start < 0:
+        return text
+    try:
+        data, end = json.JSONDecoder().raw_decode(text, start)
+    except json.JSONDecodeError:
+        return text
+    if text[end:].strip():
+        return text
+    normalized = json.dumps(_without_volatile(data), ensure_ascii=False, sort_keys=True)
+    return text[:start] + normalized
+
+
+def prompt_hash(agent_name: str, parts: List[types.Part]) -> str:
+    """Stable hash of an agent call, used as the replay key."""
+    digest = hashlib.sha256(agent_name.encode("utf-8"))
+    for part in parts:
+        if part.text:
+            digest.update(b"text:" + normalize_prompt(part.text).encode("utf-8"))
+        elif part.file_data and part.file_data.file_uri:
+            digest.update(b"uri:" + part.file_data.file_uri.encode("utf-8"))
+        elif part.inline_data and part.inline_data.data:
+            digest.update(b"data:" + hashlib.sha256(part.inline_data.data).digest())
+    return digest.hexdigest()
+
+
+@dataclass
+class LatencyModel:
+    """Response latency distribution for fake backends.
+
+    ``distribution`` is one of ``fixed``, ``uniform``, ``normal``,
+    ``lognormal`` or ``exponential``; ``mean_ms`` and ``stddev_ms`` shape it.
+    """
+
+    distribution: str = "fixed"
+    mean_ms: float = 0.0
+    stddev_ms: float = 0.0
+
+    def sample(self, rng: random.Random) -> float:
+        mean = max(self.mean_ms, 0.0)
+        spread = max(self.stddev_ms, 0.0)
+        if mean <= 0:
+            return 0.0
+        if self.distribution == "uniform":
+            value = rng.uniform(max(mean - spread, 0.0), mean + spread)
+        elif self.distribution == "normal":
+            value = rng.gauss(mean, spread)
+        elif self.distribution == "lognormal":
+            sigma2 = math.log(1 + (spread / mean) ** 2)
+            value = rng.lognormvariate(math.log(mean) - sigma2 / 2, math.sqrt(sigma2))
+        elif self.distribution == "exponential":
+            value = rng.expovariate(1 / mean)
+        else:
+            value = mean
+        return max(value, 0.0) / 1000
+
+
+@dataclass
+class FaultInjector:
+    """Fails a fraction of fake calls with a generic error or a 429, or garbles the reply."""
+
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    malformed_rate: float = 0.0
+
+    def maybe_raise(self, rng: random.Random, agent_name: str) -> None:
+        roll = rng.random()
+        if roll < self.rate_limit_rate:
+            raise RateLimitError(f"429 RESOURCE_EXHAUSTED (injected) for {agent_name}")
+        if roll < self.rate_limit_rate + self.error_rate:
+            raise BackendError(f"500 INTERNAL (injected) for {agent_name}")
+
+    def maybe_corrupt(self, rng: random.Random, text: str) -> str:
+        """Truncate the reply or break one issue's severity, like a sloppy model would."""
+        if rng.random() >= self.malformed_rate:
+            return text
+        try:
+            data = json.loads(text)
+        except ValueError:
+            # replayed replies need not be JSON; those are only truncated
+            data = None
+        issues = (data.get("issues") or data.get("top_issues")) if isinstance(data, dict) else None
+        targets = (
+            [issue for issue in issues if isinstance(issue, dict)] if isinstance(issues, list) else []
+        )
+        if targets and rng.random() < 0.5:
+            rng.choice(targets)["severity"] = "severe!!"
+            return json.dumps(data)
+        return "Here is the analysis: " + text[: max(1, len(text) // 2)]
+
+
+class AdkRunnerBackend:
+    """Runs agents through ADK's ``Runner`` against the configured model."""
+
+    def __init__(self, session_service: Any, app_name: str, user_id: str) -> None:
+        self.session_service = session_service
+        self.app_name = app_name
+        self.user_id = user_id
+        self._runners: Dict[int, Runner] = {}
+        self._runners_lock = threading.Lock()
+
+    def warm(self, agents: List[Any]) -> None:
+        """Build runners and model clients ahead of the first request."""
+        for agent in agents:
+            self._runner(agent)
+            try:
+                getattr(agent.canonical_model, "api_client", None)
+            except Exception:
+                logger.warning("could not prewarm model client for %s", agent.name, exc_info=True)
+
+    def _runner(self, agent: Any) -> Runner:
+        with self._runners_lock:
+            runner = self._runners.get(id(agent))
+            if runner is None:
+                runner = Runner(
+                    agent=agent, app_name=self.app_name, session_service=self.session_service
+                )
+                self._runners[id(agent)] = runner
+            return runner
+
+    async def generate(self, agent: Any, parts: List[types.Part]) -> str:
+        session_id = f"{agent.name}-{uuid.uuid4().hex}"
+        await self.session_service.create_session(
+            app_name=self.app_name, user_id=self.user_id, session_id=session_id
+        )
+        runner = self._runner(agent)
+        content = types.Content(role="user", parts=parts)
+
+        final_text: Optional[str] = None
+        async for event in runner.run_async(
+            user_id=self.user_id, session_id=session_id, new_message=content
+        ):
+            if event.is_final_response():
+                if event.content and event.content.parts:
+                    final_text = event.content.parts[0].text
+                break
+
+        return final_text or "{}"
+
+
+class _FakeBackend:
+    def __init__(
+        self,
+        latency: Optional[LatencyModel] = None,
+        faults: Optional[FaultInjector] = None,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.latency = latency or LatencyModel()
+        self.faults = faults or FaultInjector()
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+
+    async def generate(self, agent: Any, parts: List[types.Part]) -> str:
+        with self._rng_lock:
+            delay = self.latency.sample(self._rng)
+            fault_rng = random.Random(self._rng.random())
+        if delay:
+            await asyncio.sleep(delay)
+        self.faults.maybe_raise(fault_rng, agent.name)
+        text = self._respond(agent.name, parts)
+        if agent.name == "output_repairer":
+            return text
+        return self.faults.maybe_corrupt(fault_rng, text)
+
+    def _respond(self, agent_name: str, parts: List[types.Part]) -> str:
+        raise NotImplementedError
+
+
+class SyntheticBackend(_FakeBackend):
+    """Fabricates schema-valid JSON responses for each agent."""
+
+    def _respond(self, agent_name: str, parts: List[types.Part]) -> str:
+        if agent_name == "output_repairer":
+            return json.dumps(synthetic_repair(parts))
+        if agent_name.endswith(BATCH_SUFFIX):
+            return json.dumps(synthetic_batch(agent_name[: -len(BATCH_SUFFIX)], parts))
+        rng = random.Random(prompt_hash(agent_name, parts))
+        return json.dumps(synthetic_response(agent_name, rng))
+
+
+class ReplayBackend(_FakeBackend):
+    """Serves responses recorded by ``RecordingBackend``.
+
+    Recordings live in ``<directory>/<agent_name>.jsonl``. Unknown prompts fall
+    back to synthetic output unless ``strict`` is set.
+    """
+
+    def __init__(self, directory: Path, strict: bool = False, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.directory = Path(directory)
+        self.strict = strict
+        self._recordings: Dict[str, Dict[str, str]] = {}
+        self._load_lock = threading.Lock()
+
+    def _respond(self, agent_name: str, parts: List[types.Part]) -> str:
+        key = prompt_hash(agent_name, parts)
+        response = self._agent_recordings(agent_name).get(key)
+        if response is not None:
+            return response
+        if self.strict:
+            raise BackendError(f"no recording for {agent_name} prompt {key[:12]}")
+        if agent_name == "output_repairer":
+            return json.dumps(synthetic_repair(parts))
+        if agent_name.endswith(BATCH_SUFFIX):
+            return json.dumps(synthetic_batch(agent_name[: -len(BATCH_SUFFIX)], parts))
+        return json.dumps(synthetic_response(agent_name, random.Random(key)))
+
+    def _agent_recordings(self, agent_name: str) -> Dict[str, str]:
+        with self._load_lock:
+            if agent_name not in self._recordings:
+                self._recordings[agent_name] = read_recordings(
+                    self.directory / f"{agent_name}.jsonl"
+                )
+            return self._recordings[agent_name]
+
+
+class RecordingBackend:
+    """Passes calls through to ``inner`` and appends each response to disk."""
+
+    def __init__(self, inner: ModelBackend, directory: Path) -> None:
+        self.inner = inner
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+
+    def warm(self, agents: List[Any]) -> None:
+        warm = getattr(self.inner, "warm", None)
+        if warm:
+            warm(agents)
+
+    async def generate(self, agent: Any, parts: List[types.Part]) -> str:
+        response = await self.inner.generate(agent, parts)
+        record = {"hash": prompt_hash(agent.name, parts), "response": response}
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with (self.directory / f"{agent.name}.jsonl").open("a", encoding="utf-8") as handle:
+                handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return response
+
+
+def read_recordings(path: Path) -> Dict[str, str]:
+    recordings: Dict[str, str] = {}
+    if not path.exists():
+        return recordings
+    with path.open(encoding="utf-8") as handle:
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(record, dict) and "hash" in record and "response" in record:
+                recordings[record["hash"]] = record["response"]
+    return recordings
+
+
+def synthetic_response(agent_name: str, rng: random.Random) -> Dict[str, Any]:
+    """Build a plausible response for ``agent_name`` following its JSON contract."""
+    severities = ["low", "medium", "high"]
+    endpoint = rng.choice(["/api/cart", "/api/orders", "/api/users", "/api/search"])
+    if agent_name == "synthesizer":
+        breakdown = {severity: rng.randint(0, 3) for severity in severities}
+        return {
+            "summary": f"Requests to {endpoint} fail intermittently during checkout.",
+            "suspected_root_cause": f"{endpoint} returns 500 after the cart is updated.",
+            "severity_breakdown": breakdown,
+            "top_issues": [
+                {
+                    "title": f"{endpoint} returns 500",
+                    "severity": rng.choice(severities),
+                    "detail": "Server error after submitting the form.",
+                    "source": "log_analyst",
+                }
+            ],
+        }
+    if agent_name == "repro_planner":
+        return {
+            "summary": "Checkout flow reproduction.",
+            "repro_steps": [
+                "Step 1: Navigate to /cart",
+                "Step 2: Click on #checkout",
+                "Step 3: Enter email in input[name=email]",
+                "Expected: Order confirmation page",
+                f"Actual: Error banner after {endpoint} fails",
+            ],
+        }
+    if agent_name == "chunk_analyst":
+        return {
+            "log": synthetic_response("log_analyst", rng),
+            "repro": synthetic_response("repro_planner", rng),
+            "synthesis": synthetic_response("synthesizer", rng),
+        }
+    if agent_name == "video_analyst":
+        return {
+            "summary": "Minor layout shift observed.",
+            "issues": [
+                {
+                    "title": "Layout shift on submit",
+                    "severity": rng.choice(severities),
+                    "detail": "Form jumps when the error banner appears.",
+                    "timestamp_start": "00:00:12",
+                    "timestamp_end": "00:00:14",
+                    "ui_area": "Form",
+                    "confidence": "medium",
+                }
+            ],
+            "evidence": [
+                {
+                    "type": "layout",
+                    "timestamp": "00:00:12",
+                    "description": "Banner pushes form down",
+                }
+            ],
+        }
+    if agent_name == "qa_chat":
+        return {
+            "reply": f"The most likely cause is the failing {endpoint} request.",
+            "suggested_next_steps": [
+                "Check server logs for the request",
+                "Retry with a fresh cart",
+            ],
+        }
+    count = rng.randint(1, 4)
+    return {
+        "summary": f"{count} errors found in console and network logs.",
+        "issues": [
+            {
+                "title": f"{endpoint} returned {status}",
+                "severity": rng.choice(severities),
+                "detail": f"{status} {endpoint}",
+                "source": "network",
+                "category": "error",
+            }
+            for status in rng.choices([400, 404, 500, 502], k=count)
+        ],
+        "evidence": [{"type": "network", "message": endpoint, "status": 500}],
+    }
+
+
+def _repair_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        fixed = dict(value)
+        severity = str(fixed.get("severity", "medium")).strip().lower()
+        fixed["severity"] = severity if severity in {"low", "medium", "high"} else "medium"
+        fixed["title"] = str(fixed.get("title") or fixed.get("detail") or "Untitled issue")
+        return fixed
+    return value if isinstance(value, str) else json.dumps(value)
+
+
+def synthetic_repair(parts: List[types.Part]) -> Dict[str, Any]:
+    """Answer an ``output_repairer`` request by coercing the broken values."""
+    text = "".join(part.text or "" for part in parts)
+    try:
+        request = json.loads(text[text.index("{") :])
+    except ValueError:
+        return {"fixes": {}}
+    if "raw_text" in request:
+        raw = str(request["raw_text"])
+        start = raw.find("{")
+        candidate = raw[start:] if start != -1 else ""
+        for end in range(len(candidate), 0, -1):
+            if candidate[end - 1] != "}":
+                continue
+            try:
+                return {"output": json.loads(candidate[:end])}
+            except json.JSONDecodeError:
+                continue
+        return {"output": {"summary": raw[:200]}}
+    broken = request.get("broken") or {}
+    return {"fixes": {path: _repair_value(entry.get("value")) for path, entry in broken.items()}}
+
+
+def synthetic_batch(agent_name: str, parts: List[types.Part]) -> Dict[str, Any]:
+    """Answer a batched request with one synthetic response per item key."""
+    text = "".join(part.text or "" for part in parts)
+    try:
+        items = json.loads(text[text.index("{") :]).get("items") or {}
+    except (ValueError, AttributeError):
+        return {"results": {}}
+    results = {}
+    for key, item in items.items():
+        seed = hashlib.sha256(
+            json.dumps(item, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+        results[key] = synthetic_response(agent_name, random.Random(seed))
+    return {"results": results}
+
+
+def backend_name() -> str:
+    return os.getenv("ADK_MODEL_BACKEND", "live").strip().lower() or "live"
+
+
+def _float_env(name: str, default: float) -> float:
+    raw = os.getenv(name)
+    try:
+        return float(raw) if raw and raw.strip() else default
+    except ValueError:
+        return default
+
+
+def backend_from_env(session_service: Any, app_name: str, user_id: str) -> ModelBackend:
+    """Build the backend selected by ``ADK_MODEL_BACKEND`` (live|record|replay|synthetic)."""
+    name = backend_name()
+    live = AdkRunnerBackend(session_service, app_name, user_id)
+    replay_dir = Path(
+        os.getenv("ADK_REPLAY_DIR") or Path(__file__).resolve().parents[1] / ".recordings"
+    )
+    if name == "record":
+        return RecordingBackend(live, replay_dir)
+    if name not in FAKE_BACKENDS:
+        return live
+
+    seed_raw = os.getenv("FAKE_LLM_SEED")
+    fake_kwargs: Dict[str, Any] = {
+        "latency": LatencyModel(
+            distribution=os.getenv("FAKE_LLM_LATENCY_DIST", "fixed").lower(),
+            mean_ms=_float_env("FAKE_LLM_LATENCY_MS", 0.0),
+            stddev_ms=_float_env("FAKE_LLM_LATENCY_STDDEV_MS", 0.0),
+        ),
+        "faults": FaultInjector(
+            error_rate=_float_env("FAKE_LLM_ERROR_RATE", 0.0),
+            rate_limit_rate=_float_env("FAKE_LLM_RATE_LIMIT_RATE", 0.0),
+            malformed_rate=_float_env("FAKE_LLM_MALFORMED_RATE", 0.0),
+        ),
+        "seed": int(seed_raw) if seed_raw and seed_raw.strip() else None,
+    }
+    if name == "replay":
+        strict = os.getenv("ADK_REPLAY_STRICT", "false").lower() in {"1", "true", "yes"}
+        return ReplayBackend(replay_dir, strict=strict, **fake_kwargs)
+    return SyntheticBackend(**fake_kwargs)
@@ -0,0 +1,403 @@
+"""
+Deterministic network performance analysis.
+
+The recorder emits ``requestWillBeSent`` (``payload.type == "request"``),
+response and ``loadingFailed`` (``payload.type == "failed"``) events that
+share a ``requestId``. They are paired into requests with a start, an end and
+a status, stored as parallel columns, and grouped per endpoint (method plus
+``url_pattern``). A ``duration`` in milliseconds on the response, when the
+recorder includes one, takes precedence over the paired timestamps.
+
+From those columns the analyzer derives:
+
+- latency percentiles and error rates per endpoint
+- retry storms: bursts of calls to one endpoint, most of them failing
+- waterfall concurrency: the most requests in flight at once, per host
+- slow outliers: single requests far slower than their endpoint's median
+
+Findings come back as issues in the agents' shape, and as a compact table
+the log agent reads in place of the raw request list.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+from ai.core.config import settings
+from ai.services.correlation import parse_ts
+from ai.tools.event_tools import url_pattern
+
+
+def percentile(values: Sequence[float], q: float) -> Optional[float]:
+    """``q``-th percentile (0..100) of sorted ``values``, linearly interpolated."""
+    if not values:
+        return None
+    position = (len(values) - 1) * q / 100.0
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def _ms(value: Optional[float]) -> Optional[int]:
+    return None if value is None else int(round(value))
+
+
+@dataclass
+class RequestColumns:
+    """Paired requests as parallel lists; row ``i`` is one request."""
+
+    ids: List[str] = field(default_factory=list)
+    endpoints: List[str] = field(default_factory=list)
+    hosts: List[str] = field(default_factory=list)
+    urls: List[str] = field(default_factory=list)
+    ts: List[Any] = field(default_factory=list)
+    starts: List[Optional[float]] = field(default_factory=list)
+    ends: List[Optional[float]] = field(default_factory=list)
+    durations: List[Optional[float]] = field(default_factory=list)
+    statuses: List[Optional[int]] = field(default_factory=list)
+    failed: List[bool] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def bad(self, row: int) -> bool:
+        status = self.statuses[row]
+        return self.failed[row] or (status is not None and status >= 400)
+
+    @classmethod
+    def from_events(cls, events: Sequence[Dict[str, Any]]) -> "RequestColumns":
+        columns = cls()
+        rows: Dict[str, int] = {}
+        patterns: Dict[str, str] = {}  # url -> url_pattern; pages hit the same URLs over and over
+        for event in events:
+            if event.get("type") != "network":
+                continue
+            payload = event.get("payload") or {}
+            request_id = payload.get("requestId")
+            key = str(request_id) if request_id is not None else f"anon-{len(columns)}"
+            at = parse_ts(event.get("ts"))
+            url = str(payload.get("url") or "")
+            pattern = patterns.get(url)
+            if pattern is None:
+                pattern = patterns[url] = url_pattern(url)
+            row = rows.get(key)
+            if row is None:
+                row = rows[key] = columns._append(key, url, pattern, payload)
+            kind = payload.get("type")
+            if kind == "request":
+                # redirects reuse the id; keep the first start so the chain counts as one request
+                if columns.starts[row] is None:
+                    columns.starts[row] = at
+                    columns.ts[row] = event.get("ts")
+                method = str(payload.get("method") or "").upper()
+                if method:
+                    columns.endpoints[row] = f"{method} {pattern}"
+                continue
+            columns.ends[row] = at
+            if kind == "failed":
+                columns.failed[row] = not payload.get("canceled")
+            else:
+                status = payload.get("status")
+                columns.statuses[row] = int(status) if isinstance(status, (int, float)) else None
+            duration = payload.get("duration")
+            if isinstance(duration, (int, float)):
+                columns.durations[row] = float(duration)
+            if columns.ts[row] is None:
+                columns.ts[row] = event.get("ts")
+
+        for row in range(len(columns)):
+            start, end = columns.starts[row], columns.ends[row]
+            if (
+                columns.durations[row] is None
+                and start is not None
+                and end is not None
+                and end >= start
+            ):
+                columns.durations[row] = (end - start) * 1000.0
+        return columns
+
+    def _append(self, key: str, url: str, pattern: str, payload: Dict[str, Any]) -> int:
+        method = str(payload.get("method") or "").upper()
+        self.ids.append(key)
+        self.endpoints.append(f"{method} {pattern}" if method else pattern)
+        self.hosts.append(pattern.split("/", 1)[0])
+        self.urls.append(url)
+        self.ts.append(None)
+        self.starts.append(None)
+        self.ends.append(None)
+        self.durations.append(None)
+        self.statuses.append(None)
+        self.failed.append(False)
+        return len(self.ids) - 1
+
+
+@dataclass
+class NetworkReport:
+    requests: int = 0
+    endpoints: List[Dict[str, Any]] = field(default_factory=list)
+    retry_storms: List[Dict[str, Any]] = field(default_factory=list)
+    concurrency: Dict[str, Any] = field(default_factory=dict)
+    outliers: List[Dict[str, Any]] = field(default_factory=list)
+    issues: List[Dict[str, Any]] = field(default_factory=list)
+    evidence: List[Dict[str, Any]] = field(default_factory=list)
+
+    def table(self, rows: int = 20) -> str:
+        """Per-endpoint stats, slowest p90 first, one pipe-separated line each."""
+        ranked = sorted(
+            self.endpoints,
+            key=lambda entry: (-(entry["p90_ms"] or -1), -entry["errors"], -entry["count"]),
+        )
+        lines = ["endpoint | n | err | p50 ms | p90 ms | p99 ms | max ms"]
+        for entry in ranked[:rows]:
+            cells = [entry["p50_ms"], entry["p90_ms"], entry["p99_ms"], entry["max_ms"]]
+            lines.append(
+                f"{entry['endpoint']} | {entry['count']} | {entry['errors']} | "
+                + " | ".join("-" if cell is None else str(cell) for cell in cells)
+            )
+        if len(ranked) > rows:
+            lines.append(f"(+{len(ranked) - rows} more endpoints)")
+        return "\n".join(lines)
+
+    def prompt_summary(self, rows: int = 20) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "table": self.table(rows),
+            **({"peak_concurrency": self.concurrency} if self.concurrency.get("in_flight") else {}),
+            **({"retry_storms": self.retry_storms} if self.retry_storms else {}),
+            **({"slow_requests": self.outliers} if self.outliers else {}),
+        }
+
+
+class NetworkAnalyzer:
+    def __init__(
+        self,
+        slow_ms: float = 1000.0,
+        outlier_factor: float = 3.0,
+        storm_count: int = 5,
+        storm_seconds: float = 10.0,
+        max_concurrency: int = 16,
+        min_error_rate: float = 0.5,
+        max_outliers: int = 5,
+    ) -> None:
+        self.slow_ms = slow_ms
+        self.outlier_factor = outlier_factor
+        self.storm_count = storm_count
+        self.storm_seconds = storm_seconds
+        self.max_concurrency = max_concurrency
+        self.min_error_rate = min_error_rate
+        self.max_outliers = max_outliers
+
+    @classmethod
+    def from_settings(cls) -> "NetworkAnalyzer":
+        return cls(
+            slow_ms=settings.network_slow_ms,
+            storm_count=settings.network_retry_storm_count,
+            storm_seconds=settings.network_retry_storm_seconds,
+            max_concurrency=settings.network_max_concurrency,
+        )
+
+    def analyze(self, events: Sequence[Dict[str, Any]]) -> NetworkReport:
+        columns = RequestColumns.from_events(events)
+        report = NetworkReport(requests=len(columns))
+        if not columns:
+            return report
+
+        groups: Dict[str, List[int]] = {}
+        for row, endpoint in enumerate(columns.endpoints):
+            groups.setdefault(endpoint, []).append(row)
+
+        medians: Dict[str, Optional[float]] = {}
+        for endpoint, rows in groups.items():
+            stats = self._endpoint_stats(columns, endpoint, rows)
+            medians[endpoint] = stats.pop("_median")
+            report.endpoints.append(stats)
+            storm = self._retry_storm(columns, endpoint, rows)
+            if storm:
+                report.retry_storms.append(storm)
+
+        report.concurrency = self._concurrency(columns)
+        report.outliers = self._outliers(columns, medians)
+        self._issues(report)
+        return report
+
+    def _endpoint_stats(
+        self, columns: RequestColumns, endpoint: str, rows: List[int]
+    ) -> Dict[str, Any]:
+        durations = sorted(d for d in (columns.durations[row] for row in rows) if d is not None)
+        errors = sum(1 for row in rows if columns.bad(row))
+        return {
+            "endpoint": endpoint,
+            "count": len(rows),
+            "errors": errors,
+            "error_rate": round(errors / len(rows), 3),
+            "timed": len(durations),
+            "p50_ms": _ms(percentile(durations, 50)),
+            "p90_ms": _ms(percentile(durations, 90)),
+            "p99_ms": _ms(percentile(durations, 99)),
+            "max_ms": _ms(durations[-1] if durations else None),
+            "first_ts": columns.ts[rows[0]],
+            "url": columns.urls[rows[0]],
+            "_median": percentile(durations, 50),
+        }
+
+    def _retry_storm(
+        self, columns: RequestColumns, endpoint: str, rows: List[int]
+    ) -> Optional[Dict[str, Any]]:
+        timed = sorted(
+            (at, row)
+            for row in rows
+            if (at := columns.starts[row] if columns.starts[row] is not None else columns.ends[row])
+            is not None
+        )
+        if len(timed) < self.storm_count:
+            return None
+        bad = [0]
+        for _, row in timed:
+            bad.append(bad[-1] + (1 if columns.bad(row) or columns.ends[row] is None else 0))
+        best: Optional[Dict[str, Any]] = None
+        lo = 0
+        for hi in range(len(timed)):
+            while timed[hi][0] - timed[lo][0] > self.storm_seconds:
+                lo += 1
+            count = hi - lo + 1
+            failing = bad[hi + 1] - bad[lo]
+            # polling and type-ahead succeed; a storm is a burst where most calls fail or never
+            # answer
+            if (
+                count >= self.storm_count
+                and failing * 2 >= count
+                and (best is None or count > best["count"])
+            ):
+                best = {
+                    "endpoint": endpoint,
+                    "count": count,
+                    "failing": failing,
+                    "seconds": round(timed[hi][0] - timed[lo][0], 3),
+                    "first_ts": columns.ts[timed[lo][1]],
+                }
+        return best
+
+    def _concurrency(self, columns: RequestColumns) -> Dict[str, Any]:
+        # sweep line over (time, +1/-1); ends sort before starts at the same instant
+        edges: Dict[str, List[Any]] = {}
+        for row in range(len(columns)):
+            start, end = columns.starts[row], columns.ends[row]
+            if start is None or end is None or end < start:
+                continue
+            host_edges = edges.setdefault(columns.hosts[row], [])
+            host_edges.append((start, 1, row))
+            host_edges.append((end, -1, row))
+        peak: Dict[str, Any] = {"in_flight": 0, "host": None, "ts": None}
+        for host, host_edges in edges.items():
+            host_edges.sort(key=lambda edge: (edge[0], edge[1]))
+            in_flight = 0
+            for _, delta, row in host_edges:
+                in_flight += delta
+                if in_flight > peak["in_flight"]:
+                    peak = {"in_flight": in_flight, "host": host, "ts": columns.ts[row]}
+        return peak
+
+    def _outliers(
+        self, columns: RequestColumns, medians: Dict[str, Optional[float]]
+    ) -> List[Dict[str, Any]]:
+        found = []
+        for row, duration in enumerate(columns.durations):
+            if duration is None or duration < self.slow_ms:
+                continue
+            median = medians.get(columns.endpoints[row])
+            if median is not None and duration < median * self.outlier_factor:
+                continue
+            found.append(
+                {
+                    "endpoint": columns.endpoints[row],
+                    "url": columns.urls[row],
+                    "duration_ms": _ms(duration),
+                    "median_ms": _ms(median),
+                    "status": columns.statuses[row],
+                    "ts": columns.ts[row],
+                }
+            )
+        found.sort(key=lambda entry: entry["duration_ms"], reverse=True)
+        return found[: self.max_outliers]
+
+    def _issues(self, report: NetworkReport) -> None:
+        def add(title: str, severity: str, detail: str, ts: Any, url: str) -> None:
+            report.issues.append(
+                {
+                    "title": title,
+                    "severity": severity,
+                    "detail": detail,
+                    "ts": ts,
+                    "source": "network",
+                    "category": "performance",
+                }
+            )
+            report.evidence.append({"type": "network", "url": url, "message": detail, "ts": ts})
+
+        for entry in report.endpoints:
+            p90 = entry["p90_ms"]
+            if p90 is not None and p90 >= self.slow_ms and entry["timed"] >= 2:
+                severity = "high" if p90 >= self.slow_ms * 3 else "medium"
+                detail = (
+                    f"p50 {entry['p50_ms']} ms, p90 {p90} ms, max {entry['max_ms']} ms "
+                    f"over {entry['timed']} requests"
+                )
+                add(
+                    f"Slow endpoint {entry['endpoint']}",
+                    severity,
+                    detail,
+                    entry["first_ts"],
+                    entry["url"],
+                )
+            if entry["errors"] >= 2 and entry["error_rate"] >= self.min_error_rate:
+                severity = "high" if entry["errors"] == entry["count"] else "medium"
+                detail = f"{entry['errors']} of {entry['count']} requests failed"
+                add(
+                    f"{entry['endpoint']} fails {round(entry['error_rate'] * 100)}% of requests",
+                    severity,
+                    detail,
+                    entry["first_ts"],
+                    entry["url"],
+                )
+
+        for storm in report.retry_storms:
+            detail = (
+                f"{storm['count']} calls in {storm['seconds']} s, "
+                f"{storm['failing']} failed or unanswered"
+            )
+            add(
+                f"Retry storm on {storm['endpoint']}",
+                "high",
+                detail,
+                storm["first_ts"],
+                storm["endpoint"],
+            )
+
+        peak = report.concurrency
+        if peak.get("in_flight", 0) > self.max_concurrency:
+            detail = f"{peak['in_flight']} requests to {peak['host']} in flight at once"
+            add(
+                f"Request waterfall congestion on {peak['host']}",
+                "low",
+                detail,
+                peak["ts"],
+                peak["host"],
+            )
+
+        slow_endpoints = {
+            entry["endpoint"]
+            for entry in report.endpoints
+            if (entry["p90_ms"] or 0) >= self.slow_ms
+        }
+        for outlier in report.outliers:
+            if outlier["endpoint"] in slow_endpoints:
+                continue  # already reported as a slow endpoint
+            median = (
+                f" (median {outlier['median_ms']} ms)" if outlier["median_ms"] is not None else ""
+            )
+            detail = f"{outlier['duration_ms']} ms{median}"
+            add(f"Slow request {outlier['endpoint']}", "low", detail, outlier["ts"], outlier["url"])
+
+
+def analyze_network(events: Sequence[Dict[str, Any]]) -> NetworkReport:
+    return NetworkAnalyzer.from_settings().analyze(events)
@@ -5,9 +5,19 @@ Provides both stub (non-LLM) and ADK-powered analysis depending on configuration
 """
 from __future__ import annotations
 
+import asyncio
+import logging
 import os
+import time
 from dataclasses import dataclass
-from typing import Any, Dict, List
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from ai.core.profiling import stage
+from ai.services.circuit import CircuitBreakers
+from ai.services.live import LiveSessionRegistry
+from ai.services.rules import Finding
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -40,32 +50,40 @@ class BaseAgent:
 class LogAnalyst(BaseAgent):
     name = "log_analyst"
 
-    def run(self, session: Dict[str, Any], chunk: Dict[str, Any], events: List[Dict[str, Any]]) -> AgentResult:
-        from ai.tools.event_tools import extract_error_events
+    def __init__(self) -> None:
+        # imported here: network_perf -> correlation -> this module
+        from ai.services.network_perf import NetworkAnalyzer
+
+        self.network = NetworkAnalyzer.from_settings()
+
+    def run(
+        self,
+        session: Dict[str, Any],
+        chunk: Dict[str, Any],
+        events: List[Dict[str, Any]],
+        findings: Optional[Dict[str, Finding]] = None,
+    ) -> AgentResult:
+        """``findings`` holds per-event results precomputed while the session was live."""
+        from ai.services.rules import default_engine
+        from ai.tools.event_tools import event_key, extract_error_events
         
         issues: List[Dict[str, Any]] = []
         evidence: List[Dict[str, Any]] = []
         
-        for event in extract_error_events(events):
-            if event.get("type") == "console":
-                message = str(event.get("payload", {}).get("message", ""))
-                issues.append({
-                    "title": "Console error detected",
-                    "severity": "medium",
-                    "detail": message,
-                    "ts": event.get("ts"),
-                })
-                evidence.append({"type": "console", "message": message, "ts": event.get("ts")})
-            elif event.get("type") == "network":
-                status = event.get("payload", {}).get("status")
-                url = event.get("payload", {}).get("url", "")
-                issues.append({
-                    "title": "Network error detected",
-                    "severity": "medium",
-                    "detail": f"{status} {url}",
-                    "ts": event.get("ts"),
-                })
-                evidence.append({"type": "network", "status": status, "url": url, "ts": event.get("ts")})
+        # only rules with "match": "all" look beyond error events
+        engine = default_engine()
+        candidates = events if engine.match_all else extract_error_events(events)
+        for event in candidates:
+            finding = findings.get(event_key(event)) if findings else None
+            if finding is None:
+                finding = engine.finding(event)
+            if finding is not None:
+                issues.append(finding[0])
+                evidence.append(finding[1])
+
+        network = self.network.analyze(events)
+        issues.extend(network.issues)
+        evidence.extend(network.evidence)
 
         summary = "No console errors detected." if not issues else "Console errors detected in this chunk."
         return AgentResult(self.name, summary, issues, evidence, [])
@@ -118,8 +136,20 @@ class StubOrchestrator:
         self.agents = [LogAnalyst(), VideoAnalyst(), ReproPlanner(), Synthesizer()]
         self.use_llm = bool(os.getenv("GEMINI_API_KEY"))
 
-    def analyze_chunk(self, session: Dict[str, Any], chunk: Dict[str, Any], events: List[Dict[str, Any]]) -> Dict[str, Any]:
-        results = [agent.run(session, chunk, events) for agent in self.agents]
+    def analyze_chunk(
+        self,
+        session: Dict[str, Any],
+        chunk: Dict[str, Any],
+        events: List[Dict[str, Any]],
+        findings: Optional[Dict[str, Finding]] = None,
+    ) -> Dict[str, Any]:
+        results: List[AgentResult] = []
+        for agent in self.agents:
+            with stage(f"agent.{agent.name}"):
+                if isinstance(agent, LogAnalyst):
+                    results.append(agent.run(session, chunk, events, findings))
+                else:
+                    results.append(agent.run(session, chunk, events))
         issues = [issue for result in results for issue in result.issues]
         evidence = [item for result in results for item in result.evidence]
         steps = [step for result in results for step in result.steps]
@@ -176,21 +206,35 @@ class StubOrchestrator:
 
 
 def _should_use_adk() -> bool:
-    """Check if ADK should be enabled based on environment."""
+    """Check if ADK should be enabled based on environment.
+
+    Fake model backends (replay/synthetic) do not need an API key.
+    """
     adk_enabled = os.getenv("ADK_ENABLED", "true").lower() in {"1", "true", "yes"}
     google_key = os.getenv("GOOGLE_API_KEY")
     gemini_key = os.getenv("GEMINI_API_KEY")
     if not google_key and gemini_key:
         os.environ["GOOGLE_API_KEY"] = gemini_key
         google_key = gemini_key
-    return adk_enabled and bool(google_key)
+    fake_backend = os.getenv("ADK_MODEL_BACKEND", "live").strip().lower() in {"replay", "synthetic"}
+    return adk_enabled and (bool(google_key) or fake_backend)
 
 
 class Orchestrator:
-    """Main orchestrator that delegates to ADK or stub implementation."""
+    """Main orchestrator that delegates to ADK or stub implementation.
+
+    ADK calls go through a per-operation circuit breaker (see :mod:`ai.services.circuit`);
+    when it is open, or a call fails, the stub result is returned tagged ``degraded``.
+    """
     
     def __init__(self) -> None:
         self.stub = StubOrchestrator()
+        self.live = LiveSessionRegistry.from_settings()
+        self.circuits = CircuitBreakers.from_settings()
+        # imported here: anomaly -> correlation -> this module
+        from ai.services.anomaly import AnomalyDetector
+
+        self.anomalies = AnomalyDetector.from_settings()
         self.adk = None
         if _should_use_adk():
             try:
@@ -199,15 +243,78 @@ class Orchestrator:
             except Exception:
                 self.adk = None
 
-    def analyze_chunk(self, session: Dict[str, Any], chunk: Dict[str, Any], events: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def warm(self) -> None:
+        """Pay ADK start-up costs now instead of on the first request."""
         if self.adk:
-            return self.adk.analyze_chunk(session, chunk, events)
-        return self.stub.analyze_chunk(session, chunk, events)
+            self.adk.warm()
 
-    def aggregate_session(self, session: Dict[str, Any], chunk_reports: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def ingest_events(self, session_id: str, events: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Feed a live event delta; see :mod:`ai.services.live`."""
+        return self.live.ingest(session_id, events)
+
+    def prioritize(
+        self, session: Dict[str, Any], chunks: List[Tuple[Dict[str, Any], List[Dict[str, Any]]]]
+    ) -> Dict[str, Any]:
+        """Bursts and a chunk priority queue for a session; see :mod:`ai.services.anomaly`."""
+        with stage("anomaly.detect"):
+            result = self.anomalies.detect(chunks)
+        session_id = session.get("id") if isinstance(session, dict) else None
+        return {"session_id": session_id, **result.as_dict()}
+
+    def analyze_chunk(self, session: Dict[str, Any], chunk: Dict[str, Any], events: List[Dict[str, Any]]) -> Dict[str, Any]:
+        session_id = session.get("id") if isinstance(session, dict) else None
+        findings = self.live.take_findings(session_id, events)
+        if self.adk:
+            live = self.live.get(session_id)
+            clusters = live.top_clusters(limit=20) if live else None
+            return self._guarded(
+                "analyze",
+                lambda: self.adk.analyze_chunk_async(session, chunk, events, clusters, findings),
+                lambda: self.stub.analyze_chunk(session, chunk, events, findings),
+            )
+        return self.stub.analyze_chunk(session, chunk, events, findings)
+
+    def aggregate_session(
+        self,
+        session: Dict[str, Any],
+        chunk_reports: List[Dict[str, Any]],
+        chunk_ids: Optional[List[str]] = None,
+        version: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """``chunk_ids``/``version`` select the delta protocol of :mod:`ai.services.aggregation`."""
         if self.adk:
-            return self.adk.aggregate_session(session, chunk_reports)
-        return self.stub.aggregate_session(session, chunk_reports)
+            return self._guarded(
+                "aggregate",
+                lambda: self.adk.aggregate_session_async(
+                    session, chunk_reports, chunk_ids, version
+                ),
+                lambda: self._stub_aggregate(
+                    session, chunk_reports, chunk_ids, self._checkpoint(session)
+                ),
+            )
+        return self._stub_aggregate(session, chunk_reports, chunk_ids)
+
+    def _stub_aggregate(
+        self,
+        session: Dict[str, Any],
+        chunk_reports: List[Dict[str, Any]],
+        chunk_ids: Optional[List[str]] = None,
+        checkpoint: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """``checkpoint`` supplies stored reports when ADK is degraded; the stub keeps none."""
+        if chunk_ids is None:
+            if not chunk_reports and checkpoint:
+                chunk_reports = checkpoint.get("chunk_reports") or []
+            return self.stub.aggregate_session(session, chunk_reports)
+        # without a checkpoint every requested report must be supplied
+        from ai.services.aggregation import missing_response, reconcile
+
+        session_id = session.get("id") if isinstance(session, dict) else None
+        reconciled = reconcile(checkpoint or {}, chunk_ids, chunk_reports)
+        if reconciled.missing:
+            return missing_response(session_id, reconciled.missing)
+        aggregated = self.stub.aggregate_session(session, reconciled.reports)
+        return {**aggregated, "version": reconciled.version}
 
     def chat(
         self,
@@ -221,9 +328,58 @@ class Orchestrator:
         images: List[Dict[str, Any]] | None = None
     ) -> Dict[str, Any]:
         if self.adk:
-            return self.adk.chat(session, analysis, events, message, mode, model, resources, images)
+            # canned summarize/triage questions are answered from the checkpoint's materialized view
+            cached = self.adk.view_reply(session, message, mode, model, resources, images)
+            if cached is not None:
+                return cached
+            return self._guarded(
+                "chat",
+                lambda: self.adk.chat_async(
+                    session, analysis, events, message, mode, model, resources, images
+                ),
+                lambda: self._stub_chat(
+                    session, analysis, events, message, mode, model, resources, images,
+                    notice="The analysis model is unavailable right now. ",
+                ),
+            )
         return self._stub_chat(session, analysis, events, message, mode, model, resources, images)
 
+    def _guarded(
+        self,
+        operation: str,
+        call: Callable[[], Awaitable[Dict[str, Any]]],
+        fallback: Callable[[], Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """Run an ADK coroutine behind ``operation``'s breaker, degrading to ``fallback``."""
+        breaker = self.circuits[operation]
+        if not breaker.allow():
+            return _degraded(fallback(), "circuit_open")
+        timeout = self.circuits.timeout_seconds or None
+        start = time.perf_counter()
+        try:
+            result = self.adk._run_sync(asyncio.wait_for(call(), timeout))
+        except asyncio.TimeoutError:
+            breaker.record(False, time.perf_counter() - start, "timeout")
+            logger.warning(
+                "ADK %s timed out after %ss; serving the stub result", operation, timeout
+            )
+            return _degraded(fallback(), "timeout")
+        except Exception:
+            breaker.record(False, time.perf_counter() - start)
+            logger.exception("ADK %s failed; serving the stub result", operation)
+            return _degraded(fallback(), "error")
+        breaker.record(True, time.perf_counter() - start)
+        return result
+
+    def _checkpoint(self, session: Dict[str, Any]) -> Dict[str, Any]:
+        session_id = session.get("id") if isinstance(session, dict) else None
+        if not session_id:
+            return {}
+        try:
+            return self.adk.checkpoints.load(session_id)
+        except Exception:
+            return {}
+
     def _stub_chat(
         self,
         session: Dict[str, Any],
@@ -233,10 +389,11 @@ class Orchestrator:
         mode: str,
         model: str,
         _resources: List[Dict[str, Any]] | None = None,
-        _images: List[Dict[str, Any]] | None = None
+        _images: List[Dict[str, Any]] | None = None,
+        notice: str = "ADK is disabled. ",
     ) -> Dict[str, Any]:
         summary = analysis.get("summary") if isinstance(analysis, dict) else None
-        response = "ADK is disabled. "
+        response = notice
         if summary:
             response += f"Latest analysis summary: {summary}"
         else:
@@ -248,3 +405,8 @@ class Orchestrator:
             "session_id": session.get("id") if isinstance(session, dict) else None,
             "message": message
         }
+
+
+def _degraded(result: Dict[str, Any], reason: str) -> Dict[str, Any]:
+    """Tag a stub result served in place of ADK, so the caller can queue re-analysis."""
+    return {**result, "degraded": True, "degraded_reason": reason}
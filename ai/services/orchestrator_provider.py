@@ -1,10 +1,39 @@
 from __future__ import annotations
 
+import logging
+import threading
 from functools import lru_cache
+from typing import Any, Dict
 
 from ai.services.orchestrator import Orchestrator
 
+logger = logging.getLogger(__name__)
+_ready = threading.Event()
+
 
 @lru_cache
 def get_orchestrator() -> Orchestrator:
     return Orchestrator()
+
+
+def warm_orchestrator() -> Orchestrator:
+    """Build and prewarm the shared orchestrator, then mark the service ready."""
+    orchestrator = get_orchestrator()
+    try:
+        orchestrator.warm()
+    except Exception:
+        logger.exception("orchestrator prewarm failed; continuing with lazy initialization")
+    _ready.set()
+    return orchestrator
+
+
+def is_ready() -> bool:
+    return _ready.is_set()
+
+
+def circuit_states() -> Dict[str, Dict[str, Any]]:
+    """ADK breaker state per operation; empty until the orchestrator exists or when ADK is off."""
+    if not get_orchestrator.cache_info().currsize:
+        return {}
+    orchestrator = get_orchestrator()
+    return orchestrator.circuits.snapshot() if orchestrator.adk else {}
@@ -0,0 +1,117 @@
+"""Helpers for reshaping analysis reports without changing their content."""
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, List, Optional
+
+# agent list key -> report list key it duplicates, and the compact reference key
+AGENT_REF_KEYS = {
+    "issues": ("issues", "issue_refs"),
+    "evidence": ("evidence", "evidence_refs"),
+    "repro_steps": ("repro_steps", "repro_step_refs"),
+    "steps": ("repro_steps", "step_refs"),
+}
+
+
+def _item_key(item: Any) -> str:
+    return json.dumps(item, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+
+
+def _index_refs(items: List[Any], pool: List[Any]) -> Optional[List[int]]:
+    """Map every item to its index in ``pool``, or None if any item is missing."""
+    by_id = {id(entry): idx for idx, entry in enumerate(pool)}
+    by_value: Optional[Dict[str, int]] = None
+    refs: List[int] = []
+    for item in items:
+        idx = by_id.get(id(item))
+        if idx is None:
+            if by_value is None:
+                by_value = {}
+                for pos, entry in enumerate(pool):
+                    by_value.setdefault(_item_key(entry), pos)
+            idx = by_value.get(_item_key(item))
+            if idx is None:
+                return None
+        refs.append(idx)
+    return refs
+
+
+def compact_agents(report: Dict[str, Any]) -> Dict[str, Any]:
+    """Replace agent-level copies of report items with index references.
+
+    ``agents[i]["issues"]`` becomes ``agents[i]["issue_refs"]`` (indices into
+    ``report["issues"]``), and likewise for evidence and repro steps. Lists that
+    contain anything not present in the report are kept as-is.
+    """
+    agents = report.get("agents")
+    if not isinstance(agents, list) or not agents:
+        return report
+    compacted: List[Any] = []
+    for agent in agents:
+        if not isinstance(agent, dict):
+            compacted.append(agent)
+            continue
+        agent = dict(agent)
+        for agent_key, (report_key, ref_key) in AGENT_REF_KEYS.items():
+            items = agent.get(agent_key)
+            pool = report.get(report_key)
+            if not isinstance(items, list) or not isinstance(pool, list) or ref_key in agent:
+                continue
+            refs = _index_refs(items, pool)
+            if refs is not None:
+                del agent[agent_key]
+                agent[ref_key] = refs
+        compacted.append(agent)
+    return {**report, "agents": compacted}
+
+
+def expand_agents(report: Dict[str, Any]) -> Dict[str, Any]:
+    """Inverse of :func:`compact_agents`."""
+    agents = report.get("agents")
+    if not isinstance(agents, list) or not agents:
+        return report
+    expanded: List[Any] = []
+    for agent in agents:
+        if not isinstance(agent, dict):
+            expanded.append(agent)
+            continue
+        agent = dict(agent)
+        for agent_key, (report_key, ref_key) in AGENT_REF_KEYS.items():
+            refs = agent.pop(ref_key, None)
+            if refs is None:
+                continue
+            pool = report.get(report_key) or []
+            agent[agent_key] = [pool[idx] for idx in refs if 0 <= idx < len(pool)]
+        expanded.append(agent)
+    return {**report, "agents": expanded}
+
+
+def report_counts(report: Dict[str, Any]) -> Dict[str, int]:
+    counts = {}
+    for key in ("issues", "evidence", "repro_steps", "top_issues", "agents"):
+        value = report.get(key)
+        if isinstance(value, list):
+            counts[key] = len(value)
+    return counts
+
+
+def project_report(report: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+    """Keep only ``fields`` of ``report``; ``counts`` is a computed field."""
+    projected = {key: report[key] for key in fields if key in report}
+    if "counts" in fields and "counts" not in report:
+        projected["counts"] = report_counts(report)
+    return projected
+
+
+def compact_report(report: Dict[str, Any]) -> Dict[str, Any]:
+    """Compact response shape: agents and ``top_issues`` reference ``issues`` by index."""
+    report = compact_agents(report)
+    top_issues = report.get("top_issues")
+    issues = report.get("issues")
+    if isinstance(top_issues, list) and isinstance(issues, list):
+        refs = _index_refs(top_issues, issues)
+        if refs is not None:
+            report = dict(report)
+            del report["top_issues"]
+            report["top_issue_refs"] = refs
+    return report
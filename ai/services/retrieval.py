@@ -0,0 +1,305 @@
+"""
+Per-session BM25 retrieval for chat context selection.
+
+Events (via ``_event_text``), issues, evidence, repro steps and resource text
+are indexed once per session snapshot and cached. Each chat message then gets
+the top-k matching items, packed under a token budget, instead of the last
+300 events and the full analysis.
+"""
+from __future__ import annotations
+
+import heapq
+import json
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from ai.core.config import settings
+from ai.services.orchestrator import _event_text
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_CAMEL = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+_STOPWORDS = frozenset(
+    "a an and are as at be by do does for from has have how i in is it its of on or that the "
+    "this to was were what when where which who why with you".split()
+)
+_PASSAGE_CHARS = 600
+
+# chat context key -> document kinds packed under it
+CONTEXT_KEYS = {
+    "event": "events",
+    "issue": "issues",
+    "evidence": "evidence",
+    "repro_step": "repro_steps",
+    "resource": "resources",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens; camelCase and snake_case identifiers are split."""
+    return [
+        token
+        for token in _TOKEN.findall(_CAMEL.sub(" ", text).lower())
+        if len(token) > 1 and token not in _STOPWORDS
+    ]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough model token count (about four characters per token)."""
+    return len(text) // 4 + 1
+
+
+@dataclass
+class Document:
+    kind: str
+    text: str
+    item: Any
+    order: int = 0
+
+
+@dataclass
+class BM25Index:
+    documents: List[Document]
+    k1: float = 1.5
+    b: float = 0.75
+    postings: Dict[str, List[Tuple[int, int]]] = field(default_factory=dict)
+    lengths: List[int] = field(default_factory=list)
+    avg_length: float = 0.0
+
+    def __post_init__(self) -> None:
+        for doc_id, document in enumerate(self.documents):
+            counts: Dict[str, int] = {}
+            tokens = tokenize(document.text)
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, count in counts.items():
+                self.postings.setdefault(token, []).append((doc_id, count))
+            self.lengths.append(len(tokens))
+        self.avg_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+
+    def search(self, query: str, k: int = 50) -> List[Tuple[float, Document]]:
+        total = len(self.documents)
+        scores: Dict[int, float] = {}
+        for token in set(tokenize(query)):
+            postings = self.postings.get(token)
+            if not postings:
+                continue
+            idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, tf in postings:
+                norm = 1 - self.b + self.b * self.lengths[doc_id] / (self.avg_length or 1.0)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (
+                    tf + self.k1 * norm
+                )
+        best = heapq.nlargest(k, scores.items(), key=lambda entry: (entry[1], entry[0]))
+        return [(score, self.documents[doc_id]) for doc_id, score in best]
+
+
+def _item_text(item: Any) -> str:
+    if isinstance(item, str):
+        return item
+    if isinstance(item, dict):
+        return " ".join(
+            str(value) for value in item.values() if isinstance(value, (str, int, float))
+        )
+    return str(item)
+
+
+def _passages(text: str) -> List[str]:
+    return [text[start : start + _PASSAGE_CHARS] for start in range(0, len(text), _PASSAGE_CHARS)]
+
+
+def build_documents(
+    events: Iterable[Dict[str, Any]],
+    analysis: Optional[Dict[str, Any]],
+    checkpoint: Optional[Dict[str, Any]],
+    resources: Optional[List[Dict[str, Any]]],
+) -> List[Document]:
+    documents: List[Document] = []
+    for order, event in enumerate(events or []):
+        if isinstance(event, dict):
+            level = event.get("payload", {}).get("level", "")
+            text = f"{event.get('type')} {level} {_event_text(event)}"
+            documents.append(Document("event", text, event, order))
+
+    seen: set = set()
+    for source in (analysis or {}, checkpoint or {}):
+        for kind, key in (
+            ("issue", "issues"),
+            ("evidence", "evidence"),
+            ("repro_step", "repro_steps"),
+        ):
+            for item in source.get(key) or []:
+                marker = json.dumps(item, sort_keys=True, default=str)
+                if marker in seen:
+                    continue
+                seen.add(marker)
+                documents.append(Document(kind, _item_text(item), item, len(documents)))
+
+    for resource in resources or []:
+        if not isinstance(resource, dict):
+            continue
+        body = str(resource.get("text") or resource.get("content") or "")
+        if not body:
+            continue
+        label = " ".join(str(resource.get(key) or "") for key in ("id", "type", "label"))
+        for passage in _passages(body):
+            item = {key: value for key, value in resource.items() if key not in {"text", "content"}}
+            item["text"] = passage
+            documents.append(Document("resource", f"{label} {passage}", item, len(documents)))
+    return documents
+
+
+def pack_context(
+    hits: List[Tuple[float, Document]],
+    budget_tokens: int,
+    pinned: Optional[List[Document]] = None,
+) -> Dict[str, Any]:
+    """Fill ``budget_tokens`` with pinned documents first, then hits by score."""
+    packed: Dict[str, List[Any]] = {key: [] for key in CONTEXT_KEYS.values()}
+    used = 0
+    chosen: set = set()
+    for document in list(pinned or []) + [document for _, document in hits]:
+        if id(document) in chosen:
+            continue
+        cost = estimate_tokens(json.dumps(document.item, ensure_ascii=False, default=str))
+        if used + cost > budget_tokens:
+            continue
+        chosen.add(id(document))
+        used += cost
+        packed[CONTEXT_KEYS[document.kind]].append(document)
+    context: Dict[str, Any] = {
+        key: [document.item for document in sorted(documents, key=lambda document: document.order)]
+        for key, documents in packed.items()
+        if documents
+    }
+    context["token_estimate"] = used
+    return context
+
+
+@dataclass
+class SessionIndex:
+    index: BM25Index
+    recent_events: List[Document]
+    signature: Tuple[Any, ...]
+    built_at: float
+
+
+def session_signature(
+    session_id: Optional[str],
+    events: List[Dict[str, Any]],
+    analysis: Optional[Dict[str, Any]],
+    checkpoint: Optional[Dict[str, Any]],
+    resources: Optional[List[Dict[str, Any]]],
+) -> Tuple[Any, ...]:
+    """Cheap identity of the indexed content; any change triggers a rebuild."""
+    last = events[-1] if events else {}
+    analysis = analysis or {}
+    return (
+        session_id,
+        len(events),
+        last.get("id") if isinstance(last, dict) else None,
+        last.get("ts") if isinstance(last, dict) else None,
+        len(analysis.get("issues") or []),
+        analysis.get("summary"),
+        (checkpoint or {}).get("updated_at"),
+        # only resources carrying text are indexed; bare mentions just steer the query
+        json.dumps(
+            [
+                resource
+                for resource in resources or []
+                if isinstance(resource, dict) and (resource.get("text") or resource.get("content"))
+            ],
+            sort_keys=True,
+            default=str,
+        ),
+    )
+
+
+class RetrievalCache:
+    """LRU + TTL cache of per-session indexes, built lazily on the first chat."""
+
+    def __init__(
+        self,
+        max_sessions: int = 64,
+        ttl_seconds: float = 900.0,
+        recent_events: int = 20,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.recent_events = recent_events
+        self.clock = clock
+        self._entries: "OrderedDict[Any, SessionIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.builds = 0
+
+    @classmethod
+    def from_settings(cls) -> "RetrievalCache":
+        return cls(
+            max_sessions=settings.retrieval_cache_sessions,
+            ttl_seconds=settings.retrieval_cache_ttl_seconds,
+            recent_events=settings.chat_recent_events,
+        )
+
+    def get(
+        self,
+        session_id: Optional[str],
+        events: List[Dict[str, Any]],
+        analysis: Optional[Dict[str, Any]],
+        checkpoint: Optional[Dict[str, Any]],
+        resources: Optional[List[Dict[str, Any]]],
+    ) -> SessionIndex:
+        events = events if isinstance(events, list) else []
+        signature = session_signature(session_id, events, analysis, checkpoint, resources)
+        key = session_id or signature
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if (
+                entry is not None
+                and entry.signature == signature
+                and now - entry.built_at < self.ttl_seconds
+            ):
+                self._entries.move_to_end(key)
+                return entry
+
+        documents = build_documents(events, analysis, checkpoint, resources)
+        event_documents = [document for document in documents if document.kind == "event"]
+        entry = SessionIndex(
+            BM25Index(documents),
+            event_documents[-self.recent_events :] if self.recent_events else [],
+            signature,
+            now,
+        )
+        with self._lock:
+            self.builds += 1
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_sessions:
+                self._entries.popitem(last=False)
+        return entry
+
+    def context(
+        self,
+        session_id: Optional[str],
+        message: str,
+        events: List[Dict[str, Any]],
+        analysis: Optional[Dict[str, Any]],
+        checkpoint: Optional[Dict[str, Any]],
+        resources: Optional[List[Dict[str, Any]]],
+        top_k: int,
+        budget_tokens: int,
+    ) -> Dict[str, Any]:
+        entry = self.get(session_id, events, analysis, checkpoint, resources)
+        # mentioned resources ("errors", "logs", ...) steer the query toward those items
+        mentions = " ".join(
+            f"{resource.get('type') or ''} {resource.get('label') or ''}"
+            for resource in resources or []
+            if isinstance(resource, dict)
+        )
+        hits = entry.index.search(f"{message} {mentions}", top_k)
+        return pack_context(hits, budget_tokens, pinned=entry.recent_events)
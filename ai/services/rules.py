@@ -0,0 +1,579 @@
+"""
+Deterministic triage rules for console and network events.
+
+A rule pack is a list of rules. Each rule has an ``id``, a ``title`` template,
+a ``severity`` (``low|medium|high``, or ``ignore`` to drop known noise) and a
+``category``. It matches on a case-insensitive ``pattern`` regex, on
+``keywords`` (whole words or phrases), or on filters alone: ``type``
+(``console|network``), ``level`` and ``status`` (``404``, ``[401, 403]`` or
+``"5xx"``). Rules only see error events unless they set ``"match": "all"``.
+When several rules match, the first one in the pack wins.
+
+The pack is compiled once. A single ``re`` alternation of hundreds of
+patterns is slow, because the regex engine tries every branch at every
+position. So each rule is indexed by a literal word it cannot match without
+("anchor"), and a message is tokenized once and only the rules whose anchor
+appears are confirmed with their own regex. Rules without an anchor word are
+prefiltered on a required substring instead; the few with no literal at all
+share one combined alternation. Results are cached per event fingerprint,
+which masks numbers and ids and keeps the first 200 characters of console
+messages, so patterns should not depend on anything outside it.
+"""
+from __future__ import annotations
+
+import json
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Pattern, Tuple
+from urllib.parse import urlsplit
+
+from ai.core.config import settings
+from ai.core.metrics import metrics
+from ai.tools.event_tools import event_fingerprint, event_key, is_error_event
+
+try:  # Python 3.11+
+    from re import _parser as sre_parse
+except ImportError:  # pragma: no cover
+    import sre_parse  # type: ignore[no-redef]
+
+Finding = Tuple[Dict[str, Any], Dict[str, Any]]
+
+SEVERITIES = {"low", "medium", "high", "ignore"}
+EVENT_TYPES = {"console", "network"}
+
+metrics.describe("rule_cache_total", "Rule engine fingerprint cache lookups, by result (hit|miss)")
+
+_WORD = re.compile(r"[a-z0-9_]+")
+
+DEFAULT_RULES: List[Dict[str, Any]] = [
+    {
+        "id": "benign-resize-observer",
+        "keywords": ["ResizeObserver loop"],
+        "severity": "ignore",
+        "category": "noise",
+        "title": "ResizeObserver loop warning",
+    },
+    {
+        "id": "benign-favicon",
+        "type": "network",
+        "status": 404,
+        "pattern": r"/favicon\.ico\b",
+        "severity": "ignore",
+        "category": "noise",
+        "title": "Missing favicon",
+    },
+    {
+        "id": "chunk-load-failed",
+        "keywords": ["ChunkLoadError"],
+        "pattern": r"\bloading (?:css )?chunk \S+ failed\b",
+        "severity": "high",
+        "category": "deployment",
+        "title": "Stale bundle: a code chunk failed to load",
+    },
+    {
+        "id": "out-of-memory",
+        "keywords": ["out of memory", "allocation failed"],
+        "severity": "high",
+        "category": "performance",
+        "title": "Page ran out of memory",
+    },
+    {
+        "id": "unhandled-rejection",
+        "keywords": ["Unhandled Promise Rejection", "unhandledrejection", "Uncaught (in promise)"],
+        "severity": "high",
+        "category": "javascript",
+        "title": "Unhandled promise rejection",
+    },
+    {
+        "id": "type-error",
+        "keywords": ["TypeError"],
+        "severity": "high",
+        "category": "javascript",
+        "title": "{message}",
+    },
+    {
+        "id": "reference-error",
+        "keywords": ["ReferenceError"],
+        "severity": "high",
+        "category": "javascript",
+        "title": "{message}",
+    },
+    {
+        "id": "syntax-error",
+        "keywords": ["SyntaxError"],
+        "severity": "high",
+        "category": "javascript",
+        "title": "{message}",
+    },
+    {
+        "id": "hydration-mismatch",
+        "keywords": ["Hydration failed", "hydration mismatch", "did not match the server-rendered"],
+        "severity": "medium",
+        "category": "framework",
+        "title": "Server and client render did not match",
+    },
+    {
+        "id": "cors-blocked",
+        "type": "console",
+        "pattern": r"blocked by CORS policy",
+        "severity": "medium",
+        "category": "network",
+        "title": "Request blocked by CORS policy",
+    },
+    {
+        "id": "csp-violation",
+        "type": "console",
+        "keywords": ["Content Security Policy"],
+        "severity": "medium",
+        "category": "security",
+        "title": "Content Security Policy violation",
+    },
+    {
+        "id": "mixed-content",
+        "type": "console",
+        "keywords": ["Mixed Content"],
+        "severity": "low",
+        "category": "security",
+        "title": "Mixed content loaded over HTTP",
+    },
+    {
+        "id": "timeout",
+        "keywords": ["timeout", "timed out", "ETIMEDOUT"],
+        "severity": "medium",
+        "category": "network",
+        "title": "Operation timed out",
+    },
+    {
+        "id": "react-key-warning",
+        "type": "console",
+        "match": "all",
+        "level": ["warn", "warning"],
+        "pattern": r"unique \"?key\"? prop",
+        "severity": "low",
+        "category": "framework",
+        "title": "List items rendered without a unique key",
+    },
+    {
+        "id": "server-error",
+        "type": "network",
+        "status": "5xx",
+        "severity": "high",
+        "category": "server",
+        "title": "{status} from {method} {path}",
+    },
+    {
+        "id": "auth-rejected",
+        "type": "network",
+        "status": [401, 403],
+        "severity": "medium",
+        "category": "auth",
+        "title": "{status} (auth) from {method} {path}",
+    },
+    {
+        "id": "rate-limited",
+        "type": "network",
+        "status": 429,
+        "severity": "medium",
+        "category": "server",
+        "title": "Rate limited by {host}",
+    },
+    {
+        "id": "not-found",
+        "type": "network",
+        "status": 404,
+        "severity": "low",
+        "category": "network",
+        "title": "Not found: {path}",
+    },
+]
+
+
+class RuleError(ValueError):
+    """A rule pack that cannot be compiled."""
+
+
+class _Values(dict):
+    def __missing__(self, key: str) -> str:
+        return "{" + key + "}"
+
+
+@dataclass
+class Rule:
+    id: str
+    title: str
+    severity: str = "medium"
+    category: str = "other"
+    type: Optional[str] = None
+    pattern: Optional[str] = None
+    keywords: List[str] = field(default_factory=list)
+    level: List[str] = field(default_factory=list)
+    status: Any = None
+    match: str = "errors"
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Rule":
+        if not isinstance(data, dict) or not data.get("id") or not data.get("title"):
+            raise RuleError(f"rules need an id and a title: {data!r}")
+        rule = cls(
+            id=str(data["id"]),
+            title=str(data["title"]),
+            severity=str(data.get("severity", "medium")).lower(),
+            category=str(data.get("category", "other")),
+            type=data.get("type"),
+            pattern=data.get("pattern"),
+            keywords=[str(keyword) for keyword in data.get("keywords") or []],
+            level=[str(level).lower() for level in data.get("level") or []],
+            status=data.get("status"),
+            match=str(data.get("match", "errors")),
+        )
+        if rule.severity not in SEVERITIES:
+            raise RuleError(f"rule {rule.id}: severity must be one of {sorted(SEVERITIES)}")
+        if rule.type is not None and rule.type not in EVENT_TYPES:
+            raise RuleError(f"rule {rule.id}: type must be console or network")
+        if rule.match not in {"errors", "all"}:
+            raise RuleError(f"rule {rule.id}: match must be errors or all")
+        return rule
+
+    def status_ok(self, status: Any) -> bool:
+        if self.status is None:
+            return True
+        if not isinstance(status, (int, float)):
+            return False
+        wanted = self.status if isinstance(self.status, list) else [self.status]
+        for value in wanted:
+            if isinstance(value, str) and len(value) == 3 and value.lower().endswith("xx"):
+                if str(int(status))[:1] == value[0]:
+                    return True
+            elif int(value) == int(status):
+                return True
+        return False
+
+    def filters_ok(self, event_type: str, payload: Dict[str, Any], error: bool) -> bool:
+        if self.type is not None and self.type != event_type:
+            return False
+        if not error and self.match != "all":
+            return False
+        if self.level and str(payload.get("level", "")).lower() not in self.level:
+            return False
+        if self.status is not None and (
+            event_type != "network" or not self.status_ok(payload.get("status"))
+        ):
+            return False
+        return True
+
+
+@dataclass
+class RuleMatch:
+    rule: Rule
+    text: str = ""
+
+
+def load_rules(path: str) -> List[Dict[str, Any]]:
+    """Rule dicts from a JSON file holding a list or ``{"rules": [...]}``."""
+    with open(path, encoding="utf-8") as handle:
+        data = json.load(handle)
+    rules = data.get("rules") if isinstance(data, dict) else data
+    if not isinstance(rules, list):
+        raise RuleError(f"{path}: expected a list of rules")
+    return rules
+
+
+def _literals(pattern: str) -> Tuple[List[str], List[str]]:
+    """Lowercase literals every match of ``pattern`` contains: whole words, and plain substrings.
+
+    Only literal runs at the top level (or inside plain groups) are used. A
+    word counts only when both its edges are pinned by a non-word literal or
+    ``\\b``/``^``/``$``; anything less certain is left out.
+    """
+    try:
+        parsed = sre_parse.parse(pattern, re.IGNORECASE)
+    except re.error as exc:
+        raise RuleError(f"invalid pattern {pattern!r}: {exc}") from exc
+
+    words: List[str] = []
+    runs: List[str] = []
+
+    def scan(items: List[Tuple[Any, Any]]) -> None:
+        run: List[str] = []
+        left_pinned = False
+
+        def close(right_pinned: bool) -> None:
+            text = "".join(run)
+            runs.append(text)
+            for token in _WORD.finditer(text):
+                if (token.start() > 0 or left_pinned) and (token.end() < len(text) or right_pinned):
+                    words.append(token.group())
+
+        for op, av in items:
+            if op == sre_parse.LITERAL:
+                run.append(chr(av).lower())
+                continue
+            pinned = op == sre_parse.AT
+            if run:
+                close(pinned)
+            run = []
+            left_pinned = pinned
+            if op == sre_parse.SUBPATTERN:
+                scan(list(av[-1]))
+        if run:
+            close(False)
+
+    scan(list(parsed))
+    return words, runs
+
+
+def _keyword_regex(keyword: str) -> str:
+    escaped = re.escape(keyword)
+    start = r"\b" if re.match(r"\w", keyword) else ""
+    end = r"\b" if re.search(r"\w$", keyword) else ""
+    return f"{start}{escaped}{end}"
+
+
+def generic_finding(event: Dict[str, Any]) -> Optional[Finding]:
+    """The untriaged medium issue reported for an error event no rule matched."""
+    payload = event.get("payload", {})
+    if event.get("type") == "console":
+        message = str(payload.get("message", ""))
+        issue = {
+            "title": "Console error detected",
+            "severity": "medium",
+            "detail": message,
+            "ts": event.get("ts"),
+        }
+        return issue, {"type": "console", "message": message, "ts": event.get("ts")}
+    if event.get("type") == "network":
+        status = payload.get("status")
+        url = payload.get("url", "")
+        issue = {
+            "title": "Network error detected",
+            "severity": "medium",
+            "detail": f"{status} {url}",
+            "ts": event.get("ts"),
+        }
+        return issue, {"type": "network", "status": status, "url": url, "ts": event.get("ts")}
+    return None
+
+
+def _event_text(event_type: str, payload: Dict[str, Any]) -> str:
+    if event_type == "console":
+        return str(payload.get("message", ""))
+    return f"{payload.get('method', '')} {payload.get('url', '')} {payload.get('statusText', '')}"
+
+
+class RuleEngine:
+    def __init__(self, rules: Iterable[Dict[str, Any]], cache_size: int = 4096) -> None:
+        self.rules: List[Rule] = [Rule.from_dict(data) for data in rules]
+        ids = [rule.id for rule in self.rules]
+        if len(set(ids)) != len(ids):
+            raise RuleError("rule ids must be unique")
+        self.cache_size = cache_size
+        self.match_all = any(rule.match == "all" for rule in self.rules)
+        self._cache: "OrderedDict[str, Tuple[int, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._compile()
+
+    @classmethod
+    def from_settings(cls) -> "RuleEngine":
+        rules = load_rules(settings.rules_path) if settings.rules_path else DEFAULT_RULES
+        return cls(rules, cache_size=settings.rules_cache_size)
+
+    def _compile(self) -> None:
+        # anchor word -> [(rule index, confirming regex)]
+        self._index: Dict[str, List[Tuple[int, Pattern[str]]]] = {}
+        # no anchor word but a required substring: [(substring, rule index, confirming regex)]
+        self._substrings: List[Tuple[str, int, Pattern[str]]] = []
+        # rules checked on every event
+        self._filter_only: List[int] = []
+        unanchored: List[Tuple[int, str]] = []
+
+        for idx, rule in enumerate(self.rules):
+            sources = [_keyword_regex(keyword) for keyword in rule.keywords]
+            if rule.pattern:
+                sources.append(rule.pattern)
+            if not sources:
+                self._filter_only.append(idx)
+                continue
+            for source in sources:
+                try:
+                    compiled = re.compile(source, re.IGNORECASE)
+                except re.error as exc:
+                    raise RuleError(f"rule {rule.id}: invalid pattern {source!r}: {exc}") from exc
+                words, runs = _literals(source)
+                longest = max(runs, key=len, default="")
+                if words:
+                    self._index.setdefault(max(words, key=len), []).append((idx, compiled))
+                elif len(longest) >= 3:
+                    self._substrings.append((longest, idx, compiled))
+                else:
+                    unanchored.append((idx, source))
+
+        self._combined: Optional[Pattern[str]] = None
+        self._groups: Dict[str, int] = {}
+        if unanchored:
+            branches = []
+            for position, (idx, source) in enumerate(unanchored):
+                name = f"r{position}"
+                self._groups[name] = idx
+                branches.append(f"(?P<{name}>(?:{source}))")
+            try:
+                self._combined = re.compile("|".join(branches), re.IGNORECASE)
+            except re.error as exc:  # e.g. global inline flags that are only valid at the start
+                raise RuleError(f"rules without literals cannot be combined: {exc}") from exc
+
+    def _classify(self, event: Dict[str, Any]) -> Tuple[int, str]:
+        event_type = event.get("type")
+        payload = event.get("payload") or {}
+        error = is_error_event(event)
+        text = _event_text(str(event_type), payload)
+        best, best_text = len(self.rules), ""
+
+        lowered = text.lower()
+        for token in set(_WORD.findall(lowered)):
+            for idx, regex in self._index.get(token, ()):
+                if idx >= best or not self.rules[idx].filters_ok(event_type, payload, error):
+                    continue
+                found = regex.search(text)
+                if found:
+                    best, best_text = idx, found.group()
+
+        for literal, idx, regex in self._substrings:
+            if (
+                idx < best
+                and literal in lowered
+                and self.rules[idx].filters_ok(event_type, payload, error)
+            ):
+                found = regex.search(text)
+                if found:
+                    best, best_text = idx, found.group()
+
+        if self._combined is not None:
+            for found in self._combined.finditer(text):
+                idx = self._groups[found.lastgroup]
+                if idx < best and self.rules[idx].filters_ok(event_type, payload, error):
+                    best, best_text = idx, found.group()
+
+        for idx in self._filter_only:
+            if idx >= best:
+                break
+            if self.rules[idx].filters_ok(event_type, payload, error):
+                best, best_text = idx, ""
+                break
+
+        return (best, best_text) if best < len(self.rules) else (-1, "")
+
+    def match(self, event: Dict[str, Any]) -> Optional[RuleMatch]:
+        """First matching rule for a console/network event, cached by fingerprint."""
+        fingerprint = event_fingerprint(event)
+        if fingerprint is None:
+            return None
+        with self._lock:
+            cached = self._cache.get(fingerprint)
+            if cached is not None:
+                self._cache.move_to_end(fingerprint)
+        if cached is None:
+            metrics.inc("rule_cache_total", result="miss")
+            cached = self._classify(event)
+            with self._lock:
+                self._cache[fingerprint] = cached
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        else:
+            metrics.inc("rule_cache_total", result="hit")
+        idx, text = cached
+        return RuleMatch(self.rules[idx], text) if idx >= 0 else None
+
+    def finding(self, event: Dict[str, Any]) -> Optional[Finding]:
+        """Issue and evidence for one event; ``None`` for ignored or unremarkable events."""
+        matched = self.match(event)
+        if matched is None:
+            return generic_finding(event) if is_error_event(event) else None
+        if matched.rule.severity == "ignore":
+            return None
+        issue, evidence = generic_finding(event)  # type: ignore[misc]
+        issue.update(
+            title=self.title(matched, event),
+            severity=matched.rule.severity,
+            category=matched.rule.category,
+            rule=matched.rule.id,
+        )
+        return issue, evidence
+
+    def title(self, matched: RuleMatch, event: Dict[str, Any]) -> str:
+        payload = event.get("payload") or {}
+        url = str(payload.get("url", ""))
+        parts = urlsplit(url)
+        values = _Values(
+            message=str(payload.get("message", ""))[:120],
+            level=payload.get("level", ""),
+            status=payload.get("status", ""),
+            method=str(payload.get("method", "")).upper(),
+            url=url,
+            host=parts.netloc,
+            path=parts.path or "/",
+            match=matched.text,
+            rule=matched.rule.id,
+        )
+        return matched.rule.title.format_map(values)
+
+    def known_issues(
+        self, events: List[Dict[str, Any]], findings: Optional[Dict[str, Finding]] = None
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Split ``events`` into ones a rule did not classify and per-rule summaries of the rest.
+
+        Events matched by ``ignore`` rules are dropped from both. ``findings`` are results of
+        :meth:`finding` computed earlier, keyed by ``event_key``; events with a rule finding
+        there are not matched again.
+        """
+        remaining: List[Dict[str, Any]] = []
+        known: Dict[str, Dict[str, Any]] = {}
+        for event in events:
+            finding = findings.get(event_key(event)) if findings else None
+            matched: Optional[RuleMatch] = None
+            if finding is not None and finding[0].get("rule"):
+                rule_id = finding[0]["rule"]
+            else:
+                matched = self.match(event)
+                if matched is None:
+                    remaining.append(event)
+                    continue
+                if matched.rule.severity == "ignore":
+                    continue
+                rule_id = matched.rule.id
+            summary = known.get(rule_id)
+            if summary is None:
+                issue = (
+                    finding[0]  # type: ignore[index]
+                    if matched is None
+                    else {
+                        "title": self.title(matched, event),
+                        "severity": matched.rule.severity,
+                        "category": matched.rule.category,
+                    }
+                )
+                summary = known[rule_id] = {
+                    "rule": rule_id,
+                    "title": issue["title"],
+                    "severity": issue["severity"],
+                    "category": issue.get("category"),
+                    "count": 0,
+                    "first_ts": event.get("ts"),
+                    "sample": event,
+                }
+            summary["count"] += 1
+            summary["last_ts"] = event.get("ts")
+        return remaining, list(known.values())
+
+
+_default: Optional[RuleEngine] = None
+_default_lock = threading.Lock()
+
+
+def default_engine() -> RuleEngine:
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = RuleEngine.from_settings()
+    return _default
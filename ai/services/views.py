@@ -0,0 +1,212 @@
+"""
+Materialized per-session views for the canned ``summarize`` and ``triage`` chat modes.
+
+Views live in the checkpoint under ``views`` and are kept current by every
+writer: ``CheckpointStore`` folds each appended chunk report into the triage
+groups (only the new reports are walked), and the session synthesis refreshes
+the summary. ``CheckpointStore.save`` stamps freshly built views (no
+``version`` yet) with the checkpoint's ``updated_at``. A view is fresh when the
+two match, so a checkpoint written by anything that did not rebuild the views
+(including older checkpoints) reads as stale and ``/chat`` falls back to the
+model.
+"""
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, List, Optional
+
+from ai.core.metrics import metrics
+from ai.services.aggregation import latest_reports, version_token
+
+metrics.describe("chat_view_total", "Chat requests for canned modes, by result (hit|stale)")
+
+# normalized messages the UI sends (or users type) for a canned mode
+CANNED_MESSAGES = {
+    "summarize": {
+        "",
+        "summarize",
+        "summarize this session",
+        "summarize the session",
+        "summary",
+        "session summary",
+    },
+    "triage": {
+        "",
+        "triage",
+        "triage issues",
+        "triage this session",
+        "prioritize issues",
+        "top issues",
+        "what are the top issues",
+    },
+}
+_SEVERITY_RANK = {"high": 0, "medium": 1, "low": 2}
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+_MAX_CHUNK_IDS = 10
+_TOP_ISSUES = 5
+_TRIAGE_LINES = 10
+
+
+def _normalize(text: str) -> str:
+    return _NON_WORD.sub(" ", (text or "").lower()).strip()
+
+
+def canned_view(mode: str, message: str) -> Optional[str]:
+    """The view answering ``message``, or None for a free-form question."""
+    normalized = _normalize(message)
+    if mode in CANNED_MESSAGES and normalized in CANNED_MESSAGES[mode]:
+        return mode
+    if normalized:
+        for view, messages in CANNED_MESSAGES.items():
+            if normalized in messages:
+                return view
+    return None
+
+
+def update_views(state: Dict[str, Any], added: Optional[int] = 0) -> Dict[str, Any]:
+    """Fold the last ``added`` chunk reports into ``state["views"]`` and refresh the summary.
+
+    Triage groups are rebuilt from every report if ``added`` is None (a report
+    was replaced) or they do not cover exactly the reports before the new ones.
+    """
+    reports = [report for report in state.get("chunk_reports") or [] if isinstance(report, dict)]
+    previous = (state.get("views") or {}).get("triage") or {}
+    if added is not None and previous.get("chunks") == len(reports) - added:
+        groups = {group["key"]: dict(group) for group in previous.get("groups") or []}
+        new_reports = reports[len(reports) - added :]
+    else:
+        groups = {}
+        new_reports = reports
+
+    for report in new_reports:
+        for issue in report.get("issues") or []:
+            if isinstance(issue, dict):
+                _add_issue(groups, issue, report.get("chunk_id"))
+
+    ordered = sorted(
+        groups.values(),
+        key=lambda group: (_SEVERITY_RANK.get(group["severity"], 3), -group["count"]),
+    )
+    triage = {"chunks": len(reports), "groups": ordered}
+    state["views"] = {"triage": triage, "summarize": _summary_view(state, reports, ordered)}
+    return state
+
+
+def _add_issue(groups: Dict[str, Dict[str, Any]], issue: Dict[str, Any], chunk_id: Any) -> None:
+    title = str(issue.get("title") or issue.get("detail") or "Untitled issue")
+    key = _normalize(title)
+    severity = str(issue.get("severity") or "").lower()
+    group = groups.get(key)
+    if group is None:
+        group = groups[key] = {
+            "key": key,
+            "title": title,
+            "severity": severity,
+            "detail": str(issue.get("detail") or "")[:300],
+            "count": 0,
+            "chunk_ids": [],
+        }
+    group["count"] += 1
+    if _SEVERITY_RANK.get(severity, 3) < _SEVERITY_RANK.get(group["severity"], 3):
+        group["severity"] = severity
+    if (
+        chunk_id is not None
+        and str(chunk_id) not in group["chunk_ids"]
+        and len(group["chunk_ids"]) < _MAX_CHUNK_IDS
+    ):
+        group["chunk_ids"] = group["chunk_ids"] + [str(chunk_id)]
+
+
+def _summary_view(
+    state: Dict[str, Any], reports: List[Dict[str, Any]], groups: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    breakdown = {severity: 0 for severity in _SEVERITY_RANK}
+    for group in groups:
+        if group["severity"] in breakdown:
+            breakdown[group["severity"]] += group["count"]
+    synthesis = state.get("session_synthesis") or {}
+    # a synthesis of an older set of chunks is ignored
+    if synthesis.get("version") != version_token(latest_reports(reports)):
+        synthesis = {}
+    top = [
+        {
+            "title": group["title"],
+            "severity": group["severity"],
+            "detail": group["detail"],
+            "count": group["count"],
+        }
+        for group in groups[:_TOP_ISSUES]
+    ]
+    return {
+        "summary": synthesis.get("summary") or state.get("summary"),
+        "suspected_root_cause": state.get("suspected_root_cause"),
+        "severity_breakdown": synthesis.get("severity_breakdown") or breakdown,
+        "top_issues": synthesis.get("top_issues") or top,
+        "issue_count": sum(group["count"] for group in groups),
+        "chunk_count": len(reports),
+    }
+
+
+def fresh_view(checkpoint: Dict[str, Any], view: str) -> Optional[Dict[str, Any]]:
+    """``view`` from ``checkpoint`` if it was built by the checkpoint's latest save."""
+    views = checkpoint.get("views") if isinstance(checkpoint, dict) else None
+    if not isinstance(views, dict) or not views.get(view):
+        return None
+    if not views.get("version") or views.get("version") != checkpoint.get("updated_at"):
+        return None
+    return views[view]
+
+
+def render_reply(view: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Chat reply text and next steps for a materialized view."""
+    if view == "triage":
+        groups = data.get("groups") or []
+        if not groups:
+            return {
+                "reply": "No issues have been reported for this session yet.",
+                "suggested_next_steps": [],
+            }
+        total = sum(group["count"] for group in groups)
+        lines = [f"{total} issues across {data.get('chunks', 0)} chunks, highest severity first:"]
+        for idx, group in enumerate(groups[:_TRIAGE_LINES], start=1):
+            count = f" (x{group['count']})" if group["count"] > 1 else ""
+            detail = (
+                f": {group['detail']}"
+                if group["detail"] and group["detail"] != group["title"]
+                else ""
+            )
+            lines.append(
+                f"{idx}. [{group['severity'] or 'unknown'}] {group['title']}{count}{detail}"
+            )
+        if len(groups) > _TRIAGE_LINES:
+            lines.append(f"...and {len(groups) - _TRIAGE_LINES} more.")
+        return {
+            "reply": "\n".join(lines),
+            "suggested_next_steps": [
+                f'How do I reproduce "{groups[0]["title"]}"?',
+                "Summarize this session",
+            ],
+        }
+
+    lines = [data.get("summary") or "No summary is available yet."]
+    if data.get("suspected_root_cause"):
+        lines.append(f"Suspected root cause: {data['suspected_root_cause']}")
+    breakdown = ", ".join(
+        f"{severity} {count}"
+        for severity, count in (data.get("severity_breakdown") or {}).items()
+        if count
+    )
+    lines.append(
+        f"{data.get('issue_count', 0)} issues across {data.get('chunk_count', 0)} chunks"
+        + (f" ({breakdown})." if breakdown else ".")
+    )
+    top = [issue for issue in data.get("top_issues") or [] if isinstance(issue, dict)]
+    if top:
+        lines.append("Top issues:")
+        lines.extend(
+            f"- [{issue.get('severity') or 'unknown'}] {issue.get('title')}" for issue in top
+        )
+    return {
+        "reply": "\n".join(lines),
+        "suggested_next_steps": ["Triage the issues", "How do I reproduce the top issue?"],
+    }
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("google.adk")
+
+from ai.agents.analysis.log_analyst import LogAnalystOutput  # noqa: E402
+from ai.agents.analysis.synthesizer import SynthesizerOutput  # noqa: E402
+from ai.core.metrics import metrics  # noqa: E402
+from ai.services.agent_outputs import check_output, parse_json_object, structured_output  # noqa: E402
+
+
+def _reply() -> dict:
+    return {
+        "summary": "Two errors.",
+        "issues": [
+            {"title": "Checkout 500", "severity": "HIGH", "detail": "500 /api/cart", "extra": 1},
+            {"title": "Bad", "severity": "severe!!"},
+            {"severity": "low"},
+        ],
+        "evidence": [{"type": "network", "status": 500}],
+    }
+
+
+def test_parse_json_object_modes() -> None:
+    assert parse_json_object('{"a": 1}') == ({"a": 1}, "ok")
+    assert parse_json_object('Sure: {"a": 1} done') == ({"a": 1}, "extracted")
+    assert parse_json_object("no json here") == (None, "failed")
+    assert parse_json_object("[1, 2]") == (None, "failed")
+
+
+def test_check_output_isolates_broken_items() -> None:
+    checked = check_output(LogAnalystOutput, _reply())
+    assert set(checked.broken) == {"issues[1]", "issues[2]"}
+    assert checked.data["summary"] == "Two errors."
+    assert len(checked.data["issues"]) == 1
+    issue = checked.data["issues"][0]
+    assert issue["severity"] == "high" and issue["extra"] == 1
+
+
+def test_structured_output_repairs_only_broken_parts() -> None:
+    metrics.reset()
+    requests = []
+
+    async def repair(request: dict) -> str:
+        requests.append(request)
+        return json.dumps({"fixes": {"issues[1]": {"title": "Bad", "severity": "medium"}}})
+
+    data = asyncio.run(
+        structured_output("log_analyst", LogAnalystOutput, json.dumps(_reply()), repair)
+    )
+    assert set(requests[0]["broken"]) == {"issues[1]", "issues[2]"}
+    assert [issue["title"] for issue in data["issues"]] == ["Checkout 500", "Bad"]
+    assert metrics.value("agent_repair_calls_total", agent="log_analyst", result="partial") == 1
+    assert metrics.value("agent_output_total", agent="log_analyst", result="partial") == 1
+    assert metrics.value("agent_output_invalid_parts_total", agent="log_analyst") == 2
+
+
+def test_structured_output_repairs_unparseable_reply() -> None:
+    metrics.reset()
+
+    async def repair(request: dict) -> str:
+        assert request["raw_text"].startswith("Summary:")
+        return json.dumps({"output": {"summary": "fixed", "severity_breakdown": {"high": 1}}})
+
+    data = asyncio.run(
+        structured_output("synthesizer", SynthesizerOutput, "Summary: it broke", repair)
+    )
+    assert data["summary"] == "fixed"
+    assert data["severity_breakdown"] == {"high": 1, "medium": 0, "low": 0}
+    assert metrics.value("agent_output_total", agent="synthesizer", result="repaired") == 1
+
+    assert asyncio.run(structured_output("synthesizer", SynthesizerOutput, "nope")) == {}
+    assert metrics.value("agent_output_total", agent="synthesizer", result="failed") == 1
+
+
+def test_malformed_synthetic_replies_are_repaired(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("CHECKPOINT_DIR", str(tmp_path))
+    from ai.services.adk_orchestrator import AdkOrchestrator
+    from ai.services.model_backends import FaultInjector, SyntheticBackend
+
+    metrics.reset()
+    backend = SyntheticBackend(faults=FaultInjector(malformed_rate=1.0), seed=3)
+    orchestrator = AdkOrchestrator(backend=backend)
+    events = [
+        {"id": "e1", "ts": 1, "type": "console", "payload": {"level": "error", "message": "boom"}}
+    ]
+    report = asyncio.run(orchestrator.analyze_chunk_async({"id": None}, {"id": "c1"}, events))
+    assert report["summary"]
+    assert all(issue["severity"] in {"low", "medium", "high"} for issue in report["issues"])
+    outcomes = metrics.snapshot()["agent_output_total"]
+    assert sum(row["value"] for row in outcomes) == 4
+    assert all(row["labels"]["result"] in {"repaired", "partial"} for row in outcomes)
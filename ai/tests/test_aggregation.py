@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from ai.services.aggregation import reconcile, version_token
+
+
+def _report(chunk_id: str) -> dict:
+    return {
+        "chunk_id": chunk_id,
+        "issues": [{"title": chunk_id}],
+        "evidence": [],
+        "repro_steps": [f"step {chunk_id}"],
+    }
+
+
+def test_reconcile_orders_and_reports_missing() -> None:
+    checkpoint = {"chunk_reports": [_report("a"), _report("b")]}
+    result = reconcile(checkpoint, ["b", "c", "a"], [_report("c")])
+    assert [report["chunk_id"] for report in result.reports] == ["b", "c", "a"]
+    assert result.missing == [] and [report["chunk_id"] for report in result.added] == ["c"]
+    assert result.version == version_token(result.reports)
+
+    result = reconcile(checkpoint, ["a", "z"], [])
+    assert result.missing == ["z"]
+    assert reconcile(checkpoint, None, []).version == version_token([_report("a"), _report("b")])
+
+
+def test_reconcile_keeps_the_latest_report_per_chunk() -> None:
+    rerun = {**_report("a"), "summary": "re-analysed"}
+    checkpoint = {"chunk_reports": [_report("a"), _report("b"), rerun]}
+    result = reconcile(checkpoint, None, [])
+    assert [report.get("summary") for report in result.reports] == ["re-analysed", None]
+    assert (
+        result.version
+        != reconcile({"chunk_reports": [_report("a"), _report("b")]}, None, []).version
+    )
+
+    resent = reconcile(
+        checkpoint, ["a", "b"], [_report("b"), {**_report("a"), "summary": "third run"}]
+    )
+    assert [report.get("summary") for report in resent.added] == ["third run"]
+
+
+def test_adk_delta_aggregate_reuses_checkpoint(tmp_path, monkeypatch) -> None:
+    pytest.importorskip("google.adk")
+    monkeypatch.setenv("CHECKPOINT_DIR", str(tmp_path))
+    from ai.services.adk_orchestrator import AdkOrchestrator
+    from ai.services.model_backends import SyntheticBackend
+
+    calls = []
+
+    class CountingBackend(SyntheticBackend):
+        async def generate(self, agent, parts) -> str:
+            calls.append(agent.name)
+            return await super().generate(agent, parts)
+
+    orchestrator = AdkOrchestrator(backend=CountingBackend(seed=1))
+    session = {"id": "sess-delta"}
+    for idx in range(3):
+        asyncio.run(orchestrator.analyze_chunk_async(session, {"id": f"c{idx}", "idx": idx}, []))
+
+    calls.clear()
+    ids = ["c0", "c1", "c2"]
+    report = orchestrator.aggregate_session(session, [], chunk_ids=ids)
+    assert calls == ["synthesizer"]
+    stored = orchestrator.checkpoints.load("sess-delta")["chunk_reports"]
+    assert report["version"] == version_token(stored)
+    assert len(report["issues"]) == sum(
+        len(r["issues"]) for r in orchestrator.checkpoints.load("sess-delta")["chunk_reports"]
+    )
+
+    calls.clear()
+    assert orchestrator.aggregate_session(session, [], chunk_ids=ids) == report
+    assert (
+        orchestrator.aggregate_session(session, [], chunk_ids=ids, version=report["version"])[
+            "unchanged"
+        ]
+        is True
+    )
+    assert calls == []
+
+    missing = orchestrator.aggregate_session(session, [], chunk_ids=ids + ["c3"])
+    assert missing["missing_chunk_ids"] == ["c3"]
+    resent = orchestrator.aggregate_session(session, [_report("c3")], chunk_ids=ids + ["c3"])
+    assert resent["version"] == version_token(
+        orchestrator.checkpoints.load("sess-delta")["chunk_reports"]
+    )
+    assert calls == ["synthesizer"]
+    assert [
+        r["chunk_id"] for r in orchestrator.checkpoints.load("sess-delta")["chunk_reports"]
+    ] == ids + ["c3"]
+
+
+def test_reanalysed_chunk_rebuilds_the_synthesis(tmp_path, monkeypatch) -> None:
+    pytest.importorskip("google.adk")
+    monkeypatch.setenv("CHECKPOINT_DIR", str(tmp_path))
+    from ai.services.adk_orchestrator import AdkOrchestrator
+    from ai.services.model_backends import SyntheticBackend
+
+    orchestrator = AdkOrchestrator(backend=SyntheticBackend(seed=2))
+    session = {"id": "sess-rerun"}
+    for idx in range(2):
+        asyncio.run(orchestrator.analyze_chunk_async(session, {"id": f"c{idx}", "idx": idx}, []))
+    first = orchestrator.aggregate_session(session, [], chunk_ids=["c0", "c1"])
+
+    # a retry or the offline re-analysis CLI appends a fresh report for c1
+    orchestrator.checkpoints.append_chunk("sess-rerun", {**_report("c1"), "summary": "second run"})
+    stored = orchestrator.checkpoints.load("sess-rerun")["chunk_reports"]
+    assert [r["chunk_id"] for r in stored] == ["c0", "c1"] and stored[1]["summary"] == "second run"
+
+    calls = []
+    original = orchestrator._call_agent
+
+    async def spy(agent, payload, task):
+        calls.append(agent.name)
+        return await original(agent, payload, task)
+
+    orchestrator._call_agent = spy
+    second = orchestrator.aggregate_session(
+        session, [], chunk_ids=["c0", "c1"], version=first["version"]
+    )
+    assert calls == ["synthesizer"] and "unchanged" not in second
+    assert second["version"] != first["version"] and second["repro_steps"][-1] == "step c1"
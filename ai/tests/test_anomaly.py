@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import pytest
+
+from ai.services.anomaly import AnomalyDetector, analysis_depth
+
+
+def _at(second: float) -> float:
+    return 1_700_000_000 + second
+
+
+def _network(second: float, status: int) -> dict:
+    return {"type": "network", "ts": _at(second), "payload": {"url": "/api/cart", "status": status}}
+
+
+def _console(second: float, level: str = "info") -> dict:
+    return {"type": "console", "ts": _at(second), "payload": {"level": level, "message": "render"}}
+
+
+def _session() -> list:
+    # three 60s chunks of steady traffic; the second has a one-second 4xx spike, the third one
+    # stray error
+    steady = [
+        [_network(second + offset, 200), _console(second + offset)]
+        for offset in (0, 60, 120)
+        for second in range(0, 60, 2)
+    ]
+    quiet = steady[:30]
+    spike = steady[30:60] + [[_network(75.2 + idx / 100, 404) for idx in range(8)]]
+    stray = steady[60:] + [[_console(150, "error")]]
+    return [
+        ({"id": "c0", "idx": 0}, [event for pair in quiet for event in pair]),
+        ({"id": "c1", "idx": 1}, [event for pair in spike for event in pair]),
+        ({"id": "c2", "idx": 2}, [event for pair in stray for event in pair]),
+    ]
+
+
+def test_bursts_rank_chunks_and_set_depth() -> None:
+    result = AnomalyDetector(threshold=3.5, min_count=3).detect(_session())
+
+    assert result.seconds == 179 and result.baseline["errors"] == {"median": 0.0, "mad": 0.0}
+    bursts = {burst.series: burst for burst in result.bursts}
+    assert set(bursts) == {"errors", "http_4xx", "network"}
+    assert (
+        bursts["http_4xx"].first_second,
+        bursts["http_4xx"].peak,
+        bursts["http_4xx"].chunk_positions,
+    ) == (75, 8, [1])
+
+    queue = result.queue()
+    assert [item.chunk_id for item in queue] == ["c1", "c2", "c0"]
+    assert [item.depth for item in queue] == ["deep", "standard", "light"]
+    assert queue[0].peak["series"] == "errors" and queue[0].errors == 8
+    assert (
+        analysis_depth({"priority": queue[0].tag()}) == "deep" and analysis_depth({}) == "standard"
+    )
+
+
+def test_numpy_and_pure_python_binning_agree(monkeypatch) -> None:
+    pytest.importorskip("numpy")
+    from ai.services import anomaly
+
+    with_numpy = AnomalyDetector().detect(_session()).as_dict()
+    monkeypatch.setattr(anomaly, "np", None)
+    assert AnomalyDetector().detect(_session()).as_dict() == with_numpy
+
+
+def test_events_without_timestamps_still_get_error_priority() -> None:
+    result = AnomalyDetector().detect(
+        [({"id": "a"}, [{"type": "console", "payload": {"level": "error"}}]), ({"id": "b"}, [])]
+    )
+    assert result.bursts == [] and result.origin is None
+    assert [(item.chunk_id, item.depth) for item in result.queue()] == [
+        ("a", "standard"),
+        ("b", "light"),
+    ]
+
+
+def test_adk_depth_picks_the_agent_plan(tmp_path, monkeypatch) -> None:
+    pytest.importorskip("google.adk")
+    monkeypatch.setenv("CHECKPOINT_DIR", str(tmp_path))
+    from ai.services.adk_orchestrator import AdkOrchestrator
+    from ai.services.model_backends import SyntheticBackend
+
+    orchestrator = AdkOrchestrator(backend=SyntheticBackend(seed=5))
+    orchestrator.fused_max_chars = 50000
+    calls = []
+    original = orchestrator._run_agent
+
+    async def spy(agent, prompt):
+        calls.append(agent.name)
+        return await original(agent, prompt)
+
+    orchestrator._run_agent = spy
+    events = [_console(1, "error")]
+    report = orchestrator.analyze_chunk(
+        {"id": "s1"}, {"id": "c1", "priority": {"score": 9.0, "depth": "deep"}}, events
+    )
+    assert "chunk_analyst" not in calls and report["analysis_depth"] == "deep"
+
+    # a prompt over the standard cap but within the light one
+    light = {"id": "c2", "priority": {"score": 0.0, "depth": "light"}}
+    calls.clear()
+    orchestrator.fused_max_chars = 600
+    report = orchestrator.analyze_chunk({"id": "s1"}, light, events)
+    assert "chunk_analyst" in calls and "synthesizer" not in calls
+    assert report["analysis_depth"] == "light"
+
+    calls.clear()
+    orchestrator.analyze_chunk({"id": "s1"}, {"id": "c3"}, events)
+    assert "chunk_analyst" not in calls
+
+    calls.clear()
+    orchestrator.fused_max_chars = 0
+    orchestrator.analyze_chunk({"id": "s1"}, light, events)
+    assert "chunk_analyst" not in calls
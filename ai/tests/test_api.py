@@ -1,12 +1,21 @@
 from __future__ import annotations
 
+import gzip
+import json
 import os
+import subprocess
+import sys
+import time
+from pathlib import Path
 
+import pytest
 from fastapi.testclient import TestClient
 
 os.environ["ADK_ENABLED"] = "false"
 
 from ai.app.main import app  # noqa: E402
+from ai.app.responses import iter_json  # noqa: E402
+from ai.app.wire import COLUMNAR_MSGPACK, collapse_events  # noqa: E402
 
 
 client = TestClient(app)
@@ -20,6 +29,7 @@ def test_health() -> None:
     assert "adk_enabled" in data
     assert "adk_text_model" in data
     assert "adk_video_model" in data
+    assert data["degraded"] is False and data["circuits"] == {}
 
 
 def test_analyze_stub() -> None:
@@ -36,6 +46,35 @@ def test_analyze_stub() -> None:
     assert data["chunk_id"] == "chunk-1"
 
 
+def test_prioritize_orders_chunks_by_error_bursts() -> None:
+    spike = [
+        {
+            "type": "network",
+            "ts": 1_700_000_030 + idx / 10,
+            "payload": {"url": "/api/cart", "status": 500},
+        }
+        for idx in range(6)
+    ]
+    payload = {
+        "session": {"id": "session-1"},
+        "chunks": [
+            {
+                "chunk": {"id": "quiet"},
+                "events": [{"type": "console", "ts": 1_700_000_000, "payload": {"level": "info"}}],
+            },
+            {"chunk": {"id": "bursty"}, "events": spike},
+        ],
+    }
+    response = client.post("/prioritize", json=payload)
+    assert response.status_code == 200
+    data = response.json()
+    assert [(chunk["chunk_id"], chunk["depth"]) for chunk in data["chunks"]] == [
+        ("bursty", "deep"),
+        ("quiet", "light"),
+    ]
+    assert {burst["series"] for burst in data["bursts"]} >= {"errors", "http_5xx"}
+
+
 def test_chat_stub() -> None:
     payload = {
         "session": {"id": "session-1"},
@@ -49,3 +88,182 @@ def test_chat_stub() -> None:
     assert response.status_code == 200
     data = response.json()
     assert "reply" in data
+
+
+def test_ready_flips_after_startup() -> None:
+    with TestClient(app) as started:
+        for _ in range(100):
+            response = started.get("/ready")
+            if response.status_code == 200:
+                break
+            time.sleep(0.05)
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+
+
+def test_stub_mode_import_is_lazy() -> None:
+    code = (
+        "import sys, ai.app.main; "
+        "heavy = [m for m in ('google.adk', 'google.genai', 'ai.agents') if m in sys.modules]; "
+        "assert not heavy, heavy"
+    )
+    env = dict(os.environ, ADK_ENABLED="false")
+    root = Path(__file__).resolve().parents[2]
+    result = subprocess.run(
+        [sys.executable, "-c", code], env=env, cwd=root, capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
+
+
+def _error_events(count: int) -> list:
+    return [
+        {
+            "id": f"e{i}",
+            "ts": f"2026-01-01T00:00:{i % 60:02d}Z",
+            "type": "console",
+            "payload": {"message": f"error {i}"},
+        }
+        for i in range(count)
+    ]
+
+
+def test_analyze_fields_projection() -> None:
+    payload = {"session": {"id": None}, "chunk": {"id": "chunk-1"}, "events": _error_events(3)}
+    response = client.post("/analyze?fields=summary,counts", json=payload)
+    assert response.status_code == 200
+    data = response.json()
+    assert set(data) == {"summary", "counts"}
+    assert data["counts"]["issues"] == 3
+
+
+def test_analyze_compact_references_issues() -> None:
+    payload = {"session": {"id": None}, "chunk": {"id": "chunk-1"}, "events": _error_events(3)}
+    data = client.post("/analyze?compact=true", json=payload).json()
+    log_agent = next(agent for agent in data["agents"] if agent["name"] == "log_analyst")
+    assert "issues" not in log_agent
+    assert log_agent["issue_refs"] == [0, 1, 2]
+
+
+def test_streamed_json_matches_report() -> None:
+    report = {"summary": "s", "issues": [{"title": str(i)} for i in range(1001)], "session_id": "x"}
+    assert json.loads("".join(iter_json(report))) == report
+
+
+def test_analyze_accepts_gzip_json() -> None:
+    payload = {
+        "session": {"id": "session-gz"},
+        "chunk": {"id": "chunk-1"},
+        "events": _error_events(20),
+    }
+    body = gzip.compress(json.dumps(payload).encode("utf-8"))
+    response = client.post(
+        "/analyze",
+        content=body,
+        headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+    )
+    assert response.status_code == 200
+    assert response.json() == client.post("/analyze", json=payload).json()
+
+
+def test_large_compressed_body_is_decoded_in_offload_pool(monkeypatch) -> None:
+    from ai.app.api import bodies
+    from ai.core.metrics import metrics
+    from ai.core.offload import OffloadPool
+
+    pool = OffloadPool(workers=1, min_bytes=0)
+    monkeypatch.setattr(bodies, "offload", pool)
+    payload = {
+        "session": {"id": "session-pool"},
+        "chunk": {"id": "chunk-1"},
+        "events": _error_events(20),
+    }
+    body = gzip.compress(json.dumps(payload).encode("utf-8"))
+    try:
+        response = client.post(
+            "/analyze",
+            content=body,
+            headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+        )
+    finally:
+        pool.shutdown()
+    assert response.status_code == 200
+    assert response.json() == client.post("/analyze", json=payload).json()
+    assert metrics.value("offload_tasks_total", task="decode_body", mode="pool") >= 1
+
+
+def test_analyze_accepts_columnar_msgpack() -> None:
+    msgpack = pytest.importorskip("msgpack")
+    events = _error_events(20)
+    payload = {"session": {"id": "session-cols"}, "chunk": {"id": "chunk-1"}, "events": events}
+    columnar = dict(payload, events=collapse_events(events, "session-cols"))
+    response = client.post(
+        "/analyze", content=msgpack.packb(columnar), headers={"Content-Type": COLUMNAR_MSGPACK}
+    )
+    assert response.status_code == 200
+    assert response.json() == client.post("/analyze", json=payload).json()
+
+
+def test_analyze_rejects_unknown_body_format() -> None:
+    response = client.post(
+        "/analyze", content=b"<xml/>", headers={"Content-Type": "application/xml"}
+    )
+    assert response.status_code == 415
+    response = client.post(
+        "/analyze",
+        content=b"{}",
+        headers={"Content-Type": "application/json", "Content-Encoding": "br"},
+    )
+    assert response.status_code == 415
+    response = client.post("/analyze", content=b"not gzip", headers={"Content-Encoding": "gzip"})
+    assert response.status_code == 400
+    response = client.post("/analyze", json={"session": {}})
+    assert response.status_code == 422
+
+
+def test_live_events_then_analyze() -> None:
+    events = _error_events(12)
+    for start in range(0, 12, 4):
+        batch = events[start : start + 4]
+        # the last batch is a bare array, which skips the wrapper model
+        response = client.post(
+            "/sessions/session-live/events", json=batch if start == 8 else {"events": batch}
+        )
+        assert response.status_code == 200
+    assert (
+        client.post(
+            "/sessions/session-live/events", json=[{"ts": "2024-01-01T00:00:00Z"}]
+        ).status_code
+        == 422
+    )
+    state = client.get("/sessions/session-live/live").json()
+    assert state["event_count"] == 12
+    assert state["windows"] >= 1
+
+    payload = {"session": {"id": "session-live"}, "chunk": {"id": "chunk-1"}, "events": events}
+    data = client.post("/analyze", json=payload).json()
+    assert len(data["issues"]) == 12
+    assert client.delete("/sessions/session-live/live").json() == {"discarded": True}
+    assert client.get("/sessions/session-live/live").status_code == 404
+
+
+def test_metrics_endpoint() -> None:
+    from ai.core.metrics import metrics
+
+    metrics.inc("agent_output_total", agent="log_analyst", result="ok")
+    text = client.get("/metrics").text
+    assert "# TYPE agent_output_total counter" in text
+    assert 'agent_output_total{agent="log_analyst",result="ok"}' in text
+    assert "agent_output_total" in client.get("/metrics?format=json").json()
+
+
+def test_aggregate_delta_reports_missing_chunks() -> None:
+    session = {"id": "session-agg"}
+    response = client.post("/aggregate", json={"session": session, "chunk_ids": ["c1", "c2"]})
+    assert response.json()["missing_chunk_ids"] == ["c1", "c2"]
+
+    reports = [{"chunk_id": "c1", "issues": [{"title": "x"}]}, {"chunk_id": "c2", "issues": []}]
+    data = client.post(
+        "/aggregate", json={"session": session, "chunk_ids": ["c1", "c2"], "chunk_reports": reports}
+    ).json()
+    assert data["version"].startswith("v2-")
+    assert len(data["issues"]) == 1
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from ai.services.batching import MicroBatcher
+
+AGENT = SimpleNamespace(name="synthesizer")
+BATCH_AGENT = SimpleNamespace(name="synthesizer_batch")
+
+
+def _submit_concurrently(batcher: MicroBatcher, payloads: list) -> list:
+    """Each payload is submitted from its own thread and event loop, like concurrent requests."""
+    results = [None] * len(payloads)
+    barrier = threading.Barrier(len(payloads))
+
+    def worker(idx: int) -> None:
+        barrier.wait()
+        results[idx] = asyncio.run(batcher.submit(AGENT, payloads[idx], "Summarize findings."))
+
+    threads = [threading.Thread(target=worker, args=(idx,)) for idx in range(len(payloads))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_callers_share_one_call_and_get_their_own_item() -> None:
+    prompts = []
+
+    async def run_agent(agent, prompt: str) -> str:
+        prompts.append(prompt)
+        items = json.loads(prompt[prompt.index("{") :])["items"]
+        return json.dumps(
+            {"results": {key: {"summary": item["input"]["name"]} for key, item in items.items()}}
+        )
+
+    batcher = MicroBatcher({"synthesizer": BATCH_AGENT}, run_agent, window_seconds=0.2, max_items=8)
+    results = _submit_concurrently(batcher, [{"name": f"session-{idx}"} for idx in range(5)])
+
+    assert len(prompts) == 1
+    assert [json.loads(result)["summary"] for result in results] == [
+        f"session-{idx}" for idx in range(5)
+    ]
+
+
+def test_full_batches_are_sent_without_waiting_for_the_window() -> None:
+    calls = []
+
+    async def run_agent(agent, prompt: str) -> str:
+        items = json.loads(prompt[prompt.index("{") :])["items"]
+        calls.append(len(items))
+        return json.dumps({"results": {key: {"summary": "ok"} for key in items}})
+
+    batcher = MicroBatcher({"synthesizer": BATCH_AGENT}, run_agent, window_seconds=5.0, max_items=2)
+    results = _submit_concurrently(batcher, [{"n": 1}, {"n": 2}])
+    assert calls == [2]
+    assert all(json.loads(result) == {"summary": "ok"} for result in results)
+
+
+@pytest.mark.parametrize(
+    "reply", ["not json at all", json.dumps({"results": {"item0": {"summary": "only one"}}})]
+)
+def test_unusable_replies_fall_back_to_individual_calls(reply: str) -> None:
+    async def run_agent(agent, prompt: str) -> str:
+        return reply
+
+    batcher = MicroBatcher({"synthesizer": BATCH_AGENT}, run_agent, window_seconds=0.2)
+    results = _submit_concurrently(batcher, [{"n": 1}, {"n": 2}, {"n": 3}])
+    assert results.count(None) == (3 if reply.startswith("not") else 2)
+
+
+def test_single_caller_is_not_batched() -> None:
+    async def run_agent(agent, prompt: str) -> str:
+        raise AssertionError("a batch of one should not be sent")
+
+    batcher = MicroBatcher({"synthesizer": BATCH_AGENT}, run_agent, window_seconds=0.01)
+    assert asyncio.run(batcher.submit(AGENT, {"n": 1}, "Summarize findings.")) is None
+    assert not batcher.accepts("video_analyst", 10)
+    assert not batcher.accepts("synthesizer", batcher.max_item_chars + 1)
+
+
+def test_cancelled_leader_releases_its_followers() -> None:
+    async def run_agent(agent, prompt: str) -> str:
+        raise AssertionError("an abandoned batch should not be sent")
+
+    batcher = MicroBatcher({"synthesizer": BATCH_AGENT}, run_agent, window_seconds=5.0)
+
+    async def scenario():
+        # the leader's request is cancelled by a timeout while it waits out the window
+        leader = asyncio.ensure_future(
+            asyncio.wait_for(batcher.submit(AGENT, {"n": 1}, "Summarize findings."), 0.05)
+        )
+        await asyncio.sleep(0.01)
+        follower = await asyncio.wait_for(
+            batcher.submit(AGENT, {"n": 2}, "Summarize findings."), 1.0
+        )
+        with pytest.raises(asyncio.TimeoutError):
+            await leader
+        return follower
+
+    assert asyncio.run(scenario()) is None
+    assert batcher._open == {}
+
+
+def test_adk_concurrent_chunks_batch_synthesizer_calls(tmp_path, monkeypatch) -> None:
+    pytest.importorskip("google.adk")
+    monkeypatch.setenv("CHECKPOINT_DIR", str(tmp_path))
+    from ai.agents.analysis import create_batch_agent
+    from ai.services.adk_orchestrator import AdkOrchestrator
+    from ai.services.model_backends import SyntheticBackend
+
+    calls = []
+
+    class CountingBackend(SyntheticBackend):
+        async def generate(self, agent, parts) -> str:
+            calls.append(agent.name)
+            return await super().generate(agent, parts)
+
+    orchestrator = AdkOrchestrator(backend=CountingBackend(seed=3))
+    orchestrator.batcher = MicroBatcher(
+        {
+            agent.name: create_batch_agent(agent)
+            for agent in (orchestrator.log_agent, orchestrator.synth_agent)
+        },
+        orchestrator._run_agent,
+        window_seconds=0.3,
+    )
+    reports = [None] * 4
+    barrier = threading.Barrier(4)
+
+    def worker(idx: int) -> None:
+        barrier.wait()
+        reports[idx] = orchestrator.analyze_chunk(
+            {"id": f"batch-{idx}"}, {"id": "c0", "idx": 0}, []
+        )
+
+    threads = [threading.Thread(target=worker, args=(idx,)) for idx in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls.count("log_analyst_batch") >= 1 and "log_analyst" not in calls
+    assert calls.count("synthesizer_batch") >= 1 and "synthesizer" not in calls
+    assert calls.count("repro_planner") == 4
+    assert all(
+        report["summary"] and report["session_id"] == f"batch-{idx}"
+        for idx, report in enumerate(reports)
+    )
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from ai.benchmarks.harness import compare
+from ai.benchmarks.synthetic import SessionSpec, generate_events
+
+
+def test_generate_events_follows_spec() -> None:
+    spec = SessionSpec(
+        event_count=500, type_mix={"console": 1, "network": 1}, message_size=40, seed=3
+    )
+    events = generate_events(spec)
+
+    assert len(events) == 500
+    assert {event["type"] for event in events} == {"console", "network"}
+    assert all(len(e["payload"]["message"]) <= 40 for e in events if e["type"] == "console")
+    assert events == generate_events(spec)
+    assert [e["ts"] for e in events] == sorted(e["ts"] for e in events)
+
+
+def test_compare_flags_regressions() -> None:
+    baseline = {"results": {"a": {"median_s": 1.0}, "b": {"median_s": 1.0}}}
+    current = {"results": {"a": {"median_s": 1.1}, "b": {"median_s": 1.5}, "c": {"median_s": 9.0}}}
+
+    rows = {row["name"]: row for row in compare(current, baseline, max_regression=0.2)}
+
+    assert set(rows) == {"a", "b"}
+    assert not rows["a"]["regression"]
+    assert rows["b"]["regression"]
@@ -1,9 +1,14 @@
 from __future__ import annotations
 
 import json
+import multiprocessing
 from datetime import datetime, timedelta, timezone
+from pathlib import Path
 
-from ai.services.checkpoints import CheckpointStore
+import pytest
+
+from ai.services import checkpoint_codec
+from ai.services.checkpoints import CheckpointStore, fcntl
 
 
 def test_append_and_load(tmp_path) -> None:
@@ -40,3 +45,83 @@ def test_ttl_cleanup(tmp_path) -> None:
     store = CheckpointStore(base_dir=tmp_path, ttl_hours=1)
     assert store.load("session-2") == {}
     assert not path.exists()
+
+
+def _append_many(base_dir: str, worker: int, count: int) -> None:
+    store = CheckpointStore(base_dir=Path(base_dir), ttl_hours=48)
+    for idx in range(count):
+        store.append_chunk("shared", {"chunk_id": f"w{worker}-c{idx}", "issues": [{"title": "x"}]})
+
+
+@pytest.mark.skipif(fcntl is None, reason="requires fcntl advisory locks")
+def test_concurrent_workers_do_not_lose_chunks(tmp_path) -> None:
+    workers, per_worker = 8, 15
+    ctx = multiprocessing.get_context("spawn")
+    processes = [
+        ctx.Process(target=_append_many, args=(str(tmp_path), worker, per_worker))
+        for worker in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(timeout=60)
+        assert process.exitcode == 0
+
+    state = CheckpointStore(base_dir=tmp_path, ttl_hours=48).load("shared")
+    chunk_ids = [report["chunk_id"] for report in state["chunk_reports"]]
+    assert len(chunk_ids) == workers * per_worker
+    assert len(set(chunk_ids)) == workers * per_worker
+    assert len(state["issues"]) == workers * per_worker
+
+
+def test_binary_roundtrip_restores_agent_copies_and_derived_lists(tmp_path) -> None:
+    store = CheckpointStore(base_dir=tmp_path, ttl_hours=48)
+    issue = {"title": "Network error detected", "detail": "\x00leading nul", "severity": "medium"}
+    report = {
+        "chunk_id": "chunk-1",
+        "issues": [issue],
+        "evidence": [{"type": "network", "status": 500}],
+        "repro_steps": ["click #checkout"],
+        "agents": [
+            {
+                "name": "log_analyst",
+                "issues": [issue],
+                "evidence": [{"type": "network", "status": 500}],
+            }
+        ],
+    }
+    store.append_chunk("session-3", report)
+    store.append_chunk("session-3", dict(report, chunk_id="chunk-2"))
+
+    raw = (tmp_path / "session-3.ckpt").read_bytes()
+    assert checkpoint_codec.is_encoded(raw)
+    state = store.load("session-3")
+    assert state["chunk_reports"][1]["agents"][0]["issues"] == [issue]
+    assert state["issues"] == [issue, issue]
+    assert state["repro_steps"] == ["click #checkout", "click #checkout"]
+
+
+def test_zstd_is_the_default_codec_when_installed() -> None:
+    pytest.importorskip("zstandard")
+    state = {
+        "chunk_reports": [
+            {"chunk_id": f"c{idx}", "summary": "same text " * 20} for idx in range(20)
+        ]
+    }
+    raw = checkpoint_codec.encode(state)
+    assert raw[len(checkpoint_codec.MAGIC) + 1] == checkpoint_codec.CODEC_ZSTD
+    assert len(raw) < len(checkpoint_codec.encode(state, checkpoint_codec.CODEC_GZIP))
+    assert checkpoint_codec.decode(raw)["chunk_reports"] == state["chunk_reports"]
+
+
+def test_legacy_json_checkpoint_is_read_and_migrated(tmp_path) -> None:
+    legacy = CheckpointStore(base_dir=tmp_path, ttl_hours=48, format="json")
+    legacy.append_chunk("session-4", {"chunk_id": "chunk-1", "issues": [{"title": "old"}]})
+    assert (tmp_path / "session-4.json").exists()
+
+    store = CheckpointStore(base_dir=tmp_path, ttl_hours=48)
+    assert store.load("session-4")["issues"] == [{"title": "old"}]
+    store.append_chunk("session-4", {"chunk_id": "chunk-2", "issues": [{"title": "new"}]})
+
+    assert not (tmp_path / "session-4.json").exists()
+    assert [i["title"] for i in store.load("session-4")["issues"]] == ["old", "new"]
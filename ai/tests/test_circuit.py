@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import pytest
+
+from ai.core.metrics import metrics
+from ai.services.circuit import CircuitBreaker, CircuitBreakers, parse_slo
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_breaker_opens_on_failures_and_probes_recovery() -> None:
+    clock = _Clock()
+    breaker = CircuitBreaker(
+        "test_op", failure_rate=0.5, window=4, min_calls=4, open_seconds=10, clock=clock
+    )
+    for ok in (True, False, True, False):
+        assert breaker.allow()
+        breaker.record(ok, 0.1)
+    assert breaker.state == "open" and not breaker.allow()
+    assert metrics.value("circuit_state", operation="test_op") == 2
+
+    clock.now = 10
+    assert breaker.allow() and breaker.state == "half_open"
+    assert not breaker.allow()  # only one probe at a time
+    breaker.record(False, 0.1)
+    assert breaker.state == "open"
+
+    clock.now = 25
+    assert breaker.allow()
+    breaker.record(True, 0.1)
+    assert breaker.snapshot() == {
+        "state": "closed",
+        "calls": 0,
+        "failure_rate": 0.0,
+        "slo_ms": None,
+        "retry_in_seconds": None,
+    }
+
+
+def test_slow_calls_count_against_the_slo() -> None:
+    breaker = CircuitBreaker("slow_op", window=2, min_calls=2, slo_ms=500)
+    breaker.record(True, 0.6)
+    breaker.record(True, 0.7)
+    assert breaker.state == "open"
+    assert metrics.value("circuit_calls_total", operation="slow_op", result="slow") == 2
+    assert parse_slo("analyze=120000, chat=30000") == {"analyze": 120000.0, "chat": 30000.0}
+
+
+def test_orchestrator_serves_degraded_stub_results(tmp_path, monkeypatch) -> None:
+    pytest.importorskip("google.adk")
+    monkeypatch.setenv("CHECKPOINT_DIR", str(tmp_path))
+    monkeypatch.setenv("ADK_ENABLED", "true")
+    monkeypatch.setenv("ADK_MODEL_BACKEND", "synthetic")
+    monkeypatch.setenv("FAKE_LLM_ERROR_RATE", "1")
+    from ai.services.orchestrator import Orchestrator
+
+    orchestrator = Orchestrator()
+    assert orchestrator.adk is not None
+    orchestrator.circuits = CircuitBreakers(
+        {
+            name: CircuitBreaker(name, window=2, min_calls=2)
+            for name in ("analyze", "aggregate", "chat")
+        }
+    )
+    reasons = []
+    for idx in range(3):
+        report = orchestrator.analyze_chunk({"id": "s"}, {"id": f"c{idx}"}, [])
+        assert (
+            report["degraded"] is True
+            and report["summary"] == "No obvious issues detected in this chunk."
+        )
+        reasons.append(report["degraded_reason"])
+    assert reasons == ["error", "error", "circuit_open"]
+    assert orchestrator.circuits.snapshot()["analyze"]["state"] == "open"
+
+    reply = orchestrator.chat({"id": "s"}, {"summary": "x"}, [], "why?", "summarize", "fast")
+    assert reply["degraded"] is True and reply["reply"].startswith(
+        "The analysis model is unavailable"
+    )
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import pytest
+
+from ai.services.correlation import Correlator, correlation_groups, parse_offset, parse_ts
+
+
+def _event(ts: str, event_type: str, **payload) -> dict:
+    return {"ts": ts, "type": event_type, "payload": payload}
+
+
+EVENTS = [
+    _event("2026-01-01T00:00:01Z", "interaction", action="click", selector="#cart"),
+    _event("2026-01-01T00:00:09Z", "interaction", action="click", selector="#checkout"),
+    _event("2026-01-01T00:00:10Z", "network", status=500, url="https://x.test/api/orders"),
+    _event("2026-01-01T00:00:11Z", "console", level="error", message="Order failed"),
+    _event("2026-01-01T00:00:40Z", "console", level="error", message="Unrelated"),
+]
+
+
+def test_timestamp_parsing() -> None:
+    assert parse_ts("2026-01-01T00:00:10Z") == parse_ts(1767225610) == parse_ts(1767225610000)
+    assert parse_ts("00:00:12") is None
+    assert parse_offset("00:01:02") == 62
+    assert parse_offset("01:02") == 62
+    assert parse_offset("12.5s") == 12.5
+    assert parse_offset("soon") is None
+
+
+def test_issues_link_errors_and_preceding_interactions() -> None:
+    correlator = Correlator(
+        EVENTS, {"start_ts": "2026-01-01T00:00:00Z"}, window_seconds=2, lookback_seconds=15
+    )
+    log_issue = {"title": "Order 500", "ts": "2026-01-01T00:00:10Z"}
+    video_issue = {
+        "title": "Error banner",
+        "timestamp_start": "00:00:11",
+        "timestamp_end": "00:00:12",
+    }
+    linked = correlator.attach([log_issue, video_issue, {"title": "no time"}])
+
+    log_links = linked[0]["linked_evidence"]
+    assert [error["type"] for error in log_links["errors"]] == ["network", "console"]
+    assert [item["text"] for item in log_links["interactions"]] == [
+        "click #cart",
+        "click #checkout",
+    ]
+    assert linked[1]["linked_evidence"]["error_count"] == 2
+    assert "linked_evidence" not in linked[2]
+    # linked in place, so agent outputs and the report share the same issue objects
+    assert linked[0] is log_issue
+
+    groups = correlation_groups(linked)
+    assert [[brief["idx"] for brief in group["issues"]] for group in groups] == [[0, 1], [2]]
+    assert len(groups[0]["errors"]) == 2
+
+
+def test_correlation_scales_with_large_sessions() -> None:
+    events = [
+        _event(
+            f"2026-01-01T{i // 3600:02d}:{i // 60 % 60:02d}:{i % 60:02d}Z",
+            "console",
+            level="error",
+            message=str(i),
+        )
+        for i in range(20000)
+    ]
+    correlator = Correlator(list(reversed(events)), window_seconds=1)
+    issues = [{"title": str(i), "ts": events[i]["ts"]} for i in range(0, 20000, 10)]
+    linked = correlator.attach(issues)
+    assert all(issue["linked_evidence"]["error_count"] == 3 for issue in linked[1:-1])
+
+
+def test_adk_agent_issues_stay_references_to_correlated_report_issues(
+    tmp_path, monkeypatch
+) -> None:
+    pytest.importorskip("google.adk")
+    monkeypatch.setenv("CHECKPOINT_DIR", str(tmp_path))
+    from ai.services.adk_orchestrator import AdkOrchestrator
+    from ai.services.model_backends import SyntheticBackend
+    from ai.services.reports import compact_agents
+
+    orchestrator = AdkOrchestrator(backend=SyntheticBackend(seed=3))
+    report = orchestrator.analyze_chunk(
+        {"id": "s1"},
+        {"id": "c1", "start_ts": "2026-01-01T00:00:00Z"},
+        [_event("2026-01-01T00:00:12Z", "console", level="error", message="Banner failed")],
+    )
+    video = next(issue for issue in report["issues"] if issue.get("source") == "video")
+    assert video["linked_evidence"]["error_count"] == 1
+
+    compact = compact_agents(report)
+    agents = [agent for agent in compact["agents"] if agent["issue_refs"]]
+    assert agents and all("issues" not in agent for agent in compact["agents"])
+    assert any(report["issues"][idx] is video for agent in agents for idx in agent["issue_refs"])
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from ai.models.events import parse_events
+from ai.models.requests import AnalyzeRequest
+
+
+def test_only_the_envelope_is_validated() -> None:
+    payload = {"message": "boom", "nested": {"anything": [1, "two", None]}}
+    request = AnalyzeRequest.model_validate_json(
+        json.dumps(
+            {
+                "session": {"id": "s"},
+                "chunk": {"id": "c", "idx": 2, "gcs_uri": "gs://bucket/c.webm"},
+                "events": [
+                    {
+                        "id": 7,
+                        "type": "console",
+                        "ts": 1700000000000,
+                        "payload": payload,
+                        "extra": True,
+                    }
+                ],
+            }
+        )
+    )
+    (event,) = request.events
+    assert event == {
+        "id": 7,
+        "type": "console",
+        "ts": 1700000000000,
+        "payload": payload,
+        "extra": True,
+    }
+    assert request.chunk["gcs_uri"] == "gs://bucket/c.webm"
+
+    with pytest.raises(ValidationError):
+        AnalyzeRequest.model_validate({"session": {}, "chunk": {}, "events": [{"payload": {}}]})
+    with pytest.raises(ValidationError):
+        AnalyzeRequest.model_validate(
+            {"session": {}, "chunk": {}, "events": [{"type": "console", "ts": {"at": 1}}]}
+        )
+
+
+def test_bulk_adapter_accepts_json_and_decoded_lists() -> None:
+    events = [{"type": "network", "ts": "2024-01-01T00:00:00Z", "payload": {"status": 500}}]
+    assert parse_events(json.dumps(events)) == events
+    assert parse_events(events) == events
+    with pytest.raises(ValidationError):
+        parse_events(b'[{"type": 3}]')
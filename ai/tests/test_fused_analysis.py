@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import pytest
+
+
+def _events() -> list:
+    return [
+        {
+            "type": "interaction",
+            "ts": "2024-01-01T00:00:01Z",
+            "payload": {"action": "click", "selector": "#checkout"},
+        },
+        {
+            "type": "console",
+            "ts": "2024-01-01T00:00:02Z",
+            "payload": {"level": "error", "message": "TypeError: cart is undefined"},
+        },
+    ]
+
+
+def _orchestrator(tmp_path, monkeypatch, max_chars: int, reply=None):
+    pytest.importorskip("google.adk")
+    monkeypatch.setenv("CHECKPOINT_DIR", str(tmp_path))
+    from ai.services.adk_orchestrator import AdkOrchestrator
+    from ai.services.model_backends import SyntheticBackend
+
+    orchestrator = AdkOrchestrator(backend=SyntheticBackend(seed=3))
+    orchestrator.fused_max_chars = max_chars
+    calls = []
+    original = orchestrator._run_agent
+
+    async def spy(agent, prompt):
+        calls.append(agent.name)
+        if reply is not None and agent.name == "chunk_analyst":
+            return reply
+        return await original(agent, prompt)
+
+    orchestrator._run_agent = spy
+    return orchestrator, calls
+
+
+def test_small_chunk_without_video_uses_one_fused_call(tmp_path, monkeypatch) -> None:
+    orchestrator, calls = _orchestrator(tmp_path, monkeypatch, 50000)
+    report = orchestrator.analyze_chunk({"id": "s1"}, {"id": "c1", "idx": 0}, _events())
+
+    assert sorted(calls) == ["chunk_analyst", "video_analyst"]
+    assert [agent["name"] for agent in report["agents"]] == [
+        "log_analyst",
+        "video_analyst",
+        "repro_planner",
+        "synthesizer",
+    ]
+    assert report["repro_steps"] and report["summary"] and report["suspected_root_cause"]
+    assert any(issue.get("source") == "network" for issue in report["issues"])
+
+
+def test_large_or_video_chunks_take_the_split_path(tmp_path, monkeypatch) -> None:
+    orchestrator, calls = _orchestrator(tmp_path, monkeypatch, 200)
+    orchestrator.analyze_chunk({"id": "s1"}, {"id": "c1"}, _events())
+    assert "chunk_analyst" not in calls and {"log_analyst", "repro_planner", "synthesizer"} <= set(
+        calls
+    )
+
+    orchestrator, calls = _orchestrator(tmp_path, monkeypatch, 50000)
+    orchestrator.analyze_chunk(
+        {"id": "s2"}, {"id": "c1", "video_url": "gs://bucket/c1.webm"}, _events()
+    )
+    assert "chunk_analyst" not in calls
+
+
+def test_unusable_fused_reply_falls_back_to_split_agents(tmp_path, monkeypatch) -> None:
+    orchestrator, calls = _orchestrator(tmp_path, monkeypatch, 50000, reply="not json")
+    report = orchestrator.analyze_chunk({"id": "s1"}, {"id": "c1"}, _events())
+    assert calls[0] == "chunk_analyst" and {"log_analyst", "repro_planner", "synthesizer"} <= set(
+        calls
+    )
+    assert report["repro_steps"]
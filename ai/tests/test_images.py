@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import base64
+import json
+import struct
+import zlib
+
+import pytest
+
+from ai.services.images import ImageCache, PreparedImage, sniff_mime
+
+
+def _png(width: int = 2, height: int = 2, shade: int = 0) -> bytes:
+    def chunk(kind: bytes, body: bytes) -> bytes:
+        return (
+            struct.pack(">I", len(body))
+            + kind
+            + body
+            + struct.pack(">I", zlib.crc32(kind + body) & 0xFFFFFFFF)
+        )
+
+    rows = b"".join(b"\x00" + bytes([shade, 0, 0]) * width for _ in range(height))
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(rows))
+        + chunk(b"IEND", b"")
+    )
+
+
+def test_images_are_deduplicated_and_reusable_by_hash() -> None:
+    cache = ImageCache()
+    png = _png()
+    encoded = base64.b64encode(png).decode()
+    prepared, described = cache.prepare(
+        [
+            {"name": "a.png", "data": encoded},
+            {"name": "again.png", "data": f"data:image/png;base64,{encoded}"},
+            {"name": "meta-only.png", "type": "image/png", "size": 10},
+        ]
+    )
+    assert len(prepared) == 1 and prepared[0].data == png and prepared[0].mime_type == "image/png"
+    assert [entry.get("part") for entry in described] == [0, 0, None]
+    assert described[2]["available"] is False
+
+    # the next turn sends only the hash
+    prepared, described = cache.prepare([{"name": "a.png", "sha256": described[0]["sha256"]}])
+    assert prepared[0].data == png and described[0]["part"] == 0
+    assert cache.prepare([{"data": base64.b64encode(b"not an image").decode()}])[1][0]["error"]
+
+
+def test_cache_is_bounded_by_bytes() -> None:
+    cache = ImageCache(max_bytes=100)
+    for idx in range(4):
+        cache.put(PreparedImage(f"h{idx}", "image/png", b"x" * 40, 40))
+    assert cache.get("h0") is None and cache.get("h1") is None and cache.get("h3") is not None
+    assert sniff_mime(b"RIFF1234WEBPVP8 ") == "image/webp"
+
+
+def test_undecodable_or_unrecognised_data_is_rejected(monkeypatch) -> None:
+    from ai.services import images
+
+    cache = ImageCache()
+    _, described = cache.prepare([{"name": "bad.png", "data": "iVBOR!!not-base64"}])
+    assert described[0]["error"] and "part" not in described[0]
+
+    # without Pillow a declared image type is not enough
+    monkeypatch.setattr(images, "Image", None)
+    fake = base64.b64encode(b"<html>not an image</html>").decode()
+    png = base64.b64encode(_png()).decode()
+    prepared, described = cache.prepare([{"type": "image/png", "data": fake}, {"data": png}])
+    assert [image.mime_type for image in prepared] == ["image/png"] and described[0]["error"]
+
+
+def test_large_images_are_downscaled() -> None:
+    pytest.importorskip("PIL")
+    cache = ImageCache(max_side=64)
+    (image,), _ = cache.prepare([{"data": base64.b64encode(_png(400, 200, shade=90)).decode()}])
+    assert (image.width, image.height) == (64, 32) and image.mime_type == "image/jpeg"
+
+
+def test_adk_chat_sends_images_as_inline_parts(tmp_path, monkeypatch) -> None:
+    pytest.importorskip("google.adk")
+    monkeypatch.setenv("CHECKPOINT_DIR", str(tmp_path))
+    from ai.services.adk_orchestrator import AdkOrchestrator
+    from ai.services.model_backends import SyntheticBackend
+
+    orchestrator = AdkOrchestrator(backend=SyntheticBackend(seed=3))
+    sent = []
+    original = orchestrator._run_agent_parts
+
+    async def spy(agent, parts):
+        sent.append(parts)
+        return await original(agent, parts)
+
+    orchestrator._run_agent_parts = spy
+    encoded = base64.b64encode(_png()).decode()
+    reply = orchestrator.chat(
+        {"id": "s"},
+        {},
+        [],
+        "what is wrong here?",
+        "investigate",
+        "default",
+        [],
+        [{"name": "shot.png", "data": encoded}] * 2,
+    )
+
+    (parts,) = sent
+    assert len(parts) == 2 and parts[1].inline_data.data == _png()
+    assert encoded not in parts[0].text
+    assert [entry["part"] for entry in json.loads(parts[0].text)["images"]] == [0, 0]
+    assert reply["images"][0]["sha256"]
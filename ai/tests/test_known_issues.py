@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import pytest
+
+from ai.services.correlation import Correlator
+from ai.services.known_issues import KnownIssueIndex
+
+
+def _error(ts: str, message: str) -> dict:
+    return {"type": "console", "ts": ts, "payload": {"level": "error", "message": message}}
+
+
+def _learn(index: KnownIssueIndex, session_id: str, events: list, issues: list) -> list:
+    matches = index.match(events)
+    linked = Correlator(events).attach(issues + matches.issues)
+    index.observe(session_id, matches, linked[: len(issues)])
+    return linked
+
+
+def test_explained_fingerprints_are_attached_in_later_sessions() -> None:
+    index = KnownIssueIndex(max_entries=100)
+    events = [
+        _error("2024-01-01T00:00:05Z", "TypeError: cart 123 is undefined"),
+        _error("2024-01-01T00:00:30Z", "other"),
+    ]
+    issue = {
+        "title": "Cart crashes",
+        "severity": "high",
+        "detail": "cart is undefined",
+        "ts": "2024-01-01T00:00:05Z",
+    }
+    linked = _learn(index, "s1", events, [issue])
+    assert linked[0]["fingerprints"] == ["console|error|typeerror: cart # is undefined"]
+
+    later = [
+        _error("2024-02-01T10:00:00Z", "TypeError: cart 999 is undefined"),
+        _error("2024-02-01T10:00:01Z", "new one"),
+    ]
+    matches = index.match(later)
+    assert [event["payload"]["message"] for event in matches.remaining] == ["new one"]
+    (attached,) = matches.issues
+    assert (attached["title"], attached["ts"]) == ("Cart crashes", "2024-02-01T10:00:00Z")
+    assert (
+        attached["known_issue"]["sessions"] == ["s1"]
+        and attached["known_issue"]["occurrences"] == 1
+    )
+    # "other" was counted but never explained, so it still goes to the model
+    assert index.get("console|error|other").explanation is None
+
+
+def test_errors_are_only_explained_by_issues_that_link_them() -> None:
+    index = KnownIssueIndex(max_entries=100)
+    events = [
+        _error("2024-01-01T00:00:05Z", "first failure"),
+        _error("2024-01-01T00:00:06Z", "second failure"),
+    ]
+    matches = index.match(events)
+    # both errors are inside the window, but only the first one made it into the evidence
+    linked = Correlator(events, max_errors=1).attach(
+        [{"title": "First", "ts": "2024-01-01T00:00:05Z"}]
+    )
+    assert linked[0]["linked_evidence"]["error_count"] == 2
+    index.observe("s1", matches, linked)
+    assert index.get("console|error|first failure").explanation["title"] == "First"
+    assert index.get("console|error|second failure").explanation is None
+
+
+def test_index_is_bounded_and_persisted(tmp_path) -> None:
+    path = tmp_path / "index.ckpt"
+    clock = iter(range(100, 1000)).__next__
+    index = KnownIssueIndex(path, max_entries=3, flush_seconds=0, clock=lambda: float(clock()))
+    for idx in range(5):
+        ts = f"2024-01-01T00:00:0{idx}Z"
+        _learn(
+            index,
+            f"s{idx}",
+            [_error(ts, f"failure {chr(97 + idx)}")],
+            [{"title": f"t{idx}", "ts": ts}],
+        )
+    assert len(index) == 3 and index.get("console|error|failure a") is None
+
+    other_worker = KnownIssueIndex(path, max_entries=3)
+    assert other_worker.get("console|error|failure e").explanation["title"] == "t4"
+    _learn(other_worker, "s9", [_error("2024-01-01T00:00:09Z", "failure e")], [])
+    other_worker.flush()
+    assert KnownIssueIndex(path).get("console|error|failure e").count == 2
+
+
+def test_index_lives_apart_from_session_checkpoints(tmp_path) -> None:
+    from ai.services.checkpoints import CheckpointStore
+
+    store = CheckpointStore(base_dir=tmp_path, ttl_hours=48)
+    (tmp_path / "_known_issues.ckpt").write_bytes(b"")
+    index = KnownIssueIndex.from_settings(store)
+    assert index.path == tmp_path / "_index" / "known_issues.ckpt" and index.path.exists()
+
+    index.flush_seconds = 0
+    _learn(
+        index,
+        "s1",
+        [_error("2024-01-01T00:00:05Z", "boom")],
+        [{"title": "Boom", "ts": "2024-01-01T00:00:05Z"}],
+    )
+    store.append_chunk("_known_issues", {"chunk_id": "c1"})
+    assert sorted(path.name for path in tmp_path.glob("*.ckpt")) == ["_known_issues.ckpt"]
+    assert (
+        KnownIssueIndex.from_settings(store).get("console|error|boom").explanation["title"]
+        == "Boom"
+    )
+
+
+def test_adk_skips_the_log_agent_when_every_error_is_known(tmp_path, monkeypatch) -> None:
+    pytest.importorskip("google.adk")
+    monkeypatch.setenv("CHECKPOINT_DIR", str(tmp_path))
+    from ai.services.adk_orchestrator import AdkOrchestrator
+    from ai.services.model_backends import SyntheticBackend
+
+    orchestrator = AdkOrchestrator(backend=SyntheticBackend(seed=4))
+    events = [_error("2024-01-01T00:00:05Z", "TypeError: cart 1 is undefined")]
+    _learn(
+        orchestrator.issue_index,
+        "s1",
+        events,
+        [{"title": "Cart crashes", "ts": "2024-01-01T00:00:05Z"}],
+    )
+    calls = []
+    original = orchestrator._call_agent
+
+    async def spy(agent, payload, task):
+        calls.append(agent.name)
+        return await original(agent, payload, task)
+
+    orchestrator._call_agent = spy
+    report = orchestrator.analyze_chunk(
+        {"id": "s2"},
+        {"id": "c1"},
+        [_error("2024-03-01T00:00:00Z", "TypeError: cart 7 is undefined")],
+    )
+    assert "log_analyst" not in calls
+    known = [issue for issue in report["issues"] if issue.get("known_issue")]
+    assert [issue["title"] for issue in known] == ["Cart crashes"]
+    assert orchestrator.issue_index.get(known[0]["fingerprints"][0]).count == 2
+
+
+def test_adk_does_not_learn_explanations_from_network_issues(tmp_path, monkeypatch) -> None:
+    pytest.importorskip("google.adk")
+    monkeypatch.setenv("CHECKPOINT_DIR", str(tmp_path))
+    from ai.services.adk_orchestrator import AdkOrchestrator
+    from ai.services.model_backends import SyntheticBackend
+
+    orchestrator = AdkOrchestrator(backend=SyntheticBackend(seed=4))
+    events = [_error("2024-01-01T00:00:05Z", "TypeError: menu is undefined")]
+    url = "https://x.test/api/slow"
+    for idx, sent in enumerate(["2024-01-01T00:00:04Z", "2024-01-01T00:00:05Z"]):
+        request = {"requestId": f"r{idx}", "url": url, "method": "GET", "type": "request"}
+        events += [
+            {"type": "network", "ts": sent, "payload": request},
+            {
+                "type": "network",
+                "ts": "2024-01-01T00:00:09Z",
+                "payload": {"requestId": f"r{idx}", "url": url, "status": 200},
+            },
+        ]
+    report = orchestrator.analyze_chunk({"id": "s1"}, {"id": "c1"}, events)
+    slow = [issue for issue in report["issues"] if issue["title"].startswith("Slow endpoint")]
+    assert slow and slow[0]["linked_evidence"]["error_count"] == 1
+    entry = orchestrator.issue_index.get("console|error|typeerror: menu is undefined")
+    assert entry.count == 1 and entry.explanation is None
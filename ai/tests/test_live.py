@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import pytest
+
+from ai.services.live import EventIndex, LiveSessionRegistry, event_key
+from ai.services.orchestrator import StubOrchestrator
+from ai.tools.event_tools import event_fingerprint
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _console(idx: int, message: str, level: str = "error") -> dict:
+    return {
+        "id": f"e{idx}",
+        "ts": idx,
+        "type": "console",
+        "payload": {"message": message, "level": level},
+    }
+
+
+def test_fingerprint_masks_volatile_parts() -> None:
+    first = {
+        "type": "console",
+        "payload": {"level": "error", "message": "Order 1234 failed (0xdeadbeef)"},
+    }
+    second = {"type": "console", "payload": {"level": "error", "message": "Order 98 failed (0x1f)"}}
+    assert event_fingerprint(first) == event_fingerprint(second)
+    network = {"type": "network", "payload": {"status": 500, "url": "https://x.test/api/orders/12?page=3"}}
+    other = {"type": "network", "payload": {"status": 500, "url": "https://x.test/api/orders/7"}}
+    assert event_fingerprint(network) == event_fingerprint(other)
+    assert event_fingerprint({"type": "interaction", "payload": {}}) is None
+
+
+def test_watermark_windows_and_clusters() -> None:
+    clock = FakeClock()
+    registry = LiveSessionRegistry(window_events=10, window_seconds=5, error_burst=3, clock=clock)
+
+    state = registry.ingest("s1", [_console(i, f"info {i}", level="info") for i in range(4)])
+    assert state["window"] is None
+
+    state = registry.ingest("s1", [_console(i, f"boom {i}") for i in range(4, 7)])
+    assert state["window"]["reason"] == "error_burst"
+    assert state["clusters"][0]["count"] == 3 and state["window"]["error_count"] == 3
+    assert state["window"]["finding_count"] == state["precomputed_findings"] == 3
+
+    # resent events are deduplicated
+    state = registry.ingest("s1", [_console(4, "boom 4")])
+    assert state["event_count"] == 7 and state["window"] is None
+
+    state = registry.ingest("s1", [_console(i, "info", level="info") for i in range(7, 17)])
+    assert state["window"]["reason"] == "events"
+
+    registry.ingest("s1", [_console(17, "info", level="info")])
+    clock.now = 6
+    state = registry.ingest("s1", [_console(18, "info", level="info")])
+    assert state["window"]["reason"] == "time"
+
+
+def test_registry_evicts_idle_and_excess_sessions() -> None:
+    clock = FakeClock()
+    registry = LiveSessionRegistry(ttl_seconds=10, max_sessions=2, clock=clock)
+    registry.ingest("a", [])
+    registry.ingest("b", [])
+    registry.ingest("c", [])
+    assert registry.get("a") is None and registry.get("c") is not None
+    clock.now = 20
+    registry.ingest("d", [])
+    assert registry.get("b") is None and registry.get("c") is None
+
+
+def test_dedup_window_is_bounded() -> None:
+    index = EventIndex(seen_limit=3)
+    events = [_console(i, "info", level="info") for i in range(5)]
+    assert len(index.add(events)) == 5 and len(index.seen) == 3
+
+    # the newest keys are still deduplicated; keys pushed out of the window count again
+    assert index.add(events[4:]) == [] and index.add(events[:1]) == events[:1]
+    assert index.total == 6 and len(index.seen) == 3
+
+
+def test_stub_analysis_reuses_live_findings() -> None:
+    registry = LiveSessionRegistry(error_burst=1, seen_limit=4)
+    events = [_console(i, f"boom {i}") for i in range(6)]
+    registry.ingest("s1", events[:3])
+    findings = registry.take_findings("s1", events)
+    assert set(findings) == {event_key(event) for event in events[:3]}
+    assert registry.get("s1").findings == {}
+
+    # findings no chunk took are bounded like the dedup window
+    registry.ingest("s1", [_console(i, f"boom {i}") for i in range(10, 16)])
+    assert list(registry.get("s1").findings) == ["e12", "e13", "e14", "e15"]
+
+    orchestrator = StubOrchestrator()
+    orchestrator.use_llm = False
+    reused = orchestrator.analyze_chunk({"id": "s1"}, {"id": "c1"}, events, findings)
+    fresh = orchestrator.analyze_chunk({"id": "s1"}, {"id": "c1"}, events)
+    assert reused == fresh
+    assert reused["issues"][0] is findings["e0"][0]
+
+
+def test_adk_log_payload_takes_rule_summaries_from_live_findings(tmp_path, monkeypatch) -> None:
+    pytest.importorskip("google.adk")
+    monkeypatch.setenv("CHECKPOINT_DIR", str(tmp_path))
+    from ai.services.adk_orchestrator import AdkOrchestrator
+    from ai.services.model_backends import SyntheticBackend
+
+    events = [
+        {
+            "id": f"n{idx}",
+            "ts": idx,
+            "type": "network",
+            "payload": {"status": 500, "method": "GET", "url": "https://x.test/api/cart"},
+        }
+        for idx in range(3)
+    ]
+    registry = LiveSessionRegistry(error_burst=3)
+    registry.ingest("s1", events)
+    findings = registry.take_findings("s1", events)
+    assert len(findings) == 3
+
+    orchestrator = AdkOrchestrator(backend=SyntheticBackend(seed=1))
+    matched = []
+    original = orchestrator.rules.match
+    monkeypatch.setattr(
+        orchestrator.rules, "match", lambda event: matched.append(event) or original(event)
+    )
+    payload = orchestrator._build_log_payload(
+        {"session": {"id": "s1"}, "chunk": {"id": "c1"}, "events": events}, findings
+    )
+    assert matched == [] and payload["events"] == []
+    assert [(known["rule"], known["count"]) for known in payload["known_issues"]] == [
+        ("server-error", 3)
+    ]
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("google.genai")
+
+from google.genai import types  # noqa: E402
+
+from ai.services.model_backends import (  # noqa: E402
+    FaultInjector,
+    LatencyModel,
+    RateLimitError,
+    RecordingBackend,
+    ReplayBackend,
+    SyntheticBackend,
+    prompt_hash,
+)
+
+
+class _FixedBackend:
+    async def generate(self, agent, parts) -> str:
+        return json.dumps({"summary": f"recorded for {agent.name}"})
+
+
+def test_record_then_replay(tmp_path) -> None:
+    agent = SimpleNamespace(name="log_analyst")
+    parts = [types.Part(text="Analyze console/network logs.")]
+
+    asyncio.run(RecordingBackend(_FixedBackend(), tmp_path).generate(agent, parts))
+    replay = ReplayBackend(tmp_path, strict=True)
+
+    assert (
+        json.loads(asyncio.run(replay.generate(agent, parts)))["summary"]
+        == "recorded for log_analyst"
+    )
+    with pytest.raises(Exception):
+        asyncio.run(replay.generate(agent, [types.Part(text="different prompt")]))
+
+
+def test_replay_key_ignores_checkpoint_timestamps() -> None:
+    def prompt(updated_at: str, issues: int) -> list:
+        payload = {
+            "chunk": {"id": "c1"},
+            "checkpoint": {"updated_at": updated_at, "issue_count": issues},
+        }
+        return [
+            types.Part(
+                text=f"Analyze logs.\n\nReturn ONLY valid JSON. Input JSON:\n{json.dumps(payload)}"
+            )
+        ]
+
+    key = prompt_hash("log_analyst", prompt("2024-01-01T00:00:00+00:00", 2))
+    assert prompt_hash("log_analyst", prompt("2024-06-01T12:30:00+00:00", 2)) == key
+    assert prompt_hash("log_analyst", prompt("2024-01-01T00:00:00+00:00", 3)) != key
+    assert prompt_hash("log_analyst", [types.Part(text="not {json")]) != key
+
+
+def test_synthetic_responses_are_valid_json() -> None:
+    backend = SyntheticBackend(seed=1)
+    for name in ["log_analyst", "video_analyst", "repro_planner", "synthesizer", "qa_chat"]:
+        data = json.loads(
+            asyncio.run(backend.generate(SimpleNamespace(name=name), [types.Part(text="x")]))
+        )
+        assert data.get("summary") or data.get("reply")
+
+
+def test_malformed_replies_tolerate_any_replayed_text() -> None:
+    faults = FaultInjector(malformed_rate=1.0)
+    texts = ["plain text reply", '["a", "b"]', '{"issues": ["not a dict", 3]}', '{"issues": "x"}']
+    for seed in range(5):
+        for text in texts:
+            corrupted = faults.maybe_corrupt(random.Random(seed), text)
+            assert corrupted.startswith("Here is the analysis: ")
+
+    issues = '{"issues": ["skip", {"severity": "low"}]}'
+    broken = {faults.maybe_corrupt(random.Random(seed), issues) for seed in range(20)}
+    assert json.dumps({"issues": ["skip", {"severity": "severe!!"}]}) in broken
+
+
+def test_fault_injection_and_latency() -> None:
+    backend = SyntheticBackend(faults=FaultInjector(rate_limit_rate=1.0), seed=1)
+    with pytest.raises(RateLimitError):
+        asyncio.run(backend.generate(SimpleNamespace(name="synthesizer"), [types.Part(text="x")]))
+
+    rng = random.Random(0)
+    samples = [
+        LatencyModel("lognormal", mean_ms=200, stddev_ms=50).sample(rng) for _ in range(2000)
+    ]
+    assert 0.18 < sum(samples) / len(samples) < 0.22
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import pytest
+
+from ai.services.network_perf import NetworkAnalyzer, percentile
+
+
+def _ts(seconds: float) -> str:
+    minutes, secs = divmod(seconds, 60)
+    return f"2024-01-01T00:{int(minutes):02d}:{secs:06.3f}Z"
+
+
+def _request(
+    request_id: str, url: str, sent: float, took_ms: float, status: int = 200, method: str = "GET"
+) -> list:
+    return [
+        {
+            "type": "network",
+            "ts": _ts(sent),
+            "payload": {"requestId": request_id, "url": url, "method": method, "type": "request"},
+        },
+        {
+            "type": "network",
+            "ts": _ts(sent + took_ms / 1000.0),
+            "payload": {"requestId": request_id, "url": url, "status": status},
+        },
+    ]
+
+
+def test_percentile_interpolates_like_numpy() -> None:
+    assert percentile([], 50) is None
+    assert percentile([10.0], 99) == 10.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.5
+    assert percentile([1.0, 2.0, 3.0, 4.0], 90) == 3.7
+
+
+def test_requests_are_paired_and_summarized_per_endpoint() -> None:
+    events = []
+    for idx in range(10):
+        events += _request(
+            f"r{idx}", f"https://api.example.com/items/{idx}?page=2", idx, 100 + idx * 10
+        )
+    events += _request("slow", "https://api.example.com/items/99", 20, 4000)
+    events.append({"type": "interaction", "ts": _ts(1), "payload": {"action": "click"}})
+
+    report = NetworkAnalyzer(slow_ms=1000).analyze(events)
+    (endpoint,) = report.endpoints
+    assert endpoint["endpoint"] == "GET api.example.com/items/#"
+    assert (endpoint["count"], endpoint["errors"], endpoint["p50_ms"], endpoint["max_ms"]) == (
+        11,
+        0,
+        150,
+        4000,
+    )
+    assert [outlier["duration_ms"] for outlier in report.outliers] == [4000]
+    assert [issue["title"] for issue in report.issues] == [
+        "Slow request GET api.example.com/items/#"
+    ]
+    assert (
+        report.table().splitlines()[1]
+        == "GET api.example.com/items/# | 11 | 0 | 150 | 190 | 3619 | 4000"
+    )
+
+
+def test_retry_storms_need_most_calls_to_fail() -> None:
+    storm = []
+    for idx in range(6):
+        storm += _request(
+            f"s{idx}",
+            "https://api.example.com/pay",
+            idx,
+            50,
+            status=503 if idx % 3 else 200,
+            method="POST",
+        )
+    polling = []
+    for idx in range(6):
+        polling += _request(
+            f"p{idx}", "https://api.example.com/poll", idx, 50, status=500 if idx == 0 else 200
+        )
+
+    report = NetworkAnalyzer(storm_count=5, storm_seconds=10).analyze(storm + polling)
+    assert [
+        (entry["endpoint"], entry["count"], entry["failing"]) for entry in report.retry_storms
+    ] == [("POST api.example.com/pay", 6, 4)]
+    titles = {issue["title"]: issue["severity"] for issue in report.issues}
+    assert titles == {
+        "POST api.example.com/pay fails 67% of requests": "medium",
+        "Retry storm on POST api.example.com/pay": "high",
+    }
+
+
+def test_concurrency_peak_and_failed_loads() -> None:
+    events = []
+    for idx in range(20):
+        events += _request(f"c{idx}", f"https://cdn.example.com/img/{idx}.png", 0.01 * idx, 2000)
+    events.append(
+        {
+            "type": "network",
+            "ts": _ts(0),
+            "payload": {
+                "requestId": "f",
+                "url": "https://x.example.com/a",
+                "type": "request",
+                "method": "GET",
+            },
+        }
+    )
+    events.append(
+        {
+            "type": "network",
+            "ts": _ts(1),
+            "payload": {
+                "requestId": "f",
+                "url": "https://x.example.com/a",
+                "type": "failed",
+                "error": "net::ERR_FAILED",
+            },
+        }
+    )
+
+    report = NetworkAnalyzer(max_concurrency=16).analyze(events)
+    assert report.concurrency["in_flight"] == 20 and report.concurrency["host"] == "cdn.example.com"
+    assert any(
+        issue["title"] == "Request waterfall congestion on cdn.example.com"
+        for issue in report.issues
+    )
+    failed = next(entry for entry in report.endpoints if entry["endpoint"] == "GET x.example.com/a")
+    assert (failed["errors"], failed["p50_ms"]) == (1, 1000)
+    assert report.prompt_summary()["peak_concurrency"]["in_flight"] == 20
+
+
+def test_stub_log_analyst_reports_network_issues() -> None:
+    from ai.services.orchestrator import StubOrchestrator
+
+    events = []
+    for idx in range(4):
+        events += _request(f"r{idx}", "https://api.example.com/report", idx * 5, 2500)
+    report = StubOrchestrator().analyze_chunk({"id": "s"}, {"id": "c"}, events)
+    assert any(
+        issue["title"] == "Slow endpoint GET api.example.com/report" for issue in report["issues"]
+    )
+
+
+def test_adk_log_payload_carries_the_table_instead_of_successful_requests(
+    tmp_path, monkeypatch
+) -> None:
+    pytest.importorskip("google.adk")
+    monkeypatch.setenv("CHECKPOINT_DIR", str(tmp_path))
+    from ai.services.adk_orchestrator import AdkOrchestrator
+    from ai.services.model_backends import SyntheticBackend
+
+    orchestrator = AdkOrchestrator(backend=SyntheticBackend(seed=2))
+    events = _request("ok", "https://api.example.com/a", 0, 80) + _request(
+        "bad", "https://api.example.com/b", 1, 80, status=418
+    )
+    payload = {"session": {"id": "s"}, "chunk": {"id": "c"}, "events": events}
+    payload["network_summary"] = orchestrator.network.analyze(events).prompt_summary()
+
+    log_payload = orchestrator._build_log_payload(payload)
+    assert [event["payload"]["requestId"] for event in log_payload["events"]] == ["bad"]
+    assert log_payload["network_summary"]["table"].startswith("endpoint | n | err")
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import time
+
+import pytest
+
+from ai.app import serve, wire
+from ai.core.loop_lag import LoopLagMonitor
+from ai.core.metrics import metrics
+from ai.core.offload import OffloadPool
+from ai.services import checkpoints
+from ai.services.checkpoints import CheckpointStore
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = OffloadPool(workers=1, min_bytes=0)
+    yield pool
+    pool.shutdown()
+
+
+def test_small_payloads_stay_inline() -> None:
+    metrics.reset()
+    pool = OffloadPool(workers=1, min_bytes=1024)
+
+    assert pool.call(len, b"abc", size=3, task="probe") == 3
+    assert metrics.value("offload_tasks_total", task="probe", mode="inline") == 1
+    assert pool._executor is None
+    assert not OffloadPool(workers=0).should_offload(10**9)
+
+
+def test_pool_decodes_bodies_and_keeps_wire_errors(pool) -> None:
+    events = [
+        {
+            "id": idx,
+            "ts": f"2026-01-01T00:00:{idx:02d}Z",
+            "type": "console",
+            "payload": {"level": "error"},
+        }
+        for idx in range(30)
+    ]
+    columnar = {"session": {"id": "s-1"}, "events": wire.collapse_events(events, "s-1")}
+    body = gzip.compress(json.dumps(columnar).encode("utf-8"))
+
+    data = pool.call(
+        wire.decode_body, body, wire.COLUMNAR_JSON, "gzip", 0, size=len(body), task="decode_body"
+    )
+    assert data == wire.decode_body(body, wire.COLUMNAR_JSON, "gzip")
+
+    with pytest.raises(wire.WireFormatError) as excinfo:
+        pool.call(
+            wire.decode_body, body, "application/json", "br", 0, size=len(body), task="decode_body"
+        )
+    assert excinfo.value.status_code == 415
+
+
+def test_checkpoints_roundtrip_through_pool(tmp_path, pool, monkeypatch) -> None:
+    monkeypatch.setattr(checkpoints, "offload", pool)
+    store = CheckpointStore(base_dir=tmp_path, ttl_hours=48)
+    issue = {"title": "Console error", "severity": "high"}
+    store.append_chunk(
+        "session-1",
+        {
+            "chunk_id": "c-1",
+            "issues": [issue],
+            "agents": [{"name": "log_analyst", "issues": [issue]}],
+        },
+    )
+    store.append_chunk("session-1", {"chunk_id": "c-2", "issues": [issue]})
+
+    state = store.load("session-1")
+    assert [report["chunk_id"] for report in state["chunk_reports"]] == ["c-1", "c-2"]
+    assert state["chunk_reports"][0]["agents"][0]["issues"] == [issue]
+    assert state["issues"] == [issue, issue]
+
+
+def test_checkpoint_encode_is_sized_by_the_previous_write(tmp_path, monkeypatch) -> None:
+    metrics.reset()
+    monkeypatch.setattr(checkpoints, "offload", OffloadPool(workers=1, min_bytes=1))
+    store = CheckpointStore(base_dir=tmp_path, ttl_hours=48)
+    store.append_chunk("session-1", {"chunk_id": "c-1", "issues": []})
+    assert metrics.value("offload_tasks_total", task="checkpoint_encode", mode="inline") == 1
+
+    store.append_chunk("session-1", {"chunk_id": "c-2", "issues": []})
+    assert metrics.value("offload_tasks_total", task="checkpoint_encode", mode="pool") == 1
+    checkpoints.offload.shutdown()
+
+
+def test_serve_splits_cpus_between_worker_pools(monkeypatch) -> None:
+    monkeypatch.setattr(serve, "usable_cpus", lambda: 16)
+    monkeypatch.delenv("OFFLOAD_WORKERS", raising=False)
+    assert serve.offload_workers(8) == 2 and serve.offload_workers(32) == 1
+
+    monkeypatch.setenv("OFFLOAD_WORKERS", "3")
+    assert serve.offload_workers(8) == serve.settings.offload_workers
+
+
+def test_loop_lag_monitor_sees_blocking_work() -> None:
+    monitor = LoopLagMonitor(interval=0.01)
+
+    async def scenario() -> None:
+        monitor.start()
+        await asyncio.sleep(0.03)
+        time.sleep(0.1)  # synchronous work on the loop
+        await asyncio.sleep(0.03)
+        monitor.stop()
+
+    asyncio.run(scenario())
+    assert monitor.max_lag >= 0.05
+    assert metrics.value("event_loop_lag_max_seconds") >= 0.05
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+
+from fastapi.testclient import TestClient
+
+os.environ["ADK_ENABLED"] = "false"
+
+from ai.app.main import app  # noqa: E402
+from ai.core.profiling import ProfilingMiddleware, current_profile, profiled, stage  # noqa: E402
+
+
+def _spin(seconds: float) -> int:
+    total = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        total += 1
+    return total
+
+
+def test_stage_is_a_no_op_outside_profiles() -> None:
+    with stage("idle"):
+        assert current_profile() is None
+
+
+def test_profiled_block_writes_stacks_and_stages(tmp_path) -> None:
+    with profiled("unit", str(tmp_path), interval=0.001) as profile:
+        with stage("spin"):
+            _spin(0.05)
+
+    breakdown = json.loads((tmp_path / f"{profile.id}.stages.json").read_text())
+    names = [entry["name"] for entry in breakdown["stages"]]
+    assert names[:2] == ["total", "spin"]
+    assert [entry["depth"] for entry in breakdown["timeline"] if entry["name"] == "spin"] == [1]
+    collapsed = (tmp_path / f"{profile.id}.collapsed").read_text()
+    assert breakdown["samples"] > 0
+    assert "_spin (test_profiling.py" in collapsed
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in collapsed.splitlines())
+
+
+def test_middleware_profiles_only_requested_requests(tmp_path) -> None:
+    client = TestClient(ProfilingMiddleware(app, directory=str(tmp_path), interval=0.001))
+    payload = {"session": {"id": "session-prof"}, "chunk": {"id": "chunk-1"}, "events": []}
+
+    assert "x-qa-profile-id" not in client.post("/analyze", json=payload).headers
+    assert not list(tmp_path.iterdir())
+
+    response = client.post("/analyze", json=payload, headers={"X-QA-Profile": "1"})
+    assert response.status_code == 200
+    profile_id = response.headers["x-qa-profile-id"]
+    breakdown = json.loads((tmp_path / f"{profile_id}.stages.json").read_text())
+    assert breakdown["request"] == "POST /analyze"
+    assert breakdown["status"] == 200
+    assert {"body.parse", "orchestrator.analyze", "agent.log_analyst", "response"} <= {
+        entry["name"] for entry in breakdown["stages"]
+    }
+    assert (tmp_path / f"{profile_id}.collapsed").exists()
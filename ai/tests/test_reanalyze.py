@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+import io
+import json
+
+from ai.scripts.reanalyze import load_done, read_sessions, reanalyze
+from ai.services.orchestrator import Orchestrator
+
+
+def _write_export(path, sessions: int) -> None:
+    lines = []
+    for idx in range(sessions):
+        lines.append({"session": {"id": f"s{idx}"}})
+        for chunk_idx in range(2):
+            lines.append({"chunk": {"id": f"s{idx}-c{chunk_idx}", "idx": chunk_idx}, "events": []})
+            lines.append(
+                {
+                    "event": {
+                        "type": "console",
+                        "ts": 1,
+                        "payload": {"level": "error", "message": "TypeError: x is undefined"},
+                    }
+                }
+            )
+    data = "".join(json.dumps(line) + "\n" for line in lines).encode()
+    path.write_bytes(gzip.compress(data) if path.suffix == ".gz" else data)
+
+
+def test_read_sessions_groups_streamed_records(tmp_path) -> None:
+    path = tmp_path / "export.ndjson.gz"
+    _write_export(path, 3)
+    records = list(read_sessions(path))
+    assert [record.session_id for record in records] == ["s0", "s1", "s2"]
+    assert [len(entry["events"]) for entry in records[0].chunks] == [1, 1]
+    assert sum(record.size for record in records) == path.stat().st_size
+
+
+def test_reanalyze_streams_reports_and_resumes(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("ADK_ENABLED", "false")
+    source = tmp_path / "export.ndjson"
+    output = tmp_path / "reports.ndjson"
+    _write_export(source, 5)
+    orchestrator = Orchestrator()
+
+    first = asyncio.run(
+        reanalyze(
+            source, output, concurrency=3, limit=2, orchestrator=orchestrator, out=io.StringIO()
+        )
+    )
+    assert (first["sessions"], first["chunks"], first["errors"]) == (2, 4, 0)
+    # a crash mid-write leaves a torn line that the next run drops
+    with output.open("a") as handle:
+        handle.write('{"session_id": "s4", "aggre')
+
+    second = asyncio.run(
+        reanalyze(source, output, concurrency=3, orchestrator=orchestrator, out=io.StringIO())
+    )
+    assert (second["sessions"], second["skipped"]) == (3, 2)
+    reports = [json.loads(line) for line in output.read_text().splitlines()]
+    assert sorted(report["session_id"] for report in reports) == ["s0", "s1", "s2", "s3", "s4"]
+    assert reports[0]["aggregate"]["summary"] == "2 total issues detected across 2 chunks."
+    assert load_done(output) == {"s0", "s1", "s2", "s3", "s4"}
+
+
+def test_failed_sessions_are_retried(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("ADK_ENABLED", "false")
+    source = tmp_path / "export.ndjson"
+    source.write_text(
+        json.dumps(
+            {"session": {"id": "bad"}, "chunks": [{"chunk": {"id": "c"}, "events": [{"ts": 1}]}]}
+        )
+        + "\n"
+    )
+    output = tmp_path / "reports.ndjson"
+
+    summary = asyncio.run(reanalyze(source, output, orchestrator=Orchestrator(), out=io.StringIO()))
+    assert summary["errors"] == 1
+    assert json.loads(output.read_text())["error"].startswith("ValidationError")
+    assert load_done(output) == set()
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+
+from ai.services.retrieval import (
+    BM25Index,
+    RetrievalCache,
+    build_documents,
+    estimate_tokens,
+    pack_context,
+)
+
+
+def _events(count: int) -> list:
+    events = [
+        {
+            "id": f"e{i}",
+            "ts": i,
+            "type": "console",
+            "payload": {"level": "info", "message": f"render widget {i}"},
+        }
+        for i in range(count)
+    ]
+    events[3]["payload"] = {
+        "level": "error",
+        "message": "PaymentGateway timeout while charging card",
+    }
+    return events
+
+
+def test_bm25_ranks_matching_old_event_first() -> None:
+    documents = build_documents(
+        _events(500), {"issues": [{"title": "Slow render", "detail": "widget"}]}, {}, []
+    )
+    hits = BM25Index(documents).search("why did the payment gateway timeout?", k=5)
+    assert hits[0][1].item["id"] == "e3"
+
+
+def test_pack_context_respects_budget_and_order() -> None:
+    documents = build_documents(_events(50), {}, {}, [])
+    hits = [(1.0, document) for document in reversed(documents)]
+    context = pack_context(hits, budget_tokens=200, pinned=documents[-2:])
+    assert context["token_estimate"] <= 200
+    ids = [event["id"] for event in context["events"]]
+    assert ids == sorted(ids, key=lambda value: int(value[1:]))
+    assert {"e48", "e49"} <= set(ids)
+    assert (
+        sum(estimate_tokens(json.dumps(event)) for event in context["events"])
+        == context["token_estimate"]
+    )
+
+
+def test_cache_reuses_index_until_session_changes() -> None:
+    cache = RetrievalCache(max_sessions=2)
+    events = _events(100)
+    first = cache.context("s1", "payment", events, {}, {}, [], top_k=5, budget_tokens=1000)
+    cache.context("s1", "render", events, {}, {}, [], top_k=5, budget_tokens=1000)
+    assert cache.builds == 1
+    assert first["events"][0]["id"] == "e3"
+
+    cache.context(
+        "s1",
+        "payment",
+        events + [{"id": "e100", "type": "console", "payload": {}}],
+        {},
+        {},
+        [],
+        5,
+        1000,
+    )
+    assert cache.builds == 2
+    cache.context("s2", "x", events, {}, {}, [], 5, 1000)
+    cache.context("s3", "x", events, {}, {}, [], 5, 1000)
+    cache.context(
+        "s1", "x", events + [{"id": "e100", "type": "console", "payload": {}}], {}, {}, [], 5, 1000
+    )
+    assert cache.builds == 5
+
+
+def test_resources_are_split_into_passages() -> None:
+    resource = {
+        "id": "notes",
+        "type": "artifacts",
+        "label": "Notes",
+        "text": "x " * 400 + "refund flow broken",
+    }
+    documents = build_documents([], {}, {}, [resource])
+    assert len(documents) == 2
+    hits = BM25Index(documents).search("refund", k=1)
+    assert "refund" in hits[0][1].item["text"]
+
+
+def test_chat_prompt_uses_retrieved_context(tmp_path, monkeypatch) -> None:
+    pytest.importorskip("google.adk")
+    monkeypatch.setenv("CHECKPOINT_DIR", str(tmp_path))
+    from ai.services.adk_orchestrator import AdkOrchestrator
+
+    prompts = []
+
+    class CaptureBackend:
+        async def generate(self, agent, parts) -> str:
+            prompts.append(json.loads(parts[0].text))
+            return json.dumps({"reply": "ok"})
+
+    orchestrator = AdkOrchestrator(backend=CaptureBackend())
+    events = _events(2000)
+    analysis = {
+        "summary": "s",
+        "issues": [{"title": f"issue {i}", "detail": "render"} for i in range(200)],
+    }
+    resources = [{"id": "errors", "type": "errors", "label": "Errors", "count": 1}]
+    asyncio.run(
+        orchestrator.chat_async(
+            {"id": "s1"}, analysis, events, "payment gateway?", "investigate", "default", resources
+        )
+    )
+
+    prompt = prompts[0]
+    assert "events" not in prompt
+    assert prompt["context"]["events"][0]["id"] == "e3"
+    assert prompt["analysis"]["issue_count"] == 200 and "issues" not in prompt["analysis"]
+    assert len(json.dumps(prompt)) < len(
+        json.dumps({"events": events[-300:], "analysis": analysis})
+    )
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from ai.services.rules import DEFAULT_RULES, RuleEngine, RuleError, _literals, load_rules
+
+
+def _console(message: str, level: str = "error") -> dict:
+    return {
+        "type": "console",
+        "ts": "2024-01-01T00:00:00Z",
+        "payload": {"level": level, "message": message},
+    }
+
+
+def _network(status: int, url: str, method: str = "GET") -> dict:
+    return {
+        "type": "network",
+        "ts": "2024-01-01T00:00:01Z",
+        "payload": {"status": status, "url": url, "method": method},
+    }
+
+
+def test_default_pack_triages_common_failures() -> None:
+    engine = RuleEngine(DEFAULT_RULES)
+
+    issue, evidence = engine.finding(
+        _console("Uncaught TypeError: Cannot read properties of undefined")
+    )
+    assert (issue["rule"], issue["severity"], issue["category"]) == (
+        "type-error",
+        "high",
+        "javascript",
+    )
+    assert evidence == {
+        "type": "console",
+        "message": "Uncaught TypeError: Cannot read properties of undefined",
+        "ts": "2024-01-01T00:00:00Z",
+    }
+
+    issue, _ = engine.finding(_network(503, "https://api.example.com/v1/cart?id=9", "post"))
+    assert issue["title"] == "503 from POST /v1/cart"
+    assert engine.finding(_network(404, "https://example.com/favicon.ico")) is None
+    assert engine.finding(_console("ResizeObserver loop limit exceeded")) is None
+
+    issue, _ = engine.finding(_network(418, "https://example.com/teapot"))
+    assert (issue["title"], issue["severity"], "rule" in issue) == (
+        "Network error detected",
+        "medium",
+        False,
+    )
+    assert engine.finding(_console("render complete", level="info")) is None
+
+
+def test_first_rule_in_the_pack_wins_and_match_all_sees_warnings() -> None:
+    engine = RuleEngine(
+        [
+            {
+                "id": "specific",
+                "pattern": r"\bcheckout\b.*\bfailed\b",
+                "severity": "high",
+                "title": "Checkout: {match}",
+            },
+            {"id": "broad", "keywords": ["failed"], "severity": "low", "title": "Something failed"},
+            {
+                "id": "deprecations",
+                "keywords": ["deprecated"],
+                "match": "all",
+                "level": ["warn"],
+                "severity": "low",
+                "title": "Deprecated API",
+            },
+        ]
+    )
+    assert (
+        engine.finding(_console("Error: checkout request failed"))[0]["title"]
+        == "Checkout: checkout request failed"
+    )
+    assert engine.finding(_console("Error: upload failed"))[0]["rule"] == "broad"
+    assert (
+        engine.finding(_console("componentWillMount is deprecated", level="warn"))[0]["rule"]
+        == "deprecations"
+    )
+    assert engine.finding(_console("componentWillMount is deprecated", level="info")) is None
+    assert engine.match_all
+
+
+def test_patterns_without_anchor_words_still_match() -> None:
+    engine = RuleEngine(
+        [
+            {"id": "prefixed", "pattern": r"(?:ERR|WARN)_CONNECTION_\w+", "title": "{match}"},
+            {"id": "digits", "pattern": r"[0-9]{3} \w+", "title": "{match}"},
+        ]
+    )
+    assert engine._combined is not None and engine._substrings
+    assert (
+        engine.finding(_console("Error ERR_CONNECTION_RESET"))[0]["title"] == "ERR_CONNECTION_RESET"
+    )
+    assert engine.finding(_console("error 500 upstream"))[0]["rule"] == "digits"
+
+
+def test_literal_extraction_only_keeps_words_every_match_contains() -> None:
+    assert _literals(r"\bfoo\b")[0] == ["foo"]
+    assert _literals(r"foo bar?")[0] == []
+    assert "hello" in _literals(r"(?:x) hello world")[0]
+    assert _literals(r"a(?:b|c)d")[0] == []
+
+
+def test_matches_are_cached_per_fingerprint() -> None:
+    engine = RuleEngine(DEFAULT_RULES, cache_size=2)
+    first = engine.match(_console("Request timed out after 3000ms"))
+    calls = []
+    engine._classify = lambda event: calls.append(event) or (-1, "")  # type: ignore[method-assign]
+
+    again = engine.match(_console("Request timed out after 5000ms"))
+    assert again is not None and again.rule is first.rule and not calls
+    engine.match(_console("other error 1"))
+    engine.match(_console("other error 2 words"))
+    assert engine.match(_console("Request timed out after 7ms")) is None and len(calls) == 3
+
+
+def test_invalid_packs_are_rejected(tmp_path) -> None:
+    with pytest.raises(RuleError):
+        RuleEngine([{"id": "a", "title": "A", "severity": "critical"}])
+    with pytest.raises(RuleError):
+        RuleEngine([{"id": "a", "title": "A", "pattern": "("}])
+    with pytest.raises(RuleError):
+        RuleEngine([{"id": "a", "title": "A"}, {"id": "a", "title": "B"}])
+
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({"rules": [{"id": "a", "title": "A", "keywords": ["boom"]}]}))
+    assert RuleEngine(load_rules(str(path))).finding(_console("boom error"))[0]["rule"] == "a"
+
+
+def test_adk_log_payload_summarizes_known_issues(tmp_path, monkeypatch) -> None:
+    pytest.importorskip("google.adk")
+    monkeypatch.setenv("CHECKPOINT_DIR", str(tmp_path))
+    from ai.services.adk_orchestrator import AdkOrchestrator
+    from ai.services.model_backends import SyntheticBackend
+
+    orchestrator = AdkOrchestrator(backend=SyntheticBackend(seed=1))
+    events = [
+        _console("ResizeObserver loop limit exceeded"),
+        _network(500, "https://api.example.com/cart"),
+        _network(500, "https://api.example.com/cart"),
+        _console("something odd happened"),
+    ]
+    payload = orchestrator._build_log_payload(
+        {"session": {"id": "s"}, "chunk": {"id": "c"}, "events": events}
+    )
+
+    assert payload["events"] == [events[3]]
+    assert [(known["rule"], known["count"]) for known in payload["known_issues"]] == [
+        ("server-error", 2)
+    ]
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import pytest
+
+from ai.services.checkpoints import CheckpointStore
+from ai.services.views import canned_view, fresh_view, render_reply, update_views
+
+
+def _report(chunk_id: str, *issues: tuple) -> dict:
+    return {
+        "chunk_id": chunk_id,
+        "summary": f"summary {chunk_id}",
+        "issues": [
+            {"title": title, "severity": severity, "detail": f"{title} detail"}
+            for title, severity in issues
+        ],
+    }
+
+
+REPORTS = [
+    _report("c1", ("Cart 500", "medium"), ("Slow search", "low")),
+    _report("c2", ("Cart 500", "high")),
+    _report("c3", ("Login loop", "medium")),
+]
+
+
+def test_canned_questions_pick_a_view() -> None:
+    assert canned_view("summarize", "") == "summarize"
+    assert canned_view("investigate", "Summarize this session!") == "summarize"
+    assert canned_view("triage", "Triage issues") == "triage"
+    assert canned_view("triage", "why does the cart fail?") is None
+    assert canned_view("investigate", "") is None
+
+
+def test_incremental_views_match_a_full_rebuild(tmp_path) -> None:
+    store = CheckpointStore(tmp_path)
+    for report in REPORTS:
+        store.append_chunk("s1", report)
+    checkpoint = store.load("s1")
+
+    rebuilt = update_views(
+        {"chunk_reports": checkpoint["chunk_reports"], "summary": checkpoint["summary"]}
+    )
+    assert {
+        key: value for key, value in checkpoint["views"].items() if key != "version"
+    } == rebuilt["views"]
+    groups = checkpoint["views"]["triage"]["groups"]
+    assert [
+        (group["title"], group["severity"], group["count"], group["chunk_ids"]) for group in groups
+    ] == [
+        ("Cart 500", "high", 2, ["c1", "c2"]),
+        ("Login loop", "medium", 1, ["c3"]),
+        ("Slow search", "low", 1, ["c1"]),
+    ]
+    assert fresh_view(checkpoint, "summarize")["severity_breakdown"] == {
+        "high": 2,
+        "medium": 1,
+        "low": 1,
+    }
+    assert (
+        render_reply("triage", fresh_view(checkpoint, "triage"))["reply"].splitlines()[1]
+        == "1. [high] Cart 500 (x2): Cart 500 detail"
+    )
+
+    # a write that does not rebuild the views leaves them stale
+    store.save("s1", {**checkpoint, "summary": "edited"})
+    assert fresh_view(store.load("s1"), "triage") is None
+
+
+def test_adk_chat_serves_fresh_views_without_a_model_call(tmp_path, monkeypatch) -> None:
+    pytest.importorskip("google.adk")
+    monkeypatch.setenv("CHECKPOINT_DIR", str(tmp_path))
+    monkeypatch.setenv("ADK_ENABLED", "true")
+    monkeypatch.setenv("ADK_MODEL_BACKEND", "synthetic")
+    from ai.services.orchestrator import Orchestrator
+
+    orchestrator = Orchestrator()
+    for report in REPORTS:
+        orchestrator.adk.checkpoints.append_chunk("s1", report)
+    calls = []
+    original = orchestrator.adk._run_agent_parts
+
+    async def spy(agent, parts):
+        calls.append(agent.name)
+        return await original(agent, parts)
+
+    orchestrator.adk._run_agent_parts = spy
+    reply = orchestrator.chat({"id": "s1"}, {}, [], "Triage issues", "triage", "default")
+    assert calls == [] and reply["view"] == "triage" and "Cart 500" in reply["reply"]
+
+    orchestrator.chat({"id": "s1"}, {}, [], "Why does the cart fail?", "triage", "default")
+    assert len(calls) == 1
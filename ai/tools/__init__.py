@@ -11,6 +11,8 @@ from ai.tools.event_tools import (
     filter_network_events,
     filter_interaction_events,
     extract_error_events,
+    is_error_event,
+    event_fingerprint,
 )
 from ai.tools.checkpoint_tools import (
     load_checkpoint_context,
@@ -22,6 +24,8 @@ __all__ = [
     "filter_network_events",
     "filter_interaction_events",
     "extract_error_events",
+    "is_error_event",
+    "event_fingerprint",
     "load_checkpoint_context",
     "save_checkpoint",
 ]
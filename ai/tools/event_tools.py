@@ -1,7 +1,15 @@
 """Tools for filtering and processing events."""
 from __future__ import annotations
 
-from typing import Any, Dict, List
+import re
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+_VOLATILE = re.compile(
+    r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"
+    r"|0x[0-9a-f]+|\b[0-9a-f]{12,}\b|\d+",
+    re.IGNORECASE,
+)
 
 
 def filter_console_events(events: List[Dict[str, Any]], limit: int = 200) -> List[Dict[str, Any]]:
@@ -47,6 +55,27 @@ def filter_interaction_events(events: List[Dict[str, Any]], limit: int = 200) ->
     return filtered[-limit:]
 
 
+def is_error_event(event: Dict[str, Any]) -> bool:
+    """Whether a console or network event indicates an error.
+
+    Args:
+        event: Event dictionary
+
+    Returns:
+        True for error/fatal console logs, console messages mentioning
+        "error", and network responses with status >= 400
+    """
+    event_type = event.get("type")
+    payload = event.get("payload", {})
+    if event_type == "console":
+        level = str(payload.get("level", "")).lower()
+        return level in {"error", "fatal"} or "error" in str(payload.get("message", "")).lower()
+    if event_type == "network":
+        status = payload.get("status")
+        return isinstance(status, (int, float)) and int(status) >= 400
+    return False
+
+
 def extract_error_events(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """Extract events that indicate errors.
     
@@ -56,20 +85,57 @@ def extract_error_events(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     Returns:
         List of events containing errors
     """
-    errors = []
-    for event in events:
-        event_type = event.get("type")
-        payload = event.get("payload", {})
-        
-        if event_type == "console":
-            level = str(payload.get("level", "")).lower()
-            message = str(payload.get("message", "")).lower()
-            if level in {"error", "fatal"} or "error" in message:
-                errors.append(event)
-                
-        elif event_type == "network":
-            status = payload.get("status")
-            if isinstance(status, (int, float)) and int(status) >= 400:
-                errors.append(event)
-                
-    return errors
+    return [event for event in events if is_error_event(event)]
+
+
+def event_fingerprint(event: Dict[str, Any]) -> Optional[str]:
+    """Stable key grouping error events that differ only in volatile details.
+
+    Numbers, hex ids and UUIDs in console messages are masked, and network
+    URLs lose their query string and numeric path segments, so repeats of the
+    same failure share a fingerprint.
+
+    Args:
+        event: Event dictionary
+
+    Returns:
+        Fingerprint string, or None for events that are not console/network
+    """
+    event_type = event.get("type")
+    payload = event.get("payload") or {}
+    if event_type == "console":
+        level = str(payload.get("level", "")).lower()
+        message = _VOLATILE.sub("#", str(payload.get("message", "")).strip().lower())
+        return f"console|{level}|{message[:200]}"
+    if event_type == "network":
+        method = str(payload.get("method", "")).upper()
+        return f"network|{payload.get('status')}|{method}|{url_pattern(payload.get('url', ''))}"
+    return None
+
+
+def event_key(event: Dict[str, Any]) -> str:
+    """Identity of an event across live deltas and the final chunk payload.
+
+    Args:
+        event: Event dictionary
+
+    Returns:
+        The event ``id``, or its timestamp, type and fingerprint when it has none
+    """
+    event_id = event.get("id")
+    if event_id is not None:
+        return str(event_id)
+    return f"{event.get('ts')}|{event.get('type')}|{event_fingerprint(event)}"
+
+
+def url_pattern(url: Any) -> str:
+    """Host and path of ``url`` with the query string dropped and ids masked.
+
+    Args:
+        url: Request URL
+
+    Returns:
+        ``host/path`` string shared by requests to the same endpoint
+    """
+    parts = urlsplit(str(url or ""))
+    return f"{parts.netloc}{_VOLATILE.sub('#', parts.path)}"
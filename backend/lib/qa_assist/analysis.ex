@@ -111,6 +111,25 @@ defmodule QaAssist.Analysis do
     |> Enum.map(& &1.report)
   end
 
+  def list_chunk_report_ids(session_id) do
+    from(a in Analysis,
+      where: a.session_id == ^session_id and not is_nil(a.chunk_id) and a.status == "done",
+      order_by: [asc: a.inserted_at],
+      select: a.chunk_id
+    )
+    |> Repo.all()
+    |> Enum.uniq()
+  end
+
+  def list_chunk_reports(session_id, chunk_ids) when is_list(chunk_ids) do
+    from(a in Analysis,
+      where: a.session_id == ^session_id and a.chunk_id in ^chunk_ids and a.status == "done",
+      order_by: [asc: a.inserted_at]
+    )
+    |> Repo.all()
+    |> Enum.map(&Map.put(&1.report, "chunk_id", &1.chunk_id))
+  end
+
   def get_session_report(session_id) do
     analyses =
       from(a in Analysis, where: a.session_id == ^session_id, order_by: [asc: a.inserted_at])
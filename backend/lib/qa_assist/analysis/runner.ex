@@ -11,13 +11,13 @@ defmodule QaAssist.Analysis.Runner do
   def run_chunk(%Chunk{} = chunk) do
     Analysis.record_chunk_running(chunk)
 
-    session = Repo.get(Session, chunk.session_id)
-    events = load_events(chunk)
+    session = serialize_session(Repo.get(Session, chunk.session_id))
+    events = chunk |> load_events() |> Enum.map(&serialize_event/1)
 
     payload = %{
-      session: serialize_session(session),
-      chunk: serialize_chunk(chunk),
-      events: Enum.map(events, &serialize_event/1)
+      session: session,
+      chunk: with_priority(session, serialize_chunk(chunk), events),
+      events: events
     }
 
     case call_ai(payload) do
@@ -30,14 +30,29 @@ defmodule QaAssist.Analysis.Runner do
   end
 
   def run_session(%Session{} = session) do
-    chunks = Analysis.list_chunk_reports(session.id)
+    # Send chunk ids only; the AI service keeps chunk reports in its checkpoint
+    # and asks for any it is missing.
+    chunk_ids = Analysis.list_chunk_report_ids(session.id)
 
     payload = %{
       session: serialize_session(session),
-      chunk_reports: chunks
+      chunk_ids: chunk_ids
     }
 
-    case call_ai(payload, "/aggregate") do
+    result =
+      case call_ai(payload, "/aggregate") do
+        {:ok, %{"missing_chunk_ids" => [_ | _] = missing}} ->
+          reports = Analysis.list_chunk_reports(session.id, missing)
+          call_ai(Map.put(payload, :chunk_reports, reports), "/aggregate")
+
+        other ->
+          other
+      end
+
+    case result do
+      {:ok, %{"missing_chunk_ids" => [_ | _] = missing}} ->
+        Analysis.record_session_failure(session, "chunk reports missing: #{Enum.join(missing, ", ")}")
+
       {:ok, report} ->
         Analysis.record_session_report(session, report)
 
@@ -46,6 +61,22 @@ defmodule QaAssist.Analysis.Runner do
     end
   end
 
+  # The AI service scores the chunk for error bursts and picks its analysis depth:
+  # deep for chunks with a burst, light for chunks without errors. Only this
+  # chunk's events are sent, so bursts are measured against the chunk's own
+  # baseline. Without a score the chunk is analyzed at standard depth.
+  defp with_priority(session, chunk, events) do
+    payload = %{session: session, chunks: [%{chunk: chunk, events: events}]}
+
+    case call_ai(payload, "/prioritize") do
+      {:ok, %{"chunks" => [%{"score" => score, "depth" => depth} | _]}} ->
+        Map.put(chunk, :priority, %{score: score, depth: depth})
+
+      _ ->
+        chunk
+    end
+  end
+
   defp load_events(%Chunk{} = chunk) do
     query =
       if chunk.start_ts && chunk.end_ts do